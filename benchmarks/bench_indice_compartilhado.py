@@ -0,0 +1,98 @@
+"""
+Benchmark do AcordaoIndex em memória compartilhada (AcordaoIndexCompartilhado).
+
+Compara com o AcordaoIndex comum o tempo das consultas (citações extraídas
+dos acórdãos, que se repetem, e chaves sorteadas uniformemente, que não), o
+tamanho serializado enviado a cada tarefa de um ProcessPoolExecutor e a
+memória residente dos workers. Cada consulta ao índice compartilhado custa
+cerca de 1,5 a 2 vezes a do dict (ver AcordaoIndexCompartilhado); o ganho
+está na memória e no envio às tarefas.
+
+Uso:
+    python -m benchmarks.bench_indice_compartilhado [--input DIR_ESPELHOS] [--total N] [--workers N]
+"""
+import argparse
+import os
+import pickle
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Tuple
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.acordao_index_compartilhado import AcordaoIndexCompartilhado
+from parsers.sigla_matcher import SiglaMatcher
+
+from .bench_sigla_matcher import carregar_acordaos, extrair_citacoes
+from .synthetic import gerar_acordaos
+
+def tempo_consultas(index: AcordaoIndex, chaves: List[Tuple[str, str]]) -> float:
+    """Tempo médio por consulta, em microssegundos."""
+    inicio = time.perf_counter()
+    for tipo, numero in chaves:
+        index.get_id(tipo, numero)
+    return (time.perf_counter() - inicio) / max(len(chaves), 1) * 1e6
+
+def memoria_residente() -> int:
+    """Memória residente atual do processo, em KB (inclui páginas compartilhadas já lidas)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        # Fora do Linux: pico desde o início do processo
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def consultar_no_worker(index: AcordaoIndex, chaves: List[Tuple[str, str]]) -> Tuple[int, int]:
+    """Executa as consultas num worker; retorna acertos e a memória residente (KB)."""
+    acertos = sum(1 for tipo, numero in chaves if index.get_id(tipo, numero))
+    return acertos, memoria_residente()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help="Diretório com pastas Espelho* (padrão: dados sintéticos)")
+    parser.add_argument('--total', type=int, default=200_000, help="Acórdãos sintéticos a gerar")
+    parser.add_argument('--workers', type=int, default=4, help="Processos do ProcessPoolExecutor")
+    args = parser.parse_args()
+    
+    acordaos = carregar_acordaos(args.input) if args.input else list(gerar_acordaos(args.total))
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    for acordao in acordaos:
+        index.add_acordao(acordao)
+    citacoes = extrair_citacoes(acordaos)
+    del acordaos
+    chaves = [chave for chave, _ in index.items()]
+    random.seed(0)
+    uniformes = random.sample(chaves, min(len(chaves), 100_000))
+    print(f"Entradas: {len(index):,} | citações: {len(citacoes):,}")
+    
+    inicio = time.perf_counter()
+    indice_compartilhado = AcordaoIndexCompartilhado.criar(index)
+    print(f"Criação do segmento: {time.perf_counter() - inicio:.3f}s ({indice_compartilhado._memoria.size / 1e6:.1f} MB)")
+    
+    try:
+        for nome, chaves_consulta in (('citações', citacoes), ('uniforme', uniformes)):
+            tempo_dict = tempo_consultas(index, chaves_consulta)
+            tempo_compartilhado = tempo_consultas(indice_compartilhado, chaves_consulta)
+            print(f"Consulta ({nome}): dict {tempo_dict:.2f}us | compartilhado {tempo_compartilhado:.2f}us "
+                  f"({tempo_compartilhado / tempo_dict:.1f}x)")
+                  
+        print(f"Pickle: dict {len(pickle.dumps(index)):,} bytes | "
+              f"compartilhado {len(pickle.dumps(indice_compartilhado)):,} bytes")
+        
+        lotes = [uniformes[i::args.workers * 4] for i in range(args.workers * 4)]
+        for nome, indice in (('dict', index), ('compartilhado', indice_compartilhado)):
+            inicio = time.perf_counter()
+            # spawn: workers não herdam a memória deste processo, só o que recebem nas tarefas
+            with ProcessPoolExecutor(args.workers, mp_context=get_context('spawn')) as pool:
+                resultados = list(pool.map(consultar_no_worker, [indice] * len(lotes), lotes))
+            duracao = time.perf_counter() - inicio
+            acertos = sum(acertos for acertos, _ in resultados)
+            pico = max(pico for _, pico in resultados)
+            print(f"Pool ({nome}): {duracao:.2f}s | acertos {acertos:,} | RSS por worker {pico / 1024:.0f} MB")
+    finally:
+        indice_compartilhado.liberar()
+
+if __name__ == "__main__":
+    main()
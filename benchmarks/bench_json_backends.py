@@ -0,0 +1,73 @@
+"""
+Benchmark dos backends JSON (stdlib, orjson, ujson, simdjson) em arquivos Espelho.
+
+Para cada backend instalado mede a leitura dos arquivos e a gravação no formato
+de saída do pipeline (indent=2, ensure_ascii=False), e confere se o texto
+gravado é idêntico ao do stdlib.
+
+Uso:
+    python -m benchmarks.bench_json_backends [--input DIR_ESPELHOS] [--total N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from parsers import json_utils
+
+from .synthetic import gerar_arvore_espelho
+
+def listar_arquivos(base_path: str) -> List[str]:
+    """Lista os arquivos JSON das pastas Espelho*."""
+    arquivos = []
+    for root, _, files in os.walk(base_path):
+        if os.path.basename(root).startswith("Espelho"):
+            arquivos.extend(os.path.join(root, f) for f in files if f.endswith('.json'))
+    return sorted(arquivos)
+
+def medir(arquivos: List[str]) -> None:
+    """Mede cada backend disponível sobre os arquivos."""
+    conteudos = []
+    for caminho in arquivos:
+        with open(caminho, 'rb') as f:
+            conteudos.append(f.read())
+    megabytes = sum(len(c) for c in conteudos) / 1e6
+    print(f"Arquivos: {len(arquivos):,} ({megabytes:,.1f} MB)")
+    
+    documentos = [json_utils._stdlib_loads(c) for c in conteudos]
+    referencia = [json_utils._stdlib_dumps(d, 2, False, None) for d in documentos]
+    
+    print(f"{'backend':<10} {'loads MB/s':>12} {'dumps MB/s':>12}  saída idêntica")
+    for nome, backend in json_utils._backends_disponiveis().items():
+        inicio = time.perf_counter()
+        for conteudo in conteudos:
+            backend['loads'](conteudo)
+        vazao_loads = megabytes / max(time.perf_counter() - inicio, 1e-9)
+        
+        vazao_dumps, identica = '-', '-'
+        if backend['dumps'] is not None:
+            inicio = time.perf_counter()
+            saidas = [backend['dumps'](d, 2, False, None) for d in documentos]
+            vazao_dumps = f"{megabytes / max(time.perf_counter() - inicio, 1e-9):,.1f}"
+            identica = 'sim' if saidas == referencia else 'NÃO'
+            
+        print(f"{nome:<10} {vazao_loads:>12,.1f} {vazao_dumps:>12}  {identica}")
+        
+    print(f"\nBackends selecionados: {json_utils.json_backend()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help="Diretório com pastas Espelho* (padrão: dados sintéticos)")
+    parser.add_argument('--total', type=int, default=20_000, help="Acórdãos sintéticos a gerar")
+    args = parser.parse_args()
+    
+    if args.input:
+        medir(listar_arquivos(args.input))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            gerar_arvore_espelho(tmp, args.total)
+            medir(listar_arquivos(tmp))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark de memória dos registros compactos (parsers.registros).
+
+Processa acórdãos sintéticos e mantém em memória os campos estruturados, uma
+vez como dicts (saída padrão dos parsers) e outra como registros com
+__slots__ e valores internados. Mede a memória retida com tracemalloc e
+confere que as duas formas serializam exatamente no mesmo JSON.
+
+Uso:
+    python -m benchmarks.bench_registros [--total N]
+"""
+import argparse
+import gc
+import hashlib
+import time
+import tracemalloc
+from typing import Dict, List
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.json_utils import dumps
+from parsers.output_schema import CAMPOS_ESTRUTURADOS
+from process_stj_data import process_acordao
+
+from .synthetic import gerar_acordaos
+
+def construir_indice(total: int) -> AcordaoIndex:
+    """Índice dos acórdãos sintéticos, para que as citações tenham id."""
+    index = AcordaoIndex()
+    for acordao in gerar_acordaos(total):
+        index.add_acordao(acordao)
+    return index
+
+def campos_estruturados(total: int, index: AcordaoIndex, compacto: bool) -> List[Dict]:
+    """Processa os acórdãos e retém só os campos estruturados."""
+    retidos = []
+    for acordao in gerar_acordaos(total):
+        processado = process_acordao(acordao, index, compacto=compacto)
+        retidos.append({campo: processado[campo] for campo in CAMPOS_ESTRUTURADOS if campo in processado})
+    return retidos
+
+def medir(total: int, index: AcordaoIndex, compacto: bool):
+    """Retorna (bytes retidos, segundos, hashes do JSON de cada acórdão)."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    retidos = campos_estruturados(total, index, compacto)
+    duracao = time.perf_counter() - inicio
+    gc.collect()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    hashes = [hashlib.blake2b(dumps(r).encode('utf-8'), digest_size=8).digest() for r in retidos]
+    del retidos
+    return memoria, duracao, hashes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--total', type=int, default=100_000, help="Acórdãos sintéticos a processar")
+    args = parser.parse_args()
+    
+    index = construir_indice(args.total)
+    
+    resultados = {}
+    for nome, compacto in (('dicts', False), ('registros', True)):
+        resultados[nome] = medir(args.total, index, compacto)
+        memoria, duracao, _ = resultados[nome]
+        print(f"{nome:<10} memória retida: {memoria / 2 ** 20:8.1f} MiB "
+              f"({memoria / args.total:,.0f} bytes/acórdão) | parse: {duracao:.1f}s")
+              
+    iguais = resultados['dicts'][2] == resultados['registros'][2]
+    reducao = 1 - resultados['registros'][0] / resultados['dicts'][0]
+    print(f"\nRedução de memória: {reducao:.1%}")
+    print(f"JSON idêntico em todos os {args.total:,} acórdãos: {'sim' if iguais else 'NÃO'}")
+
+if __name__ == "__main__":
+    main()
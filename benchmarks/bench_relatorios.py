@@ -0,0 +1,81 @@
+"""
+Benchmark do modo somente contagem dos índices analíticos.
+
+Constrói o RelatorIndex e o LegalReferencesIndex a partir de acórdãos
+sintéticos processados, uma vez com os conjuntos de ids (modo padrão) e
+outra só com os sketches (somente_contagem=True). Mede a memória retida por
+cada índice com tracemalloc e confere que os relatórios são iguais.
+
+Uso:
+    python -m benchmarks.bench_relatorios [--total N] [--capacidade N]
+"""
+import argparse
+import contextlib
+import difflib
+import gc
+import io
+import time
+import tracemalloc
+from typing import Dict, List
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.relator_index import RelatorIndex
+from parsers.sketches import CAPACIDADE_PADRAO
+from process_stj_data import process_acordao
+
+from .synthetic import gerar_acordaos
+
+def acordaos_processados(total: int) -> List[Dict]:
+    index = AcordaoIndex()
+    for acordao in gerar_acordaos(total):
+        index.add_acordao(acordao)
+    return [process_acordao(acordao, index) for acordao in gerar_acordaos(total)]
+
+def construir(acordaos: List[Dict], somente_contagem: bool, capacidade: int):
+    """Retorna (bytes retidos, segundos, texto dos relatórios)."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    relatores = RelatorIndex(somente_contagem, capacidade)
+    referencias = LegalReferencesIndex(somente_contagem, capacidade)
+    for acordao in acordaos:
+        relatores.add_acordao(acordao)
+        for ref in acordao.get('referenciasLegislativasEstruturadas', []):
+            referencias.add_reference(ref, acordao['id'])
+    duracao = time.perf_counter() - inicio
+    gc.collect()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        relatores._generate_report()
+        referencias._generate_report()
+    return memoria, duracao, saida.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--total', type=int, default=50_000, help="Acórdãos sintéticos")
+    parser.add_argument('--capacidade', type=int, default=CAPACIDADE_PADRAO,
+                        help="Chaves monitoradas por top-k no modo somente contagem")
+    args = parser.parse_args()
+    
+    acordaos = acordaos_processados(args.total)
+    
+    relatorios = {}
+    for nome, somente_contagem in (('conjuntos', False), ('contagem', True)):
+        memoria, duracao, relatorios[nome] = construir(acordaos, somente_contagem, args.capacidade)
+        print(f"{nome:<10} memória retida: {memoria / 2 ** 20:8.1f} MiB | construção: {duracao:.1f}s")
+        
+    # A linha final do modo somente contagem descreve o próprio modo
+    padrao = relatorios['conjuntos'].splitlines()
+    contagem = [linha for linha in relatorios['contagem'].splitlines() if not linha.startswith('(modo')]
+    if padrao == contagem:
+        print("\nRelatórios idênticos")
+    else:
+        print("\nRelatórios diferentes:")
+        print('\n'.join(difflib.unified_diff(padrao, contagem, 'conjuntos', 'contagem', lineterm='')))
+
+if __name__ == "__main__":
+    main()
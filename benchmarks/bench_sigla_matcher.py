@@ -0,0 +1,92 @@
+"""
+Benchmark da normalização de siglas de classe (SiglaMatcher).
+
+Mede a vazão da normalização e a taxa de acerto das buscas de citações no
+AcordaoIndex com e sem normalização.
+
+Uso:
+    python -m benchmarks.bench_sigla_matcher [--input DIR_ESPELHOS] [--total N]
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Tuple
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.acordaos_similares import parse_acordaos_similares
+from parsers.json_utils import process_json_content
+from parsers.jurisprudencia_citada import parse_jurisprudencia_citada
+from parsers.sigla_matcher import SiglaMatcher
+
+from .synthetic import gerar_acordaos
+
+def carregar_acordaos(base_path: str) -> List[Dict]:
+    """Lê todos os acórdãos das pastas Espelho* de um diretório."""
+    acordaos = []
+    for root, _, files in os.walk(base_path):
+        if os.path.basename(root).startswith("Espelho"):
+            for filename in files:
+                if filename.endswith('.json'):
+                    with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                        conteudo = process_json_content(f.read())
+                    if conteudo:
+                        acordaos.extend(conteudo if isinstance(conteudo, list) else [conteudo])
+    return acordaos
+
+def extrair_citacoes(acordaos: List[Dict]) -> List[Tuple[str, str]]:
+    """Extrai os pares (tipo, número) citados do STJ e dos acórdãos similares."""
+    citacoes = []
+    for acordao in acordaos:
+        if acordao.get('jurisprudenciaCitada'):
+            estrutura = parse_jurisprudencia_citada(acordao['jurisprudenciaCitada'])
+            for categoria in estrutura['categorias']:
+                for citado in categoria['acordaosCitados']:
+                    if citado.get('tribunal') == 'STJ' and 'estado' in citado:
+                        citacoes.append((citado['tipo'], citado['numero']))
+        if acordao.get('acordaosSimilares'):
+            for similar in parse_acordaos_similares(acordao['acordaosSimilares']).values():
+                citacoes.append((similar['tipo'], similar['numero']))
+    return citacoes
+
+def taxa_acerto(index: AcordaoIndex, citacoes: List[Tuple[str, str]]) -> float:
+    """Fração das citações localizadas no índice."""
+    if not citacoes:
+        return 0.0
+    acertos = sum(1 for tipo, numero in citacoes if index.get_id(tipo, numero))
+    return acertos / len(citacoes)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help="Diretório com pastas Espelho* (padrão: dados sintéticos)")
+    parser.add_argument('--total', type=int, default=20_000, help="Acórdãos sintéticos a gerar")
+    args = parser.parse_args()
+    
+    acordaos = carregar_acordaos(args.input) if args.input else list(gerar_acordaos(args.total))
+    citacoes = extrair_citacoes(acordaos)
+    tipos = [tipo for tipo, _ in citacoes]
+    print(f"Acórdãos: {len(acordaos):,} | citações: {len(citacoes):,} | tipos distintos: {len(set(tipos)):,}")
+    
+    inicio = time.perf_counter()
+    matcher = SiglaMatcher.from_recursos()
+    print(f"Construção do matcher: {time.perf_counter() - inicio:.4f}s")
+    
+    # Vazão sem cache (cada chamada percorre a trie) e com cache
+    matcher_frio = SiglaMatcher.from_recursos(max_cache=0)
+    for nome, m in (('sem cache', matcher_frio), ('com cache', matcher)):
+        inicio = time.perf_counter()
+        for tipo in tipos:
+            m.canonicalize(tipo)
+        duracao = time.perf_counter() - inicio
+        print(f"Normalização ({nome}): {len(tipos) / max(duracao, 1e-9):,.0f} tipos/s")
+        
+    bruto = AcordaoIndex()
+    normalizado = AcordaoIndex(matcher)
+    for acordao in acordaos:
+        bruto.add_acordao(acordao)
+        normalizado.add_acordao(acordao)
+        
+    print(f"Taxa de acerto (bruto): {taxa_acerto(bruto, citacoes):.2%}")
+    print(f"Taxa de acerto (normalizado): {taxa_acerto(normalizado, citacoes):.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Teste de carga local do serviço de consultas (servico_consultas.py).
+
+Sobe o serviço numa thread, em porta livre, com índices sintéticos (ou os
+índices salvos em --indices) e dispara consultas concorrentes com conexões
+keep-alive. As chaves seguem uma distribuição enviesada (poucas chaves muito
+consultadas), como num uso real, para exercitar o cache LRU.
+
+Uso:
+    python -m benchmarks.carga_servico [--total N] [--requisicoes N] [--conexoes N] [--cache N]
+    python -m benchmarks.carga_servico --indices DIR_INDICES
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Tuple
+from urllib.parse import urlencode
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.ministros_index import MinistrosIndex
+from parsers.recursos_index import RecursosIndex
+from parsers.referencias_legislativas import parse_referencias_legislativas
+from parsers.relator_index import RelatorIndex
+from parsers.sigla_matcher import SiglaMatcher
+from servico_consultas import ServicoConsultas
+
+from .synthetic import gerar_acordaos
+
+def servico_sintetico(total: int, max_cache: int) -> ServicoConsultas:
+    """Constrói os índices a partir de acórdãos sintéticos."""
+    acordaos = AcordaoIndex(SiglaMatcher.from_recursos())
+    referencias = LegalReferencesIndex()
+    relatores = RelatorIndex()
+    
+    for acordao in gerar_acordaos(total):
+        acordaos.add_acordao(acordao)
+        relatores.add_acordao(acordao)
+        for ref in parse_referencias_legislativas(acordao['referenciasLegislativas']):
+            referencias.add_reference(ref, acordao['id'])
+            
+    return ServicoConsultas(acordaos, referencias, relatores, MinistrosIndex(), RecursosIndex(),
+                            max_cache=max_cache)
+
+def gerar_consultas(servico: ServicoConsultas, quantidade: int, seed: int = 7) -> List[str]:
+    """Gera caminhos de consulta com chaves enviesadas (peso 1/posição)."""
+    rng = random.Random(seed)
+    chaves_acordao = [chave for chave, _ in islice(servico.acordaos.items(), 50_000)] if servico.acordaos else []
+    artigos = list(servico.referencias.by_article) if servico.referencias else []
+    nomes = list(servico.relatores.by_relator) if servico.relatores else []
+    
+    def escolher(itens):
+        pesos = [1 / (i + 1) for i in range(len(itens))]
+        return rng.choices(itens, weights=pesos, k=quantidade)
+        
+    acordaos = escolher(chaves_acordao) if chaves_acordao else []
+    consultas = []
+    for i in range(quantidade):
+        sorteio = rng.random()
+        if sorteio < 0.25 and artigos:
+            consultas.append('/legislacao?' + urlencode({'chave': rng.choice(artigos), 'limite': 50}))
+        elif sorteio < 0.40 and nomes:
+            consultas.append('/relator?' + urlencode({'nome': rng.choice(nomes)}))
+        elif sorteio < 0.48 or not chaves_acordao:
+            # Consultas de acórdãos inexistentes
+            consultas.append('/acordao?' + urlencode({'tipo': 'REsp', 'numero': rng.randint(1, 999)}))
+        else:
+            tipo, numero = acordaos[i]
+            consultas.append('/acordao?' + urlencode({'tipo': tipo, 'numero': numero}))
+    return consultas
+
+def iniciar_em_thread(servico: ServicoConsultas) -> Tuple[int, asyncio.AbstractEventLoop]:
+    """Sobe o servidor num loop asyncio em outra thread e retorna a porta."""
+    loop = asyncio.new_event_loop()
+    pronto = threading.Event()
+    porta = []
+    
+    def _rodar():
+        asyncio.set_event_loop(loop)
+        servidor = loop.run_until_complete(servico.iniciar('127.0.0.1', 0))
+        porta.append(servidor.sockets[0].getsockname()[1])
+        pronto.set()
+        loop.run_forever()
+        
+    threading.Thread(target=_rodar, daemon=True).start()
+    pronto.wait()
+    return porta[0], loop
+
+def disparar(porta: int, consultas: List[str]) -> List[float]:
+    """Executa as consultas numa conexão keep-alive e retorna as latências (ms)."""
+    conexao = http.client.HTTPConnection('127.0.0.1', porta)
+    latencias = []
+    for caminho in consultas:
+        inicio = time.perf_counter()
+        conexao.request('GET', caminho)
+        conexao.getresponse().read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    conexao.close()
+    return latencias
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--indices', help="Diretório com os índices salvos (padrão: índices sintéticos)")
+    parser.add_argument('--total', type=int, default=100_000, help="Acórdãos sintéticos a indexar")
+    parser.add_argument('--requisicoes', type=int, default=50_000)
+    parser.add_argument('--conexoes', type=int, default=8)
+    parser.add_argument('--cache', type=int, default=10_000)
+    args = parser.parse_args()
+    
+    inicio = time.perf_counter()
+    if args.indices:
+        servico = ServicoConsultas.carregar(args.indices, max_cache=args.cache)
+    else:
+        servico = servico_sintetico(args.total, args.cache)
+    print(f"Índices carregados em {time.perf_counter() - inicio:.2f}s: {servico.saude()}")
+    
+    consultas = gerar_consultas(servico, args.requisicoes)
+    porta, loop = iniciar_em_thread(servico)
+    
+    lotes = [consultas[i::args.conexoes] for i in range(args.conexoes)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.conexoes) as pool:
+        latencias = sorted(ms for lote in pool.map(lambda c: disparar(porta, c), lotes) for ms in lote)
+    duracao = time.perf_counter() - inicio
+    loop.call_soon_threadsafe(loop.stop)
+    
+    def percentil(p):
+        return latencias[min(int(p * len(latencias)), len(latencias) - 1)]
+        
+    print(f"\nRequisições: {len(latencias):,} em {duracao:.2f}s ({len(latencias) / duracao:,.0f} req/s) "
+          f"com {args.conexoes} conexões")
+    print(f"Latência no cliente: p50 {percentil(0.5):.3f}ms | p95 {percentil(0.95):.3f}ms | "
+          f"p99 {percentil(0.99):.3f}ms | máx {latencias[-1]:.3f}ms")
+    print("\nMétricas do serviço:")
+    print(json.dumps(servico.metricas(), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
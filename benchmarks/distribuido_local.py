@@ -0,0 +1,113 @@
+"""
+Teste local do modo distribuído de process_stj_data.py.
+
+Gera uma árvore Espelho* sintética num diretório temporário, processa-a uma
+vez em modo sequencial (referência) e depois com vários workers
+(`process_stj_data.py --distribuido`) em processos separados sobre a mesma
+saída. Com --matar, um dos workers é morto no meio do processamento; seus
+leases expiram e os demais os retomam. No final, a saída distribuída é
+comparada arquivo a arquivo com a referência.
+
+Uso:
+    python -m benchmarks.distribuido_local [--total N] [--workers N] [--por-arquivo N]
+    python -m benchmarks.distribuido_local --workers 4 --matar --lease 3
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.input_sources import listar_fontes
+from parsers.json_utils import load_file
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import DIRETORIO_DISTRIBUIDO, process_directory
+
+from .synthetic import gerar_arvore_espelho
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def iniciar_worker(entrada: str, saida: str, indice: str, nome: str, lease: float, log_path: str) -> subprocess.Popen:
+    comando = [sys.executable, os.path.join(RAIZ, 'process_stj_data.py'), entrada, saida, '--distribuido',
+               '--worker', nome, '--lease', str(lease), '--indice', indice]
+    with open(log_path, 'w', encoding='utf-8') as log:
+        return subprocess.Popen(comando, stdout=log, stderr=subprocess.STDOUT, cwd=RAIZ)
+
+def concluidos(saida: str) -> int:
+    """Marcadores de conclusão gravados até agora (em qualquer execução)."""
+    return sum(len(glob.glob(os.path.join(execucao, 'feitos', '*.json')))
+               for execucao in glob.glob(os.path.join(saida, DIRETORIO_DISTRIBUIDO, '*')))
+
+def diferencas(referencia: str, saida: str) -> List[str]:
+    """Arquivos de saída ausentes ou diferentes da referência."""
+    problemas = []
+    for fonte in listar_fontes(referencia):
+        caminho = os.path.join(saida, fonte.caminho_relativo)
+        if not os.path.exists(caminho):
+            problemas.append(f"ausente: {fonte.caminho_relativo}")
+        elif load_file(caminho) != load_file(os.path.join(referencia, fonte.caminho_relativo)):
+            problemas.append(f"diferente: {fonte.caminho_relativo}")
+    return problemas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--total', type=int, default=20_000, help="Acórdãos sintéticos")
+    parser.add_argument('--por-arquivo', type=int, default=200, help="Acórdãos por arquivo JSON")
+    parser.add_argument('--workers', type=int, default=3, help="Processos worker")
+    parser.add_argument('--lease', type=float, default=5.0, help="Validade dos leases, em segundos")
+    parser.add_argument('--matar', action='store_true', help="Mata um worker no meio do processamento")
+    parser.add_argument('--dir-trabalho', default=None, help="Diretório de trabalho (padrão: temporário)")
+    args = parser.parse_args()
+    
+    trabalho = args.dir_trabalho or tempfile.mkdtemp(prefix='stj_distribuido_')
+    entrada = os.path.join(trabalho, 'entrada')
+    referencia = os.path.join(trabalho, 'referencia')
+    saida = os.path.join(trabalho, 'saida')
+    indice = os.path.join(trabalho, 'acordaos.json')
+    for caminho in (entrada, referencia, saida):
+        shutil.rmtree(caminho, ignore_errors=True)
+        
+    gerar_arvore_espelho(entrada, args.total, args.por_arquivo)
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = AcordaoIndex(SiglaMatcher.from_recursos())
+        index.build_from_directory(entrada)
+        index.save_to_file(indice)
+        
+        inicio = time.perf_counter()
+        process_directory(entrada, referencia, indice_path=indice)
+    sequencial = time.perf_counter() - inicio
+    print(f"Sequencial: {sequencial:.1f}s")
+    
+    inicio = time.perf_counter()
+    workers = [iniciar_worker(entrada, saida, indice, f"w{i}", args.lease, os.path.join(trabalho, f"w{i}.log"))
+               for i in range(args.workers)]
+    if args.matar:
+        # Mata o primeiro worker quando cerca de um terço dos arquivos estiver concluído
+        arquivos = -(-args.total // args.por_arquivo)
+        while concluidos(saida) < arquivos // 3 and workers[0].poll() is None:
+            time.sleep(0.05)
+        workers[0].kill()
+        print(f"Worker w0 morto com {concluidos(saida)} de {arquivos} arquivos concluídos")
+    codigos = [worker.wait() for worker in workers]
+    distribuido = time.perf_counter() - inicio
+    print(f"Distribuído ({args.workers} workers): {distribuido:.1f}s | códigos de saída: {codigos}")
+    
+    with open(os.path.join(saida, 'relatorio_processamento.txt'), encoding='utf-8') as f:
+        print(f.read())
+        
+    problemas = diferencas(referencia, saida)
+    if problemas:
+        print(f"Saída diferente da referência ({len(problemas)} arquivos):")
+        print('\n'.join(f"  {problema}" for problema in problemas[:20]))
+        sys.exit(1)
+    print(f"Saída idêntica à referência ({trabalho})")
+
+if __name__ == "__main__":
+    main()
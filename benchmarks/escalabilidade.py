@@ -0,0 +1,248 @@
+"""
+Benchmark de escalabilidade do pipeline completo (1 mil a 1 milhão de acórdãos).
+
+Para cada tamanho, gera (ou reaproveita) uma árvore Espelho* sintética e
+executa as etapas do pipeline (pipeline.etapas_padrao) em ordem, cada uma
+num processo novo, medindo tempo, vazão (acórdãos/s) e pico de memória
+(RSS do processo e, com --tracemalloc, o pico do heap Python). Os
+resultados e as curvas de escalonamento (expoente log-log de cada etapa)
+são gravados em JSON e CSV.
+
+Com --baseline, compara com resultados gravados antes e termina com código
+1 se alguma etapa ficar mais de --tolerancia % mais lenta.
+
+Uso:
+    python -m benchmarks.escalabilidade [--tamanhos 1000,10000,100000] [--dir-trabalho DIR]
+    python -m benchmarks.escalabilidade --tamanhos 1000,10000,100000,1000000 --saida resultados/
+    python -m benchmarks.escalabilidade --baseline resultados/escalabilidade.json --tolerancia 20
+"""
+import argparse
+import contextlib
+import csv
+import math
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from parsers.json_utils import dump_file, json_backend, load_file
+from pipeline import Etapa, Pipeline, etapas_padrao
+
+from .synthetic import gerar_arvore_espelho
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ARQUIVO_JSON = 'escalabilidade.json'
+ARQUIVO_CSV = 'escalabilidade.csv'
+CAMPOS_CSV = ['tamanho', 'etapa', 'segundos', 'acordaos_por_segundo', 'pico_rss_mib', 'pico_python_mib']
+MARCADOR_ARVORE = '.arvore_completa'
+
+def preparar_arvore(dir_trabalho: str, total: int, por_arquivo: int) -> str:
+    """Gera a árvore sintética de `total` acórdãos, reaproveitando uma já completa."""
+    destino = os.path.join(dir_trabalho, f"arvore_{total}")
+    marcador = os.path.join(destino, MARCADOR_ARVORE)
+    if os.path.exists(marcador) and load_file(marcador) == {'total': total, 'por_arquivo': por_arquivo}:
+        return destino
+        
+    shutil.rmtree(destino, ignore_errors=True)
+    inicio = time.perf_counter()
+    gerar_arvore_espelho(destino, total, por_arquivo)
+    dump_file({'total': total, 'por_arquivo': por_arquivo}, marcador)
+    print(f"  árvore sintética de {total:,} acórdãos gerada em {time.perf_counter() - inicio:.1f}s")
+    return destino
+
+def _pico_rss() -> Optional[int]:
+    """Pico de memória residente do processo atual, em bytes."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KiB, macOS em bytes
+        return pico if sys.platform == 'darwin' else pico * 1024
+    if psutil is not None:
+        memoria = psutil.Process().memory_info()
+        return getattr(memoria, 'peak_wset', memoria.rss)
+    return None
+
+def medir_etapa(etapa: Etapa, config: Dict, log_path: str, com_tracemalloc: bool) -> Dict:
+    """Executa uma etapa (num processo próprio) e retorna tempo e picos de memória."""
+    if com_tracemalloc:
+        tracemalloc.start()
+    with open(log_path, 'a', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        inicio = time.perf_counter()
+        etapa.funcao(config)
+        segundos = time.perf_counter() - inicio
+    pico_python = tracemalloc.get_traced_memory()[1] if com_tracemalloc else None
+    pico_rss = _pico_rss()
+    return {
+        'segundos': segundos,
+        'pico_rss_mib': pico_rss / 2 ** 20 if pico_rss is not None else None,
+        'pico_python_mib': pico_python / 2 ** 20 if pico_python is not None else None,
+    }
+
+def executar_tamanho(arvore: str, dir_execucao: str, total: int, selecionadas: Optional[List[str]],
+                     com_tracemalloc: bool) -> List[Dict]:
+    """Executa as etapas do pipeline sobre uma árvore e retorna uma linha por etapa."""
+    shutil.rmtree(dir_execucao, ignore_errors=True)
+    os.makedirs(dir_execucao)
+    config = {
+        'entrada': arvore,
+        'saida': os.path.join(dir_execucao, 'parseados'),
+        'indices': os.path.join(dir_execucao, 'indices'),
+        'particionado': os.path.join(dir_execucao, 'particionado'),
+        'colunas': os.path.join(dir_execucao, 'colunas'),
+        'schema': 'completo',
+        'dedup': False,
+        'io_workers': 0,
+    }
+    os.makedirs(config['indices'])
+    log_path = os.path.join(dir_execucao, 'etapas.log')
+    
+    # Dependências das etapas selecionadas também rodam, mas não entram nos resultados
+    etapas = etapas_padrao(config)
+    necessarias = Pipeline(etapas, config).com_dependencias(selecionadas) if selecionadas else None
+    
+    # Um processo novo por etapa: o pico de RSS de uma não contamina a seguinte
+    contexto = multiprocessing.get_context('spawn')
+    linhas = []
+    for etapa in etapas:
+        if necessarias is not None and etapa.nome not in necessarias:
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            medicao = executor.submit(medir_etapa, etapa, config, log_path, com_tracemalloc).result()
+        if selecionadas and etapa.nome not in selecionadas:
+            continue
+        linha = {'tamanho': total, 'etapa': etapa.nome, **medicao,
+                 'acordaos_por_segundo': total / medicao['segundos'] if medicao['segundos'] else None}
+        linhas.append(linha)
+        rss = f"{linha['pico_rss_mib']:,.0f} MiB" if linha['pico_rss_mib'] is not None else '-'
+        print(f"  {etapa.nome:<26} {linha['segundos']:9.2f}s {linha['acordaos_por_segundo'] or 0:12,.0f} acórdãos/s"
+              f"  pico RSS {rss}")
+    return linhas
+
+def escalonamento(linhas: List[Dict]) -> Dict[str, Dict]:
+    """
+    Curva de cada etapa e seu expoente de escalonamento.
+    
+    O expoente é a inclinação da reta log(tempo) x log(tamanho) por mínimos
+    quadrados: ~1 é linear, acima disso a etapa cresce mais que o corpus.
+    """
+    curvas: Dict[str, Dict] = {}
+    for linha in linhas:
+        curva = curvas.setdefault(linha['etapa'], {'pontos': []})
+        curva['pontos'].append([linha['tamanho'], linha['segundos']])
+        
+    for curva in curvas.values():
+        pontos = [(math.log(n), math.log(s)) for n, s in curva['pontos'] if s > 0]
+        curva['expoente'] = None
+        if len({x for x, _ in pontos}) >= 2:
+            media_x = sum(x for x, _ in pontos) / len(pontos)
+            media_y = sum(y for _, y in pontos) / len(pontos)
+            covariancia = sum((x - media_x) * (y - media_y) for x, y in pontos)
+            variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+            curva['expoente'] = round(covariancia / variancia, 3)
+    return curvas
+
+def gravar_resultados(saida: str, linhas: List[Dict]) -> str:
+    """Grava os resultados em JSON (com ambiente e curvas) e CSV; retorna o caminho do JSON."""
+    os.makedirs(saida, exist_ok=True)
+    resultado = {
+        'ambiente': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'json': json_backend(),
+        },
+        'resultados': linhas,
+        'escalonamento': escalonamento(linhas),
+    }
+    caminho_json = os.path.join(saida, ARQUIVO_JSON)
+    dump_file(resultado, caminho_json)
+    
+    with open(os.path.join(saida, ARQUIVO_CSV), 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS_CSV)
+        escritor.writeheader()
+        escritor.writerows({campo: linha.get(campo) for campo in CAMPOS_CSV} for linha in linhas)
+    return caminho_json
+
+def comparar_baseline(linhas: List[Dict], baseline_path: str, tolerancia: float,
+                      min_segundos: float) -> List[str]:
+    """
+    Etapas mais lentas que o baseline além da tolerância (em %).
+    
+    Só são comparados os pares (tamanho, etapa) presentes nos dois, e etapas
+    que levaram menos de `min_segundos` no baseline são ignoradas (ruído).
+    """
+    baseline = {(linha['tamanho'], linha['etapa']): linha['segundos']
+                for linha in load_file(baseline_path)['resultados']}
+    regressoes = []
+    for linha in linhas:
+        anterior = baseline.get((linha['tamanho'], linha['etapa']))
+        if anterior is None or anterior < min_segundos:
+            continue
+        variacao = (linha['segundos'] / anterior - 1) * 100
+        if variacao > tolerancia:
+            regressoes.append(f"{linha['etapa']} com {linha['tamanho']:,} acórdãos: "
+                              f"{anterior:.2f}s -> {linha['segundos']:.2f}s (+{variacao:.1f}%)")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', default='1000,10000,100000',
+                        help="Tamanhos do corpus sintético, separados por vírgula")
+    parser.add_argument('--dir-trabalho', default=os.path.join(tempfile.gettempdir(), 'open_stj_escalabilidade'),
+                        help="Diretório das árvores sintéticas (reaproveitadas) e das saídas")
+    parser.add_argument('--saida', default=None, help="Diretório dos resultados (padrão: <dir-trabalho>/resultados)")
+    parser.add_argument('--por-arquivo', type=int, default=500, help="Acórdãos por arquivo JSON")
+    parser.add_argument('--etapas', default=None, help="Etapas a medir, separadas por vírgula (padrão: todas)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Mede também o pico do heap Python (deixa as etapas mais lentas)")
+    parser.add_argument('--baseline', default=None, help="JSON de uma execução anterior para o gate de regressão")
+    parser.add_argument('--tolerancia', type=float, default=20.0,
+                        help="Lentidão máxima aceita em relação ao baseline (%%)")
+    parser.add_argument('--min-segundos', type=float, default=0.5,
+                        help="Etapas mais rápidas que isso no baseline não entram no gate")
+    args = parser.parse_args()
+    
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t]
+    selecionadas = [e for e in args.etapas.split(',') if e] if args.etapas else None
+    saida = args.saida or os.path.join(args.dir_trabalho, 'resultados')
+    
+    linhas = []
+    for total in tamanhos:
+        print(f"\n{total:,} acórdãos")
+        arvore = preparar_arvore(args.dir_trabalho, total, args.por_arquivo)
+        linhas.extend(executar_tamanho(arvore, os.path.join(args.dir_trabalho, f"execucao_{total}"), total,
+                                       selecionadas, args.tracemalloc))
+                                       
+    caminho = gravar_resultados(saida, linhas)
+    print(f"\nResultados gravados em {caminho} e {ARQUIVO_CSV}")
+    print("Expoente de escalonamento (tempo ~ tamanho^k):")
+    for nome, curva in escalonamento(linhas).items():
+        expoente = f"{curva['expoente']:.2f}" if curva['expoente'] is not None else '-'
+        print(f"  {nome:<26} k = {expoente}")
+        
+    if args.baseline:
+        regressoes = comparar_baseline(linhas, args.baseline, args.tolerancia, args.min_segundos)
+        if regressoes:
+            print(f"\nRegressões acima de {args.tolerancia:.0f}%:")
+            print('\n'.join(f"  {regressao}" for regressao in regressoes))
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.tolerancia:.0f}% em relação a {args.baseline}")
+
+if __name__ == "__main__":
+    main()
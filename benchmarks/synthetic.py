@@ -0,0 +1,149 @@
+"""Geração de acórdãos sintéticos no formato dos Espelhos do STJ para benchmarks."""
+import json
+import os
+import random
+from typing import Dict, Iterator, List, Optional
+
+CLASSES = [
+    'REsp', 'AgRg no REsp', 'AgInt no AREsp', 'AgInt no REsp', 'EDcl no AgRg no REsp',
+    'HC', 'RHC', 'AgRg no HC', 'RMS', 'MS', 'CC', 'EREsp', 'AgRg no Ag', 'EDcl no REsp',
+]
+
+ORGAOS = [
+    'PRIMEIRA TURMA', 'SEGUNDA TURMA', 'TERCEIRA TURMA', 'QUARTA TURMA',
+    'QUINTA TURMA', 'SEXTA TURMA', 'PRIMEIRA SEÇÃO', 'CORTE ESPECIAL',
+]
+
+RELATORES = [
+    'NANCY ANDRIGHI', 'HERMAN BENJAMIN', 'LUIS FELIPE SALOMÃO', 'OG FERNANDES',
+    'MAURO CAMPBELL MARQUES', 'SÉRGIO KUKINA', 'MARCO AURÉLIO BELLIZZE', 'RIBEIRO DANTAS',
+    'REYNALDO SOARES DA FONSECA', 'ANTONIO CARLOS FERREIRA', 'RAUL ARAÚJO', 'GURGEL DE FARIA',
+]
+
+UFS = ['SP', 'RJ', 'MG', 'RS', 'PR', 'SC', 'BA', 'PE', 'DF', 'GO', 'CE']
+
+REFERENCIAS = [
+    "LEG:FED LEI:013105 ANO:2015\n*****  CPC-15    CÓDIGO DE PROCESSO CIVIL DE 2015\n"
+    "        ART:01022 INC:00002",
+    "LEG:FED LEI:013105 ANO:2015\n*****  CPC-15    CÓDIGO DE PROCESSO CIVIL DE 2015\n"
+    "        ART:00489 PAR:00001 INC:00004",
+    "LEG:FED CFB:****** ANO:1988\n*****  CF-88    CONSTITUIÇÃO FEDERAL DE 1988\n"
+    "        ART:00105 INC:00003 LET:A",
+    "LEG:FED SUM:****** ANO:****\n*****  SUM(STJ)    SÚMULA DO SUPERIOR TRIBUNAL DE JUSTIÇA\n"
+    "        SUM:000007",
+    "LEG:FED LEI:008078 ANO:1990\n*****  CDC-90    CÓDIGO DE DEFESA DO CONSUMIDOR\n"
+    "        ART:00014",
+    "LEG:FED DEL:002848 ANO:1940\n*****  CP-40    CÓDIGO PENAL\n"
+    "        ART:00059 ART:00068",
+    "LEG:FED LEI:011343 ANO:2006\n*****  LDR-06    LEI DE DROGAS\n"
+    "        ART:00033 PAR:00004",
+]
+
+CATEGORIAS = [
+    '(AGRAVO INTERNO - REQUISITOS)', '(RECURSO ESPECIAL - REEXAME DE PROVAS)',
+    '(HABEAS CORPUS - SUBSTITUTIVO)', '(EMBARGOS DE DECLARAÇÃO - OMISSÃO)',
+]
+
+def _variante_tipo(rng: random.Random, tipo: str) -> str:
+    """Reescreve a sigla como aparece nas citações (caixa, pontos, espaços)."""
+    sorteio = rng.random()
+    if sorteio < 0.5:
+        return tipo
+    if sorteio < 0.7:
+        return tipo.upper()
+    if sorteio < 0.85:
+        return '  '.join(tipo.split())
+    return ' '.join(t if len(t) < 3 else f"{t[0]}.{t[1:]}" for t in tipo.split())
+
+def gerar_acordao(rng: random.Random, seq: int, total: int) -> Dict:
+    """Gera um acórdão sintético com todos os campos brutos usados pelos parsers."""
+    ano = rng.randint(2010, 2023)
+    mes = rng.randint(1, 12)
+    dia = rng.randint(1, 28)
+    classe = CLASSES[seq % len(CLASSES)]
+    
+    citacoes = []
+    for _ in range(rng.randint(1, 4)):
+        alvo = rng.randrange(max(total, 1))
+        citacoes.append(
+            f"<<{_variante_tipo(rng, CLASSES[alvo % len(CLASSES)])} {1_000_000 + alvo}>>-{rng.choice(UFS)}"
+        )
+    if rng.random() < 0.2:
+        citacoes[-1] += f" (RECURSO REPETITIVO - TEMA(s) {rng.randint(1, 1200)})"
+    jurisprudencia = f"{rng.choice(CATEGORIAS)}\n    STJ - {', '.join(citacoes)}\n"
+    if rng.random() < 0.3:
+        jurisprudencia += f"    STF - SÚMULA {rng.randint(1, 700)}\n"
+        
+    similares = []
+    for _ in range(rng.randint(0, 3)):
+        alvo = rng.randrange(max(total, 1))
+        similares.append(
+            f"{CLASSES[alvo % len(CLASSES)]} {1_000_000 + alvo} {rng.choice(UFS)} "
+            f"{ano}/{rng.randint(0, 9_999_999):07d}-{rng.randint(0, 9)} "
+            f"Decisão:{dia:02d}/{mes:02d}/{ano}\n"
+            f"DJe       DATA:{dia:02d}/{mes:02d}/{ano}"
+        )
+        
+    return {
+        "id": str(100_000_000 + seq),
+        "numeroProcesso": str(1_000_000 + seq),
+        "numeroRegistro": f"{ano}{seq:08d}",
+        "siglaClasse": classe,
+        "nomeOrgaoJulgador": rng.choice(ORGAOS),
+        "ministroRelator": rng.choice(RELATORES),
+        "dataPublicacao": f"DJE        DATA:{dia:02d}/{mes:02d}/{ano}\nPG:{rng.randint(1, 999):05d}",
+        "ementa": "PROCESSUAL CIVIL. AGRAVO INTERNO. " * rng.randint(2, 8),
+        "tipoDeDecisao": "ACÓRDÃO",
+        "dataDecisao": f"{ano}{mes:02d}{dia:02d}",
+        "decisao": "Vistos, relatados e discutidos estes autos, acordam os Ministros...",
+        "jurisprudenciaCitada": jurisprudencia,
+        "notas": None,
+        "informacoesComplementares": (
+            "(ANÁLISE DO MÉRITO)\nNecessidade de reexame / matéria fática, Súmula 7; "
+            "inadmissibilidade\n(VEJA A EMENTA)\nrecurso especial / dissídio"
+        ),
+        "termosAuxiliares": "MULTA DE 1% (UM POR CENTO). LITIGÂNCIA DE MÁ-FÉ; PROTELAÇÃO.",
+        "teseJuridica": None,
+        "tema": None,
+        "referenciasLegislativas": rng.sample(REFERENCIAS, rng.randint(1, 4)),
+        "acordaosSimilares": similares,
+    }
+
+def gerar_acordaos(total: int, seed: int = 42) -> Iterator[Dict]:
+    """Gera `total` acórdãos sintéticos de forma determinística."""
+    rng = random.Random(seed)
+    for seq in range(total):
+        yield gerar_acordao(rng, seq, total)
+
+def gerar_arvore_espelho(base_path: str, total: int, por_arquivo: int = 500,
+                         pastas: Optional[List[str]] = None, seed: int = 42) -> List[str]:
+    """
+    Grava uma árvore de diretórios Espelho* com `total` acórdãos sintéticos.
+    
+    Returns:
+        Lista com os caminhos dos arquivos gerados
+    """
+    pastas = pastas or ['EspelhoPrimeiraTurma', 'EspelhoTerceiraTurma', 'EspelhoCorteEspecial']
+    arquivos = []
+    lote: List[Dict] = []
+    seq_arquivo = 0
+    
+    def _grava():
+        nonlocal seq_arquivo
+        pasta = os.path.join(base_path, pastas[seq_arquivo % len(pastas)])
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"{20200101 + seq_arquivo:08d}.json")
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(lote, f, ensure_ascii=False)
+        arquivos.append(caminho)
+        seq_arquivo += 1
+        
+    for acordao in gerar_acordaos(total, seed):
+        lote.append(acordao)
+        if len(lote) >= por_arquivo:
+            _grava()
+            lote = []
+    if lote:
+        _grava()
+        
+    return arquivos
@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from parsers.acordao_index import AcordaoIndex, AcordaoIndexIncremental
+from parsers.input_sources import fontes_do_arquivo, listar_arquivos
+from parsers.json_utils import dump_file, load_file, process_json_content
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.ministros_index import MinistrosIndex
+from parsers.output_schema import SCHEMA_COMPLETO, OutputSchema
+from parsers.quarentena import Quarentena
+from parsers.recursos_index import RecursosIndex
+from parsers.relator_index import RelatorIndex
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao
+from servico_consultas import ARQUIVO_ACORDAOS, ARQUIVO_REFERENCIAS, ARQUIVO_RELATORES, ServicoConsultas
+
+# Arquivos do monitor na saída
+NOME_ESTADO = 'monitor_estado.json'
+NOME_STATUS = 'monitor_status.json'
+
+# (tamanho, mtime em ns) de um arquivo de entrada
+Assinatura = Tuple[int, int]
+
+# (caminho relativo, assinatura, chegada) de um arquivo pronto para processar
+Pronto = Tuple[str, Assinatura, float]
+
+class _Lote:
+    """Arquivos lidos e processados num ciclo, ainda não aplicados aos índices analíticos"""
+    
+    def __init__(self, indice: AcordaoIndexIncremental):
+        self.assinaturas: Dict[str, Assinatura] = {}  # caminho relativo -> assinatura processada
+        self.chegadas: List[float] = []  # chegada de cada arquivo, para a latência
+        self.indice = indice  # acórdãos do lote sobre o índice de acórdãos, ainda não incorporados
+        self.acordaos: List[Dict] = []
+        self.erros: List[str] = []
+
+class MonitorEspelhos:
+    """
+    Processa continuamente os arquivos novos ou alterados das pastas 'Espelho*'.
+    
+    A cada `intervalo` segundos a entrada é varrida só pelo tamanho e mtime dos
+    arquivos. Um arquivo novo ou alterado é processado quando sua assinatura se
+    repete em duas varreduras seguidas, para não ler um download pela metade.
+    Os acórdãos vão para a saída como em process_directory (sem deduplicação
+    nem CDC) e entram no índice de acórdãos e nos índices de relatores e de
+    referências legislativas, atualizados em memória e salvos em `indices_path`
+    ao final de cada ciclo.
+    
+    As assinaturas já processadas ficam em monitor_estado.json na saída, então
+    um reinício continua de onde parou. O estado do monitor (ciclos, erros,
+    arquivos pendentes e latência entre a chegada de um arquivo e seus acórdãos
+    ficarem consultáveis) vai para monitor_status.json e, com um
+    ServicoConsultas no mesmo processo, para a rota /monitor.
+    
+    Os índices analíticos só recebem acréscimos: acórdãos retirados ou
+    alterados num arquivo modificado mantêm as entradas antigas até a próxima
+    reconstrução completa (pipeline.py), e os que já estavam indexados não
+    entram de novo (nem nas contagens). Os registros de quarentena de um
+    arquivo reprocessado substituem os anteriores.
+    """
+    
+    def __init__(self, input_path: str, output_path: str, indices_path: str,
+                 schema: Optional[OutputSchema] = None, intervalo: float = 10.0,
+                 servico: Optional[ServicoConsultas] = None, janela_latencias: int = 1000):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.indices_path = indices_path
+        self.schema = schema or SCHEMA_COMPLETO
+        self.intervalo = intervalo
+        self.servico = servico
+        
+        os.makedirs(output_path, exist_ok=True)
+        os.makedirs(indices_path, exist_ok=True)
+        self._estado_path = os.path.join(output_path, NOME_ESTADO)
+        self._processados: Dict[str, Assinatura] = (
+            {caminho: tuple(assinatura) for caminho, assinatura in load_file(self._estado_path).items()}
+            if os.path.exists(self._estado_path) else {}
+        )
+        # caminho relativo -> (assinatura, momento da varredura anterior à primeira em que apareceu)
+        self._pendentes: Dict[str, Tuple[Assinatura, float]] = {}
+        self._ultima_varredura = 0.0
+        self.quarentena = Quarentena(output_path)
+        self.quarentena.abrir(acrescentar=True)
+        
+        self.acordaos, self.relatores, self.referencias = self._carregar_indices()
+        if servico is not None:
+            servico.acordaos, servico.relatores, servico.referencias = self.acordaos, self.relatores, self.referencias
+            servico.registrar_rota_estado('/monitor', self.estado)
+            
+        # Estatísticas
+        self.inicio = time.time()
+        self.ciclos = 0
+        self.arquivos_processados = 0
+        self.acordaos_processados = 0
+        self.erros = 0
+        self.ultimo_erro: Optional[str] = None
+        self.ultimo_ciclo: Optional[float] = None
+        self.duracao_ultimo_ciclo = 0.0
+        self._falhou_ultimo_ciclo = False
+        self._latencias: Deque[float] = deque(maxlen=janela_latencias)
+        
+    def _carregar_indices(self) -> Tuple[AcordaoIndex, RelatorIndex, LegalReferencesIndex]:
+        """Índices salvos em `indices_path` (ou vazios, preenchidos pelo primeiro ciclo)."""
+        normalizador = SiglaMatcher.from_recursos()
+        caminho = os.path.join(self.indices_path, ARQUIVO_ACORDAOS)
+        acordaos = (AcordaoIndex.load_from_file(caminho, normalizador) if os.path.exists(caminho)
+                    else AcordaoIndex(normalizador))
+        caminho = os.path.join(self.indices_path, ARQUIVO_RELATORES)
+        relatores = RelatorIndex.load_from_file(caminho) if os.path.exists(caminho) else RelatorIndex()
+        caminho = os.path.join(self.indices_path, ARQUIVO_REFERENCIAS)
+        referencias = LegalReferencesIndex.load_from_file(caminho) if os.path.exists(caminho) else LegalReferencesIndex()
+        return acordaos, relatores, referencias
+        
+    def _assinaturas(self) -> Dict[str, Assinatura]:
+        assinaturas = {}
+        for caminho in listar_arquivos(self.input_path):
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                # Removido (ou renomeado) durante a varredura
+                continue
+            assinaturas[os.path.relpath(caminho, self.input_path)] = (info.st_size, info.st_mtime_ns)
+        return assinaturas
+        
+    def ignorar_existentes(self) -> None:
+        """Marca os arquivos já presentes na entrada como processados (só os próximos serão lidos)."""
+        self._processados.update(self._assinaturas())
+        dump_file(self._processados, self._estado_path, indent=None)
+        
+    def varrer(self) -> List[Pronto]:
+        """
+        Arquivos novos ou alterados com a mesma assinatura da varredura anterior.
+        
+        A chegada de cada arquivo é seu mtime, mas nunca antes da última
+        varredura que não o viu (arquivos movidos mantêm o mtime antigo).
+        """
+        agora = time.time()
+        prontos, pendentes = [], {}
+        for caminho, assinatura in self._assinaturas().items():
+            if self._processados.get(caminho) == assinatura:
+                continue
+            anterior, limite = self._pendentes.get(caminho, (None, self._ultima_varredura))
+            if anterior == assinatura:
+                prontos.append((caminho, assinatura, max(assinatura[1] / 1e9, limite)))
+            else:
+                pendentes[caminho] = (assinatura, self._ultima_varredura)
+        self._pendentes = pendentes
+        self._ultima_varredura = agora
+        return sorted(prontos)
+        
+    def preparar(self, prontos: List[Pronto]) -> _Lote:
+        """
+        Lê os arquivos prontos e grava a saída, sem alterar os índices em memória.
+        
+        Como em process_directory, todos os acórdãos do lote são indexados
+        antes do parse, para que citações entre eles sejam resolvidas, mas num
+        AcordaoIndexIncremental: o índice de acórdãos (lido pelo serviço no
+        mesmo processo) só recebe o lote em `aplicar`.
+        """
+        lote = _Lote(AcordaoIndexIncremental(self.acordaos))
+        conteudos = []
+        for caminho, assinatura, chegada in prontos:
+            # Mesmo com erro, a assinatura é registrada: o arquivo só é relido se mudar
+            lote.assinaturas[caminho] = assinatura
+            lote.chegadas.append(chegada)
+            try:
+                for fonte in fontes_do_arquivo(self.input_path, os.path.join(self.input_path, caminho)):
+                    acordaos = process_json_content(fonte.ler_texto())
+                    if acordaos:
+                        acordaos = acordaos if isinstance(acordaos, list) else [acordaos]
+                        for acordao in acordaos:
+                            lote.indice.add_acordao(acordao)
+                        conteudos.append((fonte, acordaos))
+            except Exception as e:
+                lote.erros.append(f"Erro ao ler {caminho}: {str(e)}")
+                
+        self.quarentena.descartar(fonte.caminho_relativo for fonte, _ in conteudos)
+        for fonte, acordaos in conteudos:
+            processados = []
+            for indice, acordao in enumerate(acordaos):
+                try:
+                    processados.append(process_acordao(acordao, lote.indice, self.schema))
+                except Exception as e:
+                    self.quarentena.registrar(fonte.origem, fonte.caminho_relativo, indice, acordao, e, processados)
+            try:
+                output_file = os.path.join(self.output_path, fonte.caminho_relativo)
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                dump_file(processados, output_file)
+            except OSError as e:
+                lote.erros.append(f"Erro ao gravar {fonte.caminho_relativo}: {str(e)}")
+                continue
+            lote.acordaos.extend(processados)
+        return lote
+        
+    def aplicar(self, lote: _Lote) -> None:
+        """Acrescenta os acórdãos do lote aos índices em memória (rápido, sem E/S)."""
+        lote.indice.incorporar()
+        for acordao in lote.acordaos:
+            if 'id' not in acordao:
+                continue
+            if not self._em_relatores(acordao):
+                self.relatores.add_acordao(acordao)
+            refs = acordao.get('referenciasLegislativasEstruturadas', [])
+            if not self._em_referencias(acordao['id'], refs):
+                for ref in refs:
+                    self.referencias.add_reference(ref, acordao['id'])
+                    
+        self._processados.update(lote.assinaturas)
+        self.arquivos_processados += len(lote.assinaturas)
+        self.acordaos_processados += len(lote.acordaos)
+        self.erros += len(lote.erros)
+        for erro in lote.erros:
+            print(erro)
+            self.ultimo_erro = erro
+            
+        if self.servico is not None:
+            # Já consultáveis no serviço do mesmo processo
+            self.servico.limpar_cache()
+            self._registrar_latencias(lote.chegadas)
+            
+    def _em_relatores(self, acordao: Dict) -> bool:
+        """Indica se o acórdão já está no índice de relatores (de um arquivo processado antes)."""
+        relator = (acordao.get('ministroRelator') or '').strip().upper()
+        return acordao['id'] in self.relatores.by_relator.get(relator, ())
+        
+    def _em_referencias(self, acordao_id: str, refs: List[Dict]) -> bool:
+        """Indica se as referências do acórdão já estão no índice (de um arquivo processado antes)."""
+        for ref in refs:
+            if ref.get('LEG') and ref.get('ANO'):
+                return acordao_id in self.referencias.by_law.get(f"{ref['LEG']}-{ref['ANO']}", ())
+        return False
+        
+    def salvar(self, lote: _Lote) -> None:
+        """Salva os índices e o estado (cada arquivo é substituído só depois de gravado por completo)."""
+        for indice, nome in ((self.acordaos, ARQUIVO_ACORDAOS), (self.relatores, ARQUIVO_RELATORES),
+                             (self.referencias, ARQUIVO_REFERENCIAS)):
+            caminho = os.path.join(self.indices_path, nome)
+            indice.save_to_file(caminho + '.tmp')
+            os.replace(caminho + '.tmp', caminho)
+        dump_file(self._processados, self._estado_path + '.tmp', indent=None)
+        os.replace(self._estado_path + '.tmp', self._estado_path)
+        
+        if self.servico is None:
+            self._registrar_latencias(lote.chegadas)
+            
+    def _registrar_latencias(self, chegadas: List[float]) -> None:
+        agora = time.time()
+        self._latencias.extend(max(agora - chegada, 0.0) for chegada in chegadas)
+        
+    def ciclo(self) -> None:
+        """Uma varredura e o processamento do que estiver pronto."""
+        inicio = time.time()
+        try:
+            prontos = self.varrer()
+            if prontos:
+                lote = self.preparar(prontos)
+                self.aplicar(lote)
+                self.salvar(lote)
+        except Exception as e:
+            self._registrar_falha(e)
+        else:
+            self._falhou_ultimo_ciclo = False
+        self._concluir_ciclo(inicio)
+        
+    async def ciclo_assincrono(self) -> None:
+        """
+        Como `ciclo`, com a E/S em threads para não bloquear o serviço.
+        
+        A thread de `preparar` não altera nenhum índice em memória: o índice de
+        acórdãos e os analíticos só são alterados em `aplicar`, no próprio
+        loop, entre uma consulta e outra, então nenhuma consulta os vê pela
+        metade.
+        """
+        inicio = time.time()
+        try:
+            prontos = await asyncio.to_thread(self.varrer)
+            if prontos:
+                lote = await asyncio.to_thread(self.preparar, prontos)
+                self.aplicar(lote)
+                await asyncio.to_thread(self.salvar, lote)
+        except Exception as e:
+            self._registrar_falha(e)
+        else:
+            self._falhou_ultimo_ciclo = False
+        self._concluir_ciclo(inicio)
+        
+    def _registrar_falha(self, e: Exception) -> None:
+        self.erros += 1
+        self.ultimo_erro = f"Falha no ciclo: {str(e)}"
+        self._falhou_ultimo_ciclo = True
+        print(self.ultimo_erro)
+        
+    def _concluir_ciclo(self, inicio: float) -> None:
+        self.ciclos += 1
+        self.ultimo_ciclo = time.time()
+        self.duracao_ultimo_ciclo = self.ultimo_ciclo - inicio
+        try:
+            dump_file(self.estado(), os.path.join(self.output_path, NOME_STATUS))
+        except OSError as e:
+            print(f"Erro ao gravar {NOME_STATUS}: {str(e)}")
+            
+    def estado(self) -> Dict:
+        """Saúde, contadores e latência de disponibilidade (chegada do arquivo até ser consultável)."""
+        agora = time.time()
+        latencias = sorted(self._latencias)
+        
+        def percentil(p: float) -> float:
+            if not latencias:
+                return 0.0
+            return round(latencias[min(int(p * len(latencias)), len(latencias) - 1)], 3)
+            
+        # Saudável: o último ciclo terminou sem falha e há pouco tempo
+        atrasado = self.ultimo_ciclo is None or agora - self.ultimo_ciclo > 3 * self.intervalo + self.duracao_ultimo_ciclo
+        return {
+            'saudavel': not atrasado and not self._falhou_ultimo_ciclo,
+            'uptimeSegundos': round(agora - self.inicio, 1),
+            'ultimoCiclo': datetime.fromtimestamp(self.ultimo_ciclo).isoformat(timespec='seconds')
+                           if self.ultimo_ciclo else None,
+            'duracaoUltimoCicloSegundos': round(self.duracao_ultimo_ciclo, 3),
+            'intervaloSegundos': self.intervalo,
+            'ciclos': self.ciclos,
+            'arquivosProcessados': self.arquivos_processados,
+            'arquivosPendentes': len(self._pendentes),
+            'acordaosProcessados': self.acordaos_processados,
+            'erros': self.erros,
+            'ultimoErro': self.ultimo_erro,
+            'latenciaDisponibilidade': {
+                'arquivos': len(latencias),
+                'mediaSegundos': round(sum(latencias) / len(latencias), 3) if latencias else 0.0,
+                'p50Segundos': percentil(0.50),
+                'p95Segundos': percentil(0.95),
+                'maxSegundos': round(latencias[-1], 3) if latencias else 0.0
+            },
+            'indices': {
+                'acordaos': len(self.acordaos),
+                'relatores': len(self.relatores.by_relator),
+                'artigos': len(self.referencias.by_article)
+            }
+        }
+        
+    def fechar(self) -> None:
+        self.quarentena.fechar()
+        
+    def executar(self) -> None:
+        """Executa ciclos a cada `intervalo` segundos até o processo ser interrompido."""
+        print(f"Monitorando {self.input_path} a cada {self.intervalo:g}s")
+        try:
+            while True:
+                self.ciclo()
+                time.sleep(self.intervalo)
+        except KeyboardInterrupt:
+            print("\nMonitor encerrado")
+        finally:
+            self.fechar()
+            
+    def executar_servindo(self, host: str = '127.0.0.1', porta: int = 8765) -> None:
+        """Executa os ciclos e serve as consultas (com /monitor) no mesmo processo."""
+        async def _executar():
+            servidor = await self.servico.iniciar(host, porta)
+            print(f"Monitorando {self.input_path} a cada {self.intervalo:g}s; "
+                  f"consultas em http://{host}:{servidor.sockets[0].getsockname()[1]}")
+            async with servidor:
+                while True:
+                    await self.ciclo_assincrono()
+                    await asyncio.sleep(self.intervalo)
+                    
+        try:
+            asyncio.run(_executar())
+        except KeyboardInterrupt:
+            print("\nMonitor encerrado")
+        finally:
+            self.fechar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processa continuamente os Espelhos novos ou alterados")
+    parser.add_argument('input_path', nargs='?', default=r"D:\Dropbox\Github\Dados Abertos STJ\downloads")
+    parser.add_argument('output_path', nargs='?',
+                        default=r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados")
+    parser.add_argument('--indices', default=None, help="Diretório dos índices (padrão: <saida>/indices)")
+    parser.add_argument('--intervalo', type=float, default=10.0, help="Segundos entre varreduras")
+    parser.add_argument('--schema', default='completo',
+                        help="Schema de saída: 'completo', 'enxuto' ou caminho de um arquivo JSON")
+    parser.add_argument('--somente-novos', action='store_true',
+                        help="Ignora os arquivos já presentes na entrada ao iniciar sem estado salvo")
+    parser.add_argument('--porta', type=int, default=None,
+                        help="Serve também as consultas (e /monitor) nesta porta, com os índices em memória")
+    parser.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+    
+    servico = ServicoConsultas(ministros=MinistrosIndex(), recursos=RecursosIndex()) if args.porta is not None else None
+    monitor = MonitorEspelhos(args.input_path, args.output_path,
+                              args.indices or os.path.join(args.output_path, 'indices'),
+                              schema=OutputSchema.carregar(args.schema), intervalo=args.intervalo, servico=servico)
+    if args.somente_novos and not os.path.exists(os.path.join(args.output_path, NOME_ESTADO)):
+        monitor.ignorar_existentes()
+        
+    if servico is not None:
+        monitor.executar_servindo(args.host, args.porta)
+    else:
+        monitor.executar()
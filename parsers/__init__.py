@@ -5,6 +5,9 @@ from .referencias_legislativas import parse_referencias_legislativas
 from .complementary_info import parse_complementary_info
 from .termos_auxiliares import parse_termos_auxiliares
 from .acordao_index import AcordaoIndex
+from .sigla_matcher import SiglaMatcher
+from .output_schema import OutputSchema
+from .acordao_lazy import LazyAcordao
 
 __all__ = [
     'parse_data_publicacao',
@@ -13,5 +16,8 @@ __all__ = [
     'parse_referencias_legislativas',
     'parse_complementary_info',
     'parse_termos_auxiliares',
-    'AcordaoIndex'
+    'AcordaoIndex',
+    'SiglaMatcher',
+    'OutputSchema',
+    'LazyAcordao'
 ]
\ No newline at end of file
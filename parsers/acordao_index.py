@@ -1,12 +1,22 @@
 import os
-from typing import Dict, Tuple, Optional
-from .json_utils import process_json_content
+from typing import Dict, Iterator, List, Tuple, Optional
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+from .sigla_matcher import SiglaMatcher
 
 class AcordaoIndex:
     """Índice para localizar IDs de acórdãos por tipo e número."""
     
-    def __init__(self):
+    def __init__(self, normalizador: Optional[SiglaMatcher] = None):
         self._index: Dict[Tuple[str, str], str] = {}  # (tipo, numero) -> id
+        self._normalizador = normalizador  # normaliza siglas de classe, se informado
+        
+    def _normaliza_tipo(self, tipo: str) -> str:
+        """Normaliza a sigla da classe para a forma usada como chave."""
+        tipo = tipo.strip()
+        if self._normalizador and tipo:
+            return self._normalizador.canonicalize(tipo)
+        return tipo
         
     def add_acordao(self, acordao: dict) -> None:
         """Adiciona um acórdão ao índice."""
@@ -14,6 +24,9 @@ class AcordaoIndex:
             return
             
         tipo = acordao.get('siglaClasse', '').strip()
+        if self._normalizador and tipo:
+            self._normalizador.registra(tipo)
+        tipo = self._normaliza_tipo(tipo)
         numero = acordao.get('numeroProcesso', '').strip()
         
         if tipo and numero:
@@ -21,43 +34,95 @@ class AcordaoIndex:
             
     def get_id(self, tipo: str, numero: str) -> Optional[str]:
         """Retorna o ID do acórdão dado seu tipo e número."""
-        tipo = tipo.strip()
+        tipo = self._normaliza_tipo(tipo)
         numero = numero.strip()
         return self._index.get((tipo, numero))
         
+    def __len__(self) -> int:
+        return len(self._index)
+        
+    def items(self) -> Iterator[Tuple[Tuple[str, str], str]]:
+        """Itera sobre os pares ((tipo, numero), id) do índice."""
+        return iter(self._index.items())
+        
+    def save_to_file(self, output_path: str) -> None:
+        """Salva o índice em arquivo JSON, como lista de [tipo, numero, id]."""
+        dump_file([[tipo, numero, acordao_id] for (tipo, numero), acordao_id in self.items()], output_path)
+        
+    @classmethod
+    def load_from_file(cls, path: str, normalizador: Optional[SiglaMatcher] = None) -> 'AcordaoIndex':
+        """Carrega um índice salvo com save_to_file."""
+        index = cls(normalizador)
+        for tipo, numero, acordao_id in load_file(path):
+            if normalizador:
+                normalizador.registra(tipo)
+            index._index[(tipo, numero)] = acordao_id
+        return index
+        
     def build_from_directory(self, base_path: str) -> None:
-        """Constrói o índice a partir de um diretório com arquivos JSON."""
-        total_files = 0
+        """
+        Constrói o índice a partir de um diretório com arquivos JSON.
+        
+        Aceita também arquivos .json.gz, .json.xz e .zip, lidos sem extração.
+        """
+        fontes = list(listar_fontes(base_path))
+        total_files = len(fontes)
         processed_files = 0
         
         print("\nConstruindo índice de acórdãos...")
         
-        for root, _, files in os.walk(base_path):
-            if os.path.basename(root).startswith("Espelho"):
-                json_files = [f for f in files if f.endswith('.json')]
-                total_files += len(json_files)
-                
-                for filename in json_files:
-                    filepath = os.path.join(root, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            
-                        acordaos = process_json_content(content)
-                        if acordaos:
-                            if not isinstance(acordaos, list):
-                                acordaos = [acordaos]
-                                
-                            for acordao in acordaos:
-                                self.add_acordao(acordao)
-                                
-                            processed_files += 1
-                            
-                            if processed_files % 100 == 0:
-                                print(f"Indexados {processed_files}/{total_files} arquivos")
-                                
-                    except Exception as e:
-                        print(f"Erro ao indexar arquivo {filepath}: {str(e)}")
-                        continue
+        for fonte in fontes:
+            try:
+                acordaos = process_json_content(fonte.ler_texto())
+                if acordaos:
+                    if not isinstance(acordaos, list):
+                        acordaos = [acordaos]
+                        
+                    for acordao in acordaos:
+                        self.add_acordao(acordao)
+                        
+                    processed_files += 1
+                    
+                    if processed_files % 100 == 0:
+                        print(f"Indexados {processed_files}/{total_files} arquivos")
                         
-        print(f"\nÍndice construído com sucesso! {processed_files}/{total_files} arquivos processados")
\ No newline at end of file
+            except Exception as e:
+                print(f"Erro ao indexar arquivo {fonte.origem}: {str(e)}")
+                continue
+                
+        print(f"\nÍndice construído com sucesso! {processed_files}/{total_files} arquivos processados")
+
+class AcordaoIndexIncremental(AcordaoIndex):
+    """
+    Acórdãos novos sobre um AcordaoIndex existente, sem alterá-lo até `incorporar`.
+    
+    Os novos ficam num índice próprio, com uma cópia do normalizador da
+    base, e as consultas vão primeiro a eles e depois à base. Assim um lote
+    pode ser processado numa thread (com as citações entre os acórdãos do
+    lote resolvidas) enquanto a base continua sendo lida em outra, e só
+    `incorporar`, chamado na thread dona da base, a altera.
+    """
+    
+    def __init__(self, base: AcordaoIndex):
+        super().__init__(base._normalizador.copia() if base._normalizador else None)
+        self.base = base
+        self._novos: List[Dict] = []
+        
+    def add_acordao(self, acordao: dict) -> None:
+        super().add_acordao(acordao)
+        if acordao.get('id'):
+            # Só os campos presentes: a base trata os ausentes como em add_acordao
+            self._novos.append({campo: acordao[campo] for campo in ('id', 'siglaClasse', 'numeroProcesso')
+                                if campo in acordao})
+            
+    def get_id(self, tipo: str, numero: str) -> Optional[str]:
+        tipo = self._normaliza_tipo(tipo)
+        numero = numero.strip()
+        # A base é lida direto, sem passar pelo normalizador dela (que outra thread pode estar usando)
+        return self._index.get((tipo, numero)) or self.base._index.get((tipo, numero))
+        
+    def incorporar(self) -> None:
+        """Acrescenta os acórdãos novos à base."""
+        for acordao in self._novos:
+            self.base.add_acordao(acordao)
+        self._novos = []
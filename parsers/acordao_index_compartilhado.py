@@ -0,0 +1,275 @@
+import atexit
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .acordao_index import AcordaoIndex
+from .json_utils import dumps, loads
+from .sigla_matcher import SiglaMatcher
+
+# Cabeçalho: marca, entradas, slots da tabela e tamanhos do bloco de textos e dos metadados
+_CABECALHO = struct.Struct('<8sQQQQ')
+_MARCA = b'STJIDX02'
+
+# Bit que marca números e ids guardados como texto (o restante é a posição no bloco de textos)
+_TEXTO = 1 << 63
+
+# Segmentos já anexados neste processo, por nome
+_anexados: Dict[str, 'AcordaoIndexCompartilhado'] = {}
+
+_trava_rastreador = threading.Lock()
+
+def _abrir_sem_rastrear(nome: str) -> shared_memory.SharedMemory:
+    """
+    Anexa um segmento existente sem registrá-lo no resource_tracker.
+    
+    Registrado, ele seria removido quando o rastreador deste processo
+    terminasse; e desregistrá-lo depois não resolve, porque workers de um pool
+    compartilham o rastreador do criador e apagariam o registro dele.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, track=False)
+    # Até o 3.12, anexar também registra o segmento: o registro é suprimido só durante a abertura
+    with _trava_rastreador:
+        registrar = resource_tracker.register
+        resource_tracker.register = lambda nome_recurso, tipo: (
+            None if tipo == 'shared_memory' else registrar(nome_recurso, tipo))
+        try:
+            return shared_memory.SharedMemory(name=nome)
+        finally:
+            resource_tracker.register = registrar
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + 7) & ~7
+
+def _inteiro(texto: str) -> Optional[int]:
+    """Valor de um número ou id que volta ao mesmo texto com str(); None se não for o caso."""
+    # Mesmo teste de get_id, que o repete em linha por desempenho
+    if texto.isdigit() and texto.isascii() and len(texto) < 19 and texto[0] != '0':
+        return int(texto)
+    return None
+
+def _espalhar(codigo: int, valor: int) -> int:
+    """
+    Hash de (código do tipo, valor).
+    
+    O hash de tuplas de inteiros não depende de PYTHONHASHSEED, então é o
+    mesmo em todos os processos (o de str e bytes não é: textos entram aqui
+    pelo crc32).
+    """
+    return hash((codigo, valor))
+
+class AcordaoIndexCompartilhado(AcordaoIndex):
+    """
+    AcordaoIndex somente leitura em memória compartilhada (multiprocessing.shared_memory).
+    
+    O índice fica num único segmento, como arrays de largura fixa: código do
+    tipo, número do processo e id de cada entrada (números e ids que não são
+    inteiros vão para um bloco de textos), mais uma tabela hash de
+    endereçamento aberto (sondagem linear, ocupação de no máximo 50%) com a
+    posição das entradas. Uma consulta só compara inteiros, sem criar objetos
+    intermediários.
+    
+    Ainda assim, cada consulta custa cerca de 1,5 a 2 vezes a de um
+    AcordaoIndex comum (benchmarks.bench_indice_compartilhado): a sondagem é
+    feita em Python, e cada leitura de uma memoryview custa mais que o
+    dict.get inteiro, que roda em C. Tabelas com chaves pré-combinadas e um
+    cache de consultas por processo foram medidos e não chegaram perto do
+    dict. O ganho está em outro lugar: workers sem cópia do índice (memória
+    residente ~3 vezes menor) e tarefas que enviam só o nome do segmento.
+    
+    Workers anexam o segmento pelo nome, sem copiar nada: as páginas são as
+    mesmas em todos os processos e, como não há objetos Python por entrada, a
+    contagem de referências não as duplica. Ao ser serializado com pickle
+    (ex.: argumento de uma tarefa de um ProcessPoolExecutor), só o nome do
+    segmento é enviado; cada processo anexa o segmento uma vez e reaproveita a
+    mesma visão nas tarefas seguintes.
+    
+    Quem cria o segmento deve chamar `liberar` ao final; os demais, `fechar`.
+    
+    Exemplo:
+        compartilhado = AcordaoIndexCompartilhado.criar(index)
+        with ProcessPoolExecutor() as pool:
+            pool.map(partial(parse_jurisprudencia_citada, index=compartilhado), textos)
+        compartilhado.liberar()
+    """
+    
+    def __init__(self, memoria: shared_memory.SharedMemory, criador: bool = False):
+        self._memoria = memoria
+        self._criador = criador
+        marca, total, slots, tam_textos, tam_meta = _CABECALHO.unpack_from(memoria.buf, 0)
+        if marca != _MARCA:
+            raise ValueError(f"Segmento {memoria.name} não contém um AcordaoIndexCompartilhado")
+            
+        # Visões sobre o segmento, na ordem em que foram gravadas
+        posicao = _alinhar(_CABECALHO.size)
+        self._total = total
+        self._mascara = slots - 1
+        self._slots = memoria.buf[posicao:posicao + 4 * slots].cast('I')
+        posicao += 4 * slots
+        self._numeros = memoria.buf[posicao:posicao + 8 * total].cast('Q')
+        posicao += 8 * total
+        self._ids = memoria.buf[posicao:posicao + 8 * total].cast('Q')
+        posicao += 8 * total
+        self._tipos = memoria.buf[posicao:posicao + 4 * total].cast('I')
+        posicao += _alinhar(4 * total)
+        self._textos = memoria.buf[posicao:posicao + tam_textos]
+        # Lidos juntos a cada consulta (um acesso a atributo em vez de quatro)
+        self._sondagem = (self._mascara, self._slots, self._numeros, self._tipos)
+        posicao += tam_textos
+        meta = loads(bytes(memoria.buf[posicao:posicao + tam_meta]).decode('utf-8'))
+        
+        self._nomes_tipos: List[str] = meta['tipos']
+        self._codigos_tipos = {tipo: codigo for codigo, tipo in enumerate(self._nomes_tipos)}
+        normalizador = None
+        if meta['normalizado']:
+            normalizador = SiglaMatcher.from_recursos()
+            for tipo in self._nomes_tipos:
+                normalizador.registra(tipo)
+        super().__init__(normalizador)
+        
+    @classmethod
+    def criar(cls, index: AcordaoIndex, nome: Optional[str] = None) -> 'AcordaoIndexCompartilhado':
+        """Copia um AcordaoIndex para um novo segmento de memória compartilhada."""
+        codigos_tipos: Dict[str, int] = {}
+        tipos, numeros, ids = array('I'), array('Q'), array('Q')
+        hashes = array('q')
+        textos = bytearray()
+        
+        def guardar(texto: str) -> Tuple[int, int]:
+            """(valor guardado, valor para o hash) de um número ou id."""
+            valor = _inteiro(texto)
+            if valor is not None:
+                return valor, valor
+            dados = texto.encode('utf-8')
+            guardado = _TEXTO | len(textos)
+            textos.extend(struct.pack('<H', len(dados)) + dados)
+            return guardado, zlib.crc32(dados)
+            
+        for (tipo, numero), acordao_id in index.items():
+            codigo = codigos_tipos.setdefault(tipo, len(codigos_tipos))
+            guardado, valor_hash = guardar(numero)
+            tipos.append(codigo)
+            numeros.append(guardado)
+            ids.append(guardar(acordao_id)[0])
+            hashes.append(_espalhar(codigo, valor_hash))
+        total = len(tipos)
+        
+        tamanho_tabela = 8
+        while tamanho_tabela < 2 * total:
+            tamanho_tabela *= 2
+        mascara = tamanho_tabela - 1
+        slots = array('I', bytes(4 * tamanho_tabela))
+        for entrada, h in enumerate(hashes):
+            slot = h & mascara
+            while slots[slot]:
+                slot = (slot + 1) & mascara
+            slots[slot] = entrada + 1
+            
+        meta = dumps({'normalizado': index._normalizador is not None, 'tipos': list(codigos_tipos)}).encode('utf-8')
+        tipos_bytes = tipos.tobytes()
+        blocos = [slots.tobytes(), numeros.tobytes(), ids.tobytes(),
+                  tipos_bytes + bytes(_alinhar(len(tipos_bytes)) - len(tipos_bytes)), bytes(textos), meta]
+        inicio = _alinhar(_CABECALHO.size)
+        memoria = shared_memory.SharedMemory(name=nome, create=True, size=inicio + sum(len(b) for b in blocos))
+        _CABECALHO.pack_into(memoria.buf, 0, _MARCA, total, tamanho_tabela, len(textos), len(meta))
+        posicao = inicio
+        for bloco in blocos:
+            memoria.buf[posicao:posicao + len(bloco)] = bloco
+            posicao += len(bloco)
+            
+        compartilhado = cls(memoria, criador=True)
+        _anexados[memoria.name] = compartilhado
+        return compartilhado
+        
+    @classmethod
+    def anexar(cls, nome: str) -> 'AcordaoIndexCompartilhado':
+        """Anexa (uma vez por processo) um segmento criado com `criar`."""
+        compartilhado = _anexados.get(nome)
+        if compartilhado is None:
+            compartilhado = _anexados[nome] = cls(_abrir_sem_rastrear(nome))
+        return compartilhado
+        
+    @property
+    def nome(self) -> str:
+        return self._memoria.name
+        
+    def __reduce__(self):
+        return (AcordaoIndexCompartilhado.anexar, (self.nome,))
+        
+    def add_acordao(self, acordao: dict) -> None:
+        raise TypeError("AcordaoIndexCompartilhado é somente leitura")
+        
+    def _texto(self, guardado: int) -> bytes:
+        posicao = guardado & ~_TEXTO
+        tamanho = self._textos[posicao] | self._textos[posicao + 1] << 8
+        return bytes(self._textos[posicao + 2:posicao + 2 + tamanho])
+        
+    def _valor(self, guardado: int) -> str:
+        return str(guardado) if guardado < _TEXTO else self._texto(guardado).decode('utf-8')
+        
+    def get_id(self, tipo: str, numero: str) -> Optional[str]:
+        """Retorna o ID do acórdão dado seu tipo e número."""
+        codigo = self._codigos_tipos.get(self._normaliza_tipo(tipo))
+        if codigo is None:
+            return None
+        numero = numero.strip()
+        texto = None
+        if numero.isdigit() and numero.isascii() and len(numero) < 19 and numero[0] != '0':
+            valor = int(numero)
+            h = hash((codigo, valor))
+        else:
+            valor = None
+            texto = numero.encode('utf-8')
+            h = hash((codigo, zlib.crc32(texto)))
+            
+        mascara, slots, numeros, tipos = self._sondagem
+        slot = h & mascara
+        while True:
+            entrada = slots[slot]
+            if not entrada:
+                return None
+            entrada -= 1
+            # O número descarta quase todas as colisões: o tipo só é lido quando ele bate
+            guardado = numeros[entrada]
+            if (guardado == valor if texto is None else guardado >= _TEXTO and self._texto(guardado) == texto) \
+                    and tipos[entrada] == codigo:
+                acordao_id = self._ids[entrada]
+                return str(acordao_id) if acordao_id < _TEXTO else self._valor(acordao_id)
+            slot = (slot + 1) & mascara
+            
+    def __len__(self) -> int:
+        return self._total
+        
+    def items(self) -> Iterator[Tuple[Tuple[str, str], str]]:
+        """Itera sobre os pares ((tipo, numero), id) na ordem do índice original."""
+        for entrada in range(self._total):
+            tipo = self._nomes_tipos[self._tipos[entrada]]
+            yield (tipo, self._valor(self._numeros[entrada])), self._valor(self._ids[entrada])
+            
+    def fechar(self) -> None:
+        """Solta as visões e fecha o segmento neste processo (sem removê-lo)."""
+        if self._memoria is None:
+            return
+        _anexados.pop(self._memoria.name, None)
+        for visao in (self._slots, self._numeros, self._ids, self._tipos, self._textos):
+            visao.release()
+        self._memoria.close()
+        self._memoria = None
+        
+    def liberar(self) -> None:
+        """Fecha e remove o segmento (só quem o criou)."""
+        memoria = self._memoria
+        self.fechar()
+        if memoria is not None and self._criador:
+            memoria.unlink()
+
+@atexit.register
+def _fechar_anexados() -> None:
+    # Fecha as visões antes do encerramento do interpretador (senão SharedMemory.__del__ falha com BufferError)
+    for compartilhado in list(_anexados.values()):
+        compartilhado.fechar()
@@ -0,0 +1,119 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .acordao_index import AcordaoIndex
+from .input_sources import listar_fontes
+from .json_utils import process_json_content
+from .output_schema import CAMPO_VERSOES, PARSERS_ESTRUTURADOS, SCHEMA_COMPLETO, OutputSchema, ParserError, versao_parser
+from .registros import COMPACTADORES
+
+class LazyAcordao(Mapping):
+    """
+    Visão somente leitura de um acórdão bruto com os campos estruturados calculados sob demanda.
+    
+    Tem as mesmas chaves, na mesma ordem, e os mesmos valores que
+    process_acordao devolveria para o acórdão (com o mesmo índice, schema e
+    `compacto`), mas cada parser só roda no primeiro acesso ao seu campo, e o
+    resultado fica memorizado. Listar as chaves, testar `in` e ler campos
+    brutos não executa parser nenhum. Falhas de um parser são levantadas como
+    ParserError no acesso ao campo.
+    
+    Serializa (json_utils.dumps/dump_file) como a saída de process_acordao,
+    calculando os campos que ainda faltarem. O acórdão bruto não é alterado.
+    
+    Construtores que leem campos estruturados rodam os parsers desses campos
+    (o RelatorIndex, por exemplo, roda o da jurisprudência citada), e a
+    jurisprudência citada só tem os ids dos acórdãos citados se o
+    LazyAcordao receber o índice de acórdãos.
+    
+    Exemplo:
+        index = AcordaoIndex(SiglaMatcher.from_recursos())
+        for acordao in iterar_acordaos(entrada):
+            index.add_acordao(acordao)       # só campos brutos: nenhum parser roda
+        for acordao in iterar_acordaos(entrada, index):
+            relatores.add_acordao(acordao)   # roda só o parser da jurisprudência citada
+    """
+    
+    __slots__ = ('_bruto', '_index', '_schema', '_compacto', '_parsers', '_chaves', '_calculados')
+    
+    def __init__(self, acordao: Dict, index: Optional[AcordaoIndex] = None, schema: Optional[OutputSchema] = None,
+                 compacto: bool = False):
+        self._bruto = acordao
+        self._index = index
+        self._schema = schema or SCHEMA_COMPLETO
+        self._compacto = compacto
+        self._calculados: Dict[str, Any] = {}
+        
+        # Parsers que process_acordao executaria: campo estruturado -> (campo bruto, parser)
+        self._parsers: Dict[str, Tuple[str, Callable]] = {
+            estruturado: (bruto, parser) for bruto, estruturado, parser in PARSERS_ESTRUTURADOS
+            if self._schema.executa(estruturado) and acordao.get(bruto)
+        }
+        chaves = dict.fromkeys(acordao)
+        chaves.update(dict.fromkeys(self._parsers))
+        if self._parsers and self._schema.versoes:
+            chaves[CAMPO_VERSOES] = None
+        self._chaves = tuple(self._schema.projeta(chaves))
+        
+    def __getitem__(self, chave: str) -> Any:
+        try:
+            return self._calculados[chave]
+        except KeyError:
+            pass
+        if chave not in self._chaves:
+            raise KeyError(chave)
+            
+        if chave in self._parsers:
+            bruto, parser = self._parsers[chave]
+            try:
+                valor = parser(self._bruto[bruto], self._index)
+            except Exception as e:
+                raise ParserError(chave, e) from e
+            if self._compacto and chave in COMPACTADORES and valor is not None:
+                valor = COMPACTADORES[chave](valor)
+        elif chave == CAMPO_VERSOES and self._parsers:
+            valor = {estruturado: versao_parser(estruturado) for estruturado in self._parsers}
+        elif self._compacto and chave in COMPACTADORES and self._bruto[chave] is not None:
+            # Campo estruturado que já veio no acórdão: compactado como em compactar_acordao
+            valor = COMPACTADORES[chave](self._bruto[chave])
+        else:
+            return self._bruto[chave]
+        self._calculados[chave] = valor
+        return valor
+        
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chaves)
+        
+    def __len__(self) -> int:
+        return len(self._chaves)
+        
+    def __contains__(self, chave: object) -> bool:
+        return chave in self._chaves
+        
+    def __repr__(self) -> str:
+        return f"LazyAcordao(id={self._bruto.get('id')!r}, calculados={list(self._calculados)})"
+        
+    @property
+    def calculados(self) -> Tuple[str, ...]:
+        """Campos estruturados já calculados."""
+        return tuple(chave for chave in self._calculados if chave in self._parsers)
+        
+    def para_dict(self) -> Dict:
+        """Dict com todos os campos calculados, igual ao que process_acordao devolveria."""
+        return {chave: self[chave] for chave in self._chaves}
+
+def iterar_acordaos(base_path: str, index: Optional[AcordaoIndex] = None, schema: Optional[OutputSchema] = None,
+                    compacto: bool = False) -> Iterator[LazyAcordao]:
+    """
+    Acórdãos das pastas 'Espelho*' de `base_path` (os downloads brutos) como LazyAcordao.
+    
+    Aceita as mesmas fontes de process_directory (.json, .json.gz, .json.xz
+    e .zip). Sem `index`, a jurisprudência citada não tem os ids dos acórdãos
+    citados (use AcordaoIndex.build_from_directory ou load_from_file).
+    """
+    for fonte in listar_fontes(base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for acordao in (acordaos if isinstance(acordaos, list) else [acordaos]):
+                if isinstance(acordao, dict):
+                    yield LazyAcordao(acordao, index, schema, compacto)
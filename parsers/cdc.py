@@ -0,0 +1,147 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Tuple
+
+from .dedup import hash_conteudo
+from .json_utils import dump_file, dumps, loads
+
+# Arquivos de um delta, por operação
+ARQUIVOS_DELTA = {
+    'insert': 'inseridos.jsonl',
+    'update': 'atualizados.jsonl',
+    'delete': 'removidos.jsonl',
+}
+
+class ChangeTracker:
+    """
+    Captura as mudanças (inserções, atualizações e remoções) entre execuções.
+    
+    O estado da execução anterior (id -> hash do acórdão processado e arquivo
+    de saída) fica em SQLite. Cada execução grava um diretório
+    delta/<execução>_<timestamp>/ com os acórdãos inseridos e atualizados
+    (completos) e os ids removidos, para que consumidores apliquem só as
+    mudanças.
+    
+    O estado só é confirmado em `finalizar`, junto com o resumo.json do
+    delta. Se a execução for interrompida antes, `fechar` desfaz o estado e o
+    delta incompleto fica sem resumo.json (consumidores devem ignorá-lo): a
+    próxima execução volta a comparar com a última execução concluída.
+    """
+    
+    NOME_ESTADO = 'cdc_estado.sqlite'
+    DIRETORIO_DELTAS = 'delta'
+    
+    def __init__(self, output_base_path: str):
+        self._conn = sqlite3.connect(os.path.join(output_base_path, self.NOME_ESTADO))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS estado ("
+            "id TEXT PRIMARY KEY, hash TEXT NOT NULL, saida TEXT, execucao INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        
+        row = self._conn.execute("SELECT valor FROM meta WHERE chave = 'execucao'").fetchone()
+        self.execucao = int(row[0] if row else 0) + 1
+        self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('execucao', ?)",
+                           (str(self.execucao),))
+        self._conn.commit()
+        
+        self.delta_path = os.path.join(output_base_path, self.DIRETORIO_DELTAS,
+                                       f"{self.execucao:06d}_{datetime.now():%Y%m%dT%H%M%S}")
+        os.makedirs(self.delta_path, exist_ok=True)
+        self._arquivos = {
+            operacao: open(os.path.join(self.delta_path, nome), 'w', encoding='utf-8')
+            for operacao, nome in ARQUIVOS_DELTA.items()
+        }
+        
+        self.contagens = {'insert': 0, 'update': 0, 'delete': 0, 'inalterados': 0}
+        self._finalizado = False
+        
+    def registrar(self, acordao: Dict, saida: str) -> None:
+        """Compara um acórdão já gravado na saída com a execução anterior e grava a mudança."""
+        if not isinstance(acordao, dict) or not acordao.get('id'):
+            return
+            
+        acordao_id = acordao['id']
+        hash_ = hash_conteudo(acordao)
+        row = self._conn.execute("SELECT hash FROM estado WHERE id = ?", (acordao_id,)).fetchone()
+        
+        if row is None:
+            operacao = 'insert'
+        elif row[0] != hash_:
+            operacao = 'update'
+        else:
+            operacao = None
+            self.contagens['inalterados'] += 1
+            
+        if operacao:
+            self._gravar(operacao, {'op': operacao, 'id': acordao_id, 'hash': hash_, 'acordao': acordao})
+            
+        self._conn.execute(
+            "INSERT OR REPLACE INTO estado (id, hash, saida, execucao) VALUES (?, ?, ?, ?)",
+            (acordao_id, hash_, saida, self.execucao)
+        )
+        
+    def tocar(self, acordao_id: str) -> None:
+        """Marca um id como presente nesta execução sem gerar mudança (ex.: duplicado ou em quarentena)."""
+        self._conn.execute("UPDATE estado SET execucao = ? WHERE id = ?", (self.execucao, acordao_id))
+        
+    def finalizar(self, saidas_com_erro: Iterable[str] = ()) -> None:
+        """
+        Grava as remoções e fecha o delta.
+        
+        Ids ausentes nesta execução são removidos, exceto os de arquivos que
+        não puderam ser lidos (a ausência deles não indica remoção). O estado
+        da execução é confirmado junto com as remoções.
+        """
+        self._conn.execute("CREATE TEMP TABLE saidas_com_erro (saida TEXT PRIMARY KEY)")
+        self._conn.executemany("INSERT OR IGNORE INTO saidas_com_erro VALUES (?)",
+                               ((s,) for s in saidas_com_erro))
+                               
+        removidos = self._conn.execute(
+            "SELECT id, hash FROM estado WHERE execucao != ? "
+            "AND saida NOT IN (SELECT saida FROM saidas_com_erro)", (self.execucao,)
+        ).fetchall()
+        for acordao_id, hash_ in removidos:
+            self._gravar('delete', {'op': 'delete', 'id': acordao_id, 'hash': hash_})
+        self._conn.executemany("DELETE FROM estado WHERE id = ?", ((i,) for i, _ in removidos))
+        for arquivo in self._arquivos.values():
+            arquivo.flush()
+        self._conn.commit()
+        self._finalizado = True
+        
+        dump_file({
+            'execucao': self.execucao,
+            'gerado_em': datetime.now().isoformat(),
+            'arquivos': ARQUIVOS_DELTA,
+            'contagens': self.contagens
+        }, os.path.join(self.delta_path, 'resumo.json'))
+        
+    def fechar(self) -> None:
+        """Fecha os arquivos do delta e o estado, desfazendo o estado se `finalizar` não foi chamado."""
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        if not self._finalizado:
+            self._conn.rollback()
+        self._conn.close()
+        
+    def _gravar(self, operacao: str, registro: Dict) -> None:
+        self._arquivos[operacao].write(dumps(registro) + '\n')
+        self.contagens[operacao] += 1
+        
+    def relatorio(self) -> str:
+        """Resumo das mudanças para o relatório de processamento."""
+        c = self.contagens
+        return (f"Delta ({self.delta_path}): {c['insert']} inseridos, {c['update']} atualizados, "
+                f"{c['delete']} removidos, {c['inalterados']} inalterados")
+
+def ler_delta(delta_path: str) -> Iterator[Tuple[str, Dict]]:
+    """Lê um delta gravado pelo ChangeTracker, na ordem remoções, atualizações, inserções."""
+    for operacao in ('delete', 'update', 'insert'):
+        caminho = os.path.join(delta_path, ARQUIVOS_DELTA[operacao])
+        if not os.path.exists(caminho):
+            continue
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    yield operacao, loads(linha)
@@ -0,0 +1,276 @@
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .acordao_index import AcordaoIndex
+from .acordaos_similares import parse_acordaos_similares
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+from .sigla_matcher import SiglaMatcher
+
+# NumPy é opcional para o restante do projeto, mas necessário aqui
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ARQUIVO_CLUSTER = 'cluster.npy'
+ARQUIVO_MEMBROS = 'membros.npy'
+ARQUIVO_INICIOS = 'inicios.npy'
+ARQUIVO_IDS = 'ids.json'
+
+def _exigir_numpy() -> None:
+    if np is None:
+        raise ImportError("Os clusters de acórdãos similares requerem NumPy (pip install numpy)")
+
+class UniaoBusca:
+    """
+    Union-find sobre os inteiros 0..n-1.
+    
+    Usa compressão de caminho e união por tamanho, de modo que uma sequência
+    de m operações custa O(m α(n)), praticamente linear. Pais e tamanhos
+    ficam em arrays compactos, sem um objeto Python por elemento.
+    """
+    
+    def __init__(self, n: int = 0):
+        self.pais = array('i', range(n))
+        self.tamanhos = array('i', [1]) * n
+        
+    def __len__(self) -> int:
+        return len(self.pais)
+        
+    def adicionar(self) -> int:
+        """Cria um novo elemento, sozinho no seu conjunto."""
+        self.pais.append(len(self.pais))
+        self.tamanhos.append(1)
+        return len(self.pais) - 1
+        
+    def encontrar(self, x: int) -> int:
+        """Representante do conjunto de x; o caminho percorrido passa a apontar direto para ele."""
+        pais = self.pais
+        raiz = x
+        while pais[raiz] != raiz:
+            raiz = pais[raiz]
+        while pais[x] != raiz:
+            pais[x], x = raiz, pais[x]
+        return raiz
+        
+    def unir(self, a: int, b: int) -> bool:
+        """Une os conjuntos de a e b; False se já eram o mesmo."""
+        a, b = self.encontrar(a), self.encontrar(b)
+        if a == b:
+            return False
+        tamanhos = self.tamanhos
+        if tamanhos[a] < tamanhos[b]:
+            a, b = b, a
+        self.pais[b] = a
+        tamanhos[a] += tamanhos[b]
+        return True
+
+class MontadorClusters:
+    """
+    Lê os acórdãos similares de cada acórdão numa única passada.
+    
+    Cada acórdão recebe um código inteiro na ordem em que aparece. As
+    ligações são guardadas como pares (código de origem, código da chave
+    citada) em arrays compactos; as chaves (tipo, número) distintas são
+    resolvidas para ids de uma só vez, em `clusters`, com uma consulta ao
+    AcordaoIndex por chave, por mais que ela se repita.
+    """
+    
+    def __init__(self):
+        self.codigos: Dict[str, int] = {}
+        self.chaves: Dict[Tuple[str, str], int] = {}
+        self._origens = array('i')
+        self._destinos = array('i')
+        
+    def _codigo(self, acordao_id: str) -> int:
+        codigo = self.codigos.get(acordao_id)
+        if codigo is None:
+            codigo = self.codigos[acordao_id] = len(self.codigos)
+        return codigo
+        
+    @property
+    def total_ligacoes(self) -> int:
+        return len(self._origens)
+        
+    def adicionar(self, acordao: Dict) -> None:
+        acordao_id = acordao.get('id')
+        if not acordao_id:
+            return
+        similares = acordao.get('acordaosSimilaresEstruturados')
+        if similares is None and acordao.get('acordaosSimilares'):
+            # Saída gerada sem esse parser: os similares vêm do campo bruto
+            similares = parse_acordaos_similares(acordao['acordaosSimilares'])
+        if not similares:
+            return
+            
+        origem = self._codigo(acordao_id)
+        chaves = self.chaves
+        for similar in similares.values():
+            if not similar.get('tipo') or not similar.get('numero'):
+                continue
+            chave = (similar['tipo'], similar['numero'])
+            codigo = chaves.get(chave)
+            if codigo is None:
+                codigo = chaves[chave] = len(chaves)
+            self._origens.append(origem)
+            self._destinos.append(codigo)
+            
+    def resolver(self, index: AcordaoIndex) -> array:
+        """Código do acórdão de cada chave citada (-1 se não está no índice), em lote."""
+        resolvidos = array('i', [-1]) * len(self.chaves)
+        for (tipo, numero), codigo in self.chaves.items():
+            acordao_id = index.get_id(tipo, numero)
+            if acordao_id:
+                resolvidos[codigo] = self._codigo(acordao_id)
+        return resolvidos
+        
+    def clusters(self, index: AcordaoIndex) -> 'ClustersSimilares':
+        """Resolve as ligações e agrupa os acórdãos ligados (direta ou indiretamente) em clusters."""
+        _exigir_numpy()
+        resolvidos = self.resolver(index)
+        uniao = UniaoBusca(len(self.codigos))
+        nao_resolvidas = 0
+        for origem, chave in zip(self._origens, self._destinos):
+            destino = resolvidos[chave]
+            if destino < 0:
+                nao_resolvidas += 1
+            else:
+                uniao.unir(origem, destino)
+                
+        encontrar = uniao.encontrar
+        raizes = np.fromiter((encontrar(x) for x in range(len(uniao))), dtype=np.int64, count=len(uniao))
+        # Só acórdãos ligados a algum outro entram nos clusters
+        tamanhos = np.frombuffer(uniao.tamanhos, dtype=np.int32) if len(uniao) else np.zeros(0, np.int32)
+        ligados = np.flatnonzero(tamanhos[raizes] > 1)
+        
+        # Clusters numerados pela ordem do primeiro acórdão de cada um
+        raizes_ligados = raizes[ligados]
+        _, primeiros, rotulos = np.unique(raizes_ligados, return_index=True, return_inverse=True)
+        renumeracao = np.empty(len(primeiros), np.int32)
+        renumeracao[np.argsort(primeiros, kind='stable')] = np.arange(len(primeiros), dtype=np.int32)
+        cluster = renumeracao[rotulos].astype(np.int32)
+        
+        ids = list(self.codigos)
+        return ClustersSimilares.de_rotulos([ids[i] for i in ligados], cluster, {
+            'ligacoes': self.total_ligacoes,
+            'nao_resolvidas': nao_resolvidas,
+            'chaves': len(self.chaves),
+        })
+
+class ClustersSimilares:
+    """
+    Clusters de acórdãos similares: componentes conexos do grafo das ligações resolvidas.
+    
+    Cada acórdão ligado a outro tem um número de cluster (`cluster[i]`, na
+    ordem de `ids`); os membros ficam agrupados por cluster em `membros`,
+    com o cluster c na fatia inicios[c]:inicios[c + 1]. Assim, tanto o
+    cluster de um acórdão quanto a lista dos acórdãos do mesmo cluster saem
+    de uma consulta ao dicionário de ids e de uma fatia, em O(1) (mais o
+    tamanho da resposta). Acórdãos sem ligações resolvidas não entram.
+    """
+    
+    def __init__(self, ids: List[str], cluster: 'np.ndarray', membros: 'np.ndarray', inicios: 'np.ndarray',
+                 estatisticas: Optional[Dict[str, int]] = None):
+        _exigir_numpy()
+        self.ids = list(ids)
+        self.codigos = {acordao_id: i for i, acordao_id in enumerate(self.ids)}
+        self.cluster = cluster
+        self.membros = membros
+        self.inicios = inicios
+        self.estatisticas = dict(estatisticas or {})
+        
+    @classmethod
+    def de_rotulos(cls, ids: List[str], cluster: 'np.ndarray',
+                   estatisticas: Optional[Dict[str, int]] = None) -> 'ClustersSimilares':
+        """Agrupa os membros a partir do número de cluster de cada acórdão."""
+        cluster = np.asarray(cluster, dtype=np.int32)
+        total = int(cluster.max()) + 1 if len(cluster) else 0
+        membros = np.argsort(cluster, kind='stable').astype(np.int32)
+        inicios = np.zeros(total + 1, np.int64)
+        np.cumsum(np.bincount(cluster, minlength=total), out=inicios[1:])
+        return cls(ids, cluster, membros, inicios, estatisticas)
+        
+    @classmethod
+    def de_acordaos(cls, acordaos: Iterable[Dict], index: AcordaoIndex) -> 'ClustersSimilares':
+        montador = MontadorClusters()
+        for acordao in acordaos:
+            montador.adicionar(acordao)
+        return montador.clusters(index)
+        
+    def __len__(self) -> int:
+        return len(self.inicios) - 1
+        
+    def cluster_de(self, acordao_id: str) -> Optional[int]:
+        """Número do cluster do acórdão (None se ele não tem similares resolvidos)."""
+        i = self.codigos.get(acordao_id)
+        return int(self.cluster[i]) if i is not None else None
+        
+    def ids_do_cluster(self, cluster: int) -> List[str]:
+        membros = self.membros[self.inicios[cluster]:self.inicios[cluster + 1]]
+        return [self.ids[i] for i in membros]
+        
+    def mesmo_cluster(self, acordao_id: str) -> List[str]:
+        """Todos os acórdãos do cluster do acórdão, inclusive ele (só ele, se não tem cluster)."""
+        cluster = self.cluster_de(acordao_id)
+        return self.ids_do_cluster(cluster) if cluster is not None else [acordao_id]
+        
+    def tamanhos(self) -> 'np.ndarray':
+        """Quantidade de acórdãos de cada cluster."""
+        return np.diff(self.inicios)
+        
+    def salvar(self, diretorio: str) -> None:
+        """Grava os arrays (.npy) e os ids com as estatísticas da montagem (JSON)."""
+        os.makedirs(diretorio, exist_ok=True)
+        np.save(os.path.join(diretorio, ARQUIVO_CLUSTER), self.cluster)
+        np.save(os.path.join(diretorio, ARQUIVO_MEMBROS), self.membros)
+        np.save(os.path.join(diretorio, ARQUIVO_INICIOS), self.inicios)
+        dump_file({'estatisticas': self.estatisticas, 'ids': self.ids}, os.path.join(diretorio, ARQUIVO_IDS),
+                  indent=None)
+                  
+    @classmethod
+    def carregar(cls, diretorio: str, mmap: bool = True) -> 'ClustersSimilares':
+        """Carrega clusters gravados com `salvar` (por padrão, com memory-map)."""
+        _exigir_numpy()
+        modo = 'r' if mmap else None
+        dados = load_file(os.path.join(diretorio, ARQUIVO_IDS))
+        return cls(dados['ids'],
+                   np.load(os.path.join(diretorio, ARQUIVO_CLUSTER), mmap_mode=modo),
+                   np.load(os.path.join(diretorio, ARQUIVO_MEMBROS), mmap_mode=modo),
+                   np.load(os.path.join(diretorio, ARQUIVO_INICIOS), mmap_mode=modo),
+                   dados.get('estatisticas'))
+                   
+    def relatorio(self) -> str:
+        tamanhos = self.tamanhos()
+        ligacoes = self.estatisticas.get('ligacoes', 0)
+        resolvidas = ligacoes - self.estatisticas.get('nao_resolvidas', 0)
+        return (f"Clusters de similares: {len(self):,} clusters com {len(self.ids):,} acórdãos "
+                f"(maior: {int(tamanhos.max()) if len(tamanhos) else 0:,}); "
+                f"{resolvidas:,} de {ligacoes:,} ligações resolvidas")
+
+def clusters_do_diretorio(parsed_base_path: str, destino: str, indice_path: Optional[str] = None) -> ClustersSimilares:
+    """
+    Monta e grava os clusters a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e grava os clusters em `destino`. Os similares são
+    resolvidos pelo índice de acórdãos salvo em `indice_path` ou, sem ele,
+    por um índice construído na mesma passada.
+    """
+    montador = MontadorClusters()
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for acordao in (acordaos if isinstance(acordaos, list) else [acordaos]):
+                montador.adicionar(acordao)
+                if not indice_path:
+                    index.add_acordao(acordao)
+                    
+    if indice_path:
+        index = AcordaoIndex.load_from_file(indice_path, SiglaMatcher.from_recursos())
+    clusters = montador.clusters(index)
+    clusters.salvar(destino)
+    print(clusters.relatorio())
+    return clusters
@@ -0,0 +1,306 @@
+import math
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+
+# NumPy é opcional para o restante do projeto, mas necessário aqui
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ARQUIVO_MATRIZ = 'cocitacao.npz'
+ARQUIVO_ARTIGOS = 'artigos.json'
+
+METRICAS = ('contagem', 'pmi', 'jaccard')
+
+# Acórdãos por lote na geração dos pares (limita a memória dos pares intermediários)
+ACORDAOS_POR_LOTE = 50_000
+
+def _exigir_numpy() -> None:
+    if np is None:
+        raise ImportError("A matriz de cocitação requer NumPy (pip install numpy)")
+
+def chave_lei(ref: Dict) -> Optional[str]:
+    """
+    Identifica a lei de uma referência estruturada.
+    
+    Usa a sigla (ex.: 'CPC-15'), que distingue leis do mesmo ano; sem sigla,
+    combina esfera, tipo, número e ano (ex.: 'FED-LEI-008078-1990').
+    """
+    if ref.get('legSigla'):
+        return ref['legSigla'].strip().upper()
+    partes = [ref.get(campo) for campo in ('LEG', 'tipo', 'numero', 'ANO')]
+    return '-'.join(p for p in partes if p) or None
+
+def chave_artigo(lei: str, artigo: str) -> str:
+    """Chave de um artigo na matriz (ex.: ('CPC-15', '489') -> 'CPC-15:ART00489')."""
+    artigo = str(artigo).strip().upper()
+    if artigo.isdigit():
+        artigo = artigo.zfill(5)
+    return f"{lei.strip().upper()}:ART{artigo}"
+
+def artigos_citados(referencias: Iterable[Dict]) -> List[str]:
+    """Chaves dos artigos citados nas referências de um acórdão, sem repetição."""
+    artigos = {}
+    for ref in referencias or ():
+        lei = chave_lei(ref)
+        if not lei:
+            continue
+        for chave, valor in ref.items():
+            if chave.startswith('ART') and isinstance(valor, dict) and valor.get('numero'):
+                artigos[chave_artigo(lei, valor['numero'])] = None
+    return list(artigos)
+
+class MontadorCocitacao:
+    """
+    Lê os artigos citados por acórdão numa única passada.
+    
+    Guarda só a matriz de incidência acórdão × artigo em formato CSR (dois
+    arrays de inteiros) e o código do acórdão de cada linha; os pares de
+    artigos são gerados depois, em lote. Como em MontadorPrecedentes, um
+    acórdão lido mais de uma vez (mesmo id em dois arquivos) conta uma vez,
+    com a união dos artigos citados.
+    """
+    
+    def __init__(self):
+        self.codigos: Dict[str, int] = {}
+        self.ids: Dict[str, int] = {}
+        self._indices = array('i')
+        self._indptr = array('q', [0])
+        self._acordaos = array('i')  # código do acórdão de cada linha
+        
+    def adicionar(self, acordao: Dict) -> None:
+        if not acordao.get('id'):
+            return
+        codigos = self.codigos
+        artigos = artigos_citados(acordao.get('referenciasLegislativasEstruturadas'))
+        if not artigos:
+            return
+        for artigo in artigos:
+            codigo = codigos.get(artigo)
+            if codigo is None:
+                codigo = codigos[artigo] = len(codigos)
+            self._indices.append(codigo)
+        self._indptr.append(len(self._indices))
+        self._acordaos.append(self.ids.setdefault(acordao['id'], len(self.ids)))
+        
+    def _incidencia(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """A matriz de incidência (indices, indptr), com uma linha por acórdão."""
+        indices = np.frombuffer(self._indices, dtype=np.int32) if self._indices else np.zeros(0, np.int32)
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)
+        if len(self._acordaos) == len(self.ids):
+            return indices, indptr
+            
+        # Linhas de ids repetidos se juntam: pares (acórdão, artigo) únicos, em ordem de acórdão
+        linhas = np.repeat(np.frombuffer(self._acordaos, dtype=np.int32).astype(np.int64), np.diff(indptr))
+        pares = np.unique(linhas << 32 | indices.astype(np.int64))
+        indptr = np.zeros(len(self.ids) + 1, np.int64)
+        np.cumsum(np.bincount(pares >> 32, minlength=len(self.ids)), out=indptr[1:])
+        return (pares & 0xFFFFFFFF).astype(np.int32), indptr
+        
+    def matriz(self) -> 'MatrizCocitacao':
+        """Monta a matriz simétrica de coocorrência artigo × artigo (CSR)."""
+        _exigir_numpy()
+        n = len(self.codigos)
+        indices, indptr = self._incidencia()
+        frequencias = np.bincount(indices, minlength=n).astype(np.int64)
+        
+        # Pares (i < j) de cada acórdão, reduzidos a contagens por lote
+        chaves, contagens = [], []
+        for inicio in range(0, len(indptr) - 1, ACORDAOS_POR_LOTE):
+            pares = _pares_do_lote(indices, indptr[inicio:inicio + ACORDAOS_POR_LOTE + 1], n)
+            if len(pares):
+                unicos, quantidade = np.unique(pares, return_counts=True)
+                chaves.append(unicos)
+                contagens.append(quantidade)
+                
+        linhas, colunas, dados = _reduzir_pares(chaves, contagens, n)
+        return MatrizCocitacao.de_coo(linhas, colunas, dados, list(self.codigos), frequencias, len(indptr) - 1)
+
+def _pares_do_lote(indices: 'np.ndarray', indptr: 'np.ndarray', n: int) -> 'np.ndarray':
+    """
+    Pares de artigos citados juntos, codificados como i * n + j (i < j).
+    
+    Os acórdãos são agrupados pela quantidade k de artigos citados, e os pares
+    de cada grupo saem de uma só indexação com np.triu_indices(k, 1).
+    """
+    tamanhos = np.diff(indptr)
+    blocos = []
+    for k in np.unique(tamanhos):
+        if k < 2:
+            continue
+        inicios = indptr[:-1][tamanhos == k]
+        grupo = indices[inicios[:, None] + np.arange(k)].astype(np.int64)
+        a, b = np.triu_indices(k, 1)
+        i, j = grupo[:, a], grupo[:, b]
+        blocos.append((np.minimum(i, j) * n + np.maximum(i, j)).ravel())
+    return np.concatenate(blocos) if blocos else np.zeros(0, np.int64)
+
+def _reduzir_pares(chaves: List['np.ndarray'], contagens: List['np.ndarray'], n: int):
+    """Soma as contagens dos lotes e devolve o triângulo superior em COO."""
+    if not chaves:
+        vazio = np.zeros(0, np.int64)
+        return vazio, vazio, vazio
+    todas = np.concatenate(chaves)
+    quantidades = np.concatenate(contagens)
+    ordem = np.argsort(todas, kind='stable')
+    todas, quantidades = todas[ordem], quantidades[ordem]
+    inicios = np.flatnonzero(np.r_[True, todas[1:] != todas[:-1]])
+    unicas = todas[inicios]
+    return unicas // n, unicas % n, np.add.reduceat(quantidades, inicios)
+
+class MatrizCocitacao:
+    """
+    Matriz esparsa de cocitação entre artigos de lei.
+    
+    O elemento (i, j) é o número de acórdãos que citam os artigos i e j. A
+    matriz é simétrica e fica em CSR (indptr, indices, dados), de modo que os
+    artigos associados a um artigo são uma fatia contígua dos arrays. As
+    frequências de cada artigo permitem calcular PMI e Jaccard sem cruzar
+    conjuntos de acórdãos; `total_acordaos` conta só os acórdãos que citam
+    algum artigo.
+    """
+    
+    def __init__(self, indptr: 'np.ndarray', indices: 'np.ndarray', dados: 'np.ndarray',
+                 artigos: List[str], frequencias: 'np.ndarray', total_acordaos: int):
+        _exigir_numpy()
+        self.indptr = indptr
+        self.indices = indices
+        self.dados = dados
+        self.artigos = list(artigos)
+        self.codigos = {artigo: i for i, artigo in enumerate(self.artigos)}
+        self.frequencias = frequencias
+        self.total_acordaos = total_acordaos
+        
+    @classmethod
+    def de_coo(cls, linhas: 'np.ndarray', colunas: 'np.ndarray', dados: 'np.ndarray', artigos: List[str],
+               frequencias: 'np.ndarray', total_acordaos: int) -> 'MatrizCocitacao':
+        """Monta a CSR simétrica a partir do triângulo superior em COO."""
+        n = len(artigos)
+        linhas, colunas = np.r_[linhas, colunas], np.r_[colunas, linhas]
+        dados = np.r_[dados, dados]
+        ordem = np.lexsort((colunas, linhas))
+        indptr = np.zeros(n + 1, np.int64)
+        np.cumsum(np.bincount(linhas, minlength=n), out=indptr[1:])
+        return cls(indptr, colunas[ordem].astype(np.int32), dados[ordem].astype(np.int32),
+                   artigos, frequencias, total_acordaos)
+                   
+    @classmethod
+    def de_acordaos(cls, acordaos: Iterable[Dict]) -> 'MatrizCocitacao':
+        montador = MontadorCocitacao()
+        for acordao in acordaos:
+            montador.adicionar(acordao)
+        return montador.matriz()
+        
+    @property
+    def total_pares(self) -> int:
+        """Pares distintos de artigos citados juntos."""
+        return len(self.dados) // 2
+        
+    def coo(self) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """A matriz completa em COO (linhas, colunas, contagens)."""
+        linhas = np.repeat(np.arange(len(self.artigos), dtype=np.int32), np.diff(self.indptr))
+        return linhas, self.indices, self.dados
+        
+    def frequencia(self, artigo: str) -> int:
+        """Número de acórdãos que citam o artigo."""
+        codigo = self.codigos.get(artigo)
+        return int(self.frequencias[codigo]) if codigo is not None else 0
+        
+    def contagem(self, artigo_a: str, artigo_b: str) -> int:
+        """Número de acórdãos que citam os dois artigos."""
+        i, j = self.codigos.get(artigo_a), self.codigos.get(artigo_b)
+        if i is None or j is None:
+            return 0
+        vizinhos = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        posicao = np.searchsorted(vizinhos, j)
+        if posicao < len(vizinhos) and vizinhos[posicao] == j:
+            return int(self.dados[self.indptr[i] + posicao])
+        return 0
+        
+    def associados(self, artigo: str, k: int = 10, metrica: str = 'contagem',
+                   min_contagem: int = 1) -> List[Tuple[str, int, float]]:
+        """
+        Os k artigos mais associados a `artigo`.
+        
+        Retorna (artigo, acórdãos em comum, valor da métrica), ordenado pela
+        métrica: 'contagem', 'pmi' (log de P(a,b) / P(a)P(b)) ou 'jaccard'
+        (comuns / acórdãos que citam qualquer um dos dois). `min_contagem`
+        descarta pares raros, que inflam o PMI.
+        """
+        if metrica not in METRICAS:
+            raise ValueError(f"Métrica desconhecida: {metrica} (use {', '.join(METRICAS)})")
+        i = self.codigos.get(artigo)
+        if i is None:
+            return []
+            
+        inicio, fim = self.indptr[i], self.indptr[i + 1]
+        vizinhos = self.indices[inicio:fim]
+        comuns = self.dados[inicio:fim].astype(np.int64)
+        if min_contagem > 1:
+            filtro = comuns >= min_contagem
+            vizinhos, comuns = vizinhos[filtro], comuns[filtro]
+            
+        if metrica == 'contagem':
+            valores = comuns.astype(np.float64)
+        elif metrica == 'pmi':
+            valores = np.log(comuns * self.total_acordaos / (self.frequencias[i] * self.frequencias[vizinhos]))
+        else:
+            valores = comuns / (self.frequencias[i] + self.frequencias[vizinhos] - comuns)
+            
+        if k <= 0:
+            return []
+        candidatos = np.arange(len(valores))
+        if k < len(valores):
+            # Só os valores a partir do k-ésimo maior (inclusive empates) são ordenados
+            limiar = np.partition(valores, len(valores) - k)[len(valores) - k]
+            candidatos = np.flatnonzero(valores >= limiar)
+        # Empates pela contagem e depois pela ordem dos artigos
+        ordem = candidatos[np.lexsort((vizinhos[candidatos], -comuns[candidatos], -valores[candidatos]))][:k]
+        return [(self.artigos[vizinhos[c]], int(comuns[c]), float(valores[c])) for c in ordem]
+        
+    def salvar(self, diretorio: str) -> None:
+        """Grava os arrays CSR (.npz) e a lista de artigos (JSON)."""
+        os.makedirs(diretorio, exist_ok=True)
+        np.savez(os.path.join(diretorio, ARQUIVO_MATRIZ), indptr=self.indptr, indices=self.indices,
+                 dados=self.dados, frequencias=self.frequencias)
+        dump_file({'total_acordaos': self.total_acordaos, 'artigos': self.artigos},
+                  os.path.join(diretorio, ARQUIVO_ARTIGOS))
+                  
+    @classmethod
+    def carregar(cls, diretorio: str) -> 'MatrizCocitacao':
+        """Carrega uma matriz gravada com `salvar`."""
+        _exigir_numpy()
+        meta = load_file(os.path.join(diretorio, ARQUIVO_ARTIGOS))
+        with np.load(os.path.join(diretorio, ARQUIVO_MATRIZ)) as arrays:
+            return cls(arrays['indptr'], arrays['indices'], arrays['dados'], meta['artigos'],
+                       arrays['frequencias'], meta['total_acordaos'])
+                       
+    def relatorio(self) -> str:
+        tamanho = sum(a.nbytes for a in (self.indptr, self.indices, self.dados, self.frequencias))
+        densidade = self.total_pares / max(math.comb(len(self.artigos), 2), 1)
+        return (f"Cocitação: {len(self.artigos):,} artigos, {self.total_pares:,} pares citados juntos "
+                f"em {self.total_acordaos:,} acórdãos com artigos citados (densidade {densidade:.2%}, {tamanho / 2 ** 20:,.1f} MiB)")
+
+def cocitacao_do_diretorio(parsed_base_path: str, destino: str) -> MatrizCocitacao:
+    """
+    Monta e grava a matriz de cocitação a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e grava a matriz em `destino`.
+    """
+    montador = MontadorCocitacao()
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for acordao in (acordaos if isinstance(acordaos, list) else [acordaos]):
+                montador.adicionar(acordao)
+                
+    matriz = montador.matriz()
+    matriz.salvar(destino)
+    print(matriz.relatorio())
+    return matriz
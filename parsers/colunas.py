@@ -0,0 +1,270 @@
+import os
+import shutil
+from array import array
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+
+# NumPy é opcional: só a exportação e a leitura das colunas o exigem
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Colunas gravadas, uma por arquivo <nome>.npy
+COLUNAS = ('id', 'siglaClasse', 'numeroProcesso', 'dataDecisao', 'dataPublicacao',
+           'relator', 'orgao', 'arquivo', 'posicao')
+
+# Colunas categóricas: códigos int32 (-1 se ausente) e rótulos em ARQUIVO_METADADOS
+CATEGORICAS = ('siglaClasse', 'relator', 'orgao', 'arquivo')
+
+ARQUIVO_METADADOS = 'colunas.json'
+
+# Valor de NaT em datetime64 (o menor int64)
+_NAT = -2 ** 63
+_EPOCA = date(1970, 1, 1).toordinal()
+
+Filtro = Union[str, Iterable[str], None]
+
+def _exigir_numpy() -> None:
+    if np is None:
+        raise ImportError("O armazenamento em colunas requer NumPy (pip install numpy)")
+
+def _normalizar(coluna: str, valor: str) -> str:
+    """Normaliza um rótulo categórico (relator e órgão em maiúsculas, como nos índices)."""
+    valor = str(valor).strip()
+    return valor.upper() if coluna in ('relator', 'orgao') else valor
+
+def _dias(data: Optional[str]) -> int:
+    """Dias desde 1970-01-01 de 'AAAAMMDD' ou 'AAAA-MM-DD'; NaT se ausente ou inválida."""
+    texto = (data or '').replace('-', '')
+    if len(texto) != 8 or not texto.isdigit():
+        return _NAT
+    try:
+        return date(int(texto[:4]), int(texto[4:6]), int(texto[6:])).toordinal() - _EPOCA
+    except ValueError:
+        return _NAT
+
+def _coluna_texto(valores: List[str]) -> 'np.ndarray':
+    """Coluna de texto de largura fixa: bytes ASCII (1 byte por caractere) ou, se preciso, Unicode."""
+    try:
+        return np.array(valores, dtype='S')
+    except UnicodeEncodeError:
+        return np.array(valores, dtype='U')
+
+class EscritorColunas:
+    """
+    Acumula os metadados dos acórdãos e grava as colunas .npy.
+    
+    Datas e códigos ficam em arrays compactos durante a leitura; os rótulos
+    categóricos recebem códigos na ordem em que aparecem. A gravação é feita
+    num diretório temporário trocado pelo definitivo só no final, para que
+    leitores nunca vejam colunas de tamanhos diferentes.
+    """
+    
+    def __init__(self):
+        self.rotulos: Dict[str, Dict[str, int]] = {coluna: {} for coluna in CATEGORICAS}
+        self._ids: List[str] = []
+        self._processos: List[str] = []
+        self._datas = {'dataDecisao': array('q'), 'dataPublicacao': array('q')}
+        self._codigos = {coluna: array('i') for coluna in CATEGORICAS}
+        self._posicoes = array('i')
+        self._cache_datas: Dict[Optional[str], int] = {}
+        
+    def __len__(self) -> int:
+        return len(self._ids)
+        
+    def _codigo(self, coluna: str, valor: Optional[str]) -> int:
+        if not valor or not str(valor).strip():
+            return -1
+        rotulo = _normalizar(coluna, valor)
+        codigos = self.rotulos[coluna]
+        codigo = codigos.get(rotulo)
+        if codigo is None:
+            codigo = codigos[rotulo] = len(codigos)
+        return codigo
+        
+    def _data(self, valor: Optional[str]) -> int:
+        dias = self._cache_datas.get(valor)
+        if dias is None:
+            dias = self._cache_datas[valor] = _dias(valor)
+        return dias
+        
+    def adicionar(self, acordao: Dict, arquivo: str, posicao: int) -> None:
+        """Adiciona um acórdão lido da posição `posicao` da lista em `arquivo`."""
+        publicacao = acordao.get('publicacaoEstruturada') or {}
+        self._ids.append(str(acordao.get('id') or ''))
+        self._processos.append(str(acordao.get('numeroProcesso') or ''))
+        self._datas['dataDecisao'].append(self._data(acordao.get('dataDecisao')))
+        self._datas['dataPublicacao'].append(self._data(publicacao.get('dataPublicacao')))
+        self._codigos['siglaClasse'].append(self._codigo('siglaClasse', acordao.get('siglaClasse')))
+        self._codigos['relator'].append(self._codigo('relator', acordao.get('ministroRelator')))
+        self._codigos['orgao'].append(self._codigo('orgao', acordao.get('nomeOrgaoJulgador')))
+        self._codigos['arquivo'].append(self._codigo('arquivo', arquivo))
+        self._posicoes.append(posicao)
+        
+    def colunas(self) -> Dict[str, 'np.ndarray']:
+        _exigir_numpy()
+        colunas = {
+            'id': _coluna_texto(self._ids),
+            'numeroProcesso': _coluna_texto(self._processos),
+            'posicao': np.frombuffer(self._posicoes, dtype=np.int32).copy(),
+        }
+        for coluna, valores in self._datas.items():
+            colunas[coluna] = np.frombuffer(valores, dtype=np.int64).view('datetime64[D]').copy()
+        for coluna, valores in self._codigos.items():
+            colunas[coluna] = np.frombuffer(valores, dtype=np.int32).copy()
+        return colunas
+        
+    def gravar(self, destino: str, base_path: str) -> None:
+        """Grava as colunas e os metadados em `destino`, substituindo o conteúdo anterior."""
+        colunas = self.colunas()
+        tmp_path = destino.rstrip('/\\') + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for nome in COLUNAS:
+            np.save(os.path.join(tmp_path, f"{nome}.npy"), colunas[nome])
+        dump_file({
+            'linhas': len(self),
+            'base': os.path.abspath(base_path),
+            'colunas': {nome: str(colunas[nome].dtype) for nome in COLUNAS},
+            'rotulos': {coluna: list(self.rotulos[coluna]) for coluna in CATEGORICAS},
+        }, os.path.join(tmp_path, ARQUIVO_METADADOS))
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(tmp_path, destino)
+
+class TabelaColunas:
+    """
+    Metadados dos acórdãos em colunas NumPy, abertas com memory-map.
+    
+    Os filtros retornam máscaras booleanas (uma posição por acórdão), que
+    podem ser combinadas com & e |. As colunas 'arquivo' e 'posicao' apontam
+    para o acórdão na saída JSON (índice na lista do arquivo), de onde
+    `acordaos` lê só os arquivos necessários.
+    
+    Exemplo:
+        tabela = TabelaColunas.carregar('colunas')
+        mascara = tabela.filtrar(classe='REsp', decisao_de='2020-01-01', orgao='TERCEIRA TURMA')
+        ids = tabela.ids(mascara)
+    """
+    
+    def __init__(self, colunas: Dict[str, 'np.ndarray'], rotulos: Dict[str, List[str]],
+                 base_path: Optional[str] = None):
+        self.colunas = colunas
+        self.rotulos = rotulos
+        self.base_path = base_path
+        self._codigos = {coluna: {rotulo: codigo for codigo, rotulo in enumerate(rotulos[coluna])}
+                         for coluna in CATEGORICAS}
+                         
+    @classmethod
+    def carregar(cls, diretorio: str, mmap: bool = True, base_path: Optional[str] = None) -> 'TabelaColunas':
+        """Abre as colunas gravadas por EscritorColunas (por padrão, com memory-map)."""
+        _exigir_numpy()
+        metadados = load_file(os.path.join(diretorio, ARQUIVO_METADADOS))
+        colunas = {nome: np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode='r' if mmap else None)
+                   for nome in metadados['colunas']}
+        return cls(colunas, metadados['rotulos'], base_path or metadados.get('base'))
+        
+    def __len__(self) -> int:
+        return len(self.colunas['id'])
+        
+    def __getitem__(self, coluna: str) -> 'np.ndarray':
+        return self.colunas[coluna]
+        
+    def codigos(self, coluna: str, valores: Filtro) -> List[int]:
+        """Códigos dos rótulos de uma coluna categórica (rótulos desconhecidos são ignorados)."""
+        if isinstance(valores, str):
+            valores = [valores]
+        codigos = self._codigos[coluna]
+        return [codigos[rotulo] for rotulo in (_normalizar(coluna, v) for v in valores) if rotulo in codigos]
+        
+    def mascara_categoria(self, coluna: str, valores: Filtro) -> 'np.ndarray':
+        """Linhas cuja coluna categórica tem um dos rótulos dados."""
+        codigos = self.codigos(coluna, valores)
+        if len(codigos) == 1:
+            return self.colunas[coluna] == codigos[0]
+        return np.isin(self.colunas[coluna], codigos)
+        
+    def mascara_periodo(self, coluna: str, de: Optional[str] = None, ate: Optional[str] = None) -> 'np.ndarray':
+        """Linhas com a data entre `de` e `ate` ('AAAA-MM-DD', inclusivos); datas ausentes ficam de fora."""
+        datas = self.colunas[coluna]
+        mascara = ~np.isnat(datas)
+        if de:
+            mascara &= datas >= np.datetime64(de, 'D')
+        if ate:
+            mascara &= datas <= np.datetime64(ate, 'D')
+        return mascara
+        
+    def filtrar(self, classe: Filtro = None, relator: Filtro = None, orgao: Filtro = None,
+                decisao_de: Optional[str] = None, decisao_ate: Optional[str] = None,
+                publicacao_de: Optional[str] = None, publicacao_ate: Optional[str] = None) -> 'np.ndarray':
+        """Máscara das linhas que atendem a todos os filtros dados (None não filtra)."""
+        mascara = np.ones(len(self), dtype=bool)
+        for coluna, valores in (('siglaClasse', classe), ('relator', relator), ('orgao', orgao)):
+            if valores is not None:
+                mascara &= self.mascara_categoria(coluna, valores)
+        if decisao_de or decisao_ate:
+            mascara &= self.mascara_periodo('dataDecisao', decisao_de, decisao_ate)
+        if publicacao_de or publicacao_ate:
+            mascara &= self.mascara_periodo('dataPublicacao', publicacao_de, publicacao_ate)
+        return mascara
+        
+    def ids(self, mascara: 'np.ndarray') -> List[str]:
+        """Ids das linhas selecionadas, na ordem da tabela."""
+        ids = self.colunas['id'][mascara]
+        return [i.decode('utf-8') for i in ids.tolist()] if ids.dtype.kind == 'S' else ids.tolist()
+        
+    def acordaos(self, mascara: 'np.ndarray') -> Iterator[Dict]:
+        """
+        Lê da saída JSON os acórdãos das linhas selecionadas.
+        
+        Cada arquivo necessário é lido uma vez; os acórdãos saem agrupados por
+        arquivo e, dentro dele, na ordem da lista.
+        """
+        if self.base_path is None:
+            raise ValueError("Diretório da saída JSON desconhecido (informe base_path)")
+        linhas = np.flatnonzero(mascara)
+        arquivos = self.colunas['arquivo'][linhas]
+        ordem = np.lexsort((self.colunas['posicao'][linhas], arquivos))
+        linhas, arquivos = linhas[ordem], arquivos[ordem]
+        
+        necessarios = {self.rotulos['arquivo'][codigo] for codigo in np.unique(arquivos).tolist()}
+        fontes = {fonte.caminho_relativo: fonte for fonte in listar_fontes(self.base_path)
+                  if fonte.caminho_relativo in necessarios}
+        inicios = np.flatnonzero(np.r_[True, arquivos[1:] != arquivos[:-1]])
+        for inicio, fim in zip(inicios.tolist(), np.r_[inicios[1:], len(linhas)].tolist()):
+            fonte = fontes[self.rotulos['arquivo'][int(arquivos[inicio])]]
+            conteudo = process_json_content(fonte.ler_texto())
+            conteudo = conteudo if isinstance(conteudo, list) else [conteudo]
+            for posicao in self.colunas['posicao'][linhas[inicio:fim]].tolist():
+                yield conteudo[posicao]
+                
+    def relatorio(self) -> str:
+        datas = self.colunas['dataDecisao']
+        validas = datas[~np.isnat(datas)]
+        periodo = f"{validas.min()} a {validas.max()}" if len(validas) else '-'
+        return (f"Colunas de metadados: {len(self):,} acórdãos, {len(self.rotulos['siglaClasse']):,} classes, "
+                f"{len(self.rotulos['relator']):,} relatores, {len(self.rotulos['orgao']):,} órgãos, "
+                f"{len(self.rotulos['arquivo']):,} arquivos; decisões de {periodo}")
+
+def exportar_colunas(parsed_base_path: str, destino: str) -> TabelaColunas:
+    """
+    Grava as colunas de metadados a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e grava uma coluna .npy por campo em `destino`.
+    """
+    _exigir_numpy()
+    escritor = EscritorColunas()
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for posicao, acordao in enumerate(acordaos if isinstance(acordaos, list) else [acordaos]):
+                escritor.adicionar(acordao, fonte.caminho_relativo, posicao)
+                
+    escritor.gravar(destino, parsed_base_path)
+    tabela = TabelaColunas.carregar(destino)
+    print(tabela.relatorio())
+    return tabela
@@ -0,0 +1,266 @@
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+from .particionamento import DESCONHECIDO
+from .sketches import id_numerico
+
+# NumPy é opcional: sem ele, os relatórios usam as contagens em Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIMENSOES = ('relator', 'ano', 'orgao')
+
+ARQUIVO_CONTAGENS = 'contagens.npy'
+ARQUIVO_ROTULOS = 'rotulos.json'
+
+Filtro = Union[str, Iterable[str], None]
+
+def _exigir_numpy() -> None:
+    if np is None:
+        raise ImportError("O cubo de relatores requer NumPy (pip install numpy)")
+
+def _normalizar(dimensao: str, valor: str) -> str:
+    """Normaliza um rótulo como o RelatorIndex (relator e órgão em maiúsculas)."""
+    valor = str(valor).strip()
+    return valor.upper() if dimensao != 'ano' else valor
+
+def _ano(data_decisao: Optional[str]) -> str:
+    ano = (data_decisao or '')[:4]
+    return ano if len(ano) == 4 and ano.isdigit() else DESCONHECIDO
+
+class MontadorCubo:
+    """
+    Acumula (relator, ano, órgão) de cada acórdão e monta o CuboRelatores.
+    
+    Cada rótulo recebe um código na ordem em que aparece, e os acórdãos são
+    guardados só como três códigos e o id numérico (sketches.id_numerico) em
+    arrays compactos. Um mesmo acórdão do mesmo relator é contado uma vez,
+    como nos conjuntos do RelatorIndex: as repetições são descartadas ao
+    montar o cubo, vetorialmente, ficando a primeira ocorrência.
+    """
+    
+    def __init__(self):
+        self.codigos: Dict[str, Dict[str, int]] = {dimensao: {} for dimensao in DIMENSOES}
+        self._celulas = array('I')
+        self._ids = array('q')
+        
+    def _codigo(self, dimensao: str, rotulo: str) -> int:
+        codigos = self.codigos[dimensao]
+        codigo = codigos.get(rotulo)
+        if codigo is None:
+            codigo = codigos[rotulo] = len(codigos)
+        return codigo
+        
+    def registrar_rotulos(self, dimensao: str, rotulos: Iterable[str]) -> None:
+        """Reserva códigos para rótulos já conhecidos, na ordem dada."""
+        for rotulo in rotulos:
+            self._codigo(dimensao, rotulo)
+            
+    def __len__(self) -> int:
+        return len(self._ids)
+        
+    def adicionar_celula(self, acordao_id: str, relator: str, ano: str, orgao: str) -> None:
+        self._ids.append(id_numerico(acordao_id))
+        self._celulas.extend((self._codigo('relator', relator), self._codigo('ano', ano),
+                              self._codigo('orgao', orgao)))
+                              
+    def adicionar(self, acordao: Dict) -> None:
+        """Adiciona um acórdão (ignorado sem id ou relator, como no RelatorIndex)."""
+        if not acordao.get('id') or not acordao.get('ministroRelator'):
+            return
+        orgao = (acordao.get('nomeOrgaoJulgador') or '').strip().upper() or DESCONHECIDO
+        self.adicionar_celula(acordao['id'], acordao['ministroRelator'].strip().upper(),
+                              _ano(acordao.get('dataDecisao')), orgao)
+                              
+    def cubo(self) -> 'CuboRelatores':
+        """Monta o cubo de contagens com uma única contagem vetorizada."""
+        _exigir_numpy()
+        rotulos = {dimensao: list(self.codigos[dimensao]) for dimensao in DIMENSOES}
+        forma = tuple(len(rotulos[dimensao]) for dimensao in DIMENSOES)
+        
+        planas = np.zeros(0, np.intp)
+        if self._celulas:
+            celulas = np.frombuffer(self._celulas, dtype=f'u{self._celulas.itemsize}').reshape(-1, 3)
+            # Primeira ocorrência de cada par (relator, id): a ordenação estável mantém a ordem de chegada
+            ids = np.frombuffer(self._ids, dtype=np.int64)
+            ordem = np.lexsort((ids, celulas[:, 0]))
+            relatores, ids = celulas[ordem, 0], ids[ordem]
+            primeiras = np.ones(len(ordem), dtype=bool)
+            primeiras[1:] = (relatores[1:] != relatores[:-1]) | (ids[1:] != ids[:-1])
+            celulas = celulas[ordem[primeiras]]
+            planas = np.ravel_multi_index(celulas.T.astype(np.intp), forma)
+        contagens = np.bincount(planas, minlength=int(np.prod(forma))).astype(np.int32).reshape(forma)
+        return CuboRelatores(contagens, rotulos)
+
+class CuboRelatores:
+    """
+    Cubo de contagens de acórdãos por relator × ano × órgão julgador.
+    
+    Os rótulos de cada dimensão são codificados em inteiros e as contagens
+    ficam num array NumPy denso (relator, ano, órgão). Fatias, agregações e
+    top-k são operações vetorizadas sobre esse array. O cubo é gravado como
+    .npy e pode ser carregado com memory-map, sem reprocessar os acórdãos.
+    """
+    
+    def __init__(self, contagens: 'np.ndarray', rotulos: Dict[str, List[str]]):
+        _exigir_numpy()
+        self.contagens = contagens
+        self.rotulos = {dimensao: list(rotulos[dimensao]) for dimensao in DIMENSOES}
+        self.codigos = {dimensao: {rotulo: i for i, rotulo in enumerate(self.rotulos[dimensao])}
+                        for dimensao in DIMENSOES}
+                        
+    @classmethod
+    def de_acordaos(cls, acordaos: Iterable[Dict]) -> 'CuboRelatores':
+        montador = MontadorCubo()
+        for acordao in acordaos:
+            montador.adicionar(acordao)
+        return montador.cubo()
+        
+    @classmethod
+    def de_indice(cls, index) -> 'CuboRelatores':
+        """
+        Monta o cubo a partir de um RelatorIndex (inclusive carregado de arquivo).
+        
+        O índice guarda ano e órgão em estruturas separadas; aqui os dois são
+        reunidos pelo id de cada acórdão do relator.
+        """
+        anos: Dict[Tuple[str, str], str] = {}
+        for ano, relatores in index.by_year.items():
+            for relator, ids in relatores.items():
+                for acordao_id in ids:
+                    anos[(relator, acordao_id)] = ano
+                    
+        orgaos: Dict[Tuple[str, str], str] = {}
+        for orgao, relatores in index.by_orgao.items():
+            for relator, ids in relatores.items():
+                for acordao_id in ids:
+                    orgaos[(relator, acordao_id)] = orgao
+                    
+        # Códigos na ordem do índice, para que empates no top-k sigam a mesma ordem
+        montador = MontadorCubo()
+        montador.registrar_rotulos('relator', index.by_relator)
+        montador.registrar_rotulos('ano', index.by_year)
+        montador.registrar_rotulos('orgao', index.by_orgao)
+        for relator, ids in index.by_relator.items():
+            for acordao_id in ids:
+                chave = (relator, acordao_id)
+                montador.adicionar_celula(acordao_id, relator, anos.get(chave, DESCONHECIDO),
+                                          orgaos.get(chave, DESCONHECIDO))
+        return montador.cubo()
+        
+    @property
+    def total(self) -> int:
+        return int(self.contagens.sum(dtype=np.int64))
+        
+    def _selecao(self, dimensao: str, filtro: Filtro) -> Union[slice, 'np.ndarray']:
+        if filtro is None:
+            return slice(None)
+        valores = [filtro] if isinstance(filtro, (str, int)) else list(filtro)
+        codigos = self.codigos[dimensao]
+        selecionados = [codigos[v] for v in (_normalizar(dimensao, v) for v in valores) if v in codigos]
+        return np.array(sorted(set(selecionados)), dtype=np.intp)
+        
+    def fatia(self, relator: Filtro = None, ano: Filtro = None, orgao: Filtro = None) -> 'CuboRelatores':
+        """
+        Sub-cubo com os rótulos filtrados em cada dimensão.
+        
+        Cada filtro é um rótulo ou uma lista de rótulos; rótulos inexistentes
+        são ignorados (o sub-cubo pode ficar vazio).
+        """
+        filtros = {'relator': relator, 'ano': ano, 'orgao': orgao}
+        selecoes = [self._selecao(dimensao, filtros[dimensao]) for dimensao in DIMENSOES]
+        
+        contagens = self.contagens
+        rotulos = {}
+        for eixo, (dimensao, selecao) in enumerate(zip(DIMENSOES, selecoes)):
+            if isinstance(selecao, slice):
+                rotulos[dimensao] = self.rotulos[dimensao]
+            else:
+                contagens = np.take(contagens, selecao, axis=eixo)
+                rotulos[dimensao] = [self.rotulos[dimensao][i] for i in selecao]
+        return CuboRelatores(contagens, rotulos)
+        
+    def agregar(self, *dimensoes: str) -> 'np.ndarray':
+        """
+        Soma (roll-up) das contagens sobre as dimensões não informadas.
+        
+        Retorna um array com os eixos na ordem de `dimensoes`; sem dimensões,
+        retorna o total como escalar.
+        """
+        for dimensao in dimensoes:
+            if dimensao not in DIMENSOES:
+                raise ValueError(f"Dimensão desconhecida: {dimensao} (use {', '.join(DIMENSOES)})")
+        somados = tuple(eixo for eixo, dimensao in enumerate(DIMENSOES) if dimensao not in dimensoes)
+        resultado = self.contagens.sum(axis=somados, dtype=np.int64)
+        mantidos = [dimensao for dimensao in DIMENSOES if dimensao in dimensoes]
+        return np.transpose(resultado, [mantidos.index(dimensao) for dimensao in dimensoes])
+        
+    def contagens_por(self, dimensao: str, **filtros: Filtro) -> Dict[str, int]:
+        """Contagem por rótulo de uma dimensão (só rótulos com acórdãos)."""
+        cubo = self.fatia(**filtros) if filtros else self
+        totais = cubo.agregar(dimensao)
+        rotulos = cubo.rotulos[dimensao]
+        return {rotulos[i]: int(totais[i]) for i in np.flatnonzero(totais)}
+        
+    def top_k(self, dimensao: str, k: Optional[int] = 10, **filtros: Filtro) -> List[Tuple[str, int]]:
+        """
+        Os k rótulos de `dimensao` com mais acórdãos, após os filtros.
+        
+        Usa argpartition para achar o limiar do k-ésimo maior valor e ordena
+        só os candidatos. Empates seguem a ordem de aparição dos rótulos, como
+        um sorted(..., reverse=True) sobre os dicts do índice.
+        """
+        cubo = self.fatia(**filtros) if filtros else self
+        totais = cubo.agregar(dimensao)
+        candidatos = np.flatnonzero(totais)
+        if k is not None and len(candidatos) > k:
+            if k <= 0:
+                return []
+            limiar = np.partition(totais[candidatos], len(candidatos) - k)[len(candidatos) - k]
+            candidatos = candidatos[totais[candidatos] >= limiar]
+        ordem = candidatos[np.argsort(-totais[candidatos], kind='stable')][:k]
+        rotulos = cubo.rotulos[dimensao]
+        return [(rotulos[i], int(totais[i])) for i in ordem]
+        
+    def salvar(self, diretorio: str) -> None:
+        """Grava as contagens (.npy) e os rótulos de cada dimensão (JSON)."""
+        os.makedirs(diretorio, exist_ok=True)
+        np.save(os.path.join(diretorio, ARQUIVO_CONTAGENS), self.contagens)
+        dump_file({'dimensoes': list(DIMENSOES), 'rotulos': self.rotulos},
+                  os.path.join(diretorio, ARQUIVO_ROTULOS))
+                  
+    @classmethod
+    def carregar(cls, diretorio: str, mmap: bool = True) -> 'CuboRelatores':
+        """Carrega um cubo gravado com `salvar` (por padrão, com memory-map)."""
+        _exigir_numpy()
+        dados = load_file(os.path.join(diretorio, ARQUIVO_ROTULOS))
+        contagens = np.load(os.path.join(diretorio, ARQUIVO_CONTAGENS), mmap_mode='r' if mmap else None)
+        return cls(contagens, dados['rotulos'])
+        
+    def relatorio(self) -> str:
+        forma = ' × '.join(f"{len(self.rotulos[d]):,} {d}" for d in DIMENSOES)
+        return f"Cubo de relatores: {self.total:,} acórdãos em {forma} ({self.contagens.nbytes / 2 ** 10:,.1f} KiB)"
+
+def cubo_do_diretorio(parsed_base_path: str, destino: str) -> CuboRelatores:
+    """
+    Monta e grava o cubo a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e grava o cubo em `destino`.
+    """
+    montador = MontadorCubo()
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for acordao in (acordaos if isinstance(acordaos, list) else [acordaos]):
+                montador.adicionar(acordao)
+                
+    cubo = montador.cubo()
+    cubo.salvar(destino)
+    print(cubo.relatorio())
+    return cubo
@@ -0,0 +1,244 @@
+import hashlib
+import math
+import os
+import sqlite3
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .json_utils import dumps
+
+def hash_conteudo(acordao: Any) -> str:
+    """Hash estável do conteúdo de um acórdão (independe da ordem das chaves)."""
+    return hashlib.blake2b(dumps(acordao, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+class BloomFilter:
+    """Filtro de Bloom em memória para testar rapidamente se um id nunca foi visto."""
+    
+    def __init__(self, capacidade: int, taxa_erro: float = 0.01):
+        capacidade = max(capacidade, 1)
+        self.num_bits = max(int(-capacidade * math.log(taxa_erro) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacidade * math.log(2))), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        
+    def _posicoes(self, chave: str):
+        digest = hashlib.blake2b(chave.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+            
+    def add(self, chave: str) -> None:
+        """Adiciona uma chave ao filtro."""
+        for pos in self._posicoes(chave):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+            
+    def __contains__(self, chave: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._posicoes(chave))
+        
+    @property
+    def bytes(self) -> int:
+        return len(self._bits)
+
+class DedupStore:
+    """
+    Conjunto persistente id -> hash de conteúdo, em SQLite, com Bloom filter na frente.
+    
+    Cada id guarda o hash do último conteúdo processado, o arquivo de saída
+    onde ele está e a execução que o registrou.
+    """
+    
+    def __init__(self, path: str, capacidade_bloom: int = 10_000_000, assinatura: str = ''):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS acordaos ("
+            "id TEXT PRIMARY KEY, hash TEXT NOT NULL, saida TEXT, execucao INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        
+        # Mudou o schema ou a versão dos parsers: as saídas antigas não servem mais
+        anterior = self._meta('assinatura')
+        if anterior is not None and anterior != assinatura:
+            print("Assinatura dos parsers mudou; descartando o histórico de deduplicação")
+            self._conn.execute("DELETE FROM acordaos")
+        self._set_meta('assinatura', assinatura)
+        
+        self.execucao = int(self._meta('execucao') or 0) + 1
+        self._set_meta('execucao', str(self.execucao))
+        self._conn.commit()
+        
+        total = self._conn.execute("SELECT COUNT(*) FROM acordaos").fetchone()[0]
+        self._bloom = BloomFilter(max(capacidade_bloom, total * 2))
+        for (acordao_id,) in self._conn.execute("SELECT id FROM acordaos"):
+            self._bloom.add(acordao_id)
+            
+        self._pendentes = 0
+        
+    def _meta(self, chave: str) -> Optional[str]:
+        row = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return row[0] if row else None
+        
+    def _set_meta(self, chave: str, valor: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+        
+    def get(self, acordao_id: str) -> Optional[tuple]:
+        """Retorna (hash, saida, execucao) de um id, ou None se nunca foi visto."""
+        if acordao_id not in self._bloom:
+            return None
+        return self._conn.execute(
+            "SELECT hash, saida, execucao FROM acordaos WHERE id = ?", (acordao_id,)
+        ).fetchone()
+        
+    def put(self, acordao_id: str, hash_: str, saida: str) -> None:
+        """Registra a versão de um id processada nesta execução."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO acordaos (id, hash, saida, execucao) VALUES (?, ?, ?, ?)",
+            (acordao_id, hash_, saida, self.execucao)
+        )
+        self._bloom.add(acordao_id)
+        
+        self._pendentes += 1
+        if self._pendentes >= 10_000:
+            self.commit()
+            
+    def commit(self) -> None:
+        self._conn.commit()
+        self._pendentes = 0
+        
+    def fechar(self) -> None:
+        self.commit()
+        self._conn.close()
+
+# Decisões do deduplicador para cada acórdão
+PROCESSAR = 'processar'  # novo ou alterado: roda os parsers
+MANTER = 'manter'        # idêntico e já gravado neste arquivo: reaproveita a saída anterior
+IGNORAR = 'ignorar'      # duplicado: já está (ou ficará) em outro arquivo de saída
+
+class Deduplicador:
+    """
+    Deduplica acórdãos por id entre dumps mensais e entre execuções.
+    
+    Os arquivos devem ser processados do mais novo para o mais antigo: a
+    primeira ocorrência de um id numa execução é a que fica na saída.
+    Acórdãos idênticos aos de uma execução anterior não são reprocessados, e
+    versões antigas de acórdãos alterados são removidas dos arquivos antigos.
+    
+    Um id classificado para processar fica só reservado na memória até a
+    saída ser gravada (`confirmar`). Se o acórdão falhar ou a gravação não
+    acontecer (`liberar`), a reserva é desfeita e a próxima ocorrência do id
+    (num dump mais antigo) é processada no lugar.
+    """
+    
+    NOME_ARQUIVO = 'dedup.sqlite'
+    
+    def __init__(self, path: str, assinatura: str = ''):
+        self.store = DedupStore(path, assinatura=assinatura)
+        self.novos = 0
+        self.atualizados = 0
+        self.identicos = 0
+        self.repetidos = 0
+        self.mantidos = 0
+        self.substituidos: Dict[str, Set[str]] = defaultdict(set)  # saída antiga -> ids
+        # id -> (hash, saída, contador da decisão, saída anterior a substituir)
+        self._reservados: Dict[str, Tuple[str, str, str, Optional[str]]] = {}
+        
+    def classificar(self, acordao: Any, saida: str) -> str:
+        """Decide o que fazer com um acórdão bruto que vai para `saida`."""
+        if not isinstance(acordao, dict) or not acordao.get('id'):
+            return PROCESSAR
+            
+        acordao_id = acordao['id']
+        if acordao_id in self._reservados:
+            # Já apareceu num dump mais novo nesta execução (ainda aguardando gravação)
+            self.repetidos += 1
+            return IGNORAR
+            
+        hash_ = hash_conteudo(acordao)
+        anterior = self.store.get(acordao_id)
+        
+        if anterior is None:
+            return self._reservar(acordao_id, hash_, saida, 'novos', PROCESSAR)
+            
+        hash_anterior, saida_anterior, execucao = anterior
+        
+        if execucao == self.store.execucao:
+            # Já apareceu num dump mais novo nesta execução
+            self.repetidos += 1
+            return IGNORAR
+            
+        if hash_anterior == hash_:
+            if saida_anterior == saida:
+                return self._reservar(acordao_id, hash_, saida, 'mantidos', MANTER)
+            self.identicos += 1
+            return IGNORAR
+            
+        return self._reservar(acordao_id, hash_, saida, 'atualizados', PROCESSAR,
+                              saida_anterior if saida_anterior != saida else None)
+                              
+    def _reservar(self, acordao_id: str, hash_: str, saida: str, contador: str, decisao: str,
+                  substituida: Optional[str] = None) -> str:
+        self._reservados[acordao_id] = (hash_, saida, contador, substituida)
+        setattr(self, contador, getattr(self, contador) + 1)
+        return decisao
+        
+    def confirmar(self, ids: Iterable[str]) -> None:
+        """Registra no histórico os ids reservados cuja saída já foi gravada."""
+        for acordao_id in ids:
+            reserva = self._reservados.pop(acordao_id, None)
+            if reserva is None:
+                continue
+            hash_, saida, _, substituida = reserva
+            if substituida is not None:
+                self.substituidos[substituida].add(acordao_id)
+            self.store.put(acordao_id, hash_, saida)
+            
+    def recuperar(self, acordao: Dict, saida: str) -> bool:
+        """
+        Decide se um acórdão recuperado da quarentena volta para `saida` (e o reserva).
+        
+        A falha na execução original liberou o id, então uma versão de um dump
+        mais antigo pode ter ido para a saída no lugar dele: ela passa a ser
+        substituída. Se um dump mais novo já tem o id, o recuperado é descartado.
+        """
+        acordao_id = acordao.get('id') if isinstance(acordao, dict) else None
+        if not acordao_id:
+            return True
+        if acordao_id in self._reservados:
+            self.repetidos += 1
+            return False
+            
+        anterior = self.store.get(acordao_id)
+        substituida = None
+        if anterior is not None and anterior[1] != saida:
+            if os.path.basename(anterior[1]) > os.path.basename(saida):
+                self.repetidos += 1
+                return False
+            substituida = anterior[1]
+        self._reservar(acordao_id, hash_conteudo(acordao), saida, 'novos' if anterior is None else 'atualizados',
+                       PROCESSAR, substituida)
+        return True
+        
+    def liberar(self, ids: Iterable[str]) -> None:
+        """Desfaz a reserva de ids que não chegaram à saída (falha no parse ou na gravação)."""
+        for acordao_id in ids:
+            reserva = self._reservados.pop(acordao_id, None)
+            if reserva is not None:
+                setattr(self, reserva[2], getattr(self, reserva[2]) - 1)
+                
+                
+    @property
+    def duplicados(self) -> int:
+        return self.identicos + self.repetidos
+        
+    def fechar(self) -> None:
+        self.store.fechar()
+        
+    def relatorio(self) -> str:
+        """Resumo da deduplicação para o relatório de processamento."""
+        return (f"Deduplicação: {self.novos} novos, {self.atualizados} atualizados, "
+                f"{self.mantidos} inalterados, {self.duplicados} duplicados ignorados "
+                f"({self.identicos} idênticos a execuções anteriores, {self.repetidos} repetidos entre dumps)")
+
+def caminho_padrao(output_base_path: str) -> str:
+    """Caminho padrão do banco de deduplicação dentro da saída."""
+    return os.path.join(output_base_path, Deduplicador.NOME_ARQUIVO)
@@ -0,0 +1,182 @@
+import gzip
+import lzma
+import os
+import threading
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, ContextManager, Dict, Iterator, List, Optional
+
+# Extensões compactadas aceitas para arquivos JSON individuais, com o leitor
+# que descompacta o arquivo aberto aos poucos, à medida que é lido
+_DESCOMPRESSORES = {
+    '.json.gz': gzip.open,
+    '.json.xz': lzma.open,
+}
+
+# ZipFile não é seguro entre threads; cada thread mantém seus próprios handles,
+# um por .zip, reabertos quando o arquivo muda (modo de monitoramento)
+_zips_abertos = threading.local()
+
+def _nome_json(nome: str) -> Optional[str]:
+    """Retorna o nome do arquivo JSON descompactado, ou None se não for JSON."""
+    if nome.endswith('.json'):
+        return nome
+    for extensao in _DESCOMPRESSORES:
+        if nome.endswith(extensao):
+            return nome[:-len(extensao) + len('.json')]
+    return None
+
+@contextmanager
+def _descompactar(nome: str, arquivo: BinaryIO) -> Iterator[BinaryIO]:
+    """Lê o arquivo aberto descompactando-o conforme a extensão, e o fecha ao final."""
+    with arquivo:
+        for extensao, descompressor in _DESCOMPRESSORES.items():
+            if nome.endswith(extensao):
+                with descompressor(arquivo, 'rb') as leitor:
+                    yield leitor
+                return
+        yield arquivo
+
+def _abrir_zip(zip_path: str) -> zipfile.ZipFile:
+    """
+    Retorna o ZipFile aberto pela thread atual para o caminho informado.
+    
+    O handle é reaproveitado enquanto o tamanho e o mtime do arquivo não
+    mudarem; um .zip substituído é reaberto e o handle antigo, fechado (membros
+    ainda abertos por ele continuam legíveis até serem fechados).
+    """
+    cache = getattr(_zips_abertos, 'cache', None)
+    if cache is None:
+        cache = _zips_abertos.cache = {}
+    info = os.stat(zip_path)
+    assinatura = (info.st_size, info.st_mtime_ns)
+    aberto = cache.get(zip_path)
+    if aberto is not None:
+        if aberto[0] == assinatura:
+            return aberto[1]
+        aberto[1].close()
+    z = zipfile.ZipFile(zip_path)
+    cache[zip_path] = (assinatura, z)
+    return z
+
+class FonteJson:
+    """
+    Arquivo JSON de entrada, em disco ou dentro de um arquivo compactado.
+    
+    Attributes:
+        caminho_relativo: Caminho do JSON como se estivesse extraído na base
+            (ex.: 'EspelhoTerceiraTurma/20230131.json'), usado para a saída
+        origem: Caminho real do arquivo, para mensagens de erro
+        compactada: Se o JSON é lido de um .json.gz, .json.xz ou .zip
+    """
+    
+    def __init__(self, caminho_relativo: str, origem: str, abrir: Callable[[], ContextManager[BinaryIO]],
+                 compactada: bool = False):
+        self.caminho_relativo = caminho_relativo
+        self.origem = origem
+        self.compactada = compactada
+        self._abrir = abrir
+        
+    def abrir(self) -> ContextManager[BinaryIO]:
+        """
+        Abre o conteúdo descompactado para leitura aos poucos, sem carregá-lo inteiro.
+        
+        Uso: `with fonte.abrir() as f: ...`
+        """
+        return self._abrir()
+        
+    def ler_bytes(self) -> bytes:
+        """Lê o conteúdo descompactado do arquivo."""
+        with self._abrir() as f:
+            return f.read()
+            
+    def ler_texto(self) -> str:
+        """Lê o conteúdo descompactado do arquivo como texto UTF-8."""
+        return self.ler_bytes().decode('utf-8')
+        
+    def __repr__(self) -> str:
+        return f"FonteJson({self.origem!r})"
+
+def _fonte_arquivo(base_path: str, root: str, filename: str) -> FonteJson:
+    """Cria a fonte de um arquivo .json, .json.gz ou .json.xz em disco."""
+    caminho = os.path.join(root, filename)
+    nome_json = _nome_json(filename)
+    relativo = os.path.relpath(os.path.join(root, nome_json), base_path)
+    
+    def abrir() -> ContextManager[BinaryIO]:
+        return _descompactar(filename, open(caminho, 'rb'))
+        
+    return FonteJson(relativo, caminho, abrir, compactada=nome_json != filename)
+
+def _fontes_zip(base_path: str, root: str, filename: str) -> Iterator[FonteJson]:
+    """Lista os JSONs de pastas 'Espelho*' dentro de um arquivo .zip."""
+    zip_path = os.path.join(root, filename)
+    pasta_zip = os.path.splitext(filename)[0]
+    
+    try:
+        with zipfile.ZipFile(zip_path) as z:
+            membros = [info.filename for info in z.infolist() if not info.is_dir()]
+    except zipfile.BadZipFile as e:
+        print(f"Erro ao abrir {zip_path}: {str(e)}")
+        return
+        
+    for membro in membros:
+        nome_json = _nome_json(membro)
+        if not nome_json:
+            continue
+            
+        partes: List[str] = nome_json.split('/')
+        if len(partes) > 1:
+            if not partes[-2].startswith("Espelho"):
+                continue
+        elif pasta_zip.startswith("Espelho"):
+            # JSONs na raiz de um Espelho*.zip ficam numa pasta com o nome do zip
+            partes = [pasta_zip] + partes
+        else:
+            continue
+            
+        relativo = os.path.relpath(os.path.join(root, *partes), base_path)
+        
+        def abrir(membro: str = membro) -> ContextManager[BinaryIO]:
+            return _descompactar(membro, _abrir_zip(zip_path).open(membro))
+            
+        yield FonteJson(relativo, f"{zip_path}:{membro}", abrir, compactada=True)
+
+def listar_arquivos(base_path: str) -> Iterator[str]:
+    """Caminhos dos arquivos lidos por listar_fontes: os .zip e os JSONs das pastas 'Espelho*'."""
+    for root, _, files in os.walk(base_path):
+        em_espelho = os.path.basename(root).startswith("Espelho")
+        
+        for filename in sorted(files):
+            if filename.endswith('.zip') or (em_espelho and _nome_json(filename)):
+                yield os.path.join(root, filename)
+                
+def fontes_do_arquivo(base_path: str, caminho: str) -> Iterator[FonteJson]:
+    """Fontes de um único arquivo de listar_arquivos (um .zip pode conter várias)."""
+    root, filename = os.path.split(caminho)
+    if filename.endswith('.zip'):
+        yield from _fontes_zip(base_path, root, filename)
+    else:
+        yield _fonte_arquivo(base_path, root, filename)
+        
+def listar_fontes(base_path: str) -> Iterator[FonteJson]:
+    """
+    Lista os arquivos JSON de entrada das pastas que começam com 'Espelho'.
+    
+    Além dos .json extraídos, lê diretamente arquivos .json.gz e .json.xz e o
+    conteúdo de arquivos .zip, sem extração prévia. O caminho relativo de cada
+    fonte é o mesmo que o arquivo teria se tivesse sido extraído no lugar.
+    
+    Cada caminho relativo aparece uma única vez. Se houver mais de uma fonte
+    para ele (ex.: 'a.json' ao lado de 'a.json.gz'), vale o .json extraído;
+    entre fontes compactadas, a primeira na ordem de listar_arquivos.
+    """
+    fontes = [fonte for caminho in listar_arquivos(base_path) for fonte in fontes_do_arquivo(base_path, caminho)]
+    escolhidas: Dict[str, FonteJson] = {}
+    for fonte in fontes:
+        atual = escolhidas.get(fonte.caminho_relativo)
+        if atual is None or (atual.compactada and not fonte.compactada):
+            escolhidas[fonte.caminho_relativo] = fonte
+    for fonte in fontes:
+        if escolhidas[fonte.caminho_relativo] is fonte:
+            yield fonte
@@ -1,5 +1,230 @@
 import json
-from typing import Any, Optional
+import math
+import os
+import re
+from typing import Any, Callable, Dict, Optional, Union
+
+from .registros import serializar_registro
+
+# Backends opcionais de JSON, em ordem de preferência. Cada um só é usado se
+# estiver instalado e, para gravação, se produzir exatamente a mesma saída do
+# módulo json da biblioteca padrão (ensure_ascii=False).
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# Força um backend específico (json, orjson, ujson ou simdjson)
+JSON_BACKEND_ENV = 'OPEN_STJ_JSON_BACKEND'
+
+_SEPARADORES_COMPACTOS = (',', ':')
+
+# Documento de verificação: o backend de gravação precisa reproduzir o stdlib
+_DOCUMENTO_SONDA = [
+    {
+        "id": "123456789",
+        "texto": "AÇÃO \"RESCISÓRIA\" / art. 485\\ \t\n\r\b\f \u001f \u007f \u2028 ✓",
+        "vazios": {"lista": [], "dict": {}},
+        "valores": [0, -1, 2 ** 62, True, False, None],
+        "floats": [0.5, -1.25, 100.0, -0.0, 0.1, 0.000123, 123456789.123, 1e15],
+        "aninhado": [{"a": ["b", {"c": []}]}],
+    },
+    {},
+    [],
+]
+
+# Floats que o repr do Python escreve em notação científica (1e+16, 1e-05) e
+# não finitos (NaN, Infinity): backends que os escrevem de outro jeito (1e16,
+# 0.00001, null) podem recusá-los com SaidaDivergente, e o documento é
+# gravado pelo stdlib
+_DOCUMENTO_SONDA_DIVERGENTES = [1e16, -1.5e+300, 1.7976931348623157e308, 1e-05, 3e-07, 1.5e-10, 1e-100, 5e-324,
+                                math.nan, math.inf, -math.inf]
+
+class SaidaDivergente(ValueError):
+    """O backend não garante a mesma saída do stdlib para este documento."""
+
+# Em orjson e ujson, só números com expoente ou muitos zeros após a vírgula
+# divergem do stdlib. A busca começa pelo literal 'e' (rápida) e só confere se
+# há um dígito antes quando o encontra, porque textos têm 'e-' e 'e1' à vontade.
+_RE_EXPOENTE = {bytes: re.compile(rb'e[-+0-9]'), str: re.compile(r'e[-+0-9]')}
+_RE_NUMERO_EXPOENTE = {bytes: re.compile(rb'[0-9]e[-+0-9]'), str: re.compile(r'[0-9]e[-+0-9]')}
+_ZEROS = {bytes: b'0.0000', str: '0.0000'}
+
+def _conferir_floats(saida: Union[str, bytes]) -> Union[str, bytes]:
+    """Levanta SaidaDivergente se a saída tiver floats que o backend pode ter escrito diferente do stdlib."""
+    tipo = type(saida)
+    if _ZEROS[tipo] in saida or (_RE_EXPOENTE[tipo].search(saida) and _RE_NUMERO_EXPOENTE[tipo].search(saida)):
+        raise SaidaDivergente("floats em notação científica")
+    return saida
+
+def _tem_nao_finito(obj: Any) -> bool:
+    """Indica se há floats NaN ou infinitos em dicts e listas aninhados."""
+    pilha = [obj]
+    while pilha:
+        valor = pilha.pop()
+        tipo = type(valor)
+        if tipo is dict:
+            pilha.extend(valor.values())
+        elif tipo is list:
+            pilha.extend(valor)
+        elif tipo is float and not math.isfinite(valor):
+            return True
+    return False
+
+def _stdlib_loads(content: Union[str, bytes]) -> Any:
+    return json.loads(content)
+
+def _stdlib_dumps(obj: Any, indent: Optional[int], sort_keys: bool,
+                  default: Optional[Callable]) -> str:
+    separators = None if indent is not None else _SEPARADORES_COMPACTOS
+    return json.dumps(obj, ensure_ascii=False, indent=indent, sort_keys=sort_keys,
+                      separators=separators, default=default)
+
+def _orjson_dumps(obj: Any, indent: Optional[int], sort_keys: bool,
+                  default: Optional[Callable]) -> str:
+    return _orjson_dumps_bytes(obj, indent, sort_keys, default).decode('utf-8')
+
+def _orjson_dumps_bytes(obj: Any, indent: Optional[int], sort_keys: bool,
+                        default: Optional[Callable]) -> bytes:
+    if indent not in (None, 2):
+        raise TypeError("orjson só suporta indentação de 2 espaços")
+    option = 0
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    saida = _conferir_floats(orjson.dumps(obj, default=default, option=option))
+    # orjson grava NaN e infinitos como null (o stdlib, como NaN e Infinity)
+    if b'null' in saida and _tem_nao_finito(obj):
+        raise SaidaDivergente("floats não finitos")
+    return saida
+
+def _ujson_dumps(obj: Any, indent: Optional[int], sort_keys: bool,
+                 default: Optional[Callable]) -> str:
+    kwargs = {'ensure_ascii': False, 'escape_forward_slashes': False,
+              'indent': indent or 0, 'sort_keys': sort_keys}
+    if default is not None:
+        kwargs['default'] = default
+    return _conferir_floats(ujson.dumps(obj, **kwargs))
+
+def _backends_disponiveis() -> Dict[str, Dict[str, Optional[Callable]]]:
+    """Backends instalados, em ordem de preferência."""
+    backends = {}
+    if orjson is not None:
+        backends['orjson'] = {'loads': orjson.loads, 'dumps': _orjson_dumps}
+    if simdjson is not None:
+        backends['simdjson'] = {'loads': simdjson.loads, 'dumps': None}
+    if ujson is not None:
+        backends['ujson'] = {'loads': ujson.loads, 'dumps': _ujson_dumps}
+    backends['json'] = {'loads': _stdlib_loads, 'dumps': _stdlib_dumps}
+    return backends
+
+def _dumps_compativel(dumps: Callable) -> bool:
+    """
+    Verifica se um backend grava exatamente o mesmo texto que o stdlib.
+    
+    Floats em notação científica e não finitos podem ser recusados com SaidaDivergente
+    (dumps e dump_file gravam esses documentos com o stdlib), mas nunca
+    escritos de outro jeito.
+    """
+    try:
+        for indent in (None, 2):
+            for sort_keys in (False, True):
+                esperado = _stdlib_dumps(_DOCUMENTO_SONDA, indent, sort_keys, None)
+                if dumps(_DOCUMENTO_SONDA, indent, sort_keys, None) != esperado:
+                    return False
+        for valor in _DOCUMENTO_SONDA_DIVERGENTES:
+            try:
+                if dumps([valor], None, False, None) != _stdlib_dumps([valor], None, False, None):
+                    return False
+            except SaidaDivergente:
+                pass
+        return True
+    except Exception:
+        return False
+
+def _selecionar_backends():
+    """Escolhe os backends de leitura e gravação."""
+    backends = _backends_disponiveis()
+    preferido = os.environ.get(JSON_BACKEND_ENV, '').strip().lower()
+    if preferido:
+        if preferido not in backends:
+            print(f"Backend JSON '{preferido}' indisponível, usando a seleção automática")
+        else:
+            backends = {preferido: backends[preferido], 'json': backends['json']}
+            
+    nome_loads = next(iter(backends))
+    nome_dumps = next(nome for nome, b in backends.items()
+                      if b['dumps'] is not None and (nome == 'json' or _dumps_compativel(b['dumps'])))
+    return nome_loads, backends[nome_loads]['loads'], nome_dumps, backends[nome_dumps]['dumps']
+
+_NOME_LOADS, _LOADS, _NOME_DUMPS, _DUMPS = _selecionar_backends()
+
+def json_backend() -> Dict[str, str]:
+    """Retorna os backends JSON em uso para leitura e gravação."""
+    return {'loads': _NOME_LOADS, 'dumps': _NOME_DUMPS}
+
+def loads(content: Union[str, bytes]) -> Any:
+    """
+    Decodifica JSON com o backend mais rápido disponível.
+    
+    Se o backend rejeitar o conteúdo (ex.: inteiros acima de 64 bits), repete
+    com o stdlib, que também define a exceção levantada em caso de erro.
+    """
+    try:
+        return _LOADS(content)
+    except Exception:
+        if _LOADS is _stdlib_loads:
+            raise
+        return json.loads(content)
+
+def dumps(obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+          default: Optional[Callable] = None) -> str:
+    """
+    Codifica JSON com a mesma saída de json.dumps(ensure_ascii=False, indent=indent, sort_keys=sort_keys).
+    
+    A única diferença: sem indentação, os separadores são compactos
+    (separators=(',', ':')), sem os espaços de ', ' e ': '. Registros
+    compactos (parsers.registros) são serializados como os dicts que
+    representam.
+    """
+    default = default or serializar_registro
+    try:
+        return _DUMPS(obj, indent, sort_keys, default)
+    except Exception:
+        if _DUMPS is _stdlib_dumps:
+            raise
+        return _stdlib_dumps(obj, indent, sort_keys, default)
+
+def load_file(path: str) -> Any:
+    """Lê e decodifica um arquivo JSON."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def dump_file(obj: Any, path: str, indent: Optional[int] = 2,
+              default: Optional[Callable] = None) -> None:
+    """Grava um objeto como JSON UTF-8 (equivalente a json.dump com ensure_ascii=False)."""
+    default = default or serializar_registro
+    if _DUMPS is _orjson_dumps:
+        try:
+            data = _orjson_dumps_bytes(obj, indent, False, default)
+        except Exception:
+            data = _stdlib_dumps(obj, indent, False, default).encode('utf-8')
+    else:
+        data = dumps(obj, indent=indent, default=default).encode('utf-8')
+        
+    with open(path, 'wb') as f:
+        f.write(data)
 
 def process_json_content(content: str) -> Optional[Any]:
     """
@@ -7,7 +232,7 @@ def process_json_content(content: str) -> Optional[Any]:
     
     Args:
         content: String contendo JSON
-        
+    
     Returns:
         Conteúdo JSON parseado ou None em caso de erro
     """
@@ -26,8 +251,8 @@ def process_json_content(content: str) -> Optional[Any]:
             content = content + ']'
             
         try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
+            return loads(content)
+        except ValueError as e:
             print(f"\nTentando recuperar JSON válido...")
             
             # Tenta encontrar objetos JSON válidos
@@ -59,12 +284,12 @@ def process_json_content(content: str) -> Optional[Any]:
                         bracket_count -= 1
                         if bracket_count == 0:
                             try:
-                                obj = json.loads(current_object)
+                                obj = loads(current_object)
                                 valid_objects.append(obj)
                             except:
                                 pass
                             current_object = ""
-            
+                            
             if valid_objects:
                 print(f"Recuperados {len(valid_objects)} objetos válidos")
                 return valid_objects
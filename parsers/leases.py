@@ -0,0 +1,234 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+
+from .json_utils import dump_file, load_file
+
+def _chave_arquivo(chave: str) -> str:
+    """Nome de arquivo estável para uma chave (ex.: o caminho relativo de uma fonte)."""
+    return hashlib.blake2b(chave.encode('utf-8'), digest_size=16).hexdigest()
+
+def gravar_atomico(obj: Any, path: str, indent: Optional[int] = 2) -> None:
+    """Grava JSON num arquivo temporário e o move para `path`: leitores nunca veem o arquivo pela metade."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    dump_file(obj, tmp_path, indent=indent)
+    os.replace(tmp_path, path)
+
+class GerenciadorLeases:
+    """
+    Leases de trabalho em arquivos num diretório compartilhado, sem coordenador.
+    
+    Um worker reivindica uma chave criando leases/<hash>.lease com os.link, que
+    falha se o arquivo já existir (atômico também em NFS). O lease expira em
+    `duracao` segundos e é renovado por uma thread de heartbeat a cada terço
+    disso; leases expirados (worker morto ou travado) podem ser tomados por
+    outro worker. Ao concluir, o worker grava feitos/<hash>.json e remove o
+    lease.
+    
+    Se dois workers chegarem a processar a mesma chave (um lease tomado de um
+    worker lento, por exemplo), o trabalho deve ser idempotente: quem perde o
+    lease não grava o marcador de conclusão, e a saída gravada é a mesma.
+    """
+    
+    def __init__(self, diretorio: str, worker: str, duracao: float = 60.0, tolerancia: float = 5.0):
+        self.diretorio = diretorio
+        self.worker = worker
+        self.duracao = duracao
+        # Margem para diferenças de relógio entre máquinas
+        self.tolerancia = tolerancia
+        self._dir_leases = os.path.join(diretorio, 'leases')
+        self._dir_feitos = os.path.join(diretorio, 'feitos')
+        os.makedirs(self._dir_leases, exist_ok=True)
+        os.makedirs(self._dir_feitos, exist_ok=True)
+        
+        self._mantidos: Set[str] = set()
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.tomados = 0
+        
+    def _lease_path(self, chave: str) -> str:
+        return os.path.join(self._dir_leases, _chave_arquivo(chave) + '.lease')
+        
+    def _feito_path(self, chave: str) -> str:
+        return os.path.join(self._dir_feitos, _chave_arquivo(chave) + '.json')
+        
+    def _conteudo(self, chave: str) -> Dict:
+        return {'chave': chave, 'worker': self.worker, 'expira': time.time() + self.duracao}
+        
+    @staticmethod
+    def _ler(path: str) -> Optional[Dict]:
+        try:
+            return load_file(path)
+        except (OSError, ValueError):
+            return None
+            
+    def concluido(self, chave: str) -> bool:
+        return os.path.exists(self._feito_path(chave))
+        
+    def adquirir(self, chave: str) -> bool:
+        """Tenta reivindicar a chave; False se outro worker tem um lease válido ou ela já foi concluída."""
+        if self.concluido(chave):
+            return False
+        lease_path = self._lease_path(chave)
+        if self._criar(chave, lease_path):
+            return True
+            
+        atual = self._ler(lease_path)
+        if atual is None and not os.path.exists(lease_path):
+            # Fora do lugar por um instante (renovação ou liberação): fica para a próxima tentativa
+            return False
+        if atual is not None and atual.get('expira', 0) + self.tolerancia >= time.time():
+            return False
+        # Expirado (ou ilegível): só um worker consegue renomeá-lo
+        expirado = f"{lease_path}.{_chave_arquivo(self.worker)}.expirado"
+        try:
+            os.rename(lease_path, expirado)
+        except OSError:
+            return False
+        renomeado = self._ler(expirado)
+        if renomeado is not None and renomeado.get('expira', 0) + self.tolerancia >= time.time():
+            # Outro worker renovou ou tomou o lease entre a leitura e o rename: devolve
+            try:
+                os.link(expirado, lease_path)
+            except OSError:
+                pass
+            os.remove(expirado)
+            return False
+        os.remove(expirado)
+        if self._criar(chave, lease_path):
+            self.tomados += 1
+            return True
+        return False
+        
+    def _criar_arquivo(self, obj: Any, path: str, indent: Optional[int] = None) -> bool:
+        """Cria o arquivo JSON com os.link, que falha se outro worker já o criou."""
+        tmp_path = f"{path}.{_chave_arquivo(self.worker)}.tmp"
+        dump_file(obj, tmp_path, indent=indent)
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+        return True
+        
+    def _gravar(self, chave: str, lease_path: str) -> bool:
+        return self._criar_arquivo(self._conteudo(chave), lease_path)
+        
+    def _criar(self, chave: str, lease_path: str) -> bool:
+        if not self._gravar(chave, lease_path):
+            return False
+        if self.concluido(chave):
+            # Concluída por outro worker entre a verificação em adquirir e a criação do lease
+            os.remove(lease_path)
+            return False
+        with self._trava:
+            self._mantidos.add(chave)
+        return True
+        
+    def _retirar(self, lease_path: str) -> bool:
+        """
+        Tira o lease do lugar se ele for deste worker.
+        
+        O rename é atômico: entre ler e agir, outro worker poderia ter tomado
+        o lease expirado, e sobrescrevê-lo ou removê-lo entregaria a chave a
+        dois workers. Com o lease fora do lugar, ninguém mais o renova nem o
+        toma; se ele não era deste worker, volta para o lugar.
+        """
+        retirado = f"{lease_path}.{_chave_arquivo(self.worker)}.retirado"
+        try:
+            os.rename(lease_path, retirado)
+        except OSError:
+            return False
+        atual = self._ler(retirado)
+        if atual is None or atual.get('worker') != self.worker:
+            try:
+                os.link(retirado, lease_path)
+            except OSError:
+                pass
+            os.remove(retirado)
+            return False
+        os.remove(retirado)
+        return True
+        
+    def renovar(self, chave: str) -> bool:
+        """
+        Prorroga o lease; False se ele não é mais mantido ou foi perdido para outro worker.
+        
+        Um lease válido é regravado com os.replace, então o caminho nunca fica
+        livre para um os.link de outro worker. Se um worker tentar tomá-lo ao
+        mesmo tempo (por diferença de relógio maior que `tolerancia`), o
+        rename seguido de leitura em adquirir encontra o lease renovado e o
+        devolve.
+        """
+        lease_path = self._lease_path(chave)
+        # Sob a trava, para o heartbeat não recriar um lease que acabou de ser liberado
+        with self._trava:
+            if chave not in self._mantidos:
+                return False
+            atual = self._ler(lease_path)
+            if atual is None or atual.get('worker') != self.worker:
+                self._mantidos.discard(chave)
+                return False
+            if atual.get('expira', 0) > time.time():
+                # Ainda válido, ninguém pode tomá-lo: substituído no lugar, sem deixar o caminho livre
+                gravar_atomico(self._conteudo(chave), lease_path, indent=None)
+                return True
+            # Expirado: outro worker pode estar tomando o lease, então ele é
+            # retirado e recriado com os.link, que falha se o outro chegar antes
+            if not self._retirar(lease_path) or not self._gravar(chave, lease_path):
+                self._mantidos.discard(chave)
+                return False
+            return True
+            
+    def liberar(self, chave: str) -> None:
+        """Remove o lease, se ainda for deste worker."""
+        lease_path = self._lease_path(chave)
+        with self._trava:
+            self._mantidos.discard(chave)
+            self._retirar(lease_path)
+            
+    def concluir(self, chave: str, resultado: Dict) -> bool:
+        """
+        Grava o marcador de conclusão e libera o lease.
+        
+        Se o lease foi perdido, o marcador não é gravado (fica a cargo de quem o
+        tomou) e o retorno é False. O marcador é criado com os.link: se outro
+        worker tomou o lease e concluiu a chave entre a renovação e a
+        gravação, vale só o primeiro marcador, e o retorno também é False.
+        """
+        if not self.renovar(chave):
+            return False
+        concluida = self._criar_arquivo({'chave': chave, 'worker': self.worker, 'concluido_em': time.time(),
+                                         **resultado}, self._feito_path(chave), indent=2)
+        self.liberar(chave)
+        return concluida
+        
+    def resultado(self, chave: str) -> Optional[Dict]:
+        """Marcador de conclusão de uma chave, se houver."""
+        return self._ler(self._feito_path(chave))
+        
+    def iniciar_heartbeat(self) -> None:
+        """Renova os leases mantidos a cada terço da duração, numa thread."""
+        def _renovar():
+            while not self._parar.wait(self.duracao / 3):
+                with self._trava:
+                    mantidos = list(self._mantidos)
+                for chave in mantidos:
+                    try:
+                        self.renovar(chave)
+                    except OSError as e:
+                        print(f"Erro ao renovar lease de {chave}: {str(e)}")
+                        
+        self._parar.clear()
+        self._heartbeat = threading.Thread(target=_renovar, name='stj-heartbeat', daemon=True)
+        self._heartbeat.start()
+        
+    def parar_heartbeat(self) -> None:
+        self._parar.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
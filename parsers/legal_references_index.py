@@ -1,13 +1,33 @@
 from typing import Dict, List, Set, Optional
 from collections import defaultdict
-import json
+import argparse
+import heapq
 import os
 from pathlib import Path
 
+from .dedup import BloomFilter
+from .json_utils import dump_file, load_file
+from .sketches import CAPACIDADE_IDS, CAPACIDADE_PADRAO, ContadorTopK, formatar_top
+
 class LegalReferencesIndex:
-    """Índice para análise de referências legislativas."""
+    """
+    Índice para análise de referências legislativas.
+    
+    Com `somente_contagem`, o índice não guarda os ids dos acórdãos: só conta
+    leis, artigos e anos em sketches de memória limitada (parsers.sketches),
+    numa única passada, para gerar o relatório. Os tops são exatos enquanto
+    as chaves distintas couberem em `capacidade`; acima disso, aproximados.
     
-    def __init__(self):
+    Como nos conjuntos, um acórdão repetido (o mesmo id em outro arquivo) não
+    conta de novo: os ids já contados ficam num filtro de Bloom para
+    `capacidade_ids` acórdãos. Difere do modo completo só em dois casos: as
+    referências de um id repetido que não estavam na primeira ocorrência não
+    são contadas, e um falso positivo do filtro (cerca de 1% acima da
+    capacidade, bem menos abaixo dela) deixa um acórdão novo de fora.
+    """
+    
+    def __init__(self, somente_contagem: bool = False, capacidade: int = CAPACIDADE_PADRAO,
+                 capacidade_ids: int = CAPACIDADE_IDS):
         # Estruturas para indexação
         self.by_law: Dict[str, Set[str]] = defaultdict(set)  # lei -> set de IDs de acórdãos
         self.by_article: Dict[str, Set[str]] = defaultdict(set)  # lei+artigo -> set de IDs
@@ -20,6 +40,17 @@ class LegalReferencesIndex:
         self.unique_laws = set()
         self.unique_articles = set()
         
+        # Modo somente contagem
+        self.somente_contagem = somente_contagem
+        self.contadores: Dict[str, ContadorTopK] = (
+            {estrutura: ContadorTopK(capacidade) for estrutura in ('by_law', 'by_article', 'by_year')}
+            if somente_contagem else {}
+        )
+        self._contados = BloomFilter(capacidade_ids) if somente_contagem else None
+        self._acordao_atual = None
+        self._repetido = False
+        self._chaves_acordao: Set = set()
+        
     def add_reference(self, ref: dict, acordao_id: str) -> None:
         """Adiciona uma referência legislativa ao índice."""
         if not ref.get('LEG') or not ref.get('ANO'):
@@ -27,6 +58,11 @@ class LegalReferencesIndex:
             
         # Identifica a lei
         law_id = f"{ref['LEG']}-{ref['ANO']}"
+        if self.somente_contagem:
+            self._contar(ref, law_id, acordao_id)
+            self.total_references += 1
+            return
+            
         self.by_law[law_id].add(acordao_id)
         self.unique_laws.add(law_id)
         
@@ -53,9 +89,28 @@ class LegalReferencesIndex:
                                 elif det_type in ('INC', 'ITEM', 'LET'):
                                     item_id = f"{art_id}:{det_type}{det_value}"
                                     self.by_item[item_id].add(acordao_id)
-        
+                                    
         self.total_references += 1
         
+    def _contar(self, ref: dict, law_id: str, acordao_id: str) -> None:
+        """Conta a referência nos sketches; cada chave conta uma vez por acórdão, como nos conjuntos."""
+        if acordao_id != self._acordao_atual:
+            self._acordao_atual = acordao_id
+            self._chaves_acordao = set()
+            # Já contado numa sequência anterior (outro arquivo): não conta de novo
+            self._repetido = str(acordao_id) in self._contados
+            self._contados.add(str(acordao_id))
+        if self._repetido:
+            return
+            
+        chaves = [('by_law', law_id), ('by_year', ref['ANO'])]
+        chaves.extend(('by_article', f"{law_id}:ART{value['numero']}") for key, value in ref.items()
+                      if key.startswith('ART') and isinstance(value, dict) and value.get('numero'))
+        for chave in chaves:
+            if chave not in self._chaves_acordao:
+                self._chaves_acordao.add(chave)
+                self.contadores[chave[0]].adicionar(chave[1])
+                
     def process_directory(self, base_path: str) -> None:
         """Processa todos os arquivos JSON do diretório."""
         print("\nConstruindo índice de referências legislativas...")
@@ -71,9 +126,8 @@ class LegalReferencesIndex:
                 for filename in json_files:
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            acordaos = json.load(f)
-                            
+                        acordaos = load_file(filepath)
+                        
                         if not isinstance(acordaos, list):
                             acordaos = [acordaos]
                             
@@ -96,33 +150,58 @@ class LegalReferencesIndex:
         
     def _generate_report(self) -> None:
         """Gera relatório com estatísticas do índice."""
+        if self.somente_contagem:
+            leis_unicas = self.contadores['by_law'].total_distintos()
+            artigos_unicos = self.contadores['by_article'].total_distintos()
+            top_leis, top_artigos, top_anos = (formatar_top(self.contadores[estrutura].top_k(10), 'citações')
+                                               for estrutura in ('by_law', 'by_article', 'by_year'))
+        else:
+            leis_unicas = len(self.unique_laws)
+            artigos_unicos = len(self.unique_articles)
+            top_leis = self._format_top_items(self.by_law, 10)
+            top_artigos = self._format_top_items(self.by_article, 10)
+            top_anos = self._format_top_items(self.by_year, 10)
+            
         report = f"""
 === Relatório do Índice de Referências Legislativas ===
 
 Estatísticas Gerais:
 - Total de referências: {self.total_references:,}
-- Leis únicas citadas: {len(self.unique_laws):,}
-- Artigos únicos citados: {len(self.unique_articles):,}
+- Leis únicas citadas: {leis_unicas:,}
+- Artigos únicos citados: {artigos_unicos:,}
 
 Top 10 Leis Mais Citadas:
-{self._format_top_items(self.by_law, 10)}
+{top_leis}
 
 Top 10 Artigos Mais Citados:
-{self._format_top_items(self.by_article, 10)}
+{top_artigos}
 
 Top 10 Anos com Mais Citações:
-{self._format_top_items(self.by_year, 10)}
+{top_anos}
 """
+        if self.somente_contagem:
+            report += self._descricao_contagem()
         print(report)
         
+    def _descricao_contagem(self) -> str:
+        exatos = all(contador.exato for contador in self.contadores.values())
+        precisao = 'contagens exatas' if exatos else 'contagens aproximadas, com erro máximo'
+        memoria = sum(contador.bytes for contador in self.contadores.values()) + self._contados.bytes
+        return f"(modo somente contagem: {precisao}, ~{memoria / 2 ** 20:,.1f} MiB em sketches)\n"
+                
     def _format_top_items(self, index: Dict[str, Set[str]], limit: int) -> str:
         """Formata os top items de um índice para o relatório."""
-        sorted_items = sorted(index.items(), key=lambda x: len(x[1]), reverse=True)[:limit]
+        sorted_items = heapq.nlargest(limit, index.items(), key=lambda x: len(x[1]))
         return '\n'.join(f"- {item}: {len(refs):,} citações" 
                         for item, refs in sorted_items)
-        
+                        
     def save_to_file(self, output_path: str) -> None:
-        """Salva o índice em arquivo JSON."""
+        """Salva o índice em arquivo JSON (no modo somente contagem, só as contagens)."""
+        if self.somente_contagem:
+            dump_file(self._resumo_contagem(), output_path)
+            print(f"\nContagens salvas em: {output_path}")
+            return
+            
         index_data = {
             'by_law': {k: list(v) for k, v in self.by_law.items()},
             'by_article': {k: list(v) for k, v in self.by_article.items()},
@@ -136,21 +215,56 @@ Top 10 Anos com Mais Citações:
             }
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
-            
+        dump_file(index_data, output_path)
+        
         print(f"\nÍndice salvo em: {output_path}")
+        
+    def _resumo_contagem(self, limite: int = 100) -> Dict:
+        return {
+            'modo': 'contagem',
+            'top': {estrutura: [[chave, contagem, erro] for chave, contagem, erro in contador.top_k(limite)]
+                    for estrutura, contador in self.contadores.items()},
+            'exato': all(contador.exato for contador in self.contadores.values()),
+            'stats': {
+                'total_references': self.total_references,
+                'unique_laws': self.contadores['by_law'].total_distintos(),
+                'unique_articles': self.contadores['by_article'].total_distintos()
+            }
+        }
+        
+    @classmethod
+    def load_from_file(cls, path: str) -> 'LegalReferencesIndex':
+        """Carrega um índice salvo com save_to_file."""
+        index_data = load_file(path)
+        if index_data.get('modo') == 'contagem':
+            raise ValueError(f"{path} tem só as contagens (modo somente contagem), não o índice")
+        index = cls()
+        for attr in ('by_law', 'by_article', 'by_paragraph', 'by_item', 'by_year'):
+            getattr(index, attr).update({k: set(v) for k, v in index_data.get(attr, {}).items()})
+            
+        index.total_references = index_data.get('stats', {}).get('total_references', 0)
+        index.unique_laws = set(index.by_law)
+        index.unique_articles = set(index.by_article)
+        return index
 
-def main():
-    input_path = r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados"
-    output_path = r"D:\Dropbox\Github\Dados Abertos STJ\indices\referencias_legislativas.json"
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Índice de referências legislativas dos acórdãos processados")
+    parser.add_argument('--entrada', default=r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados",
+                        help="Diretório dos acórdãos processados")
+    parser.add_argument('--saida', default=r"D:\Dropbox\Github\Dados Abertos STJ\indices\referencias_legislativas.json",
+                        help="Arquivo do índice")
+    parser.add_argument('--somente-contagem', action='store_true',
+                        help="Só as contagens, em memória limitada (sem os ids dos acórdãos)")
+    parser.add_argument('--capacidade', type=int, default=CAPACIDADE_PADRAO,
+                        help="Chaves exatas por sketch no modo somente contagem")
+    args = parser.parse_args(argv)
     
     # Garante que o diretório de saída existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
     
-    index = LegalReferencesIndex()
-    index.process_directory(input_path)
-    index.save_to_file(output_path)
+    index = LegalReferencesIndex(somente_contagem=args.somente_contagem, capacidade=args.capacidade)
+    index.process_directory(args.entrada)
+    index.save_to_file(args.saida)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,11 @@
 from typing import Dict, Set, Optional
 from collections import defaultdict
-import json
 import csv
 import os
 from pathlib import Path
 
+from .json_utils import dump_file, load_file
+
 class MinistrosIndex:
     """Índice para análise de ministros e suas variações de nome."""
     
@@ -92,8 +93,7 @@ class MinistrosIndex:
                 for filename in json_files:
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            acordaos = json.load(f)
+                        acordaos = load_file(filepath)
                             
                         if not isinstance(acordaos, list):
                             acordaos = [acordaos]
@@ -130,8 +130,7 @@ class MinistrosIndex:
             'by_status': {k: list(v) for k, v in self.by_status.items()}
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        dump_file(index_data, output_path)
             
         print(f"\nÍndice salvo em: {output_path}")
 
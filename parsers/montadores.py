@@ -0,0 +1,68 @@
+import os
+from typing import Dict, Optional
+
+from .acordao_index import AcordaoIndex
+from .clusters_similares import MontadorClusters
+from .cocitacao import MontadorCocitacao
+from .colunas import EscritorColunas, TabelaColunas
+from .cubo_relatores import MontadorCubo
+from .input_sources import listar_fontes
+from .json_utils import process_json_content
+from .precedentes import MontadorPrecedentes
+from .sigla_matcher import SiglaMatcher
+
+def montar_indices(parsed_base_path: str, indices: str, colunas: Optional[str] = None,
+                   indice_path: Optional[str] = None) -> Dict[str, object]:
+    """
+    Monta e grava os índices binários numa única leitura dos acórdãos processados.
+    
+    Cada acórdão lido das pastas 'Espelho*' de `parsed_base_path` vai para
+    todos os montadores (precedentes, cocitação, clusters de similares e cubo
+    de relatores e, com `colunas`, as colunas de metadados), em vez de uma
+    leitura por índice como em precedentes_do_diretorio, cocitacao_do_diretorio
+    etc. Os resultados são os mesmos e são gravados nos mesmos lugares:
+    `indices`/<nome> e `colunas`. Os similares são resolvidos pelo índice de
+    acórdãos salvo em `indice_path` ou, sem ele, por um construído na mesma
+    passada.
+    
+    Returns:
+        Índices montados, por nome ('colunas' só se pedidas)
+    """
+    precedentes = MontadorPrecedentes()
+    cocitacao = MontadorCocitacao()
+    clusters = MontadorClusters()
+    cubo = MontadorCubo()
+    escritor = EscritorColunas() if colunas else None
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if not acordaos:
+            continue
+        for posicao, acordao in enumerate(acordaos if isinstance(acordaos, list) else [acordaos]):
+            precedentes.adicionar(acordao)
+            cocitacao.adicionar(acordao)
+            clusters.adicionar(acordao)
+            cubo.adicionar(acordao)
+            if escritor is not None:
+                escritor.adicionar(acordao, fonte.caminho_relativo, posicao)
+            if not indice_path:
+                index.add_acordao(acordao)
+                
+    if indice_path:
+        index = AcordaoIndex.load_from_file(indice_path, SiglaMatcher.from_recursos())
+    resultados = {
+        'precedentes': precedentes.indice(),
+        'cocitacao': cocitacao.matriz(),
+        'clusters_similares': clusters.clusters(index),
+        'cubo_relatores': cubo.cubo(),
+    }
+    for nome, resultado in resultados.items():
+        resultado.salvar(os.path.join(indices, nome))
+        print(resultado.relatorio())
+        
+    if escritor is not None:
+        escritor.gravar(colunas, parsed_base_path)
+        resultados['colunas'] = TabelaColunas.carregar(colunas)
+        print(resultados['colunas'].relatorio())
+    return resultados
@@ -0,0 +1,170 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .acordao_index import AcordaoIndex
+from .acordaos_similares import parse_acordaos_similares
+from .complementary_info import parse_complementary_info
+from .data_publicacao import parse_data_publicacao
+from .json_utils import load_file
+from .jurisprudencia_citada import parse_jurisprudencia_citada
+from .referencias_legislativas import parse_referencias_legislativas
+from .termos_auxiliares import parse_termos_auxiliares
+from .versoes import versao_fonte
+
+# Parsers do acórdão, na ordem em que os campos estruturados são gerados:
+# (campo bruto, campo estruturado, parser(valor_bruto, index))
+PARSERS_ESTRUTURADOS: List[Tuple[str, str, Callable[[Any, Optional[AcordaoIndex]], Any]]] = [
+    ('dataPublicacao', 'publicacaoEstruturada',
+     lambda valor, index: parse_data_publicacao(valor)),
+    ('jurisprudenciaCitada', 'jurisprudenciaCitadaEstruturada',
+     lambda valor, index: parse_jurisprudencia_citada(valor, index=index)),
+    ('referenciasLegislativas', 'referenciasLegislativasEstruturadas',
+     lambda valor, index: parse_referencias_legislativas(valor)),
+    ('acordaosSimilares', 'acordaosSimilaresEstruturados',
+     lambda valor, index: parse_acordaos_similares(valor)),
+    ('informacoesComplementares', 'informacoesComplementaresEstruturadas',
+     lambda valor, index: parse_complementary_info(valor)),
+    ('termosAuxiliares', 'termosAuxiliaresEstruturados',
+     lambda valor, index: parse_termos_auxiliares(valor)),
+]
+
+CAMPOS_ESTRUTURADOS = [estruturado for _, estruturado, _ in PARSERS_ESTRUTURADOS]
+CAMPO_BRUTO = {estruturado: bruto for bruto, estruturado, _ in PARSERS_ESTRUTURADOS}
+
+# Módulo de cada parser. A versão do parser é o hash do código desse módulo e de
+# tudo o que ele importa do projeto (parsers.versoes): muda sozinha quando o
+# código muda, sem contador para lembrar de incrementar. Com o schema gravando
+# as versões (versoesParsers), `process_stj_data.py --recompute` refaz só os
+# campos gravados com versões antigas.
+MODULOS_PARSERS: Dict[str, str] = {
+    'publicacaoEstruturada': parse_data_publicacao.__module__,
+    'jurisprudenciaCitadaEstruturada': parse_jurisprudencia_citada.__module__,
+    'referenciasLegislativasEstruturadas': parse_referencias_legislativas.__module__,
+    'acordaosSimilaresEstruturados': parse_acordaos_similares.__module__,
+    'informacoesComplementaresEstruturadas': parse_complementary_info.__module__,
+    'termosAuxiliaresEstruturados': parse_termos_auxiliares.__module__,
+}
+
+@lru_cache(maxsize=None)
+def versao_parser(campo_estruturado: str) -> str:
+    """Versão atual do parser de um campo estruturado (calculada na primeira consulta)."""
+    return versao_fonte([MODULOS_PARSERS[campo_estruturado]])
+
+CAMPO_VERSOES = 'versoesParsers'
+
+class ParserError(Exception):
+    """Falha de um parser ao processar um campo do acórdão."""
+    
+    def __init__(self, campo: str, erro: Exception):
+        super().__init__(f"{campo}: {erro}")
+        self.campo = campo
+        self.erro = erro
+
+class OutputSchema:
+    """
+    Define quais parsers rodam em process_acordao e quais campos vão para a saída.
+    
+    Args:
+        parsers: Campos estruturados a gerar (None = todos). Parsers fora da
+            lista não são executados.
+        manter_brutos: Se os campos brutos dos parsers executados são mantidos
+            (True/False) ou a lista dos que devem ser mantidos
+        campos: Campos não estruturados a manter na saída (None = todos)
+        excluir: Campos sempre removidos da saída
+        versoes: Se cada acórdão leva em versoesParsers a versão dos parsers
+            que geraram seus campos (para `--recompute` refazer só os campos
+            desatualizados; desligado, os campos não anotados são todos
+            refeitos na primeira recomputação)
+    """
+    
+    def __init__(self,
+                 parsers: Optional[Iterable[str]] = None,
+                 manter_brutos: Union[bool, Iterable[str]] = True,
+                 campos: Optional[Iterable[str]] = None,
+                 excluir: Iterable[str] = (),
+                 versoes: bool = False):
+        self.parsers = set(CAMPOS_ESTRUTURADOS if parsers is None else parsers)
+        desconhecidos = self.parsers - set(CAMPOS_ESTRUTURADOS)
+        if desconhecidos:
+            raise ValueError(f"Parsers desconhecidos no schema: {', '.join(sorted(desconhecidos))}")
+            
+        self.brutos_executados = {CAMPO_BRUTO[c] for c in self.parsers}
+        if manter_brutos is True:
+            self.brutos_removidos = set()
+        elif manter_brutos is False:
+            self.brutos_removidos = set(self.brutos_executados)
+        else:
+            self.brutos_removidos = self.brutos_executados - set(manter_brutos)
+            
+        self.campos = set(campos) if campos is not None else None
+        self.excluir = set(excluir)
+        self.versoes = versoes
+        
+        # Sem projeção, process_acordao devolve o próprio dicionário
+        self._projeta = bool(self.brutos_removidos or self.campos is not None or self.excluir)
+        
+    def executa(self, campo_estruturado: str) -> bool:
+        """Indica se o parser de um campo estruturado deve rodar."""
+        return campo_estruturado in self.parsers
+        
+    def mantem(self, campo: str) -> bool:
+        """Indica se um campo do acórdão vai para a saída."""
+        if campo in self.excluir or campo in self.brutos_removidos:
+            return False
+        if campo == CAMPO_VERSOES:
+            return self.versoes
+        if campo in CAMPO_BRUTO:
+            return campo in self.parsers
+        if self.campos is not None:
+            return campo in self.campos or campo in self.brutos_executados
+        return True
+        
+    def projeta(self, acordao: Dict) -> Dict:
+        """Remove do acórdão (no próprio dicionário) os campos fora do schema."""
+        if self._projeta:
+            for campo in [c for c in acordao if not self.mantem(c)]:
+                del acordao[campo]
+        return acordao
+        
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'OutputSchema':
+        """
+        Cria o schema a partir de um dicionário no formato:
+        
+            {"parsers": [...], "manterBrutos": true, "campos": [...], "excluir": [...], "versoesParsers": false}
+        """
+        return cls(parsers=config.get('parsers'),
+                   manter_brutos=config.get('manterBrutos', True),
+                   campos=config.get('campos'),
+                   excluir=config.get('excluir', ()),
+                   versoes=config.get('versoesParsers', False))
+                   
+    def to_dict(self) -> Dict:
+        """Serializa o schema no formato aceito por from_dict."""
+        return {
+            'parsers': [c for c in CAMPOS_ESTRUTURADOS if c in self.parsers],
+            'manterBrutos': sorted(self.brutos_executados - self.brutos_removidos),
+            'campos': sorted(self.campos) if self.campos is not None else None,
+            'excluir': sorted(self.excluir),
+            'versoesParsers': self.versoes
+        }
+        
+    @classmethod
+    def carregar(cls, nome_ou_caminho: Optional[str]) -> 'OutputSchema':
+        """Retorna um schema predefinido ('completo', 'enxuto') ou lido de um arquivo JSON."""
+        if not nome_ou_caminho:
+            return SCHEMA_COMPLETO
+        if nome_ou_caminho in SCHEMAS:
+            return SCHEMAS[nome_ou_caminho]
+        return cls.from_dict(load_file(nome_ou_caminho))
+
+# Saída original: todos os parsers, com os campos brutos e estruturados
+SCHEMA_COMPLETO = OutputSchema()
+
+# Todos os parsers, sem os campos brutos já convertidos em estruturados
+SCHEMA_ENXUTO = OutputSchema(manter_brutos=False)
+
+SCHEMAS = {
+    'completo': SCHEMA_COMPLETO,
+    'enxuto': SCHEMA_ENXUTO,
+}
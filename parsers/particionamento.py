@@ -0,0 +1,209 @@
+import os
+import re
+import shutil
+from collections import OrderedDict
+from typing import Dict, IO, Iterable, List, Optional, Tuple
+
+from .input_sources import listar_fontes
+from .json_utils import dump_file, dumps, load_file, process_json_content
+
+# Valor da partição quando o acórdão não tem data ou órgão julgador
+DESCONHECIDO = 'desconhecido'
+
+def _data_iso(data_decisao: str) -> Optional[str]:
+    """Converte 'YYYYMMDD' em 'YYYY-MM-DD' (None se a data for inválida)."""
+    data = (data_decisao or '').strip()[:8]
+    if len(data) != 8 or not data.isdigit():
+        return None
+    return f"{data[:4]}-{data[4:6]}-{data[6:]}"
+
+def valor_orgao(nome_orgao: str) -> str:
+    """Nome do órgão julgador como valor de partição (ex.: 'TERCEIRA TURMA' -> 'TERCEIRA_TURMA')."""
+    valor = re.sub(r'[\s/\\]+', '_', (nome_orgao or '').strip().upper()).strip('_')
+    return valor or DESCONHECIDO
+
+def chave_particao(acordao: Dict) -> Tuple[str, str]:
+    """Retorna (ano, órgão) da partição de um acórdão."""
+    data = _data_iso(acordao.get('dataDecisao'))
+    ano = data[:4] if data else DESCONHECIDO
+    return ano, valor_orgao(acordao.get('nomeOrgaoJulgador'))
+
+class _Particao:
+    """Estatísticas e arquivo corrente de uma partição"""
+    
+    def __init__(self, ano: str, orgao: str, nome_orgao: str):
+        self.ano = ano
+        self.orgao = orgao
+        self.nome_orgao = nome_orgao
+        self.caminho = os.path.join(f"ano={ano}", f"orgao={orgao}")
+        self.partes: List[Dict] = []
+        self.linhas = 0
+        self.data_min: Optional[str] = None
+        self.data_max: Optional[str] = None
+        
+    def to_dict(self) -> Dict:
+        return {
+            'ano': self.ano,
+            'orgao': self.orgao,
+            'nomeOrgaoJulgador': self.nome_orgao,
+            'caminho': self.caminho.replace(os.sep, '/'),
+            'linhas': self.linhas,
+            'dataMin': self.data_min,
+            'dataMax': self.data_max,
+            'partes': self.partes
+        }
+
+class EscritorParticionado:
+    """
+    Grava acórdãos processados em partições ano=YYYY/orgao=.../part-N.jsonl.
+    
+    A partição vem de `dataDecisao` e `nomeOrgaoJulgador`. Cada parte tem no
+    máximo `linhas_por_parte` acórdãos (um por linha). Ao fechar, grava
+    _manifesto.json com as linhas e as datas mínima e máxima de cada partição,
+    o que permite aos leitores descartar partições sem abri-las.
+    
+    A gravação é feita num diretório temporário que substitui o anterior só
+    ao final, para que leitores nunca vejam uma saída pela metade.
+    """
+    
+    NOME_MANIFESTO = '_manifesto.json'
+    
+    def __init__(self, base_path: str, linhas_por_parte: int = 100_000, max_abertos: int = 64):
+        self.base_path = base_path
+        self.linhas_por_parte = max(linhas_por_parte, 1)
+        self.max_abertos = max(max_abertos, 1)
+        self._tmp_path = base_path.rstrip('/\\') + '.tmp'
+        self._particoes: Dict[Tuple[str, str], _Particao] = {}
+        self._abertos: 'OrderedDict[Tuple[str, str], IO]' = OrderedDict()
+        
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        os.makedirs(self._tmp_path)
+        
+    def adicionar(self, acordaos: Iterable[Dict]) -> None:
+        """Grava acórdãos processados em suas partições."""
+        for acordao in acordaos:
+            if not isinstance(acordao, dict):
+                continue
+                
+            chave = chave_particao(acordao)
+            particao = self._particoes.get(chave)
+            if particao is None:
+                nome_orgao = (acordao.get('nomeOrgaoJulgador') or '').strip()
+                particao = self._particoes[chave] = _Particao(*chave, nome_orgao)
+                
+            self._arquivo(chave, particao).write(dumps(acordao) + '\n')
+            particao.partes[-1]['linhas'] += 1
+            particao.linhas += 1
+            
+            data = _data_iso(acordao.get('dataDecisao'))
+            if data:
+                if particao.data_min is None or data < particao.data_min:
+                    particao.data_min = data
+                if particao.data_max is None or data > particao.data_max:
+                    particao.data_max = data
+                    
+    def _arquivo(self, chave: Tuple[str, str], particao: _Particao) -> IO:
+        """Retorna o arquivo da parte corrente, abrindo uma nova parte se a atual encheu."""
+        if particao.partes and particao.partes[-1]['linhas'] >= self.linhas_por_parte:
+            self._fechar_arquivo(chave)
+            particao.partes.append({'arquivo': f"part-{len(particao.partes)}.jsonl", 'linhas': 0})
+        elif not particao.partes:
+            particao.partes.append({'arquivo': 'part-0.jsonl', 'linhas': 0})
+            
+        arquivo = self._abertos.get(chave)
+        if arquivo is not None:
+            self._abertos.move_to_end(chave)
+            return arquivo
+            
+        # Limita os arquivos abertos ao mesmo tempo, fechando os usados há mais tempo
+        while len(self._abertos) >= self.max_abertos:
+            self._fechar_arquivo(next(iter(self._abertos)))
+            
+        diretorio = os.path.join(self._tmp_path, particao.caminho)
+        os.makedirs(diretorio, exist_ok=True)
+        arquivo = open(os.path.join(diretorio, particao.partes[-1]['arquivo']), 'a', encoding='utf-8')
+        self._abertos[chave] = arquivo
+        return arquivo
+        
+    def _fechar_arquivo(self, chave: Tuple[str, str]) -> None:
+        arquivo = self._abertos.pop(chave, None)
+        if arquivo is not None:
+            arquivo.close()
+            
+    def manifesto(self) -> Dict:
+        """Manifesto das partições gravadas."""
+        particoes = sorted(self._particoes.values(), key=lambda p: (p.ano, p.orgao))
+        return {
+            'layout': 'ano=YYYY/orgao=ORGAO/part-N.jsonl',
+            'linhas': sum(p.linhas for p in particoes),
+            'particoes': [p.to_dict() for p in particoes]
+        }
+        
+    def fechar(self) -> None:
+        """Fecha as partições, grava o manifesto e publica a nova saída."""
+        for chave in list(self._abertos):
+            self._fechar_arquivo(chave)
+            
+        dump_file(self.manifesto(), os.path.join(self._tmp_path, self.NOME_MANIFESTO))
+        
+        shutil.rmtree(self.base_path, ignore_errors=True)
+        os.replace(self._tmp_path, self.base_path)
+        
+    def descartar(self) -> None:
+        """Descarta a gravação em andamento, mantendo a saída anterior (sem efeito depois de fechar)."""
+        for chave in list(self._abertos):
+            self._fechar_arquivo(chave)
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        
+    def relatorio(self) -> str:
+        """Resumo das partições para o relatório de processamento."""
+        return (f"Saída particionada ({self.base_path}): {len(self._particoes)} partições, "
+                f"{sum(p.linhas for p in self._particoes.values())} acórdãos")
+
+def particionar_diretorio(parsed_base_path: str, destino: str, linhas_por_parte: int = 100_000) -> Dict:
+    """
+    Gera a saída particionada a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e retorna o manifesto gravado em `destino`.
+    """
+    escritor = EscritorParticionado(destino, linhas_por_parte)
+    try:
+        for fonte in listar_fontes(parsed_base_path):
+            acordaos = process_json_content(fonte.ler_texto())
+            if acordaos:
+                escritor.adicionar(acordaos if isinstance(acordaos, list) else [acordaos])
+        escritor.fechar()
+    finally:
+        escritor.descartar()
+    print(escritor.relatorio())
+    return escritor.manifesto()
+
+def listar_partes(base_path: str, anos: Optional[Iterable[str]] = None,
+                  orgaos: Optional[Iterable[str]] = None,
+                  data_inicio: Optional[str] = None, data_fim: Optional[str] = None) -> List[str]:
+    """
+    Lista os arquivos das partições que podem conter os acórdãos filtrados.
+    
+    Usa só o manifesto: partições de outros anos ou órgãos, ou cujas datas não
+    cruzam o intervalo [data_inicio, data_fim] (YYYY-MM-DD), são descartadas.
+    Os órgãos podem ser informados pelo nome (ex.: 'TERCEIRA TURMA').
+    """
+    manifesto = load_file(os.path.join(base_path, EscritorParticionado.NOME_MANIFESTO))
+    anos = {str(a) for a in anos} if anos is not None else None
+    orgaos = {valor_orgao(o) for o in orgaos} if orgaos is not None else None
+    
+    partes = []
+    for particao in manifesto['particoes']:
+        if anos is not None and particao['ano'] not in anos:
+            continue
+        if orgaos is not None and particao['orgao'] not in orgaos:
+            continue
+        if data_inicio and particao['dataMax'] and particao['dataMax'] < data_inicio:
+            continue
+        if data_fim and particao['dataMin'] and particao['dataMin'] > data_fim:
+            continue
+            
+        diretorio = os.path.join(base_path, *particao['caminho'].split('/'))
+        partes.extend(os.path.join(diretorio, parte['arquivo']) for parte in particao['partes'])
+    return partes
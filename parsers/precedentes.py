@@ -0,0 +1,276 @@
+import os
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .input_sources import listar_fontes
+from .json_utils import dump_file, load_file, process_json_content
+from .particionamento import DESCONHECIDO
+
+# NumPy é opcional para o restante do projeto, mas necessário aqui
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ARQUIVO_INICIOS = 'inicios.npy'
+ARQUIVO_POSTINGS = 'postings.npy'
+ARQUIVO_POR_ANO = 'por_ano.npy'
+ARQUIVO_ROTULOS = 'rotulos.json'
+
+SUMULA = 'SÚMULA'
+SUMULA_VINCULANTE = 'SÚMULA VINCULANTE'
+TEMA = 'TEMA'
+REPERCUSSAO_GERAL = 'REPERCUSSÃO GERAL'
+ESPECIES = (SUMULA, SUMULA_VINCULANTE, TEMA, REPERCUSSAO_GERAL)
+
+# Tribunal entre parênteses na sigla da lei das súmulas (ex.: 'SUM(STJ)', 'SUV(STF)')
+_RE_TRIBUNAL_SIGLA = re.compile(r'\((\w+)\)')
+
+def _exigir_numpy() -> None:
+    if np is None:
+        raise ImportError("O índice de precedentes requer NumPy (pip install numpy)")
+
+def chave_precedente(tribunal: Optional[str], especie: str, numero) -> Optional[str]:
+    """
+    Chave de um precedente (ex.: ('STJ', 'TEMA', '1.076') -> 'STJ:TEMA:1076').
+    
+    O número perde zeros à esquerda e separadores de milhar, para que
+    'SUM:000007' e 'SÚMULA 7' caiam no mesmo precedente.
+    """
+    digitos = re.sub(r'\D', '', str(numero or ''))
+    if not digitos or especie not in ESPECIES:
+        return None
+    return f"{(tribunal or DESCONHECIDO).strip().upper()}:{especie}:{int(digitos)}"
+
+def _tribunal_sumula(ref: Dict) -> Optional[str]:
+    match = _RE_TRIBUNAL_SIGLA.search(ref.get('legSigla') or '')
+    if match:
+        return match.group(1)
+    extenso = (ref.get('legExtenso') or '').upper()
+    if 'SUPERIOR TRIBUNAL DE JUSTIÇA' in extenso:
+        return 'STJ'
+    if 'SUPREMO TRIBUNAL FEDERAL' in extenso:
+        return 'STF'
+    return None
+
+def precedentes_citados(acordao: Dict) -> List[str]:
+    """
+    Chaves dos precedentes citados por um acórdão processado, sem repetição.
+    
+    Vêm da jurisprudência citada (citações de SÚMULA, TEMA e REPERCUSSÃO
+    GERAL e temas de recursos repetitivos citados) e das referências
+    legislativas com número de súmula.
+    """
+    chaves = {}
+    jurisprudencia = acordao.get('jurisprudenciaCitadaEstruturada') or {}
+    for categoria in jurisprudencia.get('categorias', []):
+        for citado in categoria.get('acordaosCitados', []):
+            tribunal = citado.get('tribunal')
+            if citado.get('tipo') in ESPECIES:
+                chaves[chave_precedente(tribunal, citado['tipo'], citado.get('numero'))] = None
+            for tema in citado.get('temas') or ():
+                chaves[chave_precedente(tribunal, TEMA, tema)] = None
+                
+    for ref in acordao.get('referenciasLegislativasEstruturadas') or ():
+        if ref.get('numeroSumula'):
+            vinculante = ref.get('tipo') == 'SUV' or (ref.get('legSigla') or '').upper().startswith('SUV')
+            especie = SUMULA_VINCULANTE if vinculante else SUMULA
+            chaves[chave_precedente(_tribunal_sumula(ref), especie, ref['numeroSumula'])] = None
+            
+    chaves.pop(None, None)
+    return list(chaves)
+
+def _ano(data_decisao: Optional[str]) -> str:
+    ano = (data_decisao or '')[:4]
+    return ano if len(ano) == 4 and ano.isdigit() else DESCONHECIDO
+
+class MontadorPrecedentes:
+    """
+    Lê os precedentes citados por acórdão numa única passada.
+    
+    Acórdãos, precedentes e anos recebem códigos inteiros na ordem em que
+    aparecem; cada citação vira um par (precedente, acórdão) em arrays
+    compactos, e o ano de decisão fica num array por acórdão. As listas de
+    acórdãos por precedente (postings) e as contagens por ano são montadas
+    de uma vez, em `indice`.
+    """
+    
+    def __init__(self):
+        self.codigos: Dict[str, int] = {}
+        self.precedentes: Dict[str, int] = {}
+        self.anos: Dict[str, int] = {}
+        self._anos_acordaos = array('i')
+        self._pares_precedentes = array('i')
+        self._pares_acordaos = array('i')
+        
+    def _codigo(self, acordao_id: str, ano: str) -> int:
+        codigo = self.codigos.get(acordao_id)
+        if codigo is None:
+            codigo = self.codigos[acordao_id] = len(self.codigos)
+            ano_codigo = self.anos.get(ano)
+            if ano_codigo is None:
+                ano_codigo = self.anos[ano] = len(self.anos)
+            self._anos_acordaos.append(ano_codigo)
+        return codigo
+        
+    def adicionar(self, acordao: Dict) -> None:
+        if not acordao.get('id'):
+            return
+        citados = precedentes_citados(acordao)
+        if not citados:
+            return
+            
+        codigo = self._codigo(acordao['id'], _ano(acordao.get('dataDecisao')))
+        precedentes = self.precedentes
+        for chave in citados:
+            precedente = precedentes.get(chave)
+            if precedente is None:
+                precedente = precedentes[chave] = len(precedentes)
+            self._pares_precedentes.append(precedente)
+            self._pares_acordaos.append(codigo)
+            
+    def indice(self) -> 'IndicePrecedentes':
+        """Monta as postings (CSR, acórdãos em ordem crescente de código) e as contagens por ano."""
+        _exigir_numpy()
+        n = len(self.precedentes)
+        precedentes = np.frombuffer(self._pares_precedentes, dtype=np.int32) if n else np.zeros(0, np.int32)
+        acordaos = np.frombuffer(self._pares_acordaos, dtype=np.int32) if n else np.zeros(0, np.int32)
+        
+        # Um acórdão reprocessado (mesmo id em dois arquivos) conta uma vez por precedente
+        pares = np.unique(precedentes.astype(np.int64) << 32 | acordaos.astype(np.int64))
+        precedentes, postings = (pares >> 32).astype(np.int32), (pares & 0xFFFFFFFF).astype(np.int32)
+        inicios = np.zeros(n + 1, np.int64)
+        np.cumsum(np.bincount(precedentes, minlength=n), out=inicios[1:])
+        
+        # Anos em ordem, com o desconhecido no fim
+        rotulos_anos = sorted(self.anos, key=lambda ano: (ano == DESCONHECIDO, ano))
+        posicao = np.zeros(len(self.anos), np.int64)
+        posicao[[self.anos[ano] for ano in rotulos_anos]] = np.arange(len(rotulos_anos))
+        anos_acordaos = np.frombuffer(self._anos_acordaos, dtype=np.int32) if len(self.codigos) else np.zeros(0, np.int32)
+        celulas = precedentes.astype(np.int64) * len(rotulos_anos) + posicao[anos_acordaos[postings]]
+        por_ano = np.bincount(celulas, minlength=n * len(rotulos_anos)).astype(np.int32)
+        
+        return IndicePrecedentes(list(self.codigos), list(self.precedentes), rotulos_anos, inicios, postings,
+                                 por_ano.reshape(n, len(rotulos_anos)))
+
+class IndicePrecedentes:
+    """
+    Índice invertido de precedentes (temas, súmulas e repercussão geral, por tribunal).
+    
+    Os acórdãos que citam o precedente p são a fatia inicios[p]:inicios[p + 1]
+    de `postings`, com códigos inteiros de acórdão (posições em `ids`) em
+    ordem crescente; `por_ano[p]` tem quantos deles foram decididos em cada
+    ano de `anos`. Uma consulta é uma busca no dicionário de chaves e uma
+    fatia de um array (com memory-map, direto do disco).
+    """
+    
+    def __init__(self, ids: List[str], precedentes: List[str], anos: List[str], inicios: 'np.ndarray',
+                 postings: 'np.ndarray', por_ano: 'np.ndarray'):
+        _exigir_numpy()
+        self.ids = list(ids)
+        self.precedentes = list(precedentes)
+        self.codigos = {chave: i for i, chave in enumerate(self.precedentes)}
+        self.anos = list(anos)
+        self.inicios = inicios
+        self.postings = postings
+        self.por_ano = por_ano
+        
+    @classmethod
+    def de_acordaos(cls, acordaos: Iterable[Dict]) -> 'IndicePrecedentes':
+        montador = MontadorPrecedentes()
+        for acordao in acordaos:
+            montador.adicionar(acordao)
+        return montador.indice()
+        
+    def __len__(self) -> int:
+        return len(self.precedentes)
+        
+    def codigos_acordaos(self, tribunal: str, especie: str, numero) -> 'np.ndarray':
+        """Códigos (posições em `ids`) dos acórdãos que citam o precedente."""
+        p = self.codigos.get(chave_precedente(tribunal, especie, numero))
+        if p is None:
+            return self.postings[:0]
+        return self.postings[self.inicios[p]:self.inicios[p + 1]]
+        
+    def acordaos(self, tribunal: str, especie: str, numero) -> List[str]:
+        """Ids dos acórdãos que citam o precedente (ex.: ('STJ', 'TEMA', 1076))."""
+        ids = self.ids
+        return [ids[i] for i in self.codigos_acordaos(tribunal, especie, numero)]
+        
+    def total(self, tribunal: str, especie: str, numero) -> int:
+        """Número de acórdãos que citam o precedente."""
+        p = self.codigos.get(chave_precedente(tribunal, especie, numero))
+        return int(self.inicios[p + 1] - self.inicios[p]) if p is not None else 0
+        
+    def contagens_por_ano(self, tribunal: str, especie: str, numero) -> Dict[str, int]:
+        """Acórdãos que citam o precedente, por ano de decisão (só anos com citações)."""
+        p = self.codigos.get(chave_precedente(tribunal, especie, numero))
+        if p is None:
+            return {}
+        linha = self.por_ano[p]
+        return {self.anos[i]: int(linha[i]) for i in np.flatnonzero(linha)}
+        
+    def mais_citados(self, k: int = 10, especie: Optional[str] = None,
+                     tribunal: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Os k precedentes citados por mais acórdãos, opcionalmente de uma espécie e de um tribunal."""
+        totais = np.diff(self.inicios)
+        candidatos = np.arange(len(self.precedentes))
+        if especie is not None or tribunal is not None:
+            candidatos = np.array([
+                i for i, chave in enumerate(self.precedentes)
+                if (tribunal is None or chave.startswith(f"{tribunal.upper()}:"))
+                and (especie is None or chave.split(':')[1] == especie)
+            ], dtype=np.int64)
+        if k <= 0 or not len(candidatos):
+            return []
+        ordem = candidatos[np.lexsort((candidatos, -totais[candidatos]))][:k]
+        return [(self.precedentes[i], int(totais[i])) for i in ordem]
+        
+    def salvar(self, diretorio: str) -> None:
+        """Grava os arrays (.npy) e os rótulos de acórdãos, precedentes e anos (JSON)."""
+        os.makedirs(diretorio, exist_ok=True)
+        np.save(os.path.join(diretorio, ARQUIVO_INICIOS), self.inicios)
+        np.save(os.path.join(diretorio, ARQUIVO_POSTINGS), self.postings)
+        np.save(os.path.join(diretorio, ARQUIVO_POR_ANO), self.por_ano)
+        dump_file({'ids': self.ids, 'precedentes': self.precedentes, 'anos': self.anos},
+                  os.path.join(diretorio, ARQUIVO_ROTULOS), indent=None)
+                  
+    @classmethod
+    def carregar(cls, diretorio: str, mmap: bool = True) -> 'IndicePrecedentes':
+        """Carrega um índice gravado com `salvar` (por padrão, com memory-map)."""
+        _exigir_numpy()
+        modo = 'r' if mmap else None
+        rotulos = load_file(os.path.join(diretorio, ARQUIVO_ROTULOS))
+        return cls(rotulos['ids'], rotulos['precedentes'], rotulos['anos'],
+                   np.load(os.path.join(diretorio, ARQUIVO_INICIOS), mmap_mode=modo),
+                   np.load(os.path.join(diretorio, ARQUIVO_POSTINGS), mmap_mode=modo),
+                   np.load(os.path.join(diretorio, ARQUIVO_POR_ANO), mmap_mode=modo))
+                   
+    def relatorio(self) -> str:
+        por_especie = {especie: 0 for especie in ESPECIES}
+        for chave in self.precedentes:
+            por_especie[chave.split(':')[1]] += 1
+        especies = ', '.join(f"{total:,} {especie.lower()}" for especie, total in por_especie.items() if total)
+        tamanho = sum(a.nbytes for a in (self.inicios, self.postings, self.por_ano))
+        return (f"Precedentes: {len(self.precedentes):,} ({especies or 'nenhum'}) citados por "
+                f"{len(self.ids):,} acórdãos, {len(self.postings):,} citações ({tamanho / 2 ** 20:,.1f} MiB)")
+
+def precedentes_do_diretorio(parsed_base_path: str, destino: str) -> IndicePrecedentes:
+    """
+    Monta e grava o índice de precedentes a partir de acórdãos já processados.
+    
+    Lê os arquivos das pastas 'Espelho*' de `parsed_base_path` (a saída de
+    process_directory) e grava o índice em `destino`.
+    """
+    montador = MontadorPrecedentes()
+    for fonte in listar_fontes(parsed_base_path):
+        acordaos = process_json_content(fonte.ler_texto())
+        if acordaos:
+            for acordao in (acordaos if isinstance(acordaos, list) else [acordaos]):
+                montador.adicionar(acordao)
+                
+    indice = montador.indice()
+    indice.salvar(destino)
+    print(indice.relatorio())
+    return indice
@@ -0,0 +1,144 @@
+import os
+import traceback
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .json_utils import dumps, loads
+from .output_schema import CAMPOS_ESTRUTURADOS, ParserError
+
+class Quarentena:
+    """
+    Arquivo JSONL com os acórdãos que falharam no processamento.
+    
+    Cada linha guarda o arquivo de origem, a posição do acórdão no arquivo, o
+    parser que falhou, o traceback e o acórdão bruto, o que permite reprocessar
+    só esses registros depois. O lugar do acórdão na saída é guardado pelo id
+    do acórdão gravado antes dele e pela posição na saída (a posição na
+    entrada não serve: a deduplicação pode descartar acórdãos da saída).
+    """
+    
+    NOME_ARQUIVO = 'quarentena.jsonl'
+    
+    def __init__(self, output_base_path: str):
+        self.path = os.path.join(output_base_path, self.NOME_ARQUIVO)
+        self.total = 0
+        self._arquivo = None
+        self._saidas: Set[str] = set()  # saídas com registros no arquivo aberto
+        
+    def abrir(self, acrescentar: bool = False) -> None:
+        """Inicia uma nova quarentena, descartando a da execução anterior (ou acrescentando a ela)."""
+        self._saidas = {registro['saida'] for registro in self.ler()} if acrescentar else set()
+        self._arquivo = open(self.path, 'a' if acrescentar else 'w', encoding='utf-8')
+        self.total = 0
+        
+    def fechar(self) -> None:
+        """Fecha o arquivo de quarentena."""
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+            
+    def registrar(self, arquivo: str, saida: str, indice: int, acordao: Any, erro: Exception,
+                  anteriores: Optional[List[Any]] = None) -> None:
+        """
+        Registra um acórdão que falhou no processamento.
+        
+        Args:
+            indice: Posição do acórdão no arquivo de entrada
+            anteriores: Acórdãos já processados do mesmo arquivo, que vão antes
+                dele na saída (para recolocá-lo no mesmo lugar ao recuperá-lo)
+        """
+        if isinstance(acordao, dict):
+            # Descarta campos estruturados gerados antes da falha
+            acordao = {k: v for k, v in acordao.items() if k not in CAMPOS_ESTRUTURADOS}
+            acordao_id = acordao.get('id')
+        else:
+            acordao_id = None
+            
+        anteriores = anteriores if anteriores is not None else []
+        registro = {
+            'arquivo': arquivo,
+            'saida': saida,
+            'indice': indice,
+            'posicao': len(anteriores),
+            'anterior': _id(anteriores[-1]) if anteriores else None,
+            'id': acordao_id,
+            'parser': erro.campo if isinstance(erro, ParserError) else None,
+            'erro': str(erro),
+            'traceback': ''.join(traceback.format_exception(type(erro), erro, erro.__traceback__)),
+            'acordao': acordao
+        }
+        
+        self._arquivo.write(dumps(registro) + '\n')
+        self._arquivo.flush()
+        self._saidas.add(saida)
+        self.total += 1
+        
+    def descartar(self, saidas: Iterable[str]) -> None:
+        """
+        Remove da quarentena aberta os registros de saídas que vão ser reprocessadas.
+        
+        Usado quando a quarentena é acrescentada (ex.: monitor_espelhos): um
+        arquivo alterado e processado de novo não repete os registros antigos.
+        """
+        saidas = self._saidas.intersection(saidas)
+        if not saidas:
+            return
+        self._arquivo.close()
+        self.reescrever(registro for registro in self.ler() if registro['saida'] not in saidas)
+        self._arquivo = open(self.path, 'a', encoding='utf-8')
+        self._saidas -= saidas
+        
+    def ler(self) -> List[Dict]:
+        """Lê os registros em quarentena."""
+        if not os.path.exists(self.path):
+            return []
+            
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [loads(linha) for linha in f if linha.strip()]
+            
+    def reescrever(self, registros: Iterable[Dict]) -> None:
+        """Substitui a quarentena pelos registros informados."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(dumps(registro) + '\n')
+        os.replace(tmp_path, self.path)
+
+def _id(acordao: Any) -> Optional[str]:
+    return acordao.get('id') if isinstance(acordao, dict) else None
+
+def mesclar_recuperados(processados: List[Any], recuperados: List[Tuple[Dict, Any]]) -> List[Any]:
+    """
+    Recoloca acórdãos recuperados no lugar que teriam no arquivo de saída.
+    
+    Cada recuperado vai logo depois do acórdão que o precedia na saída
+    (`anterior` do registro de quarentena) ou, se ele não está mais no
+    arquivo, na posição que tinha na saída. Recuperados com o mesmo lugar
+    mantêm a ordem da entrada.
+    
+    Args:
+        processados: Acórdãos já gravados (sem os que estavam em quarentena)
+        recuperados: Pares (registro de quarentena, acórdão reprocessado com sucesso)
+    """
+    posicoes = {}
+    for posicao, acordao in enumerate(processados):
+        acordao_id = _id(acordao)
+        if acordao_id is not None:
+            posicoes.setdefault(acordao_id, posicao)
+            
+    insercoes: Dict[int, List[Tuple[int, Any]]] = defaultdict(list)
+    for registro, acordao in recuperados:
+        anterior = registro.get('anterior')
+        if anterior is not None and anterior in posicoes:
+            posicao = posicoes[anterior] + 1
+        else:
+            # Primeiro da saída, vizinho removido dela ou registro antigo (sem `posicao`)
+            posicao = min(registro.get('posicao', registro['indice']), len(processados))
+        insercoes[posicao].append((registro['indice'], acordao))
+        
+    resultado = []
+    for posicao in range(len(processados) + 1):
+        resultado.extend(acordao for _, acordao in sorted(insercoes.get(posicao, ()), key=lambda par: par[0]))
+        if posicao < len(processados):
+            resultado.append(processados[posicao])
+    return resultado
@@ -1,10 +1,11 @@
 from typing import Dict, Set, Optional
 from collections import defaultdict
-import json
 import csv
 import os
 from pathlib import Path
 
+from .json_utils import dump_file, load_file
+
 class RecursosIndex:
     """Índice para análise de tipos de recursos e suas siglas."""
     
@@ -94,8 +95,7 @@ class RecursosIndex:
                 for filename in json_files:
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            acordaos = json.load(f)
+                        acordaos = load_file(filepath)
                             
                         if not isinstance(acordaos, list):
                             acordaos = [acordaos]
@@ -131,8 +131,7 @@ class RecursosIndex:
             'siglas': self.siglas
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        dump_file(index_data, output_path)
             
         print(f"\nÍndice salvo em: {output_path}")
 
@@ -1,116 +1,266 @@
 import re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lista completa de tipos de referência
+TIPOS_REFERENCIA = {
+    'LCP', 'DEL', 'LEI', 'CFB', 'RGI', 'MPR', 'EMC', 'RES', 'ATO', 'PRT', 'SUM'
+}
+
+_RE_SUMULA = re.compile(r'SUM:(\d+)')
+_RE_CHAVE_VALOR = re.compile(r'([A-Z]+):([^\s]+)')
+
+# Máximo de referências distintas mantidas no cache de parse do processo
+MAX_CACHE_REFERENCIAS = 50_000
+
+class RegistroImutavel(dict):
+    """
+    Dicionário somente leitura guardado no cache de parse.
+    
+    Não sai do módulo diretamente: parse_referencias_legislativas devolve
+    cada um como RegistroCompartilhado, que o copia só quando é alterado.
+    """
+    
+    @classmethod
+    def congelar(cls, valor: Any) -> Any:
+        """Converte recursivamente dicts em RegistroImutavel (listas viram tuplas)."""
+        if isinstance(valor, dict):
+            return cls({k: cls.congelar(v) for k, v in valor.items()})
+        if isinstance(valor, list):
+            return tuple(cls.congelar(v) for v in valor)
+        return valor
+        
+    def _imutavel(self, *args, **kwargs):
+        raise TypeError("Referência legislativa compartilhada pelo cache; altere uma copia()")
+        
+    __setitem__ = __delitem__ = __ior__ = _imutavel
+    update = pop = popitem = setdefault = clear = _imutavel
+    
+    def copia(self) -> Dict:
+        """Cópia profunda e mutável."""
+        return {k: v.copia() if isinstance(v, RegistroImutavel) else v for k, v in self.items()}
+        
+    def __deepcopy__(self, memo) -> Dict:
+        return self.copia()
+        
+    def __copy__(self) -> Dict:
+        return dict(self)
+        
+    def __reduce__(self):
+        return (RegistroImutavel, (dict(self),))
+
+class RegistroCompartilhado(dict):
+    """
+    Resultado do cache de parse: dict mutável que compartilha com o cache os valores aninhados.
+    
+    O primeiro nível é uma cópia rasa do registro do cache (poucas chaves);
+    os dicts aninhados (artigos e seus detalhes) continuam os do cache até
+    serem lidos pelo código Python (por chave, get, items, values, pop...),
+    quando são copiados da mesma forma. Assim, alterar o resultado em
+    qualquer nível altera só a cópia deste acórdão, e serializar ou só ler
+    o registro não copia nada além do primeiro nível.
+    """
+    
+    __slots__ = ()
+    
+    def _proprio(self, chave: str, valor: Any) -> Any:
+        if isinstance(valor, RegistroImutavel):
+            valor = RegistroCompartilhado(valor)
+            dict.__setitem__(self, chave, valor)
+        return valor
+        
+    def _materializar(self) -> None:
+        for chave, valor in list(dict.items(self)):
+            self._proprio(chave, valor)
+            
+    def __getitem__(self, chave: str) -> Any:
+        return self._proprio(chave, dict.__getitem__(self, chave))
+        
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        return self[chave] if chave in self else padrao
+        
+    def items(self):
+        self._materializar()
+        return dict.items(self)
+        
+    def values(self):
+        self._materializar()
+        return dict.values(self)
+        
+    def pop(self, *args) -> Any:
+        self._materializar()
+        return dict.pop(self, *args)
+        
+    def popitem(self) -> Tuple[str, Any]:
+        self._materializar()
+        return dict.popitem(self)
+        
+    def setdefault(self, chave: str, padrao: Any = None) -> Any:
+        return self[chave] if chave in self else dict.setdefault(self, chave, padrao)
+        
+    def copy(self) -> 'RegistroCompartilhado':
+        return RegistroCompartilhado(self)
 
 def parse_referencias_legislativas(referencias: List[str]) -> List[Dict]:
-    """Parse referências legislativas no formato STJ."""
+    """
+    Parse referências legislativas no formato STJ.
+    
+    As mesmas referências se repetem em boa parte dos acórdãos, então cada
+    string é interpretada uma única vez por processo (cache LRU limitado).
+    Cada resultado é um RegistroCompartilhado: pode ser alterado livremente,
+    e só as partes alteradas deixam de ser compartilhadas com o cache.
+    """
     resultado = []
     
     if not referencias:
         return resultado
         
-    # Lista completa de tipos de referência
-    TIPOS_REFERENCIA = {
-        'LCP', 'DEL', 'LEI', 'CFB', 'RGI', 'MPR', 'EMC', 'RES', 'ATO', 'PRT', 'SUM'
-    }
-    
     for ref in referencias:
-        try:
-            ref_dict = {}
-            linhas = [l.strip() for l in ref.split('\n') if l.strip()]
+        ref_dict = _parse_referencia_cache(ref) if isinstance(ref, str) else _parse_referencia(ref)
+        if ref_dict is not None:
+            resultado.append(RegistroCompartilhado(ref_dict))
             
-            if not linhas:
+    return resultado
+
+def _parse_referencia(ref: str) -> Optional[Dict]:
+    """Interpreta uma referência legislativa (None se inválida)."""
+    try:
+        ref_dict = {}
+        linhas = [l.strip() for l in ref.split('\n') if l.strip()]
+        
+        if not linhas:
+            return None
+            
+        # Primeira linha - informações básicas da lei
+        primeira_linha = linhas[0].split()
+        
+        # Processa cada parte da primeira linha
+        for parte in primeira_linha:
+            if ':' not in parte:
                 continue
                 
-            # Primeira linha - informações básicas da lei
-            primeira_linha = linhas[0].split()
-            
-            # Processa cada parte da primeira linha
-            for parte in primeira_linha:
-                if ':' not in parte:
-                    continue
-                    
-                chave, valor = parte.split(':', 1)
-                if chave == 'LEG':
-                    ref_dict['LEG'] = valor
-                elif chave in TIPOS_REFERENCIA:
-                    ref_dict['tipo'] = chave
-                    # Alguns tipos não têm número
-                    if chave not in ['CFB', 'RGI']:
-                        ref_dict['numero'] = valor
-                elif chave == 'ANO':
-                    ref_dict['ANO'] = valor
-            
-            # Processa órgão emissor (entre parênteses na última linha)
-            if linhas[-1].startswith('(') and linhas[-1].endswith(')'):
-                ref_dict['orgaoEmissor'] = linhas[-1].strip('()')
-                # Remove a última linha se ela contiver apenas o órgão emissor
-                if len(linhas) > 1:
-                    linhas = linhas[:-1]
-            
-            # Segunda linha - nome e sigla da lei
-            for linha in linhas[1:]:
-                if '*****' in linha:
-                    partes = linha.split('*****', 1)
-                    if len(partes) > 1:
-                        resto = partes[1].strip()
-                        primeira_palavra = resto.split(maxsplit=1)
-                        if primeira_palavra:
-                            ref_dict['legSigla'] = primeira_palavra[0]
-                            if len(primeira_palavra) > 1:
-                                ref_dict['legExtenso'] = primeira_palavra[1]
-                    break
-            
-            # Procura por número de súmula
-            for linha in linhas:
-                if 'SUM:' in linha:
-                    match = re.search(r'SUM:(\d+)', linha)
-                    if match:
-                        ref_dict['numeroSumula'] = match.group(1)
-                        break
-            
-            # Última linha não-parênteses - artigos e detalhes
-            ultima_linha = ''
-            for linha in reversed(linhas):
-                if not linha.startswith('('):
-                    ultima_linha = linha
-                    break
-                    
-            if ultima_linha:
-                partes = re.findall(r'([A-Z]+):([^\s]+)', ultima_linha)
+            chave, valor = parte.split(':', 1)
+            if chave == 'LEG':
+                ref_dict['LEG'] = valor
+            elif chave in TIPOS_REFERENCIA:
+                ref_dict['tipo'] = chave
+                # Alguns tipos não têm número
+                if chave not in ['CFB', 'RGI']:
+                    ref_dict['numero'] = valor
+            elif chave == 'ANO':
+                ref_dict['ANO'] = valor
                 
-                art_atual = {}
-                detalhes_atual = {}
-                contador_art = 0
+        # Processa órgão emissor (entre parênteses na última linha)
+        if linhas[-1].startswith('(') and linhas[-1].endswith(')'):
+            ref_dict['orgaoEmissor'] = linhas[-1].strip('()')
+            # Remove a última linha se ela contiver apenas o órgão emissor
+            if len(linhas) > 1:
+                linhas = linhas[:-1]
                 
-                for chave, valor in partes:
-                    if chave == 'ART':
-                        # Salva artigo anterior se existir
-                        if art_atual:
-                            if detalhes_atual:
-                                art_atual['detalhes'] = detalhes_atual
-                            chave_art = 'ART' if contador_art == 0 else f'ART{contador_art+1}'
-                            ref_dict[chave_art] = art_atual.copy()
-                        
-                        # Inicia novo artigo
-                        contador_art += 1
-                        art_atual = {'numero': valor}
-                        detalhes_atual = {}
-                    elif chave in ['PAR', 'INC', 'LET', 'ITEM', 'NUM']:
-                        detalhes_atual[chave] = valor
+        # Segunda linha - nome e sigla da lei
+        for linha in linhas[1:]:
+            if '*****' in linha:
+                partes = linha.split('*****', 1)
+                if len(partes) > 1:
+                    resto = partes[1].strip()
+                    primeira_palavra = resto.split(maxsplit=1)
+                    if primeira_palavra:
+                        ref_dict['legSigla'] = primeira_palavra[0]
+                        if len(primeira_palavra) > 1:
+                            ref_dict['legExtenso'] = primeira_palavra[1]
+                break
                 
-                # Salva o último artigo
-                if art_atual:
-                    if detalhes_atual:
-                        art_atual['detalhes'] = detalhes_atual
-                    chave_art = 'ART' if contador_art == 1 else f'ART{contador_art}'
-                    ref_dict[chave_art] = art_atual
+        # Procura por número de súmula
+        for linha in linhas:
+            if 'SUM:' in linha:
+                match = _RE_SUMULA.search(linha)
+                if match:
+                    ref_dict['numeroSumula'] = match.group(1)
+                    break
+                    
+        # Última linha não-parênteses - artigos e detalhes
+        ultima_linha = ''
+        for linha in reversed(linhas):
+            if not linha.startswith('('):
+                ultima_linha = linha
+                break
+                
+        if ultima_linha:
+            partes = _RE_CHAVE_VALOR.findall(ultima_linha)
             
-            # Só adiciona ao resultado se tiver pelo menos LEG e ANO
-            if 'LEG' in ref_dict and 'ANO' in ref_dict:
-                resultado.append(ref_dict)
+            art_atual = {}
+            detalhes_atual = {}
+            contador_art = 0
             
-        except Exception as e:
-            print(f"Erro ao processar referência: {str(e)}")
-            continue
-    
-    return resultado
\ No newline at end of file
+            for chave, valor in partes:
+                if chave == 'ART':
+                    # Salva artigo anterior se existir
+                    if art_atual:
+                        if detalhes_atual:
+                            art_atual['detalhes'] = detalhes_atual
+                        chave_art = 'ART' if contador_art == 0 else f'ART{contador_art+1}'
+                        ref_dict[chave_art] = art_atual.copy()
+                        
+                    # Inicia novo artigo
+                    contador_art += 1
+                    art_atual = {'numero': valor}
+                    detalhes_atual = {}
+                elif chave in ['PAR', 'INC', 'LET', 'ITEM', 'NUM']:
+                    detalhes_atual[chave] = valor
+                    
+            # Salva o último artigo
+            if art_atual:
+                if detalhes_atual:
+                    art_atual['detalhes'] = detalhes_atual
+                chave_art = 'ART' if contador_art == 1 else f'ART{contador_art}'
+                ref_dict[chave_art] = art_atual
+                
+        # Só adiciona ao resultado se tiver pelo menos LEG e ANO
+        if 'LEG' in ref_dict and 'ANO' in ref_dict:
+            return RegistroImutavel.congelar(ref_dict)
+        return None
+    except Exception as e:
+        print(f"Erro ao processar referência: {str(e)}")
+        return None
+
+def _parse_referencia_na_falta(ref: str) -> Optional[Dict]:
+    """Chamada pelo cache só nas faltas; com o cache cheio, a nova entrada descarta a mais antiga."""
+    info = _parse_referencia_cache.cache_info()
+    if info.maxsize is not None and info.currsize >= info.maxsize:
+        _contadores['evictions'] += 1
+    return _parse_referencia(ref)
+
+_parse_referencia_cache = lru_cache(maxsize=MAX_CACHE_REFERENCIAS)(_parse_referencia_na_falta)
+
+# Contagens acumuladas no processo, que sobrevivem à troca do cache em configurar_cache
+_contadores = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def configurar_cache(max_itens: int) -> None:
+    """Redimensiona (e esvazia) o cache de parse de referências do processo."""
+    global _parse_referencia_cache
+    info = _parse_referencia_cache.cache_info()
+    _contadores['hits'] += info.hits
+    _contadores['misses'] += info.misses
+    _parse_referencia_cache = lru_cache(maxsize=max_itens)(_parse_referencia_na_falta)
+
+def estatisticas_cache() -> Dict[str, int]:
+    """Acertos, faltas e evicções acumulados no processo, e tamanho do cache de parse de referências."""
+    info = _parse_referencia_cache.cache_info()
+    return {
+        'hits': _contadores['hits'] + info.hits,
+        'misses': _contadores['misses'] + info.misses,
+        'evictions': _contadores['evictions'],
+        'tamanho': info.currsize,
+        'maximo': info.maxsize
+    }
+
+def relatorio_cache(inicio: Optional[Dict[str, int]] = None) -> str:
+    """Resumo do cache para o relatório de processamento (desde `inicio`, se informado)."""
+    atual = estatisticas_cache()
+    inicio = inicio or {}
+    hits = atual['hits'] - inicio.get('hits', 0)
+    misses = atual['misses'] - inicio.get('misses', 0)
+    evictions = atual['evictions'] - inicio.get('evictions', 0)
+    taxa = hits / (hits + misses) if hits + misses else 0.0
+    return (f"Cache de referências legislativas: {hits} hits, {misses} misses, {evictions} evicções "
+            f"(taxa de acerto {taxa:.1%}, {atual['tamanho']}/{atual['maximo']} entradas)")
@@ -0,0 +1,185 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+# Campo opcional ausente (diferente de None, que é gravado como null)
+_AUSENTE = object()
+
+def _intern(valor: Any) -> Any:
+    """Interna strings de valores muito repetidos (tribunal, UF, siglas, datas)."""
+    return sys.intern(valor) if type(valor) is str else valor
+
+def _tupla(valores: Any, intern: bool = False) -> Any:
+    """Converte listas em tuplas (menores e imutáveis); a lista vazia vira a tupla vazia compartilhada."""
+    if not isinstance(valores, list):
+        return valores
+    return tuple(_intern(v) for v in valores) if intern else tuple(valores)
+
+class Registro(Mapping):
+    """
+    Base dos registros compactos da saída estruturada.
+    
+    Cada subclasse declara em `__slots__` os campos na ordem em que o parser
+    os gera; campos opcionais ausentes não são serializados. Os registros se
+    comportam como dicts somente leitura (get, [], items, in) e serializam
+    exatamente como o dict original via `para_json`.
+    """
+    
+    __slots__ = ()
+    _INTERNADOS: Tuple[str, ...] = ()  # campos com valores internados
+    
+    @classmethod
+    def de_dict(cls, dados: Any) -> Any:
+        """
+        Converte o dict de um parser no registro.
+        
+        Só converte se as chaves forem campos do registro e estiverem na mesma
+        ordem, o que garante o mesmo JSON; caso contrário, devolve o dict.
+        """
+        if not isinstance(dados, dict):
+            return dados
+        chaves = list(dados)
+        if chaves != [campo for campo in cls.__slots__ if campo in dados]:
+            return dados
+            
+        registro = cls.__new__(cls)
+        for campo in cls.__slots__:
+            valor = dados.get(campo, _AUSENTE)
+            if campo in cls._INTERNADOS:
+                valor = _intern(valor)
+            object.__setattr__(registro, campo, cls._converter(campo, valor))
+        return registro
+        
+    @classmethod
+    def _converter(cls, campo: str, valor: Any) -> Any:
+        """Converte valores aninhados de um campo (sobrescrito pelas subclasses)."""
+        return valor
+        
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        raise TypeError(f"{type(self).__name__} é somente leitura; use para_dict() para obter uma cópia mutável")
+        
+    def __getitem__(self, chave: str) -> Any:
+        if chave in self.__slots__:
+            valor = getattr(self, chave)
+            if valor is not _AUSENTE:
+                return valor
+        raise KeyError(chave)
+        
+    def __iter__(self) -> Iterator[str]:
+        return (campo for campo in self.__slots__ if getattr(self, campo) is not _AUSENTE)
+        
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+        
+    def para_json(self) -> Dict:
+        """Dict raso com os campos presentes, na ordem original (usado na serialização)."""
+        return {campo: getattr(self, campo) for campo in self.__slots__ if getattr(self, campo) is not _AUSENTE}
+        
+    def para_dict(self) -> Dict:
+        """Cópia profunda e mutável, com dicts e listas como a saída do parser."""
+        return _para_dict(self)
+        
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.para_json()!r})"
+        
+    def __eq__(self, outro: Any) -> bool:
+        if isinstance(outro, Mapping):
+            # Compara pelo JSON equivalente (tuplas e listas são iguais)
+            return _para_dict(self) == _para_dict(dict(outro.items()))
+        return NotImplemented
+        
+    __hash__ = None
+    
+    def __reduce__(self):
+        return (type(self).de_dict, (self.para_json(),))
+
+def _para_dict(valor: Any) -> Any:
+    if isinstance(valor, Registro):
+        return {campo: _para_dict(v) for campo, v in valor.para_json().items()}
+    if isinstance(valor, dict):
+        return {k: _para_dict(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_para_dict(v) for v in valor]
+    return valor
+
+class PublicacaoEstruturada(Registro):
+    __slots__ = ('meioPub', 'dataPublicacao', 'paginaPublicacao')
+    _INTERNADOS = ('meioPub', 'dataPublicacao')
+
+class AcordaoCitado(Registro):
+    __slots__ = ('tribunal', 'tipo', 'numero', 'estado', 'recursoRepetitivo', 'temas', 'id')
+    _INTERNADOS = ('tribunal', 'tipo', 'estado')
+    
+    @classmethod
+    def _converter(cls, campo: str, valor: Any) -> Any:
+        return _tupla(valor, intern=True) if campo == 'temas' else valor
+
+class CategoriaCitada(Registro):
+    __slots__ = ('categoriaPrincipal', 'subcategorias', 'acordaosCitados')
+    _INTERNADOS = ('categoriaPrincipal',)
+    
+    @classmethod
+    def _converter(cls, campo: str, valor: Any) -> Any:
+        if campo == 'subcategorias':
+            return _tupla(valor, intern=True)
+        if campo == 'acordaosCitados' and isinstance(valor, list):
+            return tuple(AcordaoCitado.de_dict(citado) for citado in valor)
+        return valor
+
+class JurisprudenciaCitada(Registro):
+    __slots__ = ('categorias',)
+    
+    @classmethod
+    def _converter(cls, campo: str, valor: Any) -> Any:
+        if isinstance(valor, list):
+            return tuple(CategoriaCitada.de_dict(categoria) for categoria in valor)
+        return valor
+
+class PublicacaoSimilar(Registro):
+    __slots__ = ('fonte', 'data', 'pagina')
+    _INTERNADOS = ('fonte', 'data')
+
+class AcordaoSimilar(Registro):
+    __slots__ = ('tribunal', 'tipo', 'numero', 'estado', 'registro', 'data_decisao', 'publicacoes')
+    _INTERNADOS = ('tribunal', 'tipo', 'estado', 'data_decisao')
+    
+    @classmethod
+    def _converter(cls, campo: str, valor: Any) -> Any:
+        if campo == 'publicacoes' and isinstance(valor, list):
+            return tuple(PublicacaoSimilar.de_dict(publicacao) for publicacao in valor)
+        return valor
+
+def _compactar_similares(valor: Any) -> Any:
+    if not isinstance(valor, dict):
+        return valor
+    return {sys.intern(chave): AcordaoSimilar.de_dict(similar) for chave, similar in valor.items()}
+
+def _compactar_complementares(valor: Any) -> Any:
+    if not isinstance(valor, dict):
+        return valor
+    return {sys.intern(secao): _tupla(itens, intern=True) for secao, itens in valor.items()}
+
+# Conversão de cada campo estruturado para a forma compacta. As referências
+# legislativas já são compartilhadas pelo cache de parse e ficam como estão.
+COMPACTADORES = {
+    'publicacaoEstruturada': PublicacaoEstruturada.de_dict,
+    'jurisprudenciaCitadaEstruturada': JurisprudenciaCitada.de_dict,
+    'acordaosSimilaresEstruturados': _compactar_similares,
+    'informacoesComplementaresEstruturadas': _compactar_complementares,
+    'termosAuxiliaresEstruturados': lambda valor: _tupla(valor, intern=True),
+}
+
+def compactar_acordao(acordao: Dict) -> Dict:
+    """Converte os campos estruturados de um acórdão processado em registros compactos (no lugar)."""
+    for campo, compactador in COMPACTADORES.items():
+        if acordao.get(campo) is not None:
+            acordao[campo] = compactador(acordao[campo])
+    return acordao
+
+def serializar_registro(obj: Any) -> Any:
+    """Hook `default` de serialização JSON para registros compactos (e outros Mappings, como o LazyAcordao)."""
+    if isinstance(obj, Registro):
+        return obj.para_json()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -1,16 +1,94 @@
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
+from array import array
 from collections import defaultdict
-import json
+import argparse
+import heapq
 import os
 from pathlib import Path
 
-class RelatorIndex:
-    """Índice para análise de relatores e citações entre eles."""
+from .cubo_relatores import CuboRelatores, MontadorCubo, np
+from .dedup import BloomFilter
+from .json_utils import dump_file, load_file
+from .particionamento import DESCONHECIDO
+from .sketches import CAPACIDADE_IDS, CAPACIDADE_PADRAO, ContadorTopK, formatar_top, id_numerico
+
+class _CitacoesPorRelator:
+    """
+    Citações recebidas por relator sem guardar conjuntos de ids.
+    
+    O relator de um acórdão citado só é conhecido quando o próprio acórdão
+    é lido, que pode ser depois da citação. Por isso ficam só arrays
+    compactos (id do acórdão e código do relator, id de cada citado), e as
+    citações são resolvidas de uma vez no relatório.
+    
+    Ao contrário dos sketches, os arrays crescem com o corpus: 12 bytes por
+    acórdão e 8 por acórdão citado (cerca de 20 MB por milhão de acórdãos
+    com uma citação em média).
+    """
     
     def __init__(self):
+        self.relatores: Dict[str, int] = {}
+        self._ids = array('q')
+        self._codigos = array('i')
+        self._citados = array('q')
+        
+    def registrar_acordao(self, acordao_id: str, relator: str) -> None:
+        codigo = self.relatores.setdefault(relator, len(self.relatores))
+        self._ids.append(id_numerico(acordao_id))
+        self._codigos.append(codigo)
+        
+    def registrar_citacao(self, citado_id: str) -> None:
+        self._citados.append(id_numerico(citado_id))
+        
+    def contagens(self) -> Dict[str, int]:
+        """Citações por relator do acórdão citado (citados fora do índice são ignorados)."""
+        nomes = list(self.relatores)
+        if np is None:
+            relator_de = dict(zip(self._ids, self._codigos))
+            totais = [0] * len(nomes)
+            for citado in self._citados:
+                if citado in relator_de:
+                    totais[relator_de[citado]] += 1
+            return dict(zip(nomes, totais))
+            
+        if not self._ids or not self._citados:
+            return dict.fromkeys(nomes, 0)
+        ids = np.frombuffer(self._ids, dtype=np.int64)
+        ordem = np.argsort(ids, kind='stable')
+        ids_ordenados = ids[ordem]
+        citados = np.frombuffer(self._citados, dtype=np.int64)
+        posicoes = np.minimum(np.searchsorted(ids_ordenados, citados), len(ids_ordenados) - 1)
+        encontrados = posicoes[ids_ordenados[posicoes] == citados]
+        codigos = np.frombuffer(self._codigos, dtype=np.int32)[ordem][encontrados]
+        return dict(zip(nomes, np.bincount(codigos, minlength=len(nomes)).tolist()))
+        
+    @property
+    def bytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self._ids, self._codigos, self._citados))
+
+class RelatorIndex:
+    """
+    Índice para análise de relatores e citações entre eles.
+    
+    Com `somente_contagem`, o índice não guarda os ids dos acórdãos: conta
+    relatores e órgãos em sketches de memória limitada (parsers.sketches) e
+    as citações em arrays compactos (_CitacoesPorRelator, que crescem com o
+    corpus), numa única passada, para o relatório. Um id repetido (o mesmo
+    acórdão em outro arquivo) entra só nos totais, como nos conjuntos: os ids
+    já contados ficam num filtro de Bloom para `capacidade_ids` acórdãos, e
+    um falso positivo (cerca de 1% acima da capacidade) deixa um acórdão
+    novo fora dos tops.
+    
+    No modo completo (com NumPy), cada acórdão também vai para um
+    MontadorCubo, de onde saem o cubo relator × ano × órgão e os tops do
+    relatório, sem percorrer os conjuntos.
+    """
+    
+    def __init__(self, somente_contagem: bool = False, capacidade: int = CAPACIDADE_PADRAO,
+                 capacidade_ids: int = CAPACIDADE_IDS):
         # Estruturas para indexação
         self.by_relator: Dict[str, Set[str]] = defaultdict(set)  # relator -> set de IDs de acórdãos
-        self.citations: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))  # relator -> relator_citado -> set de IDs
+        self.citations: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))  # relator -> id do acórdão citado -> set de IDs
         self.by_year: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))  # ano -> relator -> set de IDs
         self.by_orgao: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))  # órgão -> relator -> set de IDs
         
@@ -19,6 +97,17 @@ class RelatorIndex:
         self.total_citations = 0
         self.unique_relatores = set()
         
+        # Modo somente contagem
+        self.somente_contagem = somente_contagem
+        self.contadores: Dict[str, ContadorTopK] = (
+            {estrutura: ContadorTopK(capacidade) for estrutura in ('by_relator', 'by_orgao')}
+            if somente_contagem else {}
+        )
+        self._citacoes_recebidas = _CitacoesPorRelator()
+        self._contados = BloomFilter(capacidade_ids) if somente_contagem else None
+        # Células do cubo, acumuladas a cada acórdão (None: montado a partir dos conjuntos)
+        self._cubo = MontadorCubo() if np is not None and not somente_contagem else None
+        
     def add_acordao(self, acordao: dict) -> None:
         """Adiciona um acórdão ao índice."""
         if not acordao.get('id') or not acordao.get('ministroRelator'):
@@ -26,12 +115,16 @@ class RelatorIndex:
             
         acordao_id = acordao['id']
         relator = acordao['ministroRelator'].strip().upper()
+        if self.somente_contagem:
+            self._contar(acordao, acordao_id, relator)
+            return
         self.unique_relatores.add(relator)
         
         # Indexa por relator
         self.by_relator[relator].add(acordao_id)
         
         # Indexa por ano (se disponível)
+        ano = orgao = DESCONHECIDO
         if 'dataDecisao' in acordao:
             ano = acordao['dataDecisao'][:4]  # Primeiros 4 dígitos
             self.by_year[ano][relator].add(acordao_id)
@@ -41,6 +134,9 @@ class RelatorIndex:
             orgao = acordao['nomeOrgaoJulgador'].strip().upper()
             self.by_orgao[orgao][relator].add(acordao_id)
             
+        if self._cubo is not None:
+            self._cubo.adicionar_celula(acordao_id, relator, ano, orgao)
+            
         # Processa citações na jurisprudência
         jurisprudencia = acordao.get('jurisprudenciaCitadaEstruturada', {})
         for categoria in jurisprudencia.get('categorias', []):
@@ -49,7 +145,30 @@ class RelatorIndex:
                     self.total_citations += 1
                     # Adiciona a citação ao índice de citações
                     self.citations[relator][citacao['id']].add(acordao_id)
+                    
+        self.total_acordaos += 1
+        
+    def _contar(self, acordao: dict, acordao_id: str, relator: str) -> None:
+        """Conta o acórdão nos sketches; cada citado conta uma vez por acórdão, como nos conjuntos."""
+        novo = str(acordao_id) not in self._contados
+        if novo:
+            self._contados.add(str(acordao_id))
+            self.contadores['by_relator'].adicionar(relator)
+            if 'nomeOrgaoJulgador' in acordao:
+                self.contadores['by_orgao'].adicionar(acordao['nomeOrgaoJulgador'].strip().upper())
+            self._citacoes_recebidas.registrar_acordao(acordao_id, relator)
         
+        citados = {}
+        jurisprudencia = acordao.get('jurisprudenciaCitadaEstruturada', {})
+        for categoria in jurisprudencia.get('categorias', []):
+            for citacao in categoria.get('acordaosCitados', []):
+                if citacao.get('id'):
+                    self.total_citations += 1
+                    citados[citacao['id']] = None
+        if novo:
+            for citado_id in citados:
+                self._citacoes_recebidas.registrar_citacao(citado_id)
+            
         self.total_acordaos += 1
         
     def process_directory(self, base_path: str) -> None:
@@ -67,15 +186,14 @@ class RelatorIndex:
                 for filename in json_files:
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            acordaos = json.load(f)
-                            
+                        acordaos = load_file(filepath)
+                        
                         if not isinstance(acordaos, list):
                             acordaos = [acordaos]
                             
                         for acordao in acordaos:
                             self.add_acordao(acordao)
-                                
+                            
                         processed_files += 1
                         if processed_files % 100 == 0:
                             print(f"Processados {processed_files}/{total_files} arquivos")
@@ -85,56 +203,98 @@ class RelatorIndex:
                         
         self._generate_report()
         
+    def cubo(self) -> CuboRelatores:
+        """Cubo de contagens relator × ano × órgão (requer NumPy)."""
+        if self._cubo is not None:
+            return self._cubo.cubo()
+        return CuboRelatores.de_indice(self)
+        
     def _generate_report(self) -> None:
         """Gera relatório com estatísticas do índice."""
+        if self.somente_contagem:
+            relatores_unicos = self.contadores['by_relator'].total_distintos()
+            top_relatores = formatar_top(self.contadores['by_relator'].top_k(10), 'acórdãos')
+            top_orgaos = formatar_top(self.contadores['by_orgao'].top_k(10), 'acórdãos')
+            top_citados = self._format_counts(self._top_counts(self._citacoes_recebidas.contagens(), 10), 'citações')
+        else:
+            # Com NumPy, os tops de relatores e órgãos saem do cubo de contagens
+            cubo = self.cubo() if np is not None else None
+            relatores_unicos = len(self.unique_relatores)
+            top_relatores = (self._format_counts(cubo.top_k('relator', 10), 'acórdãos') if cubo is not None
+                             else self._format_top_items(self.by_relator, 10))
+            top_orgaos = (self._format_counts(cubo.top_k('orgao', 10, orgao=list(self.by_orgao)), 'acórdãos')
+                          if cubo is not None else self._format_top_orgaos(10))
+            top_citados = self._format_top_citations(10)
+            
         report = f"""
 === Relatório do Índice de Relatores ===
 
 Estatísticas Gerais:
 - Total de acórdãos: {self.total_acordaos:,}
 - Total de citações: {self.total_citations:,}
-- Relatores únicos: {len(self.unique_relatores):,}
+- Relatores únicos: {relatores_unicos:,}
 
 Top 10 Relatores por Número de Acórdãos:
-{self._format_top_items(self.by_relator, 10)}
+{top_relatores}
 
 Top 10 Relatores Mais Citados:
-{self._format_top_citations(10)}
+{top_citados}
 
 Top 10 Órgãos por Número de Acórdãos:
-{self._format_top_orgaos(10)}
+{top_orgaos}
 """
+        if self.somente_contagem:
+            exatos = all(contador.exato for contador in self.contadores.values())
+            precisao = 'contagens exatas' if exatos else 'contagens aproximadas, com erro máximo'
+            memoria = (sum(contador.bytes for contador in self.contadores.values()) + self._citacoes_recebidas.bytes
+                       + self._contados.bytes)
+            report += f"(modo somente contagem: {precisao}, ~{memoria / 2 ** 20:,.1f} MiB em sketches e arrays)\n"
         print(report)
         
+    @staticmethod
+    def _format_counts(items: List[Tuple[str, int]], unidade: str) -> str:
+        return '\n'.join(f"- {item}: {count:,} {unidade}" for item, count in items)
+        
+    @staticmethod
+    def _top_counts(counts: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+        """Top por contagem (sem zeros), com empates na ordem do dict."""
+        return heapq.nlargest(limit, ((item, count) for item, count in counts.items() if count), key=lambda x: x[1])
+        
     def _format_top_items(self, index: Dict[str, Set[str]], limit: int) -> str:
         """Formata os top items de um índice para o relatório."""
-        sorted_items = sorted(index.items(), key=lambda x: len(x[1]), reverse=True)[:limit]
+        sorted_items = heapq.nlargest(limit, index.items(), key=lambda x: len(x[1]))
         return '\n'.join(f"- {item}: {len(refs):,} acórdãos" 
                         for item, refs in sorted_items)
                         
     def _format_top_citations(self, limit: int) -> str:
-        """Formata os relatores mais citados para o relatório."""
-        citation_counts = defaultdict(int)
-        for relator_dict in self.citations.values():
-            for citacoes in relator_dict.values():
-                citation_counts[relator_dict] += len(citacoes)
-                
-        sorted_items = sorted(citation_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
-        return '\n'.join(f"- {item}: {count:,} citações" 
-                        for item, count in sorted_items)
-                        
+        """Formata os relatores mais citados (pelo relator do acórdão citado) para o relatório."""
+        relator_de = {acordao_id: relator for relator, ids in self.by_relator.items() for acordao_id in ids}
+        citation_counts = dict.fromkeys(self.by_relator, 0)
+        for citados in self.citations.values():
+            for citado_id, citantes in citados.items():
+                relator = relator_de.get(citado_id)
+                if relator is not None:
+                    citation_counts[relator] += len(citantes)
+                    
+        return self._format_counts(self._top_counts(citation_counts, limit), 'citações')
+        
     def _format_top_orgaos(self, limit: int) -> str:
         """Formata os órgãos com mais acórdãos para o relatório."""
         orgao_counts = {
             orgao: sum(len(acordaos) for acordaos in relatores.values())
             for orgao, relatores in self.by_orgao.items()
         }
-        sorted_items = sorted(orgao_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+        sorted_items = heapq.nlargest(limit, orgao_counts.items(), key=lambda x: x[1])
         return '\n'.join(f"- {item}: {count:,} acórdãos" 
                         for item, count in sorted_items)
-        
+                        
     def save_to_file(self, output_path: str) -> None:
-        """Salva o índice em arquivo JSON."""
+        """Salva o índice em arquivo JSON (no modo somente contagem, só as contagens)."""
+        if self.somente_contagem:
+            dump_file(self._resumo_contagem(), output_path)
+            print(f"\nContagens salvas em: {output_path}")
+            return
+            
         index_data = {
             'by_relator': {k: list(v) for k, v in self.by_relator.items()},
             'citations': {k: {k2: list(v2) for k2, v2 in v.items()} 
@@ -150,21 +310,66 @@ Top 10 Órgãos por Número de Acórdãos:
             }
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
-            
+        dump_file(index_data, output_path)
+        
         print(f"\nÍndice salvo em: {output_path}")
+        
+    def _resumo_contagem(self, limite: int = 100) -> Dict:
+        top = {estrutura: [[chave, contagem, erro] for chave, contagem, erro in contador.top_k(limite)]
+               for estrutura, contador in self.contadores.items()}
+        top['citations'] = [[relator, contagem, 0] for relator, contagem
+                            in self._top_counts(self._citacoes_recebidas.contagens(), limite)]
+        return {
+            'modo': 'contagem',
+            'top': top,
+            'exato': all(contador.exato for contador in self.contadores.values()),
+            'stats': {
+                'total_acordaos': self.total_acordaos,
+                'total_citations': self.total_citations,
+                'unique_relatores': self.contadores['by_relator'].total_distintos()
+            }
+        }
+        
+    @classmethod
+    def load_from_file(cls, path: str) -> 'RelatorIndex':
+        """Carrega um índice salvo com save_to_file."""
+        index_data = load_file(path)
+        if index_data.get('modo') == 'contagem':
+            raise ValueError(f"{path} tem só as contagens (modo somente contagem), não o índice")
+        index = cls()
+        # Os conjuntos carregados não passam pelo montador: o cubo sai deles
+        index._cubo = None
+        index.by_relator.update({k: set(v) for k, v in index_data.get('by_relator', {}).items()})
+        for attr in ('citations', 'by_year', 'by_orgao'):
+            destino = getattr(index, attr)
+            for k, v in index_data.get(attr, {}).items():
+                destino[k].update({k2: set(v2) for k2, v2 in v.items()})
+                
+        stats = index_data.get('stats', {})
+        index.total_acordaos = stats.get('total_acordaos', 0)
+        index.total_citations = stats.get('total_citations', 0)
+        index.unique_relatores = set(index.by_relator)
+        return index
 
-def main():
-    input_path = r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados"
-    output_path = r"D:\Dropbox\Github\Dados Abertos STJ\indices\relatores.json"
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Índice de relatores dos acórdãos processados")
+    parser.add_argument('--entrada', default=r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados",
+                        help="Diretório dos acórdãos processados")
+    parser.add_argument('--saida', default=r"D:\Dropbox\Github\Dados Abertos STJ\indices\relatores.json",
+                        help="Arquivo do índice")
+    parser.add_argument('--somente-contagem', action='store_true',
+                        help="Só as contagens, sem os ids dos acórdãos: tops em memória limitada, mas as "
+                             "citações por relator ainda ocupam ~20 bytes por acórdão")
+    parser.add_argument('--capacidade', type=int, default=CAPACIDADE_PADRAO,
+                        help="Chaves exatas por sketch no modo somente contagem")
+    args = parser.parse_args(argv)
     
     # Garante que o diretório de saída existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
     
-    index = RelatorIndex()
-    index.process_directory(input_path)
-    index.save_to_file(output_path)
+    index = RelatorIndex(somente_contagem=args.somente_contagem, capacidade=args.capacidade)
+    index.process_directory(args.entrada)
+    index.save_to_file(args.saida)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
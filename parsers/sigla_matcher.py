@@ -0,0 +1,124 @@
+import copy
+from typing import Dict, Iterable, List, Optional
+
+from .recursos_index import RecursosIndex
+
+# Marca de fim de chave na trie (tokens normalizados nunca são vazios)
+_FIM = ''
+
+# Conectivos das classes compostas ("AgRg no REsp", "EDcl nos EDcl na Rcl")
+_CONECTIVOS = ('no', 'na', 'nos', 'nas', 'em')
+
+def _normaliza_token(token: str) -> str:
+    """Remove pontos e ignora caixa para comparar tokens de siglas."""
+    return token.replace('.', '').casefold()
+
+class SiglaMatcher:
+    """
+    Normaliza siglas de classes processuais para a sigla padrão do RecursosIndex.
+    
+    As siglas conhecidas (e suas variações) são carregadas numa trie de tokens.
+    Uma sigla composta ("AGRG NO RESP", "A.g.R.g. no R.Esp", "AgInt no AREsp")
+    é normalizada numa única varredura, casando sempre o maior trecho conhecido
+    a partir de cada posição. Tokens desconhecidos são mantidos como vieram.
+    """
+    
+    def __init__(self, siglas: Dict[str, str], canonicas: Iterable[str] = (), max_cache: int = 100_000):
+        self._raiz: Dict = {}
+        self._cache: Dict[str, str] = {}  # tipo bruto -> sigla padrão
+        self._max_cache = max_cache
+        
+        for conectivo in _CONECTIVOS:
+            self._add(conectivo, conectivo)
+            
+        # Variações primeiro; as siglas padrão sobrescrevem colisões
+        for alternativa, sigla in siglas.items():
+            self._add(alternativa, sigla)
+        for sigla in canonicas:
+            self._add(sigla, sigla)
+            
+    @classmethod
+    def from_recursos(cls, recursos: Optional[RecursosIndex] = None, max_cache: int = 100_000) -> 'SiglaMatcher':
+        """Constrói o matcher a partir das siglas do RecursosIndex."""
+        if recursos is None:
+            recursos = RecursosIndex()
+        return cls(recursos.siglas, recursos.recursos.keys(), max_cache=max_cache)
+        
+    def _add(self, alternativa: str, sigla: str) -> None:
+        """Insere uma variação de sigla na trie."""
+        tokens = [_normaliza_token(t) for t in alternativa.split()]
+        tokens = [t for t in tokens if t]
+        if not tokens:
+            return
+            
+        no = self._raiz
+        for token in tokens:
+            no = no.setdefault(token, {})
+        no[_FIM] = sigla
+        
+    def copia(self) -> 'SiglaMatcher':
+        """Cópia independente da trie (com o cache vazio), para registrar siglas sem alterar este matcher."""
+        copia = SiglaMatcher.__new__(SiglaMatcher)
+        copia._raiz = copy.deepcopy(self._raiz)
+        copia._cache = {}
+        copia._max_cache = self._max_cache
+        return copia
+        
+    def registra(self, sigla: str) -> None:
+        """
+        Registra como conhecidos os tokens de uma sigla vinda dos próprios dados.
+        
+        Classes ausentes do CSV ("AgInt", "AREsp") passam a ser normalizadas
+        para a grafia registrada, independentemente de caixa e pontuação.
+        """
+        novo = False
+        for token in sigla.split():
+            token = token.replace('.', '')
+            chave = token.casefold()
+            if chave and _FIM not in self._raiz.get(chave, {}):
+                self._raiz.setdefault(chave, {})[_FIM] = token
+                novo = True
+                
+        if novo:
+            self._cache.clear()
+            
+    def canonicalize(self, tipo: str) -> str:
+        """Retorna a sigla padrão de um tipo de recurso, simples ou composto."""
+        cached = self._cache.get(tipo)
+        if cached is not None:
+            return cached
+            
+        originais = [t.replace('.', '') for t in tipo.split()]
+        originais = [t for t in originais if t]
+        chaves = [t.casefold() for t in originais]
+        
+        partes: List[str] = []
+        i = 0
+        n = len(chaves)
+        while i < n:
+            no = self._raiz
+            fim, sigla = i, None
+            j = i
+            while j < n:
+                no = no.get(chaves[j])
+                if no is None:
+                    break
+                j += 1
+                if _FIM in no:
+                    fim, sigla = j, no[_FIM]
+                    
+            if sigla is None:
+                partes.append(originais[i])
+                i += 1
+            else:
+                partes.append(sigla)
+                i = fim
+                
+        resultado = ' '.join(partes)
+        
+        if self._max_cache:
+            if len(self._cache) >= self._max_cache:
+                self._cache.clear()
+            self._cache[tipo] = resultado
+            
+        return resultado
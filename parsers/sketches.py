@@ -0,0 +1,232 @@
+import hashlib
+import heapq
+import math
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Capacidade padrão (chaves monitoradas) de cada top-k dos relatórios
+CAPACIDADE_PADRAO = 10_000
+
+# Acórdãos distintos previstos no filtro de ids já contados (~2,4 MB com 1% de falsos positivos)
+CAPACIDADE_IDS = 2_000_000
+
+_MASCARA_64 = (1 << 64) - 1
+_MULTIPLICADOR = 0x9E3779B97F4A7C15
+
+def _hash64(item: Hashable) -> int:
+    """Hash de 64 bits do item (o hash do Python, estável dentro do processo)."""
+    return hash(item) & _MASCARA_64
+
+def id_numerico(acordao_id: str) -> int:
+    """
+    Id de acórdão como inteiro de 63 bits, para guardar em arrays compactos.
+    
+    Ids numéricos (o caso dos dados do STJ) são usados diretamente; os demais
+    são resumidos com blake2b (colisões desprezíveis para este uso).
+    """
+    texto = str(acordao_id)
+    if texto.isdigit() and len(texto) < 19:
+        return int(texto)
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'big') >> 1
+
+class CountMin:
+    """
+    Sketch Count-Min: estimativas de frequência com memória fixa.
+    
+    A estimativa nunca subestima; com largura w, o erro é de no máximo
+    e/w do total inserido com probabilidade 1 - e^-profundidade.
+    """
+    
+    def __init__(self, largura: int = 2 ** 15, profundidade: int = 4):
+        self.bits = max(int(largura - 1).bit_length(), 1)
+        self.largura = 1 << self.bits
+        self.profundidade = profundidade
+        self._sementes = [_hash64(('count-min', linha)) | 1 for linha in range(profundidade)]
+        # Alocadas no primeiro uso
+        self._linhas: Optional[List[array]] = None
+        self.total = 0
+        
+    def _posicoes(self, item: Hashable) -> List[int]:
+        h = _hash64(item)
+        deslocamento = 64 - self.bits
+        return [(((h ^ semente) * _MULTIPLICADOR) & _MASCARA_64) >> deslocamento for semente in self._sementes]
+        
+    def adicionar(self, item: Hashable, quantidade: int = 1) -> int:
+        """Soma `quantidade` ao item e retorna a nova estimativa."""
+        if self._linhas is None:
+            self._linhas = [array('q', bytes(8 * self.largura)) for _ in range(self.profundidade)]
+        self.total += quantidade
+        estimativa = None
+        for linha, posicao in zip(self._linhas, self._posicoes(item)):
+            linha[posicao] += quantidade
+            estimativa = linha[posicao] if estimativa is None else min(estimativa, linha[posicao])
+        return estimativa
+        
+    def estimar(self, item: Hashable) -> int:
+        if self._linhas is None:
+            return 0
+        return min(linha[posicao] for linha, posicao in zip(self._linhas, self._posicoes(item)))
+        
+    @property
+    def bytes(self) -> int:
+        return sum(linha.itemsize * len(linha) for linha in self._linhas or ())
+
+class SpaceSaving:
+    """
+    Top-k aproximado (Space-Saving) com no máximo `capacidade` chaves.
+    
+    Enquanto houver espaço, as contagens são exatas. Cheia, uma chave nova
+    substitui a de menor contagem e herda essa contagem como erro máximo;
+    com um CountMin associado, herda a estimativa do sketch, em geral bem
+    menor. As contagens nunca ficam abaixo das reais.
+    
+    O CountMin só passa a ser atualizado no primeiro descarte: até ali as
+    contagens do dict são exatas e servem para inicializá-lo.
+    """
+    
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO, count_min: Optional[CountMin] = None):
+        self.capacidade = capacidade
+        self.count_min = count_min
+        self.contagens: Dict[Hashable, int] = {}
+        self.erros: Dict[Hashable, int] = {}
+        # Heap de (contagem, ordem, chave); contagens desatualizadas são corrigidas na remoção
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._ordem = 0
+        self.total = 0
+        self.descartes = 0
+        
+    @property
+    def exato(self) -> bool:
+        """True se nenhuma chave foi descartada (contagens e top-k exatos)."""
+        return self.descartes == 0
+        
+    def adicionar(self, item: Hashable, quantidade: int = 1) -> None:
+        self.total += quantidade
+        if item in self.contagens:
+            self.contagens[item] += quantidade
+            if self.descartes and self.count_min is not None:
+                self.count_min.adicionar(item, quantidade)
+            return
+            
+        contagem, erro = quantidade, 0
+        if len(self.contagens) >= self.capacidade:
+            estimativa = None
+            if self.count_min is not None:
+                if not self.descartes:
+                    for chave, valor in self.contagens.items():
+                        self.count_min.adicionar(chave, valor)
+                estimativa = self.count_min.adicionar(item, quantidade)
+            minimo = self._remover_minimo()
+            # A estimativa do CountMin nunca subestima. Limitá-la pelo mínimo
+            # quebraria o invariante do Space-Saving, então ela substitui o mínimo
+            contagem = estimativa if estimativa is not None else minimo + quantidade
+            erro = contagem - quantidade
+            
+        self.contagens[item] = contagem
+        if erro:
+            self.erros[item] = erro
+        self._ordem += 1
+        heapq.heappush(self._heap, (contagem, self._ordem, item))
+        
+    def _remover_minimo(self) -> int:
+        while True:
+            contagem, _, item = self._heap[0]
+            atual = self.contagens[item]
+            if atual == contagem:
+                heapq.heappop(self._heap)
+                del self.contagens[item]
+                self.erros.pop(item, None)
+                self.descartes += 1
+                return contagem
+            self._ordem += 1
+            heapq.heapreplace(self._heap, (atual, self._ordem, item))
+            
+    def top_k(self, k: int = 10) -> List[Tuple[Hashable, int, int]]:
+        """
+        As k chaves mais frequentes como (chave, contagem, erro máximo).
+        
+        Empates seguem a ordem de inserção, como sorted(..., reverse=True).
+        """
+        maiores = heapq.nlargest(k, self.contagens.items(), key=lambda item: item[1])
+        return [(chave, contagem, self.erros.get(chave, 0)) for chave, contagem in maiores]
+        
+    @property
+    def bytes(self) -> int:
+        """Memória aproximada das estruturas (dicts e heap), sem as chaves."""
+        tamanho = 100 * len(self.contagens) + 72 * len(self._heap)
+        return tamanho + (self.count_min.bytes if self.count_min is not None else 0)
+
+class HyperLogLog:
+    """Estimativa de cardinalidade com 2^precisao registradores de um byte."""
+    
+    def __init__(self, precisao: int = 14):
+        self.precisao = precisao
+        self.m = 1 << precisao
+        self._registradores = bytearray(self.m)
+        self._alfa = 0.7213 / (1 + 1.079 / self.m)
+        
+    def adicionar(self, item: Hashable) -> None:
+        h = (_hash64(item) * _MULTIPLICADOR) & _MASCARA_64
+        indice = h >> (64 - self.precisao)
+        resto = (h << self.precisao) & _MASCARA_64
+        # Posição do primeiro bit 1 nos bits restantes (alinhados à esquerda)
+        posicao = 64 - resto.bit_length() + 1 if resto else 64 - self.precisao + 1
+        if posicao > self._registradores[indice]:
+            self._registradores[indice] = posicao
+            
+    def estimar(self) -> int:
+        soma = sum(2.0 ** -r for r in self._registradores)
+        estimativa = self._alfa * self.m * self.m / soma
+        zeros = self._registradores.count(0)
+        if estimativa <= 2.5 * self.m and zeros:
+            # Correção para cardinalidades pequenas (linear counting)
+            estimativa = self.m * math.log(self.m / zeros)
+        return int(round(estimativa))
+
+class ContadorTopK:
+    """
+    Contagem de chaves para relatórios, em memória limitada.
+    
+    Combina SpaceSaving (com CountMin) para o top-k e HyperLogLog para o
+    número de chaves distintas. Enquanto nenhuma chave é descartada, tanto o
+    top-k quanto a contagem de distintas são exatos.
+    """
+    
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO, largura: int = 2 ** 15, profundidade: int = 4):
+        self.frequentes = SpaceSaving(capacidade, CountMin(largura, profundidade))
+        self.distintos = HyperLogLog()
+        
+    def adicionar(self, item: Hashable, quantidade: int = 1) -> None:
+        frequentes = self.frequentes
+        if not frequentes.exato:
+            self.distintos.adicionar(item)
+        elif item not in frequentes.contagens and len(frequentes.contagens) >= frequentes.capacidade:
+            # Primeiro descarte: até aqui as chaves distintas estão todas no dict
+            for chave in frequentes.contagens:
+                self.distintos.adicionar(chave)
+            self.distintos.adicionar(item)
+        frequentes.adicionar(item, quantidade)
+        
+    def adicionar_varios(self, itens: Iterable[Hashable]) -> None:
+        for item in itens:
+            self.adicionar(item)
+            
+    @property
+    def exato(self) -> bool:
+        return self.frequentes.exato
+        
+    def top_k(self, k: int = 10) -> List[Tuple[Hashable, int, int]]:
+        return self.frequentes.top_k(k)
+        
+    def total_distintos(self) -> int:
+        """Chaves distintas: exato sem descartes, senão estimado pelo HyperLogLog."""
+        return len(self.frequentes.contagens) if self.exato else self.distintos.estimar()
+        
+    @property
+    def bytes(self) -> int:
+        return self.frequentes.bytes + len(self.distintos._registradores)
+
+def formatar_top(itens: Iterable[Tuple[Hashable, int, int]], unidade: str) -> str:
+    """Linhas de relatório de um top-k; contagens aproximadas mostram o erro máximo."""
+    return '\n'.join(f"- {chave}: {contagem:,} {unidade}" + (f" (±{erro:,})" if erro else '')
+                     for chave, contagem, erro in itens)
@@ -0,0 +1,63 @@
+import ast
+import hashlib
+import os
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Set
+
+# Raiz do projeto: só módulos daqui entram nas versões (biblioteca padrão e dependências não)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def arquivo_do_modulo(modulo: str) -> Optional[str]:
+    """Arquivo-fonte de um módulo do projeto (None se não for do projeto)."""
+    caminho = os.path.join(RAIZ, *modulo.split('.'))
+    for arquivo in (caminho + '.py', os.path.join(caminho, '__init__.py')):
+        if os.path.isfile(arquivo):
+            return arquivo
+    return None
+
+@lru_cache(maxsize=None)
+def _importados(modulo: str, arquivo: str) -> FrozenSet[str]:
+    """Módulos importados pelo arquivo, em qualquer ponto (inclusive dentro de funções)."""
+    with open(arquivo, 'rb') as f:
+        arvore = ast.parse(f.read(), arquivo)
+    pacote = modulo if arquivo.endswith('__init__.py') else modulo.rpartition('.')[0]
+    
+    nomes = set()
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom):
+            if no.level:
+                partes = pacote.split('.')
+                base = '.'.join(partes[:len(partes) - no.level + 1])
+                base = f"{base}.{no.module}" if no.module else base
+            else:
+                base = no.module
+            nomes.add(base)
+            # `from pacote import submodulo`
+            nomes.update(f"{base}.{alias.name}" for alias in no.names)
+    return frozenset(nome for nome in nomes if arquivo_do_modulo(nome))
+
+def modulos_locais(modulos: Iterable[str]) -> List[str]:
+    """Os módulos e todos os módulos do projeto que eles importam, direta ou indiretamente."""
+    vistos: Set[str] = set()
+    fila = list(modulos)
+    while fila:
+        modulo = fila.pop()
+        if modulo in vistos:
+            continue
+        arquivo = arquivo_do_modulo(modulo)
+        if arquivo is None:
+            raise ValueError(f"Módulo não encontrado no projeto: {modulo}")
+        vistos.add(modulo)
+        fila.extend(_importados(modulo, arquivo) - vistos)
+    return sorted(vistos)
+
+def versao_fonte(modulos: Iterable[str], tamanho: int = 4) -> str:
+    """Hash curto do código-fonte dos módulos e de tudo o que eles importam do projeto."""
+    h = hashlib.blake2b(digest_size=tamanho)
+    for modulo in modulos_locais(modulos):
+        h.update(f"{modulo}\n".encode('utf-8'))
+        with open(arquivo_do_modulo(modulo), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
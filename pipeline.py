@@ -0,0 +1,395 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from functools import partial
+from importlib import import_module
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from parsers.json_utils import dump_file, dumps, load_file
+from parsers.versoes import arquivo_do_modulo, modulos_locais
+
+# Versão do próprio orquestrador; mudá-la invalida todos os carimbos
+VERSAO_PIPELINE = '1'
+
+DIRETORIO_CARIMBOS = '.pipeline'
+
+class Etapa:
+    """
+    Etapa do pipeline, com entradas e saídas explícitas.
+    
+    Uma etapa depende de outra quando alguma de suas entradas é saída da
+    outra. `modulos` são os módulos que a etapa chama: a versão da etapa é o
+    código-fonte deles e de tudo o que importam do projeto. `parametros` são
+    as opções da configuração que alteram sua saída.
+    A função recebe a configuração completa e roda num processo separado.
+    """
+    
+    def __init__(self, nome: str, funcao: Callable[[Dict], None], entradas: Iterable[str],
+                 saidas: Iterable[str], modulos: Iterable[str] = (), parametros: Iterable[str] = ()):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        self.modulos = list(modulos)
+        self.parametros = list(parametros)
+
+def _arquivos_monitorados(path: str) -> List[str]:
+    """
+    Arquivos de um caminho que entram no hash de conteúdo.
+    
+    Em diretórios, só contam os arquivos das pastas 'Espelho*' e os .zip (o
+    mesmo que listar_fontes lê), para que relatórios e bancos auxiliares
+    gravados junto da saída não invalidem as etapas seguintes.
+    """
+    if os.path.isfile(path):
+        return [path]
+        
+    arquivos = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != DIRETORIO_CARIMBOS)
+        em_espelho = os.path.basename(root).startswith("Espelho")
+        arquivos.extend(os.path.join(root, f) for f in sorted(files) if em_espelho or f.endswith('.zip'))
+    return arquivos
+
+class _CacheHashes:
+    """Hashes de arquivos por (caminho, tamanho, mtime), para não reler arquivos inalterados"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self._hashes = load_file(path)
+        except (OSError, ValueError):
+            self._hashes = {}
+        self._usados: Dict[str, Dict] = {}
+        
+    def hash_arquivo(self, caminho: str) -> str:
+        info = os.stat(caminho)
+        chave = os.path.abspath(caminho)
+        anterior = self._hashes.get(chave)
+        if anterior and anterior['tamanho'] == info.st_size and anterior['mtime'] == info.st_mtime_ns:
+            self._usados[chave] = anterior
+            return anterior['hash']
+            
+        hash_ = hash_arquivo(caminho)
+        self._usados[chave] = {'tamanho': info.st_size, 'mtime': info.st_mtime_ns, 'hash': hash_}
+        return hash_
+        
+    def salvar(self) -> None:
+        self._hashes.update(self._usados)
+        dump_file(self._hashes, self.path, indent=None)
+
+def hash_arquivo(caminho: str) -> str:
+    """Hash do conteúdo de um arquivo."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def hash_entradas(caminhos: Iterable[str], cache: Optional[_CacheHashes] = None) -> str:
+    """Hash do conteúdo de arquivos e diretórios (caminho relativo + conteúdo de cada arquivo)."""
+    h = hashlib.blake2b(digest_size=16)
+    for caminho in caminhos:
+        h.update(f"\0{os.path.abspath(caminho)}\0".encode('utf-8'))
+        if not os.path.exists(caminho):
+            h.update(b'<ausente>')
+            continue
+            
+        for arquivo in _arquivos_monitorados(caminho):
+            conteudo = cache.hash_arquivo(arquivo) if cache else hash_arquivo(arquivo)
+            h.update(f"{os.path.relpath(arquivo, caminho)}:{conteudo}\n".encode('utf-8'))
+    return h.hexdigest()
+
+def versao_codigo(modulos: Iterable[str]) -> str:
+    """
+    Hash do código-fonte dos módulos e de todos os módulos do projeto que eles importam.
+    
+    Pacotes incluem todos os seus .py. As importações são seguidas
+    transitivamente (parsers.versoes.modulos_locais), então uma etapa só
+    precisa listar os módulos que chama diretamente.
+    """
+    sementes = []
+    for modulo in modulos:
+        arquivo = arquivo_do_modulo(modulo)
+        if arquivo is None:
+            raise ValueError(f"Módulo não encontrado: {modulo}")
+        sementes.append(modulo)
+        if os.path.basename(arquivo) == '__init__.py':
+            pasta = os.path.dirname(arquivo)
+            sementes.extend(f"{modulo}.{f[:-3]}" for f in os.listdir(pasta) if f.endswith('.py') and f != '__init__.py')
+            
+    h = hashlib.blake2b(digest_size=16)
+    h.update(VERSAO_PIPELINE.encode('utf-8'))
+    for modulo in modulos_locais(sementes):
+        h.update(f"{modulo}\n".encode('utf-8'))
+        with open(arquivo_do_modulo(modulo), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+# Funções das etapas (nível de módulo, para rodarem em outros processos)
+
+def _etapa_indice_acordaos(config: Dict) -> None:
+    from parsers.acordao_index import AcordaoIndex
+    from parsers.sigla_matcher import SiglaMatcher
+    
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    index.build_from_directory(config['entrada'])
+    index.save_to_file(os.path.join(config['indices'], 'acordaos.json'))
+
+def _etapa_parse(config: Dict) -> None:
+    from parsers.output_schema import OutputSchema
+    from process_stj_data import process_directory
+    
+    process_directory(config['entrada'], config['saida'], io_workers=config['io_workers'],
+                      schema=OutputSchema.carregar(config['schema']), dedup=config['dedup'],
+                      indice_path=os.path.join(config['indices'], 'acordaos.json'))
+
+def _etapa_exportacao(config: Dict) -> None:
+    from parsers.particionamento import particionar_diretorio
+    
+    particionar_diretorio(config['saida'], config['particionado'])
+
+def _etapa_montadores(config: Dict) -> None:
+    from parsers.montadores import montar_indices
+    
+    montar_indices(config['saida'], config['indices'], colunas=config['colunas'],
+                   indice_path=os.path.join(config['indices'], 'acordaos.json'))
+
+def _etapa_indice_analitico(config: Dict, classe: str, arquivo: str, contagem: bool = False) -> None:
+    modulo, nome = classe.rsplit('.', 1)
+    opcoes = {'somente_contagem': True} if contagem and config.get('somente_contagem') else {}
+    index = getattr(import_module(modulo), nome)(**opcoes)
+    index.process_directory(config['saida'])
+    index.save_to_file(os.path.join(config['indices'], arquivo))
+
+def etapas_padrao(config: Dict) -> List[Etapa]:
+    """Etapas do pipeline completo: índice de acórdãos, parse, exportação e índices analíticos."""
+    entrada, saida, indices = config['entrada'], config['saida'], config['indices']
+    dados = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsers', 'data')
+    recursos_csv = os.path.join(dados, 'recursos.csv')
+    ministros_csv = os.path.join(dados, 'ministros.csv')
+    
+    def indice(nome: str) -> str:
+        return os.path.join(indices, nome)
+        
+    def analitico(nome: str, classe: str, arquivo: str, entradas: List[str], contagem: bool = False) -> Etapa:
+        # `contagem`: a classe aceita somente_contagem, ligado pela opção de mesmo nome da configuração
+        return Etapa(nome, partial(_etapa_indice_analitico, classe=classe, arquivo=arquivo, contagem=contagem),
+                     entradas, [indice(arquivo)], modulos=[classe.rsplit('.', 1)[0]],
+                     parametros=['somente_contagem'] if contagem else [])
+                     
+    return [
+        Etapa('indice_acordaos', _etapa_indice_acordaos, [entrada, recursos_csv], [indice('acordaos.json')],
+              modulos=['parsers.acordao_index', 'parsers.sigla_matcher']),
+        Etapa('parse', _etapa_parse, [entrada, indice('acordaos.json')], [saida],
+              modulos=['process_stj_data'], parametros=['schema', 'dedup']),
+        Etapa('exportacao', _etapa_exportacao, [saida], [config['particionado']],
+              modulos=['parsers.particionamento']),
+        analitico('referencias_legislativas', 'parsers.legal_references_index.LegalReferencesIndex',
+                  'referencias_legislativas.json', [saida], contagem=True),
+        Etapa('montadores', _etapa_montadores, [saida, indice('acordaos.json')],
+              [indice('precedentes'), indice('cocitacao'), indice('clusters_similares'), indice('cubo_relatores'),
+               config['colunas']],
+              modulos=['parsers.montadores']),
+        analitico('relatores', 'parsers.relator_index.RelatorIndex', 'relatores.json', [saida], contagem=True),
+        analitico('ministros', 'parsers.ministros_index.MinistrosIndex', 'ministros.json', [saida, ministros_csv]),
+        analitico('recursos', 'parsers.recursos_index.RecursosIndex', 'recursos.json', [saida, recursos_csv]),
+    ]
+
+class Pipeline:
+    """
+    Executa um DAG de etapas, em paralelo quando independentes.
+    
+    Cada etapa concluída grava um carimbo com o hash de suas entradas, a
+    versão do código e os parâmetros. Na execução seguinte, a etapa é pulada
+    se o carimbo continua válido e suas saídas existem.
+    """
+    
+    def __init__(self, etapas: List[Etapa], config: Dict, workers: int = 2, forcar: Iterable[str] = ()):
+        self.etapas = {etapa.nome: etapa for etapa in etapas}
+        self.config = config
+        self.workers = max(workers, 1)
+        self.forcar = set(forcar)
+        self.carimbos_path = os.path.join(config['saida'], DIRETORIO_CARIMBOS)
+        os.makedirs(self.carimbos_path, exist_ok=True)
+        self._hashes = _CacheHashes(os.path.join(self.carimbos_path, 'hashes.json'))
+        
+        # Dependências: entradas que são saídas de outras etapas
+        produtor = {os.path.abspath(s): etapa.nome for etapa in etapas for s in etapa.saidas}
+        self.dependencias: Dict[str, Set[str]] = {
+            etapa.nome: {produtor[os.path.abspath(e)] for e in etapa.entradas
+                         if os.path.abspath(e) in produtor and produtor[os.path.abspath(e)] != etapa.nome}
+            for etapa in etapas
+        }
+        self._validar_aciclico()
+        
+    def _validar_aciclico(self) -> None:
+        visitando, concluidas = set(), set()
+        
+        def visitar(nome: str) -> None:
+            if nome in concluidas:
+                return
+            if nome in visitando:
+                raise ValueError(f"Ciclo entre as etapas do pipeline passando por '{nome}'")
+            visitando.add(nome)
+            for dependencia in self.dependencias[nome]:
+                visitar(dependencia)
+            visitando.discard(nome)
+            concluidas.add(nome)
+            
+        for nome in self.etapas:
+            visitar(nome)
+            
+    def _carimbo_path(self, nome: str) -> str:
+        return os.path.join(self.carimbos_path, f"{nome}.json")
+        
+    def carimbo(self, etapa: Etapa) -> Dict:
+        """Carimbo atual de uma etapa (hash das entradas, versão do código e parâmetros)."""
+        return {
+            'entradas': hash_entradas(etapa.entradas, self._hashes),
+            'codigo': versao_codigo(etapa.modulos),
+            'parametros': dumps({p: self.config.get(p) for p in etapa.parametros}, sort_keys=True)
+        }
+        
+    def atualizada(self, etapa: Etapa, carimbo: Dict) -> bool:
+        """Indica se a etapa pode ser pulada."""
+        if etapa.nome in self.forcar or not all(os.path.exists(s) for s in etapa.saidas):
+            return False
+        try:
+            anterior = load_file(self._carimbo_path(etapa.nome))
+        except (OSError, ValueError):
+            return False
+        return all(anterior.get(k) == v for k, v in carimbo.items())
+        
+    def com_dependencias(self, selecionadas: Iterable[str]) -> Set[str]:
+        """Etapas selecionadas mais todas as suas dependências (diretas e indiretas)."""
+        etapas: Set[str] = set()
+        fila = list(selecionadas)
+        while fila:
+            nome = fila.pop()
+            if nome not in self.etapas:
+                raise ValueError(f"Etapa desconhecida: {nome}")
+            if nome not in etapas:
+                etapas.add(nome)
+                fila.extend(self.dependencias[nome])
+        return etapas
+        
+    def executar(self, selecionadas: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Executa as etapas selecionadas (padrão: todas) e suas dependências.
+        
+        Returns:
+            Situação final de cada etapa: 'executada', 'pulada', 'falhou' ou
+            'cancelada' (dependência falhou)
+        """
+        pendentes = self.com_dependencias(selecionadas) if selecionadas else set(self.etapas)
+        situacao: Dict[str, str] = {}
+        em_execucao: Dict[Future, tuple] = {}
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pendentes or em_execucao:
+                for nome in sorted(pendentes):
+                    dependencias = self.dependencias[nome]
+                    if any(situacao.get(d) in ('falhou', 'cancelada') for d in dependencias):
+                        situacao[nome] = 'cancelada'
+                        pendentes.discard(nome)
+                        print(f"[{nome}] cancelada: dependência falhou")
+                        continue
+                    if len(em_execucao) >= self.workers or not all(d in situacao for d in dependencias):
+                        continue
+                        
+                    pendentes.discard(nome)
+                    etapa = self.etapas[nome]
+                    carimbo = self.carimbo(etapa)
+                    if self.atualizada(etapa, carimbo):
+                        situacao[nome] = 'pulada'
+                        print(f"[{nome}] pulada: entradas e código inalterados")
+                        continue
+                        
+                    print(f"[{nome}] iniciada")
+                    for saida in etapa.saidas:
+                        os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+                    em_execucao[pool.submit(etapa.funcao, self.config)] = (nome, carimbo, time.perf_counter())
+                    
+                if not em_execucao:
+                    continue
+                    
+                concluidos, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    nome, carimbo, inicio = em_execucao.pop(futuro)
+                    try:
+                        futuro.result()
+                    except Exception as e:
+                        situacao[nome] = 'falhou'
+                        print(f"[{nome}] falhou: {str(e)}")
+                        continue
+                        
+                    situacao[nome] = 'executada'
+                    dump_file(dict(carimbo, concluida_em=datetime.now().isoformat()), self._carimbo_path(nome))
+                    print(f"[{nome}] concluída em {time.perf_counter() - inicio:.1f}s")
+                    
+        self._hashes.salvar()
+        return situacao
+        
+    def status(self) -> Dict[str, str]:
+        """Situação de cada etapa sem executá-las: 'atualizada' ou 'pendente'."""
+        return {nome: 'atualizada' if self.atualizada(etapa, self.carimbo(etapa)) else 'pendente'
+                for nome, etapa in self.etapas.items()}
+
+def _config(args: argparse.Namespace) -> Dict:
+    return {
+        'entrada': args.entrada,
+        'saida': args.saida,
+        'indices': args.indices or os.path.join(args.saida, 'indices'),
+        'particionado': args.particionado or os.path.join(args.saida, 'particionado'),
+        'colunas': args.colunas or os.path.join(args.saida, 'colunas'),
+        'schema': args.schema,
+        'dedup': args.dedup,
+        'io_workers': args.io_workers,
+        'somente_contagem': args.somente_contagem,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline completo dos Espelhos de Acórdãos do STJ")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    
+    for comando, ajuda in (('run', "Executa as etapas desatualizadas"), ('status', "Mostra as etapas pendentes")):
+        sub = subparsers.add_parser(comando, help=ajuda)
+        sub.add_argument('--entrada', default=r"D:\Dropbox\Github\Dados Abertos STJ\downloads",
+                         help="Diretório com as pastas 'Espelho*' baixadas")
+        sub.add_argument('--saida', default=r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados",
+                         help="Diretório dos acórdãos processados")
+        sub.add_argument('--indices', default=None, help="Diretório dos índices (padrão: <saida>/indices)")
+        sub.add_argument('--particionado', default=None,
+                         help="Diretório da saída particionada (padrão: <saida>/particionado)")
+        sub.add_argument('--colunas', default=None,
+                         help="Diretório das colunas de metadados (padrão: <saida>/colunas)")
+        sub.add_argument('--schema', default='completo', help="Schema de saída do parse")
+        sub.add_argument('--dedup', action='store_true', help="Deduplica acórdãos no parse")
+        sub.add_argument('--somente-contagem', action='store_true',
+                         help="Índices de relatores e de referências legislativas só com as contagens, em memória "
+                              "limitada (sem os ids dos acórdãos; as citações por relator ainda ocupam ~20 bytes "
+                              "por acórdão; o serviço de consultas e o monitor não os carregam)")
+        sub.add_argument('--workers', type=int, default=2, help="Etapas executadas em paralelo")
+        sub.add_argument('--io-workers', type=int, default=0, help="Threads de E/S do parse")
+        sub.add_argument('--etapas', default=None,
+                         help="Etapas a executar, separadas por vírgula (inclui as dependências)")
+        sub.add_argument('--forcar', default='', help="Etapas a executar mesmo se atualizadas, separadas por vírgula")
+        
+    args = parser.parse_args()
+    config = _config(args)
+    pipeline = Pipeline(etapas_padrao(config), config, workers=args.workers,
+                        forcar=[e for e in args.forcar.split(',') if e])
+                        
+    if args.comando == 'status':
+        for nome, estado in pipeline.status().items():
+            dependencias = ', '.join(sorted(pipeline.dependencias[nome])) or '-'
+            print(f"{nome:<26} {estado:<11} depende de: {dependencias}")
+    else:
+        situacao = pipeline.executar(args.etapas.split(',') if args.etapas else None)
+        print("\n" + '\n'.join(f"{nome}: {estado}" for nome, estado in sorted(situacao.items())))
+        sys.exit(1 if any(estado in ('falhou', 'cancelada') for estado in situacao.values()) else 0)
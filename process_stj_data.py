@@ -1,109 +1,366 @@
-import json
+import argparse
+import hashlib
 import os
+import socket
+import time
+import zlib
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Union
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
-from parsers.data_publicacao import parse_data_publicacao
-from parsers.acordaos_similares import parse_acordaos_similares
-from parsers.jurisprudencia_citada import parse_jurisprudencia_citada
-from parsers.referencias_legislativas import parse_referencias_legislativas
-from parsers.complementary_info import parse_complementary_info
-from parsers.termos_auxiliares import parse_termos_auxiliares
 from parsers.acordao_index import AcordaoIndex
-from parsers.json_utils import process_json_content
+from parsers.cdc import ChangeTracker
+from parsers.dedup import IGNORAR, MANTER, Deduplicador, caminho_padrao as caminho_dedup
+from parsers.input_sources import FonteJson, listar_fontes
+from parsers.leases import GerenciadorLeases, gravar_atomico
+from parsers.particionamento import EscritorParticionado
+from parsers.output_schema import (CAMPO_VERSOES, CAMPOS_ESTRUTURADOS, PARSERS_ESTRUTURADOS, SCHEMA_COMPLETO,
+                                   MODULOS_PARSERS, OutputSchema, ParserError, versao_parser)
+from parsers.registros import compactar_acordao
+from parsers.referencias_legislativas import estatisticas_cache, relatorio_cache
+from parsers.versoes import versao_fonte
+from parsers.quarentena import Quarentena, mesclar_recuperados
+from parsers.sigla_matcher import SiglaMatcher
+from parsers.json_utils import dump_file, dumps, load_file, process_json_content
 
-def process_acordao(acordao: Dict, index: AcordaoIndex) -> Dict:
-    """Processa todos os campos de um acórdão"""
+def process_acordao(acordao: Dict, index: AcordaoIndex, schema: Optional[OutputSchema] = None,
+                    compacto: bool = False) -> Dict:
+    """
+    Processa os campos de um acórdão
     
-    # Processa data de publicação
-    if 'dataPublicacao' in acordao and acordao['dataPublicacao']:
-        acordao['publicacaoEstruturada'] = parse_data_publicacao(acordao['dataPublicacao'])
+    Só rodam os parsers habilitados no schema (por padrão, todos), e a saída é
+    projetada nos campos que o schema mantém. Falhas de um parser são
+    levantadas como ParserError, indicando o campo que falhou. Se o schema
+    pede (`versoes`), cada campo gerado tem a versão do seu parser anotada em
+    `versoesParsers` (ver recompute_fields). Com `compacto`, os campos estruturados viram registros
+    com __slots__ (parsers.registros), que ocupam menos memória e serializam
+    no mesmo JSON.
+    """
+    schema = schema or SCHEMA_COMPLETO
     
-    # Processa jurisprudência citada
-    if 'jurisprudenciaCitada' in acordao and acordao['jurisprudenciaCitada']:
-        acordao['jurisprudenciaCitadaEstruturada'] = parse_jurisprudencia_citada(
-            acordao['jurisprudenciaCitada'],
-            index=index
-        )
-    
-    # Processa referências legislativas
-    if 'referenciasLegislativas' in acordao and acordao['referenciasLegislativas']:
-        acordao['referenciasLegislativasEstruturadas'] = parse_referencias_legislativas(acordao['referenciasLegislativas'])
+    versoes = {}
+    for campo_bruto, campo_estruturado, parser in PARSERS_ESTRUTURADOS:
+        if schema.executa(campo_estruturado) and acordao.get(campo_bruto):
+            try:
+                acordao[campo_estruturado] = parser(acordao[campo_bruto], index)
+            except Exception as e:
+                raise ParserError(campo_estruturado, e) from e
+            if schema.versoes:
+                versoes[campo_estruturado] = versao_parser(campo_estruturado)
+                
+    if versoes:
+        acordao[CAMPO_VERSOES] = versoes
+    if compacto:
+        compactar_acordao(acordao)
+    return schema.projeta(acordao)
+
+class _Execucao:
+    """Estado compartilhado de uma execução de process_directory"""
     
-    # Processa acórdãos similares
-    if 'acordaosSimilares' in acordao and acordao['acordaosSimilares']:
-        acordao['acordaosSimilaresEstruturados'] = parse_acordaos_similares(acordao['acordaosSimilares'])
+    def __init__(self, input_base_path: str, output_base_path: str, index: AcordaoIndex,
+                 schema: OutputSchema, quarentena: Quarentena, dedup: Optional[Deduplicador] = None,
+                 cdc: Optional[ChangeTracker] = None, particionado: Optional[EscritorParticionado] = None,
+                 compacto: bool = False):
+        self.input_base_path = input_base_path
+        self.output_base_path = output_base_path
+        self.index = index
+        self.schema = schema
+        self.quarentena = quarentena
+        self.dedup = dedup
+        self.cdc = cdc
+        self.particionado = particionado
+        self.compacto = compacto
+        
+        self.total_arquivos = 0
+        self.arquivos_processados = 0
+        self.total_acordaos = 0
+        self.erros: List[str] = []
+        self.saidas_com_erro: List[str] = []
+        # Ids reservados no deduplicador por arquivo, confirmados só depois da gravação
+        self._reservas: Dict[str, List[str]] = {}
+        
+    def processar_conteudo(self, content: str, fonte: FonteJson) -> Optional[List[Dict]]:
+        """
+        Faz o parse do conteúdo de um arquivo e processa seus acórdãos
+        
+        Acórdãos que falham vão para a quarentena; os demais seguem para a saída.
+        Com deduplicação, duplicados são descartados sem parse e acórdãos
+        inalterados reaproveitam a saída já gravada; os ids só entram no
+        histórico depois que a saída é gravada. Com saída particionada,
+        os acórdãos também vão para suas partições. O delta do CDC só é
+        gerado depois que a saída é gravada (registrar_sucesso).
+        """
+        acordaos = process_json_content(content)
+        if not acordaos:
+            # A saída anterior do arquivo não é regravada: o CDC não pode tomar os ids dela como removidos
+            self.saidas_com_erro.append(fonte.caminho_relativo)
+            return None
+            
+        if not isinstance(acordaos, list):
+            acordaos = [acordaos]
+            
+        processed_data = []
+        anteriores = None
+        reservados = self._reservas[fonte.caminho_relativo] = []
+        for indice, acordao in enumerate(acordaos):
+            if self.dedup:
+                decisao = self.dedup.classificar(acordao, fonte.caminho_relativo)
+                if decisao == IGNORAR:
+                    self._manter_no_delta(acordao)
+                    continue
+                if isinstance(acordao, dict) and acordao.get('id'):
+                    reservados.append(acordao['id'])
+                if decisao == MANTER:
+                    if anteriores is None:
+                        anteriores = self._saida_anterior(fonte)
+                    if acordao['id'] in anteriores:
+                        processed_data.append(anteriores[acordao['id']])
+                        continue
+                        
+            try:
+                processado = process_acordao(acordao, self.index, self.schema, self.compacto)
+            except Exception as e:
+                self.quarentena.registrar(fonte.origem, fonte.caminho_relativo, indice, acordao, e, processed_data)
+                # Falhou agora, mas não foi removido da fonte
+                self._manter_no_delta(acordao)
+                if self.dedup and reservados and isinstance(acordao, dict) and reservados[-1] == acordao.get('id'):
+                    # Uma versão mais antiga do mesmo id pode ocupar o lugar deste
+                    self.dedup.liberar([reservados.pop()])
+                continue
+                
+            processed_data.append(processado)
+            
+        if self.particionado:
+            self.particionado.adicionar(processed_data)
+            
+        self.total_acordaos += len(processed_data)
+        return processed_data
+        
+    def _manter_no_delta(self, acordao: Dict) -> None:
+        """Marca um acórdão não gravado como ainda presente (só com CDC)"""
+        if self.cdc and isinstance(acordao, dict) and acordao.get('id'):
+            self.cdc.tocar(acordao['id'])
+            
+    def _saida_anterior(self, fonte: FonteJson) -> Dict[str, Dict]:
+        """Carrega os acórdãos já gravados na saída de uma fonte, por id"""
+        output_file = os.path.join(self.output_base_path, fonte.caminho_relativo)
+        try:
+            return {a['id']: a for a in load_file(output_file) if isinstance(a, dict) and a.get('id')}
+        except (OSError, ValueError):
+            return {}
+            
+    def registrar_sucesso(self, fonte: FonteJson, processed_data: List[Dict]) -> None:
+        """Contabiliza um arquivo gravado com sucesso e compara seus acórdãos com a execução anterior (CDC)"""
+        reservados = self._reservas.pop(fonte.caminho_relativo, [])
+        if self.dedup:
+            self.dedup.confirmar(reservados)
+        if self.cdc:
+            for processado in processed_data:
+                self.cdc.registrar(processado, fonte.caminho_relativo)
+        self.arquivos_processados += 1
+        
+        if self.arquivos_processados % 100 == 0:
+            print(f"Processados {self.arquivos_processados}/{self.total_arquivos} arquivos")
+            
+    def registrar_erro(self, fonte: FonteJson, e: Exception) -> None:
+        """Registra o erro de processamento de um arquivo"""
+        erro = f"Erro ao processar {fonte.origem}: {str(e)}"
+        reservados = self._reservas.pop(fonte.caminho_relativo, [])
+        if self.dedup:
+            self.dedup.liberar(reservados)
+        print(erro)
+        self.erros.append(erro)
+        self.saidas_com_erro.append(fonte.caminho_relativo)
+
+def _listar_arquivos(input_base_path: str, output_base_path: str,
+                     mais_novos_primeiro: bool = False) -> Iterator[Tuple[FonteJson, str]]:
+    """
+    Lista os pares (fonte, saída) dos arquivos JSON das pastas 'Espelho*'
     
-    # Processa informações complementares
-    if 'informacoesComplementares' in acordao and acordao['informacoesComplementares']:
-        acordao['informacoesComplementaresEstruturadas'] = parse_complementary_info(acordao['informacoesComplementares'])
+    As fontes podem estar compactadas (.json.gz, .json.xz ou dentro de .zip);
+    a saída mantém o caminho relativo que o arquivo teria se extraído. Com
+    `mais_novos_primeiro`, os dumps são ordenados pelo nome do arquivo
+    (data do dump) em ordem decrescente.
+    """
+    fontes = listar_fontes(input_base_path)
+    if mais_novos_primeiro:
+        fontes = sorted(fontes, key=lambda f: os.path.basename(f.caminho_relativo), reverse=True)
         
-    # Processa termos auxiliares
-    if 'termosAuxiliares' in acordao and acordao['termosAuxiliares']:
-        acordao['termosAuxiliaresEstruturados'] = parse_termos_auxiliares(acordao['termosAuxiliares'])
+    diretorio_atual = None
+    for fonte in fontes:
+        output_file = os.path.join(output_base_path, fonte.caminho_relativo)
+        output_dir = os.path.dirname(output_file)
+        
+        if output_dir != diretorio_atual:
+            print(f"\nProcessando diretório: {os.path.join(input_base_path, os.path.dirname(fonte.caminho_relativo))}")
+            os.makedirs(output_dir, exist_ok=True)
+            diretorio_atual = output_dir
+            
+        yield fonte, output_file
+
+def _ler_arquivo(fonte: FonteJson) -> str:
+    """Lê o conteúdo de um arquivo de entrada"""
+    return fonte.ler_texto()
+
+def _gravar_arquivo(output_file: str, processed_data: List[Dict]) -> None:
+    """Grava os acórdãos processados no arquivo de saída"""
+    dump_file(processed_data, output_file)
+
+def _processar_sequencial(arquivos: Iterator[Tuple[FonteJson, str]], execucao: _Execucao) -> None:
+    """Lê, processa e grava cada arquivo em sequência"""
+    for fonte, output_file in arquivos:
+        execucao.total_arquivos += 1
+        try:
+            processed_data = execucao.processar_conteudo(_ler_arquivo(fonte), fonte)
+            if processed_data is None:
+                continue
+                
+            _gravar_arquivo(output_file, processed_data)
+            execucao.registrar_sucesso(fonte, processed_data)
+            
+        except Exception as e:
+            execucao.registrar_erro(fonte, e)
+
+def _processar_pipeline(arquivos: Iterator[Tuple[FonteJson, str]], execucao: _Execucao,
+                        io_workers: int, prefetch: int) -> None:
+    """
+    Processa os arquivos sobrepondo E/S e parse.
+    
+    Um pool de threads lê antecipadamente até `prefetch` arquivos e grava as
+    saídas em segundo plano, enquanto a thread principal só faz o parse. Se
+    houver mais de `prefetch` gravações pendentes, a thread principal espera
+    a mais antiga terminar antes de seguir (backpressure).
+    """
+    leituras: Deque[Tuple[FonteJson, str, Future]] = deque()
+    gravacoes: Deque[Tuple[FonteJson, List[Dict], Future]] = deque()
     
-    return acordao
+    def _concluir_gravacao():
+        fonte, processed_data, futuro = gravacoes.popleft()
+        try:
+            futuro.result()
+            execucao.registrar_sucesso(fonte, processed_data)
+        except Exception as e:
+            execucao.registrar_erro(fonte, e)
+            
+    with ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="stj-io") as pool:
+        pendentes = iter(arquivos)
+        
+        def _agendar_leituras():
+            while len(leituras) < prefetch:
+                proximo = next(pendentes, None)
+                if proximo is None:
+                    return
+                execucao.total_arquivos += 1
+                leituras.append((*proximo, pool.submit(_ler_arquivo, proximo[0])))
+                
+        _agendar_leituras()
+        while leituras:
+            fonte, output_file, futuro = leituras.popleft()
+            _agendar_leituras()
+            
+            try:
+                processed_data = execucao.processar_conteudo(futuro.result(), fonte)
+            except Exception as e:
+                execucao.registrar_erro(fonte, e)
+                continue
+                
+            if processed_data is None:
+                continue
+                
+            while len(gravacoes) >= prefetch:
+                _concluir_gravacao()
+            gravacoes.append((fonte, processed_data, pool.submit(_gravar_arquivo, output_file, processed_data)))
+            
+            # Contabiliza gravações já concluídas sem bloquear o parse
+            while gravacoes and gravacoes[0][2].done():
+                _concluir_gravacao()
+                
+        while gravacoes:
+            _concluir_gravacao()
 
-def process_directory(input_base_path: str, output_base_path: str):
-    """Processa todos os arquivos JSON das pastas que começam com 'Espelho'"""
-    os.makedirs(output_base_path, exist_ok=True)
+def _carregar_indice(input_base_path: str, schema: OutputSchema, indice_path: Optional[str] = None) -> AcordaoIndex:
+    """Carrega o índice de acórdãos salvo em `indice_path` ou o constrói a partir da entrada"""
+    if indice_path:
+        return AcordaoIndex.load_from_file(indice_path, SiglaMatcher.from_recursos())
+        
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    if schema.executa('jurisprudenciaCitadaEstruturada'):
+        index.build_from_directory(input_base_path)
+    return index
+
+def process_directory(input_base_path: str, output_base_path: str, io_workers: int = 0, prefetch: int = 8,
+                      schema: Optional[OutputSchema] = None, dedup: bool = False, cdc: bool = False,
+                      particionar: bool = False, indice_path: Optional[str] = None,
+                      registros_compactos: bool = False):
+    """
+    Processa todos os arquivos JSON das pastas que começam com 'Espelho'
     
-    total_arquivos = 0
-    arquivos_processados = 0
-    total_acordaos = 0
-    erros = []
+    Args:
+        input_base_path: Diretório com as pastas 'Espelho*' baixadas (extraídas ou em .zip/.json.gz/.json.xz)
+        output_base_path: Diretório onde os arquivos processados são gravados
+        io_workers: Threads de E/S para leitura antecipada e gravação em
+            segundo plano. Com 0 (padrão), os arquivos são processados em sequência.
+        prefetch: Máximo de leituras antecipadas e de gravações pendentes
+        schema: Parsers a executar e campos mantidos na saída (padrão: completo)
+        dedup: Deduplica acórdãos por id entre dumps e entre execuções, mantendo
+            só a versão mais nova (histórico em dedup.sqlite na saída)
+        cdc: Grava em delta/<execução>_<timestamp>/ os acórdãos inseridos,
+            atualizados e removidos em relação à execução anterior (estado em
+            cdc_estado.sqlite na saída)
+        particionar: Grava também a saída em particionado/ano=YYYY/orgao=.../part-N.jsonl,
+            pela data de decisão e órgão julgador, com um manifesto das partições
+        indice_path: Índice de acórdãos já salvo (AcordaoIndex.save_to_file), usado
+            no lugar de construir o índice a partir da entrada
+        registros_compactos: Mantém os campos estruturados em registros com
+            __slots__ enquanto aguardam gravação (mesmo JSON, menos memória)
+    """
+    schema = schema or SCHEMA_COMPLETO
+    os.makedirs(output_base_path, exist_ok=True)
     
     inicio = datetime.now()
+    cache_inicial = estatisticas_cache()
     
-    # Primeiro constrói o índice de todos os acórdãos
-    index = AcordaoIndex()
-    index.build_from_directory(input_base_path)
+    # Primeiro constrói o índice de todos os acórdãos (só usado pela jurisprudência citada)
+    index = _carregar_indice(input_base_path, schema, indice_path)
     
+    quarentena = Quarentena(output_base_path)
+    quarentena.abrir()
+    deduplicador = None
+    if dedup:
+        deduplicador = Deduplicador(caminho_dedup(output_base_path), assinatura=dumps(schema.to_dict(), sort_keys=True))
+    tracker = ChangeTracker(output_base_path) if cdc else None
+    particionado = EscritorParticionado(os.path.join(output_base_path, 'particionado')) if particionar else None
+    execucao = _Execucao(input_base_path, output_base_path, index, schema, quarentena, deduplicador, tracker,
+                         particionado, registros_compactos)
+                         
     # Depois processa os arquivos
-    for root, _, files in os.walk(input_base_path):
-        if os.path.basename(root).startswith("Espelho"):
-            print(f"\nProcessando diretório: {root}")
+    try:
+        arquivos = _listar_arquivos(input_base_path, output_base_path, mais_novos_primeiro=dedup)
+        if io_workers > 0:
+            _processar_pipeline(arquivos, execucao, io_workers, max(prefetch, 1))
+        else:
+            _processar_sequencial(arquivos, execucao)
             
-            relative_path = os.path.relpath(root, input_base_path)
-            output_dir = os.path.join(output_base_path, relative_path)
-            os.makedirs(output_dir, exist_ok=True)
+        if deduplicador:
+            _remover_versoes_substituidas(output_base_path, deduplicador)
+        if tracker:
+            tracker.finalizar(execucao.saidas_com_erro)
+        if particionado:
+            particionado.fechar()
+    finally:
+        quarentena.fechar()
+        if deduplicador:
+            deduplicador.fechar()
+        if tracker:
+            tracker.fechar()
+        if particionado:
+            particionado.descartar()
             
-            for filename in files:
-                if filename.endswith('.json'):
-                    total_arquivos += 1
-                    input_file = os.path.join(root, filename)
-                    output_file = os.path.join(output_dir, filename)
-                    
-                    try:
-                        with open(input_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            
-                        acordaos = process_json_content(content)
-                        if not acordaos:
-                            continue
-                            
-                        if not isinstance(acordaos, list):
-                            acordaos = [acordaos]
-                        
-                        processed_data = [process_acordao(acordao, index) for acordao in acordaos]
-                        total_acordaos += len(processed_data)
-                        
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            json.dump(processed_data, f, ensure_ascii=False, indent=2)
-                        
-                        arquivos_processados += 1
-                        
-                        if arquivos_processados % 100 == 0:
-                            print(f"Processados {arquivos_processados}/{total_arquivos} arquivos")
-                            
-                    except Exception as e:
-                        erro = f"Erro ao processar {input_file}: {str(e)}"
-                        print(erro)
-                        erros.append(erro)
-    
     fim = datetime.now()
     tempo_total = fim - inicio
+    erros = execucao.erros
     
     relatorio = f"""
 === Relatório de Processamento ===
@@ -111,9 +368,14 @@ Início: {inicio}
 Fim: {fim}
 Duração: {tempo_total}
 
-Arquivos encontrados: {total_arquivos}
-Arquivos processados: {arquivos_processados}
-Total de acórdãos: {total_acordaos}
+Arquivos encontrados: {execucao.total_arquivos}
+Arquivos processados: {execucao.arquivos_processados}
+Total de acórdãos: {execucao.total_acordaos}
+Acórdãos em quarentena: {quarentena.total} ({quarentena.path})
+{deduplicador.relatorio() if deduplicador else 'Deduplicação: desativada'}
+{tracker.relatorio() if tracker else 'Delta (CDC): desativado'}
+{particionado.relatorio() if particionado else 'Saída particionada: desativada'}
+{relatorio_cache(cache_inicial)}
 Erros: {len(erros)}
 
 Erros detalhados:
@@ -123,13 +385,424 @@ Erros detalhados:
     relatorio_path = os.path.join(output_base_path, "relatorio_processamento.txt")
     with open(relatorio_path, 'w', encoding='utf-8') as f:
         f.write(relatorio)
-    
+        
     print(f"\nProcessamento concluído! Relatório salvo em: {relatorio_path}")
 
-if __name__ == "__main__":
-    input_path = r"D:\Dropbox\Github\Dados Abertos STJ\downloads"
-    output_path = r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados"
+def _remover_versoes_substituidas(output_base_path: str, deduplicador: Deduplicador) -> None:
+    """Remove dos arquivos de saída antigos as versões substituídas por dumps mais novos"""
+    for saida, ids in deduplicador.substituidos.items():
+        output_file = os.path.join(output_base_path, saida)
+        if not os.path.exists(output_file):
+            continue
+            
+        acordaos = load_file(output_file)
+        restantes = [a for a in acordaos if not (isinstance(a, dict) and a.get('id') in ids)]
+        if len(restantes) != len(acordaos):
+            _gravar_arquivo(output_file, restantes)
+
+def retry_quarantine(input_base_path: str, output_base_path: str, schema: Optional[OutputSchema] = None,
+                     indice_path: Optional[str] = None, registros_compactos: bool = False) -> None:
+    """
+    Reprocessa apenas os acórdãos em quarentena de uma execução anterior
+    
+    Os recuperados voltam para o lugar que teriam no arquivo de saída (logo
+    depois do acórdão que os precedia); os que falharem de novo continuam na
+    quarentena. Para resolver a jurisprudência citada como na execução
+    original, passe o mesmo `indice_path`; `registros_compactos` deve ser o
+    mesmo da execução original.
+    
+    Se a saída foi deduplicada, o histórico é atualizado: uma versão de um
+    dump mais antigo gravada no lugar do recuperado é removida, e um
+    recuperado cujo id já está num dump mais novo é descartado.
+    """
+    schema = schema or SCHEMA_COMPLETO
+    quarentena = Quarentena(output_base_path)
+    registros = quarentena.ler()
+    if not registros:
+        print("Nenhum acórdão em quarentena")
+        return
+        
+    print(f"Reprocessando {len(registros)} acórdãos em quarentena...")
+    
+    index = _carregar_indice(input_base_path, schema, indice_path)
+    deduplicador = None
+    if os.path.exists(caminho_dedup(output_base_path)):
+        deduplicador = Deduplicador(caminho_dedup(output_base_path), assinatura=dumps(schema.to_dict(), sort_keys=True))
+        
+    # Do dump mais novo para o mais antigo, como na deduplicação
+    por_saida: Dict[str, List[Dict]] = defaultdict(list)
+    for registro in sorted(registros, key=lambda r: os.path.basename(r['saida']), reverse=True):
+        por_saida[registro['saida']].append(registro)
+        
+    restantes = []
+    total_recuperados = descartados = 0
+    try:
+        for saida, registros_saida in por_saida.items():
+            recuperados = []
+            for registro in registros_saida:
+                try:
+                    processado = process_acordao(dict(registro['acordao']), index, schema, registros_compactos)
+                except Exception as e:
+                    print(f"Acórdão {registro['id']} ({registro['arquivo']}, posição {registro['indice']}) "
+                          f"continua falhando: {str(e)}")
+                    restantes.append(registro)
+                    continue
+                if deduplicador and not deduplicador.recuperar(registro['acordao'], saida):
+                    descartados += 1
+                    continue
+                recuperados.append((registro, processado))
+                
+            if not recuperados:
+                continue
+                
+            output_file = os.path.join(output_base_path, saida)
+            processados = load_file(output_file) if os.path.exists(output_file) else []
+            _gravar_arquivo(output_file, mesclar_recuperados(processados, recuperados))
+            if deduplicador:
+                deduplicador.confirmar(registro['id'] for registro, _ in recuperados if registro['id'])
+            total_recuperados += len(recuperados)
+            
+        if deduplicador:
+            _remover_versoes_substituidas(output_base_path, deduplicador)
+    finally:
+        if deduplicador:
+            deduplicador.fechar()
+            
+    quarentena.reescrever(restantes)
+    print(f"\nRecuperados: {total_recuperados} | Já presentes em dumps mais novos: {descartados} | "
+          f"Ainda em quarentena: {len(restantes)}")
+
+def recompute_fields(output_base_path: str, campos: Optional[List[str]] = None, forcar: bool = False,
+                     indice_path: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Refaz campos estruturados de uma saída já gravada, sem reprocessar a entrada
+    
+    Percorre os arquivos de saída um a um e, em cada acórdão, roda de novo só
+    os parsers de `campos` (padrão: todos) cuja versão anotada em
+    versoesParsers difere da atual (versao_parser), ou todos com `forcar`,
+    a partir do campo bruto mantido na saída. Os demais campos não são
+    tocados, e só os arquivos alterados são regravados. Campos cujo bruto não
+    foi mantido (ex.: schema 'enxuto') não podem ser refeitos; se um parser
+    falhar, o valor anterior fica, com a versão antiga, para uma próxima vez.
+    
+    Os campos refeitos sempre ganham a versão em versoesParsers, mesmo que a
+    saída tenha sido gravada sem elas: a primeira recomputação de uma saída
+    sem versões refaz todos os campos, e as seguintes só os desatualizados.
     
-    print("Iniciando processamento...")
-    process_directory(input_path, output_path)
-    print("Processamento concluído!")
\ No newline at end of file
+    O índice da jurisprudência citada vem de `indice_path` ou é construído a
+    partir da própria saída. Saídas derivadas (particionada, colunas, delta do
+    CDC) não são atualizadas.
+    
+    Returns:
+        Contagens por campo: refeitos, atualizados (já na versão atual),
+        sem_bruto e erros
+    """
+    campos = list(campos) if campos else list(CAMPOS_ESTRUTURADOS)
+    desconhecidos = [campo for campo in campos if campo not in MODULOS_PARSERS]
+    if desconhecidos:
+        raise ValueError(f"Campos estruturados desconhecidos: {', '.join(desconhecidos)}")
+        
+    parsers = [(bruto, estruturado, parser) for bruto, estruturado, parser in PARSERS_ESTRUTURADOS
+               if estruturado in campos]
+    contagens = {estruturado: {'refeitos': 0, 'atualizados': 0, 'sem_bruto': 0, 'erros': 0}
+                 for _, estruturado, _ in parsers}
+    index: Optional[AcordaoIndex] = None
+    
+    fontes = list(listar_fontes(output_base_path))
+    arquivos_alterados = 0
+    for numero_arquivo, fonte in enumerate(fontes, 1):
+        try:
+            acordaos = load_file(fonte.origem)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao ler {fonte.origem}: {str(e)}")
+            continue
+            
+        alterado = False
+        for acordao in acordaos if isinstance(acordaos, list) else []:
+            if not isinstance(acordao, dict):
+                continue
+            versoes = acordao.get(CAMPO_VERSOES) or {}
+            for bruto, estruturado, parser in parsers:
+                contagem = contagens[estruturado]
+                if not acordao.get(bruto):
+                    if bruto not in acordao and (estruturado in acordao or estruturado in versoes):
+                        contagem['sem_bruto'] += 1
+                    continue
+                if not forcar and versoes.get(estruturado) == versao_parser(estruturado):
+                    contagem['atualizados'] += 1
+                    continue
+                    
+                if estruturado == 'jurisprudenciaCitadaEstruturada' and index is None:
+                    index = _carregar_indice(output_base_path, SCHEMA_COMPLETO, indice_path)
+                try:
+                    acordao[estruturado] = parser(acordao[bruto], index)
+                except Exception as e:
+                    print(f"Acórdão {acordao.get('id')} ({fonte.caminho_relativo}): "
+                          f"{ParserError(estruturado, e)}")
+                    contagem['erros'] += 1
+                    continue
+                versoes[estruturado] = versao_parser(estruturado)
+                acordao[CAMPO_VERSOES] = versoes
+                contagem['refeitos'] += 1
+                alterado = True
+                
+        if alterado:
+            gravar_atomico(acordaos, fonte.origem)
+            arquivos_alterados += 1
+        if numero_arquivo % 100 == 0:
+            print(f"Verificados {numero_arquivo}/{len(fontes)} arquivos")
+            
+    print(f"\nArquivos regravados: {arquivos_alterados} de {len(fontes)}")
+    for estruturado, contagem in contagens.items():
+        print(f"{estruturado} (versão {versao_parser(estruturado)}): {contagem['refeitos']} refeitos, "
+              f"{contagem['atualizados']} já atualizados, {contagem['sem_bruto']} sem campo bruto, "
+              f"{contagem['erros']} erros")
+    return contagens
+
+# Estado do modo distribuído, na saída
+DIRETORIO_DISTRIBUIDO = '.distribuido'
+
+def _id_execucao(schema: OutputSchema) -> str:
+    """Identifica a execução distribuída pelo código dos parsers e pelo schema: mudou um dos dois, tudo é refeito."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(versao_fonte(['process_stj_data']).encode('utf-8'))
+    h.update(dumps(schema.to_dict(), sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+def process_directory_distribuido(input_base_path: str, output_base_path: str, worker: Optional[str] = None,
+                                  lease_segundos: float = 60.0, schema: Optional[OutputSchema] = None,
+                                  indice_path: Optional[str] = None, execucao: Optional[str] = None) -> None:
+    """
+    Processa os arquivos como um dos workers de uma execução distribuída
+    
+    Qualquer número de workers, em qualquer número de máquinas, pode rodar
+    esta função sobre a mesma entrada e saída compartilhadas. Cada arquivo é
+    reivindicado por um lease em <saida>/.distribuido/<execução>/ (ver
+    parsers.leases), processado e gravado de forma atômica e marcado como
+    concluído; leases de workers que morreram expiram e são retomados. Como a
+    saída de um arquivo só depende dele, reprocessá-lo grava o mesmo conteúdo.
+    
+    O worker termina quando todos os arquivos estiverem concluídos e então
+    mescla os relatórios e quarentenas de todos os workers (cada worker que
+    termina refaz a mescla, que não depende de quem a executa).
+    
+    A execução é identificada pelo código dos parsers e pelo schema, então
+    uma mudança nos parsers inicia uma nova execução em vez de reaproveitar
+    os arquivos concluídos. Deduplicação, CDC e saída particionada dependem
+    de estado local e não estão disponíveis neste modo.
+    
+    Args:
+        worker: Nome único do worker (padrão: <host>-<pid>)
+        lease_segundos: Validade de um lease sem heartbeat
+        execucao: Nome da execução, no lugar do derivado do código e do schema
+    """
+    schema = schema or SCHEMA_COMPLETO
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    execucao = execucao or _id_execucao(schema)
+    execucao_path = os.path.join(output_base_path, DIRETORIO_DISTRIBUIDO, execucao)
+    worker_path = os.path.join(execucao_path, 'workers', worker)
+    os.makedirs(worker_path, exist_ok=True)
+    
+    inicio = datetime.now()
+    index = _carregar_indice(input_base_path, schema, indice_path)
+    leases = GerenciadorLeases(execucao_path, worker, lease_segundos)
+    quarentena = Quarentena(worker_path)
+    quarentena.abrir(acrescentar=True)
+    processamento = _Execucao(input_base_path, output_base_path, index, schema, quarentena)
+    
+    # Cada worker começa num ponto diferente da lista, para disputarem menos os mesmos leases
+    fontes = list(listar_fontes(input_base_path))
+    processamento.total_arquivos = len(fontes)
+    deslocamento = zlib.crc32(worker.encode('utf-8')) % max(len(fontes), 1)
+    fontes = fontes[deslocamento:] + fontes[:deslocamento]
+    
+    print(f"Worker {worker} na execução {execucao}: {len(fontes)} arquivos")
+    concluidos = 0
+    leases.iniciar_heartbeat()
+    try:
+        while True:
+            pendentes = [fonte for fonte in fontes if not leases.concluido(fonte.caminho_relativo)]
+            if not pendentes:
+                break
+                
+            reivindicados = 0
+            for fonte in pendentes:
+                if not leases.adquirir(fonte.caminho_relativo):
+                    continue
+                reivindicados += 1
+                resultado = _processar_distribuido(fonte, processamento)
+                if leases.concluir(fonte.caminho_relativo, resultado):
+                    concluidos += 1
+                    
+            if not reivindicados:
+                # Os pendentes estão com outros workers: aguarda a conclusão ou a expiração
+                time.sleep(min(1.0, lease_segundos / 4))
+    finally:
+        leases.parar_heartbeat()
+        quarentena.fechar()
+        gravar_atomico({
+            'worker': worker,
+            'inicio': inicio.isoformat(),
+            'fim': datetime.now().isoformat(),
+            'arquivos_concluidos': concluidos,
+            'acordaos': processamento.total_acordaos,
+            'leases_tomados': leases.tomados,
+            'erros': processamento.erros,
+        }, os.path.join(worker_path, 'relatorio.json'))
+        
+    print(f"Worker {worker}: {concluidos} arquivos concluídos, {leases.tomados} leases retomados")
+    mesclar_relatorios_distribuidos(output_base_path, execucao, [fonte.caminho_relativo for fonte in fontes])
+
+def _processar_distribuido(fonte: FonteJson, processamento: _Execucao) -> Dict:
+    """Processa e grava um arquivo; retorna o resumo guardado no marcador de conclusão"""
+    try:
+        processed_data = processamento.processar_conteudo(_ler_arquivo(fonte), fonte)
+        if processed_data is None:
+            return {'acordaos': 0}
+            
+        output_file = os.path.join(processamento.output_base_path, fonte.caminho_relativo)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        gravar_atomico(processed_data, output_file)
+        processamento.registrar_sucesso(fonte, processed_data)
+        return {'acordaos': len(processed_data)}
+    except Exception as e:
+        processamento.registrar_erro(fonte, e)
+        return {'acordaos': 0, 'erro': f"Erro ao processar {fonte.origem}: {str(e)}"}
+
+def mesclar_relatorios_distribuidos(output_base_path: str, execucao: str, arquivos: List[str]) -> None:
+    """
+    Mescla os resultados de uma execução distribuída na saída
+    
+    As contagens vêm dos marcadores de conclusão (um por arquivo, qualquer
+    que seja o worker), as quarentenas dos workers viram a quarentena.jsonl
+    da saída (um registro por acórdão, mesmo que o arquivo tenha sido
+    processado duas vezes) e o relatório_processamento.txt lista os workers,
+    com os totais de cada um também tirados dos marcadores, para que workers
+    que morreram antes de gravar o próprio relatório sejam contados.
+    """
+    execucao_path = os.path.join(output_base_path, DIRETORIO_DISTRIBUIDO, execucao)
+    leases = GerenciadorLeases(execucao_path, 'mesclagem')
+    resultados = [leases.resultado(arquivo) for arquivo in arquivos]
+    concluidos = [resultado for resultado in resultados if resultado is not None]
+    erros = [resultado['erro'] for resultado in concluidos if resultado.get('erro')]
+    
+    workers_path = os.path.join(execucao_path, 'workers')
+    relatorios, quarentenados = {}, {}
+    for worker in sorted(os.listdir(workers_path)):
+        relatorio_path = os.path.join(workers_path, worker, 'relatorio.json')
+        if os.path.exists(relatorio_path):
+            relatorios[worker] = load_file(relatorio_path)
+        for registro in Quarentena(os.path.join(workers_path, worker)).ler():
+            quarentenados[(registro['saida'], registro['indice'])] = registro
+            
+    # Totais por worker pelos marcadores: workers que morreram não gravam relatorio.json
+    por_worker: Dict[str, List[int]] = {worker: [0, 0] for worker in relatorios}
+    for resultado in concluidos:
+        totais = por_worker.setdefault(resultado.get('worker', '?'), [0, 0])
+        totais[0] += 1
+        totais[1] += resultado.get('acordaos', 0)
+            
+    quarentena = Quarentena(output_base_path)
+    tmp_path = f"{quarentena.path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for chave in sorted(quarentenados):
+            f.write(dumps(quarentenados[chave]) + '\n')
+    os.replace(tmp_path, quarentena.path)
+    
+    linhas_workers = []
+    for worker, (arquivos_worker, acordaos_worker) in sorted(por_worker.items()):
+        r = relatorios.get(worker)
+        situacao = (f"{r['leases_tomados']} leases retomados ({r['inicio']} a {r['fim']})" if r
+                    else "sem relatório (interrompido ou ainda em execução)")
+        linhas_workers.append(f"- {worker}: {arquivos_worker} arquivos, {acordaos_worker} acórdãos, {situacao}")
+    relatorio = f"""
+=== Relatório de Processamento (distribuído) ===
+Execução: {execucao}
+Início: {min((r['inicio'] for r in relatorios.values()), default='-')}
+Fim: {max((r['fim'] for r in relatorios.values()), default='-')}
+
+Workers: {len(por_worker)}
+{chr(10).join(linhas_workers)}
+
+Arquivos encontrados: {len(arquivos)}
+Arquivos concluídos: {len(concluidos)}
+Total de acórdãos: {sum(resultado.get('acordaos', 0) for resultado in concluidos)}
+Acórdãos em quarentena: {len(quarentenados)} ({quarentena.path})
+Erros: {len(erros)}
+
+Erros detalhados:
+{chr(10).join(erros)}
+"""
+    
+    relatorio_path = os.path.join(output_base_path, "relatorio_processamento.txt")
+    tmp_path = f"{relatorio_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(relatorio)
+    os.replace(tmp_path, relatorio_path)
+    print(f"\nRelatórios mesclados em: {relatorio_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processa os Espelhos de Acórdãos do STJ")
+    parser.add_argument('input_path', nargs='?', default=r"D:\Dropbox\Github\Dados Abertos STJ\downloads")
+    parser.add_argument('output_path', nargs='?',
+                        default=r"D:\Dropbox\Github\Dados Abertos STJ\Espelhos de Acordaos Parseados")
+    parser.add_argument('--io-workers', type=int, default=0,
+                        help="Threads de E/S para leitura antecipada e gravação em segundo plano (0 = sequencial)")
+    parser.add_argument('--prefetch', type=int, default=8,
+                        help="Máximo de arquivos lidos antecipadamente e de gravações pendentes")
+    parser.add_argument('--schema', default='completo',
+                        help="Schema de saída: 'completo', 'enxuto' ou caminho de um arquivo JSON")
+    parser.add_argument('--versoes-parsers', action='store_true',
+                        help="Anota em cada acórdão a versão dos parsers (versoesParsers), para --recompute "
+                             "refazer só os campos desatualizados")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Deduplica acórdãos por id entre dumps e execuções, mantendo só a versão mais nova")
+    parser.add_argument('--cdc', action='store_true',
+                        help="Grava o delta de acórdãos inseridos, atualizados e removidos desde a execução anterior")
+    parser.add_argument('--particionar', action='store_true',
+                        help="Grava também a saída particionada por ano de decisão e órgão julgador")
+    parser.add_argument('--registros-compactos', action='store_true',
+                        help="Usa registros compactos (__slots__) para os campos estruturados em memória")
+    parser.add_argument('--retry-quarantine', action='store_true',
+                        help="Reprocessa apenas os acórdãos em quarentena da execução anterior")
+    parser.add_argument('--recompute', action='store_true',
+                        help="Refaz na saída já gravada só os campos estruturados de parsers com versão nova")
+    parser.add_argument('--campo', action='append', choices=CAMPOS_ESTRUTURADOS,
+                        help="Campo estruturado a refazer com --recompute (repetível; padrão: todos)")
+    parser.add_argument('--forcar', action='store_true',
+                        help="Com --recompute, refaz os campos mesmo que já estejam na versão atual")
+    parser.add_argument('--distribuido', action='store_true',
+                        help="Roda como um dos workers de uma execução distribuída (leases na saída compartilhada)")
+    parser.add_argument('--worker', default=None, help="Nome do worker no modo distribuído (padrão: <host>-<pid>)")
+    parser.add_argument('--lease', type=float, default=60.0,
+                        help="Validade, em segundos, de um lease sem heartbeat no modo distribuído")
+    parser.add_argument('--execucao', default=None,
+                        help="Nome da execução distribuída (padrão: derivado do código dos parsers e do schema)")
+    parser.add_argument('--indice', default=None,
+                        help="Índice de acórdãos já salvo, no lugar de construí-lo a partir da entrada")
+    args = parser.parse_args()
+    if args.distribuido and (args.dedup or args.cdc or args.particionar or args.retry_quarantine):
+        parser.error("--distribuido não pode ser combinado com --dedup, --cdc, --particionar ou --retry-quarantine")
+        
+    if args.recompute and (args.distribuido or args.retry_quarantine):
+        parser.error("--recompute não pode ser combinado com --distribuido ou --retry-quarantine")
+        
+    schema = OutputSchema.carregar(args.schema)
+    if args.versoes_parsers:
+        schema = OutputSchema.from_dict(dict(schema.to_dict(), versoesParsers=True))
+    if args.recompute:
+        recompute_fields(args.output_path, campos=args.campo, forcar=args.forcar, indice_path=args.indice)
+    elif args.retry_quarantine:
+        retry_quarantine(args.input_path, args.output_path, schema=schema, indice_path=args.indice,
+                         registros_compactos=args.registros_compactos)
+    elif args.distribuido:
+        process_directory_distribuido(args.input_path, args.output_path, worker=args.worker,
+                                      lease_segundos=args.lease, schema=schema, indice_path=args.indice,
+                                      execucao=args.execucao)
+    else:
+        print("Iniciando processamento...")
+        process_directory(args.input_path, args.output_path, io_workers=args.io_workers, prefetch=args.prefetch,
+                          schema=schema, dedup=args.dedup, cdc=args.cdc,
+                          particionar=args.particionar, indice_path=args.indice,
+                          registros_compactos=args.registros_compactos)
+        print("Processamento concluído!")
@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import os
+import time
+import traceback
+from collections import OrderedDict, defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.json_utils import dumps
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.ministros_index import MinistrosIndex
+from parsers.recursos_index import RecursosIndex
+from parsers.relator_index import RelatorIndex
+from parsers.sigla_matcher import SiglaMatcher
+
+# Nomes dos arquivos de índice dentro do diretório de índices
+ARQUIVO_ACORDAOS = 'acordaos.json'
+ARQUIVO_REFERENCIAS = 'referencias_legislativas.json'
+ARQUIVO_RELATORES = 'relatores.json'
+
+class ConsultaInvalida(Exception):
+    """Erro de uma consulta, com o status HTTP a devolver"""
+    
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+class _Latencias:
+    """Latências recentes de um endpoint, para percentis"""
+    
+    def __init__(self, janela: int = 10_000):
+        self.total = 0
+        self.soma_ms = 0.0
+        self.cache_hits = 0
+        self.erros = 0
+        self._recentes: Deque[float] = deque(maxlen=janela)
+        
+    def registrar(self, ms: float, cache_hit: bool, erro: bool) -> None:
+        self.total += 1
+        self.soma_ms += ms
+        self.cache_hits += cache_hit
+        self.erros += erro
+        self._recentes.append(ms)
+        
+    def resumo(self) -> Dict:
+        recentes = sorted(self._recentes)
+        
+        def percentil(p: float) -> float:
+            if not recentes:
+                return 0.0
+            return round(recentes[min(int(p * len(recentes)), len(recentes) - 1)], 3)
+            
+        return {
+            'requisicoes': self.total,
+            'erros': self.erros,
+            'cacheHits': self.cache_hits,
+            'mediaMs': round(self.soma_ms / self.total, 3) if self.total else 0.0,
+            'p50Ms': percentil(0.50),
+            'p95Ms': percentil(0.95),
+            'p99Ms': percentil(0.99),
+            'maxMs': round(recentes[-1], 3) if recentes else 0.0
+        }
+
+class ServicoConsultas:
+    """
+    Consultas sobre os índices já construídos, carregados uma única vez.
+    
+    As respostas ficam num cache LRU (por rota e parâmetros) e cada endpoint
+    mede sua latência. Erros inesperados viram respostas 500 (registradas no
+    console e fora do cache), sem derrubar a conexão. `consultar` não depende de HTTP, então o mesmo serviço
+    pode ser usado em processo; `servir` expõe os endpoints via HTTP/1.1.
+    
+    Endpoints:
+        /acordao?tipo=REsp&numero=1234567      id do acórdão
+        /legislacao?leg=FED&ano=2015&artigo=01022   acórdãos que citam a lei/artigo
+            (ou ?chave=FED-2015:ART01022; aceita limite e offset)
+        /relator?nome=NANCY ANDRIGHI            estatísticas do relator
+        /metricas                               latências e cache
+        /saude                                  índices carregados
+    """
+    
+    def __init__(self, acordaos: Optional[AcordaoIndex] = None,
+                 referencias: Optional[LegalReferencesIndex] = None,
+                 relatores: Optional[RelatorIndex] = None,
+                 ministros: Optional[MinistrosIndex] = None,
+                 recursos: Optional[RecursosIndex] = None,
+                 max_cache: int = 10_000):
+        self.acordaos = acordaos
+        self.referencias = referencias  # ids de cada lei e artigo ordenados sob demanda (ver o setter)
+        self.relatores = relatores
+        self.ministros = ministros
+        self.recursos = recursos
+        self.max_cache = max_cache
+        
+        self._cache: 'OrderedDict[Tuple, Tuple[int, bytes]]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._latencias: Dict[str, _Latencias] = defaultdict(_Latencias)
+        self.inicio = time.time()
+        
+        self._rotas: Dict[str, Callable[[Dict[str, str]], Dict]] = {
+            '/acordao': self._acordao,
+            '/legislacao': self._legislacao,
+            '/relator': self._relator,
+        }
+        # Rotas de estado: respondidas a cada consulta, sem passar pelo cache
+        self._rotas_estado: Dict[str, Callable[[], Dict]] = {
+            '/metricas': self.metricas,
+            '/saude': self.saude,
+        }
+        
+    @property
+    def referencias(self) -> Optional[LegalReferencesIndex]:
+        return self._referencias
+        
+    @referencias.setter
+    def referencias(self, referencias: Optional[LegalReferencesIndex]) -> None:
+        """Troca o índice de referências; os ids de cada lei e artigo são ordenados na primeira consulta."""
+        self._referencias = referencias
+        self._ids_ordenados: Dict[str, List[str]] = {}
+        
+    @classmethod
+    def carregar(cls, indices_path: str, input_path: Optional[str] = None,
+                 max_cache: int = 10_000) -> 'ServicoConsultas':
+        """
+        Carrega os índices salvos em `indices_path`.
+        
+        Se o índice de acórdãos ainda não foi salvo e `input_path` foi
+        informado, ele é construído a partir dos Espelhos e salvo para as
+        próximas cargas. Índices ausentes deixam seus endpoints indisponíveis.
+        """
+        normalizador = SiglaMatcher.from_recursos()
+        acordaos_path = os.path.join(indices_path, ARQUIVO_ACORDAOS)
+        acordaos = None
+        if os.path.exists(acordaos_path):
+            acordaos = AcordaoIndex.load_from_file(acordaos_path, normalizador)
+        elif input_path:
+            acordaos = AcordaoIndex(normalizador)
+            acordaos.build_from_directory(input_path)
+            os.makedirs(indices_path, exist_ok=True)
+            acordaos.save_to_file(acordaos_path)
+            
+        referencias_path = os.path.join(indices_path, ARQUIVO_REFERENCIAS)
+        relatores_path = os.path.join(indices_path, ARQUIVO_RELATORES)
+        
+        return cls(
+            acordaos=acordaos,
+            referencias=LegalReferencesIndex.load_from_file(referencias_path) if os.path.exists(referencias_path) else None,
+            relatores=RelatorIndex.load_from_file(relatores_path) if os.path.exists(relatores_path) else None,
+            ministros=MinistrosIndex(),
+            recursos=RecursosIndex(),
+            max_cache=max_cache
+        )
+        
+    def consultar(self, rota: str, params: Dict[str, str]) -> Tuple[int, bytes]:
+        """Responde uma consulta, retornando (status HTTP, corpo JSON)."""
+        inicio = time.perf_counter()
+        cache_hit = False
+        
+        if rota in self._rotas_estado:
+            status, corpo = self._responder(rota, params, lambda _: self._rotas_estado[rota]())
+        elif rota not in self._rotas:
+            status, corpo = 404, dumps({'erro': f"Rota desconhecida: {rota}"}).encode('utf-8')
+        else:
+            chave = (rota, tuple(sorted(params.items())))
+            resposta = self._cache.get(chave)
+            if resposta is not None:
+                self._cache.move_to_end(chave)
+                self.cache_hits += 1
+                cache_hit = True
+            else:
+                self.cache_misses += 1
+                resposta = self._responder(rota, params, self._rotas[rota])
+                # Erros inesperados não ficam em cache: a próxima consulta tenta de novo
+                if self.max_cache > 0 and resposta[0] != 500:
+                    self._cache[chave] = resposta
+                    if len(self._cache) > self.max_cache:
+                        self._cache.popitem(last=False)
+            status, corpo = resposta
+            
+        self._latencias[rota].registrar((time.perf_counter() - inicio) * 1000, cache_hit, status >= 400)
+        return status, corpo
+        
+    @staticmethod
+    def _responder(rota: str, params: Dict[str, str], funcao: Callable[[Dict[str, str]], Dict]) -> Tuple[int, bytes]:
+        """Executa uma rota, convertendo ConsultaInvalida no seu status e qualquer outro erro em 500."""
+        try:
+            return 200, dumps(funcao(params)).encode('utf-8')
+        except ConsultaInvalida as e:
+            return e.status, dumps({'erro': str(e)}).encode('utf-8')
+        except Exception as e:
+            print(f"Erro ao responder {rota} {params}: {str(e)}\n{traceback.format_exc()}")
+            return 500, dumps({'erro': f"Erro interno: {type(e).__name__}"}).encode('utf-8')
+            
+    def registrar_rota_estado(self, rota: str, funcao: Callable[[], Dict]) -> None:
+        """Expõe `funcao` em `rota`, sem cache (ex.: o estado de um monitor no mesmo processo)."""
+        self._rotas_estado[rota] = funcao
+        
+    def limpar_cache(self) -> None:
+        """Descarta as respostas em cache (ex.: depois de atualizar os índices)."""
+        self._cache.clear()
+        # Os ids de /legislacao são ordenados de novo, sob demanda, por chave
+        self._ids_ordenados.clear()
+        
+    @staticmethod
+    def _param(params: Dict[str, str], nome: str) -> str:
+        valor = params.get(nome, '').strip()
+        if not valor:
+            raise ConsultaInvalida(400, f"Parâmetro obrigatório ausente: {nome}")
+        return valor
+        
+    @staticmethod
+    def _indice(indice, nome: str):
+        if indice is None:
+            raise ConsultaInvalida(503, f"Índice não carregado: {nome}")
+        return indice
+        
+    def _acordao(self, params: Dict[str, str]) -> Dict:
+        acordaos = self._indice(self.acordaos, 'acórdãos')
+        tipo = self._param(params, 'tipo')
+        numero = self._param(params, 'numero')
+        
+        acordao_id = acordaos.get_id(tipo, numero)
+        if acordao_id is None:
+            raise ConsultaInvalida(404, f"Acórdão não encontrado: {tipo} {numero}")
+            
+        resposta = {'tipo': tipo, 'numero': numero, 'id': acordao_id}
+        if self.recursos:
+            resposta['nomeClasse'] = self.recursos.get_nome(tipo)
+        return resposta
+        
+    def _legislacao(self, params: Dict[str, str]) -> Dict:
+        referencias = self._indice(self.referencias, 'referências legislativas')
+        
+        chave = params.get('chave', '').strip()
+        if not chave:
+            chave = f"{self._param(params, 'leg')}-{self._param(params, 'ano')}"
+            if params.get('artigo'):
+                chave += f":ART{params['artigo'].strip()}"
+                
+        indice = referencias.by_article if ':ART' in chave else referencias.by_law
+        if chave not in indice:
+            raise ConsultaInvalida(404, f"Referência não encontrada: {chave}")
+            
+        try:
+            limite = int(params.get('limite', 100))
+            offset = int(params.get('offset', 0))
+        except ValueError:
+            raise ConsultaInvalida(400, "limite e offset devem ser inteiros")
+        if limite < 0 or offset < 0:
+            raise ConsultaInvalida(400, "limite e offset não podem ser negativos")
+            
+        ids = self._ids_ordenados.get(chave)
+        if ids is None:
+            ids = self._ids_ordenados[chave] = sorted(indice[chave])
+        return {
+            'chave': chave,
+            'total': len(ids),
+            'offset': offset,
+            'ids': ids[offset:offset + limite]
+        }
+        
+    def _relator(self, params: Dict[str, str]) -> Dict:
+        relatores = self._indice(self.relatores, 'relatores')
+        nome = self._param(params, 'nome')
+        
+        relator = nome.upper()
+        if relator not in relatores.by_relator and self.ministros:
+            # Aceita variações do nome (ex.: 'Nancy Andrighi')
+            padrao = self.ministros.get_nome_padrao(nome)
+            relator = padrao.upper() if padrao else relator
+            
+        if relator not in relatores.by_relator:
+            raise ConsultaInvalida(404, f"Relator não encontrado: {nome}")
+            
+        resposta = {
+            'relator': relator,
+            'totalAcordaos': len(relatores.by_relator[relator]),
+            'porAno': {ano: len(por_relator[relator]) for ano, por_relator in sorted(relatores.by_year.items())
+                       if relator in por_relator},
+            'porOrgao': {orgao: len(por_relator[relator]) for orgao, por_relator in sorted(relatores.by_orgao.items())
+                         if relator in por_relator},
+            'citacoesFeitas': sum(len(ids) for ids in relatores.citations.get(relator, {}).values())
+        }
+        if self.ministros:
+            resposta['status'] = self.ministros.get_status(nome)
+        return resposta
+        
+    def metricas(self) -> Dict:
+        """Latências por endpoint e estatísticas do cache."""
+        consultas = self.cache_hits + self.cache_misses
+        return {
+            'uptimeSegundos': round(time.time() - self.inicio, 1),
+            'cache': {
+                'tamanho': len(self._cache),
+                'maximo': self.max_cache,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'taxaAcerto': round(self.cache_hits / consultas, 4) if consultas else 0.0
+            },
+            'endpoints': {rota: latencias.resumo() for rota, latencias in sorted(self._latencias.items())}
+        }
+        
+    def saude(self) -> Dict:
+        """Índices carregados e seus tamanhos."""
+        return {
+            'acordaos': len(self.acordaos) if self.acordaos is not None else None,
+            'artigos': len(self.referencias.by_article) if self.referencias is not None else None,
+            'relatores': len(self.relatores.by_relator) if self.relatores is not None else None
+        }
+        
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende uma conexão HTTP/1.1 (com keep-alive) só com GET."""
+        try:
+            while True:
+                requisicao = await reader.readuntil(b'\r\n\r\n')
+                linhas = requisicao.decode('latin-1').split('\r\n')
+                metodo, alvo, versao = (linhas[0].split(' ', 2) + ['', ''])[:3]
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    if ':' in linha:
+                        nome, valor = linha.split(':', 1)
+                        cabecalhos[nome.strip().lower()] = valor.strip().lower()
+                        
+                if metodo != 'GET':
+                    status, corpo = 405, dumps({'erro': f"Método não suportado: {metodo}"}).encode('utf-8')
+                else:
+                    url = urlsplit(alvo)
+                    status, corpo = self.consultar(url.path.rstrip('/') or '/', dict(parse_qsl(url.query)))
+                    
+                manter = cabecalhos.get('connection') != 'close' and versao == 'HTTP/1.1'
+                writer.write(
+                    f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(corpo)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode('latin-1') + corpo
+                )
+                await writer.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            
+    async def iniciar(self, host: str = '127.0.0.1', porta: int = 8765) -> asyncio.AbstractServer:
+        """Inicia o servidor HTTP no loop atual (porta 0 escolhe uma porta livre)."""
+        return await asyncio.start_server(self._atender, host, porta)
+        
+    def servir(self, host: str = '127.0.0.1', porta: int = 8765) -> None:
+        """Serve as consultas até o processo ser interrompido."""
+        async def _servir():
+            servidor = await self.iniciar(host, porta)
+            print(f"Servindo consultas em http://{host}:{servidor.sockets[0].getsockname()[1]}")
+            async with servidor:
+                await servidor.serve_forever()
+                
+        try:
+            asyncio.run(_servir())
+        except KeyboardInterrupt:
+            print("\nServidor encerrado")
+
+_MOTIVOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de consultas sobre os índices")
+    parser.add_argument('indices_path', nargs='?', default=r"D:\Dropbox\Github\Dados Abertos STJ\indices")
+    parser.add_argument('--entrada', default=None,
+                        help="Espelhos baixados, para construir o índice de acórdãos se ele ainda não foi salvo")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--cache', type=int, default=10_000, help="Máximo de respostas no cache LRU (0 desativa)")
+    args = parser.parse_args()
+    
+    ServicoConsultas.carregar(args.indices_path, args.entrada, max_cache=args.cache).servir(args.host, args.porta)
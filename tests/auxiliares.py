@@ -0,0 +1,26 @@
+"""Funções comuns aos testes."""
+import glob
+import json
+import os
+from typing import Any, Dict
+
+# 240 acórdãos sintéticos em 6 arquivos de 3 pastas Espelho*
+TOTAL_ACORDAOS = 240
+POR_ARQUIVO = 40
+
+def ler_saidas(base_path: str) -> Dict[str, bytes]:
+    """Conteúdo dos arquivos JSON gravados nas pastas 'Espelho*', por caminho relativo."""
+    saidas = {}
+    for caminho in sorted(glob.glob(os.path.join(base_path, 'Espelho*', '*.json'))):
+        with open(caminho, 'rb') as f:
+            saidas[os.path.relpath(caminho, base_path)] = f.read()
+    return saidas
+
+def ler_json(path: str) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def gravar_json(obj: Any, path: str) -> None:
+    """Grava como os downloads do STJ (UTF-8, sem indentação)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False)
@@ -0,0 +1,35 @@
+import shutil
+from typing import Dict
+
+import pytest
+
+from benchmarks.synthetic import gerar_arvore_espelho
+from process_stj_data import process_directory
+
+from .auxiliares import POR_ARQUIVO, TOTAL_ACORDAOS, ler_saidas
+
+@pytest.fixture(scope='session')
+def entrada_sintetica(tmp_path_factory) -> str:
+    """Árvore Espelho* de downloads sintéticos, compartilhada (não altere: use `entrada`)."""
+    base = str(tmp_path_factory.mktemp('entrada'))
+    gerar_arvore_espelho(base, TOTAL_ACORDAOS, por_arquivo=POR_ARQUIVO)
+    return base
+
+@pytest.fixture
+def entrada(entrada_sintetica, tmp_path) -> str:
+    """Cópia da árvore sintética que o teste pode alterar."""
+    destino = str(tmp_path / 'entrada')
+    shutil.copytree(entrada_sintetica, destino)
+    return destino
+
+@pytest.fixture(scope='session')
+def saida_referencia(entrada_sintetica, tmp_path_factory) -> str:
+    """Saída de process_directory sobre a árvore sintética, no modo sequencial padrão."""
+    saida = str(tmp_path_factory.mktemp('saida_referencia'))
+    process_directory(entrada_sintetica, saida)
+    return saida
+
+@pytest.fixture(scope='session')
+def saidas_referencia(saida_referencia) -> Dict[str, bytes]:
+    """Arquivos da saída de referência, por caminho relativo."""
+    return ler_saidas(saida_referencia)
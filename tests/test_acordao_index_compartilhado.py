@@ -0,0 +1,69 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers.acordao_index import AcordaoIndex
+from parsers.acordao_index_compartilhado import AcordaoIndexCompartilhado
+from parsers.sigla_matcher import SiglaMatcher
+
+# Números e ids que não cabem no formato inteiro
+ESPECIAIS = [
+    {'id': '900000001', 'siglaClasse': 'REsp', 'numeroProcesso': '0123'},
+    {'id': '900000002', 'siglaClasse': 'REsp', 'numeroProcesso': '123'},
+    {'id': 'abc-3', 'siglaClasse': 'HC', 'numeroProcesso': 'ABC-1'},
+    {'id': '900000004', 'siglaClasse': 'AgInt no AREsp', 'numeroProcesso': '12345678901234567890'},
+    {'id': '18446744073709551616', 'siglaClasse': 'RHC', 'numeroProcesso': '7'},
+    {'id': '900000006', 'siglaClasse': 'RMS', 'numeroProcesso': 'nº 77'},
+]
+
+def _consultar(index, chaves):
+    return [index.get_id(tipo, numero) for tipo, numero in chaves]
+
+@pytest.fixture(scope='module')
+def indices():
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    for acordao in list(gerar_acordaos(500)) + ESPECIAIS:
+        index.add_acordao(acordao)
+    compartilhado = AcordaoIndexCompartilhado.criar(index)
+    yield index, compartilhado
+    compartilhado.liberar()
+
+@pytest.fixture(scope='module')
+def consultas(indices):
+    """Chaves do índice, variações de grafia e chaves ausentes."""
+    index, _ = indices
+    chaves = []
+    for (tipo, numero), _ in index.items():
+        chaves += [
+            (tipo, numero), (tipo.upper(), f" {numero} "), (tipo.replace('Esp', '.E.s.p'), numero),
+            (tipo, numero + '1'), (tipo, '0' + numero), ('XYZ', numero),
+        ]
+    return chaves + [('REsp', ''), ('', '123'), ('REsp', '-1'), ('REsp', '99999999999999999999')]
+
+def test_consultas_iguais_ao_dict(indices, consultas):
+    index, compartilhado = indices
+    assert len(compartilhado) == len(index)
+    assert list(compartilhado.items()) == list(index.items())
+    assert _consultar(compartilhado, consultas) == _consultar(index, consultas)
+    assert compartilhado.get_id('resp', '0123') == '900000001'
+    assert compartilhado.get_id('REsp', '123') == '900000002'
+    assert compartilhado.get_id('HC', 'ABC-1') == 'abc-3'
+    assert compartilhado.get_id('RHC', '7') == '18446744073709551616'
+
+def test_pickle_envia_so_o_nome(indices, consultas):
+    _, compartilhado = indices
+    dados = pickle.dumps(compartilhado)
+    assert len(dados) < 200
+    assert pickle.loads(dados) is compartilhado
+
+def test_consultas_em_outro_processo(indices, consultas):
+    index, compartilhado = indices
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_consultar, compartilhado, consultas).result() == _consultar(index, consultas)
+
+def test_somente_leitura(indices):
+    _, compartilhado = indices
+    with pytest.raises(TypeError):
+        compartilhado.add_acordao(ESPECIAIS[0])
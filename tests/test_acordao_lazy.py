@@ -0,0 +1,94 @@
+import copy
+import os
+
+import pytest
+
+from parsers import acordao_lazy
+from parsers.acordao_index import AcordaoIndex
+from parsers.acordao_lazy import LazyAcordao, iterar_acordaos
+from parsers.input_sources import listar_fontes
+from parsers.json_utils import dump_file, dumps, loads
+from parsers.output_schema import (CAMPO_VERSOES, PARSERS_ESTRUTURADOS, SCHEMA_COMPLETO, SCHEMA_ENXUTO, OutputSchema,
+                                   ParserError)
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao
+
+from .auxiliares import TOTAL_ACORDAOS
+
+SCHEMAS = {
+    'completo': SCHEMA_COMPLETO,
+    'versoes': OutputSchema(versoes=True),
+    'enxuto': SCHEMA_ENXUTO,
+    'parcial': OutputSchema(parsers=['jurisprudenciaCitadaEstruturada', 'termosAuxiliaresEstruturados'],
+                            campos=['id', 'ementa'], versoes=True),
+}
+
+@pytest.fixture(scope='module')
+def index(entrada_sintetica):
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    index.build_from_directory(entrada_sintetica)
+    return index
+
+@pytest.fixture(scope='module')
+def brutos(entrada_sintetica):
+    return [acordao for fonte in listar_fontes(entrada_sintetica) for acordao in loads(fonte.ler_bytes())]
+
+@pytest.mark.parametrize('nome_schema', sorted(SCHEMAS))
+@pytest.mark.parametrize('compacto', [False, True])
+def test_serializa_como_process_acordao(brutos, index, nome_schema, compacto):
+    schema = SCHEMAS[nome_schema]
+    for bruto in brutos:
+        esperado = dumps(process_acordao(copy.deepcopy(bruto), index, schema, compacto), indent=2)
+        lazy = LazyAcordao(bruto, index, schema, compacto)
+        assert dumps(lazy, indent=2) == esperado
+        assert dumps(lazy.para_dict(), indent=2) == esperado
+
+def test_versoes_so_com_o_schema(brutos, index):
+    assert CAMPO_VERSOES not in LazyAcordao(brutos[0], index)
+    assert CAMPO_VERSOES in LazyAcordao(brutos[0], index, SCHEMAS['versoes'])
+    assert set(LazyAcordao(brutos[0], index, SCHEMAS['parcial'])[CAMPO_VERSOES]) == \
+        {'jurisprudenciaCitadaEstruturada', 'termosAuxiliaresEstruturados'}
+
+def test_parsers_rodam_so_no_acesso(brutos, index):
+    bruto = brutos[0]
+    original = copy.deepcopy(bruto)
+    lazy = LazyAcordao(bruto, index)
+    
+    assert 'jurisprudenciaCitadaEstruturada' in lazy
+    assert list(lazy) == list(process_acordao(copy.deepcopy(bruto), index))
+    assert lazy['ementa'] == bruto['ementa']
+    assert lazy.calculados == ()
+    
+    lazy['termosAuxiliaresEstruturados']
+    assert lazy.calculados == ('termosAuxiliaresEstruturados',)
+    assert lazy['termosAuxiliaresEstruturados'] is lazy['termosAuxiliaresEstruturados']
+    assert bruto == original
+    with pytest.raises(KeyError):
+        lazy['inexistente']
+
+def test_falha_do_parser_no_acesso(brutos, index, monkeypatch):
+    def falhar(valor, index):
+        raise ValueError("falha simulada")
+        
+    monkeypatch.setattr(acordao_lazy, 'PARSERS_ESTRUTURADOS', [
+        (bruto, estruturado, falhar if estruturado == 'publicacaoEstruturada' else parser)
+        for bruto, estruturado, parser in PARSERS_ESTRUTURADOS])
+    bruto = brutos[0]
+    lazy = LazyAcordao(bruto, index)
+    assert lazy['ementa'] == bruto['ementa']
+    with pytest.raises(ParserError) as erro:
+        lazy['publicacaoEstruturada']
+    assert erro.value.campo == 'publicacaoEstruturada'
+
+def test_iterar_acordaos_e_dump_file(entrada_sintetica, saida_referencia, index, tmp_path):
+    lazies = list(iterar_acordaos(entrada_sintetica, index))
+    assert len(lazies) == TOTAL_ACORDAOS
+    
+    # Gravados por arquivo como process_directory, saem os mesmos bytes
+    for fonte in listar_fontes(entrada_sintetica):
+        quantidade = len(loads(fonte.ler_bytes()))
+        caminho = str(tmp_path / 'saida.json')
+        dump_file(lazies[:quantidade], caminho)
+        del lazies[:quantidade]
+        with open(caminho, 'rb') as gravado, open(os.path.join(saida_referencia, fonte.caminho_relativo), 'rb') as f:
+            assert gravado.read() == f.read()
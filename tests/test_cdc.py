@@ -0,0 +1,65 @@
+import glob
+import os
+from typing import Dict, List, Tuple
+
+from parsers.cdc import ler_delta
+from parsers.input_sources import listar_fontes
+from parsers.json_utils import loads
+from process_stj_data import process_directory
+
+from .auxiliares import TOTAL_ACORDAOS, gravar_json, ler_json
+
+def _ultimo_delta(saida: str) -> Tuple[Dict[str, int], List[Tuple[str, Dict]]]:
+    """Contagens e registros do delta da última execução concluída."""
+    deltas = sorted(glob.glob(os.path.join(saida, 'delta', '*', 'resumo.json')))
+    delta_path = os.path.dirname(deltas[-1])
+    return ler_json(os.path.join(delta_path, 'resumo.json'))['contagens'], list(ler_delta(delta_path))
+
+def test_deltas_entre_execucoes(entrada, saida_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida, cdc=True)
+    contagens, registros = _ultimo_delta(saida)
+    assert contagens == {'insert': TOTAL_ACORDAOS, 'update': 0, 'delete': 0, 'inalterados': 0}
+    # Os inseridos são os acórdãos gravados na saída
+    caminho = 'EspelhoPrimeiraTurma/20200101.json'
+    gravados = {acordao['id']: acordao for acordao in ler_json(os.path.join(saida_referencia, caminho))}
+    for operacao, registro in registros:
+        assert operacao == 'insert'
+        if registro['id'] in gravados:
+            assert registro['acordao'] == gravados[registro['id']]
+            
+    process_directory(entrada, saida, cdc=True)
+    contagens, registros = _ultimo_delta(saida)
+    assert contagens == {'insert': 0, 'update': 0, 'delete': 0, 'inalterados': TOTAL_ACORDAOS}
+    assert registros == []
+    
+    # Remove um acórdão (que nenhum outro cita, para não mudar a jurisprudência citada dos demais),
+    # altera outro e acrescenta um novo
+    citacoes = ' '.join(acordao['jurisprudenciaCitada'] for fonte in listar_fontes(entrada)
+                        for acordao in loads(fonte.ler_bytes()))
+    arquivo = os.path.join(entrada, caminho)
+    acordaos = ler_json(arquivo)
+    removido = acordaos.pop(next(i for i, acordao in enumerate(acordaos[1:], 1)
+                                 if f" {acordao['numeroProcesso']}>>" not in citacoes))
+    acordaos[7]['ementa'] = 'EMENTA CORRIGIDA.'
+    novo = dict(acordaos[0], id='999999999', numeroProcesso='9999999')
+    acordaos.append(novo)
+    gravar_json(acordaos, arquivo)
+    
+    process_directory(entrada, saida, cdc=True)
+    contagens, registros = _ultimo_delta(saida)
+    assert contagens == {'insert': 1, 'update': 1, 'delete': 1, 'inalterados': TOTAL_ACORDAOS - 2}
+    assert [(operacao, registro['id']) for operacao, registro in registros] == [
+        ('delete', removido['id']), ('update', acordaos[7]['id']), ('insert', novo['id'])]
+    assert registros[1][1]['acordao']['ementa'] == 'EMENTA CORRIGIDA.'
+
+def test_arquivo_ilegivel_nao_gera_remocoes(entrada, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida, cdc=True)
+    
+    with open(os.path.join(entrada, 'EspelhoCorteEspecial', '20200103.json'), 'w', encoding='utf-8') as f:
+        f.write('[{"id": ')
+    process_directory(entrada, saida, cdc=True)
+    contagens, registros = _ultimo_delta(saida)
+    assert contagens['delete'] == 0
+    assert all(operacao != 'delete' for operacao, _ in registros)
@@ -0,0 +1,82 @@
+import copy
+import random
+from collections import defaultdict, deque
+
+import pytest
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers.acordao_index import AcordaoIndex
+from parsers.clusters_similares import ClustersSimilares, UniaoBusca
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao
+
+def _componentes_bfs(vizinhos):
+    """Componentes conexos com mais de um vértice, por busca em largura."""
+    vistos = set()
+    componentes = set()
+    for inicio in vizinhos:
+        if inicio in vistos:
+            continue
+        componente = {inicio}
+        fila = deque([inicio])
+        while fila:
+            for vizinho in vizinhos[fila.popleft()]:
+                if vizinho not in componente:
+                    componente.add(vizinho)
+                    fila.append(vizinho)
+        vistos |= componente
+        if len(componente) > 1:
+            componentes.add(frozenset(componente))
+    return componentes
+
+@pytest.mark.parametrize('semente', range(5))
+def test_uniao_busca_igual_a_bfs(semente):
+    rng = random.Random(semente)
+    n = 300
+    uniao = UniaoBusca(n // 2)
+    for _ in range(n - n // 2):
+        uniao.adicionar()
+    vizinhos = defaultdict(set, {x: set() for x in range(n)})
+    for _ in range(200):
+        a, b = rng.randrange(n), rng.randrange(n)
+        uniao.unir(a, b)
+        vizinhos[a].add(b)
+        vizinhos[b].add(a)
+        
+    grupos = defaultdict(set)
+    for x in range(n):
+        grupos[uniao.encontrar(x)].add(x)
+    assert {frozenset(g) for g in grupos.values() if len(g) > 1} == _componentes_bfs(vizinhos)
+    for raiz, grupo in grupos.items():
+        assert uniao.tamanhos[raiz] == len(grupo)
+
+def test_clusters_iguais_aos_componentes_do_grafo(tmp_path):
+    pytest.importorskip('numpy')
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    brutos = list(gerar_acordaos(400, seed=7))
+    for acordao in brutos:
+        index.add_acordao(acordao)
+    acordaos = [process_acordao(copy.deepcopy(acordao), index) for acordao in brutos]
+    
+    vizinhos = defaultdict(set)
+    for acordao in acordaos:
+        for similar in (acordao.get('acordaosSimilaresEstruturados') or {}).values():
+            destino = index.get_id(similar['tipo'], similar['numero'])
+            if destino and destino != acordao['id']:
+                vizinhos[acordao['id']].add(destino)
+                vizinhos[destino].add(acordao['id'])
+    esperados = _componentes_bfs(vizinhos)
+    assert esperados
+    
+    clusters = ClustersSimilares.de_acordaos(acordaos, index)
+    assert {frozenset(clusters.ids_do_cluster(c)) for c in range(len(clusters))} == esperados
+    for componente in esperados:
+        for acordao_id in componente:
+            assert set(clusters.mesmo_cluster(acordao_id)) == componente
+    assert clusters.mesmo_cluster('inexistente') == ['inexistente']
+    
+    clusters.salvar(str(tmp_path / 'clusters'))
+    carregados = ClustersSimilares.carregar(str(tmp_path / 'clusters'))
+    assert carregados.ids == clusters.ids
+    assert (carregados.cluster == clusters.cluster).all()
+    assert carregados.mesmo_cluster(clusters.ids[0]) == clusters.mesmo_cluster(clusters.ids[0])
@@ -0,0 +1,69 @@
+import copy
+import itertools
+import math
+from collections import Counter
+
+import pytest
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers import cocitacao
+from parsers.acordao_index import AcordaoIndex
+from parsers.cocitacao import MatrizCocitacao, artigos_citados, chave_artigo
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao
+
+@pytest.fixture(scope='module')
+def acordaos():
+    pytest.importorskip('numpy')
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    brutos = list(gerar_acordaos(400, seed=5))
+    for acordao in brutos:
+        index.add_acordao(acordao)
+    processados = [process_acordao(copy.deepcopy(acordao), index) for acordao in brutos]
+    # Um acórdão repetido (mesmo id em dois arquivos) conta uma vez, com a união dos artigos
+    repetido = copy.deepcopy(processados[0])
+    repetido['referenciasLegislativasEstruturadas'] = processados[1]['referenciasLegislativasEstruturadas']
+    return processados + processados[:5] + [repetido]
+
+def test_chave_artigo():
+    assert chave_artigo('cpc-15 ', '489') == 'CPC-15:ART00489'
+    assert chave_artigo('CPC-15', '1-a') == 'CPC-15:ART1-A'
+
+@pytest.mark.parametrize('por_lote', [7, cocitacao.ACORDAOS_POR_LOTE])
+def test_contagens_iguais_a_varredura(acordaos, por_lote, monkeypatch):
+    monkeypatch.setattr(cocitacao, 'ACORDAOS_POR_LOTE', por_lote)
+    matriz = MatrizCocitacao.de_acordaos(acordaos)
+    
+    artigos_por_id = {}
+    for acordao in acordaos:
+        artigos_por_id.setdefault(acordao['id'], set()).update(
+            artigos_citados(acordao.get('referenciasLegislativasEstruturadas')))
+    artigos_por_id = {acordao_id: artigos for acordao_id, artigos in artigos_por_id.items() if artigos}
+    frequencias = Counter(artigo for artigos in artigos_por_id.values() for artigo in artigos)
+    pares = Counter(par for artigos in artigos_por_id.values() for par in itertools.combinations(sorted(artigos), 2))
+    assert pares
+    
+    assert matriz.total_acordaos == len(artigos_por_id)
+    assert sorted(matriz.artigos) == sorted(frequencias)
+    assert matriz.total_pares == len(pares)
+    for artigo, frequencia in frequencias.items():
+        assert matriz.frequencia(artigo) == frequencia
+    for (a, b), contagem in pares.items():
+        assert matriz.contagem(a, b) == matriz.contagem(b, a) == contagem
+        
+    artigo = frequencias.most_common(1)[0][0]
+    associados = matriz.associados(artigo, k=5, metrica='pmi')
+    assert len(associados) == 5
+    for outro, comuns, pmi in associados:
+        par = tuple(sorted((artigo, outro)))
+        assert comuns == pares[par]
+        assert pmi == pytest.approx(math.log(comuns * len(artigos_por_id) / (frequencias[artigo] * frequencias[outro])))
+    assert [valor for _, _, valor in associados] == sorted((valor for _, _, valor in associados), reverse=True)
+
+def test_salvar_e_carregar(acordaos, tmp_path):
+    matriz = MatrizCocitacao.de_acordaos(acordaos)
+    matriz.salvar(str(tmp_path / 'cocitacao'))
+    carregada = MatrizCocitacao.carregar(str(tmp_path / 'cocitacao'))
+    artigo = matriz.artigos[0]
+    assert carregada.associados(artigo, k=10, metrica='jaccard') == matriz.associados(artigo, k=10, metrica='jaccard')
+    assert carregada.total_acordaos == matriz.total_acordaos
@@ -0,0 +1,58 @@
+import os
+
+from process_stj_data import process_directory
+
+from .auxiliares import gravar_json, ler_json, ler_saidas
+
+def _ids(saida, caminho):
+    return [acordao['id'] for acordao in ler_json(os.path.join(saida, caminho))]
+
+def _relatorio(saida):
+    with open(os.path.join(saida, 'relatorio_processamento.txt'), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_primeira_execucao_igual_sem_dedup(entrada_sintetica, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada_sintetica, saida, dedup=True)
+    assert ler_saidas(saida) == saidas_referencia
+    assert "Deduplicação: 240 novos, 0 atualizados, 0 inalterados, 0 duplicados" in _relatorio(saida)
+
+def test_reexecucao_reaproveita_a_saida(entrada_sintetica, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada_sintetica, saida, dedup=True)
+    process_directory(entrada_sintetica, saida, dedup=True)
+    assert ler_saidas(saida) == saidas_referencia
+    assert "Deduplicação: 0 novos, 0 atualizados, 240 inalterados, 0 duplicados" in _relatorio(saida)
+
+def test_dump_novo_substitui_versoes_antigas(entrada, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida, dedup=True)
+    
+    antigo = 'EspelhoTerceiraTurma/20200102.json'
+    acordaos = ler_json(os.path.join(entrada, antigo))
+    identico, alterado = dict(acordaos[5]), dict(acordaos[6])
+    alterado['ementa'] = 'EMENTA CORRIGIDA.'
+    novo = dict(acordaos[0], id='999999999', numeroProcesso='9999999')
+    # Dump mais novo: o mesmo id duas vezes (fica só a primeira ocorrência) e um acórdão novo
+    gravar_json([identico, alterado, novo, dict(novo, ementa='REPETIDO')],
+                os.path.join(entrada, 'EspelhoTerceiraTurma', '20991231.json'))
+    process_directory(entrada, saida, dedup=True)
+    
+    saidas = ler_saidas(saida)
+    assert _ids(saida, 'EspelhoTerceiraTurma/20991231.json') == [alterado['id'], novo['id']]
+    gravados = ler_json(os.path.join(saida, 'EspelhoTerceiraTurma/20991231.json'))
+    assert gravados[0]['ementa'] == 'EMENTA CORRIGIDA.'
+    assert gravados[1]['ementa'] == novo['ementa']
+    # A versão antiga do alterado sai do arquivo antigo; o idêntico fica onde estava
+    ids_antigos = _ids(saida, antigo)
+    assert alterado['id'] not in ids_antigos and identico['id'] in ids_antigos
+    assert len(ids_antigos) == len(acordaos) - 1
+    assert {k: v for k, v in saidas.items() if k != antigo and '20991231' not in k} == \
+        {k: v for k, v in saidas_referencia.items() if k != antigo}
+    # Duplicados: o idêntico, a segunda ocorrência do novo e a versão antiga do alterado
+    assert ("Deduplicação: 1 novos, 1 atualizados, 239 inalterados, 3 duplicados ignorados "
+            "(1 idênticos a execuções anteriores, 2 repetidos entre dumps)") in _relatorio(saida)
+            
+    # Uma terceira execução não muda nada
+    process_directory(entrada, saida, dedup=True)
+    assert ler_saidas(saida) == saidas
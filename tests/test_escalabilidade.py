@@ -0,0 +1,50 @@
+import csv
+import os
+
+import pytest
+
+from benchmarks.escalabilidade import (ARQUIVO_CSV, CAMPOS_CSV, comparar_baseline, escalonamento, executar_tamanho,
+                                       gravar_resultados, preparar_arvore)
+
+from .auxiliares import ler_json
+
+def _linhas(segundos_por_tamanho, etapa='parse'):
+    return [{'tamanho': tamanho, 'etapa': etapa, 'segundos': segundos} for tamanho, segundos in segundos_por_tamanho]
+
+def test_expoente_de_escalonamento():
+    linhas = (_linhas([(1000, 0.5), (10_000, 5.0), (100_000, 50.0)])
+              + _linhas([(1000, 0.01), (10_000, 1.0), (100_000, 100.0)], etapa='quadratica')
+              + _linhas([(1000, 2.0)], etapa='um_tamanho'))
+    curvas = escalonamento(linhas)
+    assert curvas['parse']['expoente'] == pytest.approx(1.0)
+    assert curvas['quadratica']['expoente'] == pytest.approx(2.0)
+    assert curvas['um_tamanho'] == {'pontos': [[1000, 2.0]], 'expoente': None}
+
+def test_gate_de_regressao(tmp_path):
+    baseline = gravar_resultados(str(tmp_path / 'baseline'), _linhas([(1000, 0.2), (10_000, 2.0)])
+                                 + _linhas([(10_000, 1.0)], etapa='relatores'))
+    with open(os.path.join(str(tmp_path / 'baseline'), ARQUIVO_CSV), newline='', encoding='utf-8') as f:
+        linhas_csv = list(csv.DictReader(f))
+    assert list(linhas_csv[0]) == CAMPOS_CSV and len(linhas_csv) == 3
+    assert ler_json(baseline)['escalonamento']['parse']['expoente'] == pytest.approx(1.0)
+    
+    # 1000: abaixo de min_segundos no baseline; relatores: dentro da tolerância; 50_000: sem baseline
+    atuais = (_linhas([(1000, 1.0), (10_000, 2.6), (50_000, 99.0)])
+              + _linhas([(10_000, 1.1)], etapa='relatores'))
+    regressoes = comparar_baseline(atuais, baseline, tolerancia=20, min_segundos=0.5)
+    assert regressoes == ["parse com 10,000 acórdãos: 2.00s -> 2.60s (+30.0%)"]
+    assert comparar_baseline(atuais, baseline, tolerancia=50, min_segundos=0.5) == []
+
+def test_mede_so_as_etapas_selecionadas(tmp_path):
+    trabalho = str(tmp_path)
+    arvore = preparar_arvore(trabalho, 60, 20)
+    mtime = os.path.getmtime(os.path.join(arvore, '.arvore_completa'))
+    assert preparar_arvore(trabalho, 60, 20) == arvore
+    assert os.path.getmtime(os.path.join(arvore, '.arvore_completa')) == mtime
+    
+    # A dependência (indice_acordaos) roda, mas só a etapa pedida entra nos resultados
+    linhas = executar_tamanho(arvore, os.path.join(trabalho, 'execucao'), 60, ['parse'], com_tracemalloc=True)
+    assert [linha['etapa'] for linha in linhas] == ['parse']
+    assert linhas[0]['segundos'] > 0 and linhas[0]['pico_python_mib'] > 0
+    assert os.path.exists(os.path.join(trabalho, 'execucao', 'indices', 'acordaos.json'))
+    assert os.listdir(os.path.join(trabalho, 'execucao', 'parseados'))
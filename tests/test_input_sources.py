@@ -0,0 +1,89 @@
+import gzip
+import lzma
+import os
+import zipfile
+
+import pytest
+
+from parsers.input_sources import listar_fontes
+from process_stj_data import process_directory
+
+from .auxiliares import ler_saidas
+
+def _compactar_entrada(base: str) -> None:
+    """
+    Troca os JSONs da árvore sintética pelas formas compactadas aceitas.
+    
+    EspelhoPrimeiraTurma vira um .zip com os JSONs na raiz; os arquivos de
+    EspelhoTerceiraTurma viram .json.gz e .json.xz; um JSON de
+    EspelhoCorteEspecial vai, como .json.gz, para um .zip com pastas.
+    """
+    pasta = os.path.join(base, 'EspelhoPrimeiraTurma')
+    with zipfile.ZipFile(pasta + '.zip', 'w', zipfile.ZIP_DEFLATED) as z:
+        for nome in sorted(os.listdir(pasta)):
+            z.write(os.path.join(pasta, nome), nome)
+            os.remove(os.path.join(pasta, nome))
+    os.rmdir(pasta)
+    
+    pasta = os.path.join(base, 'EspelhoTerceiraTurma')
+    for nome, abrir, extensao in zip(sorted(os.listdir(pasta)), (gzip.open, lzma.open), ('.gz', '.xz')):
+        caminho = os.path.join(pasta, nome)
+        with open(caminho, 'rb') as origem, abrir(caminho + extensao, 'wb') as destino:
+            destino.write(origem.read())
+        os.remove(caminho)
+        
+    pasta = os.path.join(base, 'EspelhoCorteEspecial')
+    nome = sorted(os.listdir(pasta))[-1]
+    with open(os.path.join(pasta, nome), 'rb') as f:
+        conteudo = f.read()
+    with zipfile.ZipFile(os.path.join(base, 'downloads.zip'), 'w') as z:
+        z.writestr(f"EspelhoCorteEspecial/{nome}.gz", gzip.compress(conteudo))
+        z.writestr('leiame.txt', b'ignorado')
+    os.remove(os.path.join(pasta, nome))
+
+def test_fontes_compactadas_tem_o_mesmo_conteudo(entrada_sintetica, entrada):
+    originais = {fonte.caminho_relativo: fonte.ler_bytes() for fonte in listar_fontes(entrada_sintetica)}
+    _compactar_entrada(entrada)
+    fontes = list(listar_fontes(entrada))
+    assert sorted(fonte.caminho_relativo for fonte in fontes) == sorted(originais)
+    assert any(fonte.origem.endswith('.zip:EspelhoCorteEspecial/20200106.json.gz') for fonte in fontes)
+    for fonte in fontes:
+        assert fonte.ler_bytes() == originais[fonte.caminho_relativo]
+
+@pytest.mark.parametrize('tamanho', [1, 1000])
+def test_abrir_le_aos_poucos(entrada_sintetica, entrada, tamanho):
+    originais = {fonte.caminho_relativo: fonte.ler_bytes() for fonte in listar_fontes(entrada_sintetica)}
+    _compactar_entrada(entrada)
+    for fonte in listar_fontes(entrada):
+        with fonte.abrir() as f:
+            assert f.read(tamanho) == originais[fonte.caminho_relativo][:tamanho]
+            assert f.read() == originais[fonte.caminho_relativo][tamanho:]
+
+def test_saida_de_entrada_compactada_igual_a_extraida(entrada, saidas_referencia, tmp_path):
+    _compactar_entrada(entrada)
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida)
+    assert ler_saidas(saida) == saidas_referencia
+
+def test_json_extraido_prevalece_sobre_compactado(entrada_sintetica, entrada):
+    pasta = os.path.join(entrada, 'EspelhoTerceiraTurma')
+    nome = sorted(os.listdir(pasta))[0]
+    with open(os.path.join(pasta, nome), 'rb') as f:
+        original = f.read()
+    with gzip.open(os.path.join(pasta, nome + '.gz'), 'wb') as f:
+        f.write(b'[]')
+    with zipfile.ZipFile(os.path.join(entrada, 'downloads.zip'), 'w') as z:
+        z.writestr(f"EspelhoTerceiraTurma/{nome}", b'[]')
+    fontes = list(listar_fontes(entrada))
+    relativos = [fonte.caminho_relativo for fonte in fontes]
+    assert sorted(relativos) == sorted(fonte.caminho_relativo for fonte in listar_fontes(entrada_sintetica))
+    fonte, = [fonte for fonte in fontes if fonte.caminho_relativo == os.path.join('EspelhoTerceiraTurma', nome)]
+    assert not fonte.compactada and fonte.ler_bytes() == original
+
+def test_zip_substituido_e_relido(tmp_path):
+    zip_path = str(tmp_path / 'EspelhoSegundaTurma.zip')
+    for conteudo in (b'[]', b'[{"id": "1"}]', b'[{"id": "2"}, {"id": "3"}]'):
+        with zipfile.ZipFile(zip_path, 'w') as z:
+            z.writestr('20200101.json', conteudo)
+        fonte, = listar_fontes(str(tmp_path))
+        assert fonte.ler_bytes() == conteudo
@@ -0,0 +1,13 @@
+import pytest
+
+from process_stj_data import process_directory
+
+from .auxiliares import POR_ARQUIVO, TOTAL_ACORDAOS, ler_saidas
+
+@pytest.mark.parametrize('io_workers, prefetch', [(1, 1), (4, 2), (8, 8)])
+def test_pipeline_grava_os_mesmos_bytes_que_o_sequencial(entrada_sintetica, saidas_referencia, tmp_path,
+                                                         io_workers, prefetch):
+    assert len(saidas_referencia) == TOTAL_ACORDAOS // POR_ARQUIVO
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada_sintetica, saida, io_workers=io_workers, prefetch=prefetch)
+    assert ler_saidas(saida) == saidas_referencia
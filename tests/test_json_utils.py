@@ -0,0 +1,39 @@
+import json
+import math
+
+import pytest
+
+from parsers import json_utils
+
+DOCUMENTOS = [
+    {'texto': 'ação e-STJ fl. 2e3', 'lista': [1, -2, None, True], 'vazio': {}},
+    [0.5, -1.25, 100.0, 0.1, 0.000123, 123456789.123, 1e15],
+    [1e16, -1.5e+300, 1e-05, 3e-07, 1.5e-10, 5e-324, 0.00001234],
+    {'floats': {'pequeno': 2.5e-300, 'grande': 1.7976931348623157e308}},
+    [{'v': math.nan}, {'w': [math.inf, -math.inf, None]}],
+]
+
+@pytest.mark.parametrize('documento', DOCUMENTOS)
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('sort_keys', [False, True])
+def test_dumps_igual_ao_stdlib(documento, indent, sort_keys):
+    separadores = (',', ':') if indent is None else None
+    esperado = json.dumps(documento, ensure_ascii=False, indent=indent, sort_keys=sort_keys, separators=separadores)
+    assert json_utils.dumps(documento, indent=indent, sort_keys=sort_keys) == esperado
+
+@pytest.mark.parametrize('documento', DOCUMENTOS)
+def test_dump_file_igual_ao_stdlib(documento, tmp_path):
+    caminho = str(tmp_path / 'saida.json')
+    json_utils.dump_file(documento, caminho)
+    with open(caminho, 'r', encoding='utf-8') as f:
+        assert f.read() == json.dumps(documento, ensure_ascii=False, indent=2)
+    assert json_utils.dumps(json_utils.load_file(caminho)) == json_utils.dumps(documento)
+
+def test_nao_finitos_vindos_da_entrada():
+    documento = json_utils.process_json_content('[{"v":NaN,"w":[Infinity,-Infinity,null]}]')
+    assert json_utils.dumps(documento) == '[{"v":NaN,"w":[Infinity,-Infinity,null]}]'
+
+def test_backend_escolhido_passa_na_sonda():
+    backends = json_utils.json_backend()
+    assert set(backends) == {'loads', 'dumps'}
+    assert json_utils.loads('{"a": [1, 2.5, "ç"]}') == {'a': [1, 2.5, 'ç']}
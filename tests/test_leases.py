@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+from parsers.leases import GerenciadorLeases
+
+DURACAO = 0.3
+
+def _gerenciadores(tmp_path, *workers):
+    return [GerenciadorLeases(str(tmp_path), worker, duracao=DURACAO, tolerancia=0) for worker in workers]
+
+def test_lease_valido_nao_e_tomado(tmp_path):
+    a, b = _gerenciadores(tmp_path, 'a', 'b')
+    assert a.adquirir('arquivo.json')
+    assert not b.adquirir('arquivo.json')
+    assert a.renovar('arquivo.json')
+    assert not b.adquirir('arquivo.json')
+    assert b.tomados == 0
+
+def test_lease_expirado_e_tomado(tmp_path):
+    a, b, c = _gerenciadores(tmp_path, 'a', 'b', 'c')
+    assert a.adquirir('arquivo.json')
+    time.sleep(DURACAO * 1.5)
+    
+    assert b.adquirir('arquivo.json')
+    assert b.tomados == 1
+    assert not c.adquirir('arquivo.json')
+    # Quem perdeu o lease não o renova, não o libera e não conclui a chave
+    assert not a.renovar('arquivo.json')
+    a.liberar('arquivo.json')
+    assert not c.adquirir('arquivo.json')
+    assert not a.concluir('arquivo.json', {'acordaos': 1})
+    assert not a.concluido('arquivo.json')
+    
+    assert b.concluir('arquivo.json', {'acordaos': 2})
+    assert a.resultado('arquivo.json')['worker'] == 'b'
+    assert a.resultado('arquivo.json')['acordaos'] == 2
+    assert not a.adquirir('arquivo.json')
+    assert not c.adquirir('arquivo.json')
+    assert os.listdir(os.path.join(str(tmp_path), 'leases')) == []
+
+def test_heartbeat_mantem_o_lease(tmp_path):
+    a, b = _gerenciadores(tmp_path, 'a', 'b')
+    assert a.adquirir('arquivo.json')
+    a.iniciar_heartbeat()
+    try:
+        time.sleep(DURACAO * 2)
+        assert not b.adquirir('arquivo.json')
+    finally:
+        a.parar_heartbeat()
+    assert a.concluir('arquivo.json', {})
+
+def test_cada_chave_concluida_uma_vez(tmp_path):
+    chaves = [f"arquivo{i}.json" for i in range(30)]
+    gerenciadores = _gerenciadores(tmp_path, *(f"w{i}" for i in range(4)))
+    concluidas = []
+    trava = threading.Lock()
+    
+    def trabalhar(gerenciador):
+        for chave in chaves:
+            if gerenciador.adquirir(chave) and gerenciador.concluir(chave, {}):
+                with trava:
+                    concluidas.append(chave)
+                    
+    threads = [threading.Thread(target=trabalhar, args=(g,)) for g in gerenciadores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(concluidas) == sorted(chaves)
+
+def test_renovacao_nao_abre_brecha(tmp_path):
+    a, b = (GerenciadorLeases(str(tmp_path), worker, duracao=60.0) for worker in ('a', 'b'))
+    assert a.adquirir('arquivo.json')
+    parar = threading.Event()
+    renovacoes = []
+    
+    def renovar():
+        while not parar.is_set():
+            renovacoes.append(a.renovar('arquivo.json'))
+            
+    thread = threading.Thread(target=renovar)
+    thread.start()
+    try:
+        tomou = any(b.adquirir('arquivo.json') for _ in range(2000))
+    finally:
+        parar.set()
+        thread.join()
+    assert not tomou
+    assert renovacoes and all(renovacoes)
+    assert a.concluir('arquivo.json', {})
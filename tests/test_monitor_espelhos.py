@@ -0,0 +1,55 @@
+import os
+
+from monitor_espelhos import MonitorEspelhos
+
+from .auxiliares import POR_ARQUIVO, TOTAL_ACORDAOS, gravar_json, ler_json, ler_saidas
+
+def _monitor(entrada: str, saida: str) -> MonitorEspelhos:
+    return MonitorEspelhos(entrada, saida, os.path.join(saida, 'indices'), intervalo=60)
+
+def test_monitor_processa_arquivos_estaveis(entrada, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    monitor = _monitor(entrada, saida)
+    try:
+        # Na primeira varredura os arquivos só ficam pendentes
+        monitor.ciclo()
+        assert monitor.arquivos_processados == 0
+        assert monitor.estado()['arquivosPendentes'] == 6
+        monitor.ciclo()
+        assert monitor.arquivos_processados == 6
+        assert monitor.acordaos_processados == TOTAL_ACORDAOS
+        assert monitor.erros == 0
+        assert monitor.estado()['saudavel']
+    finally:
+        monitor.fechar()
+    assert ler_saidas(saida) == saidas_referencia
+    
+    # Reiniciado, continua de onde parou e só lê o arquivo novo
+    acordaos = ler_json(os.path.join(entrada, 'EspelhoPrimeiraTurma', '20200101.json'))
+    for acordao in acordaos:
+        acordao['id'] = 'novo' + acordao['id']
+        acordao['numeroProcesso'] = '9' + acordao['numeroProcesso']
+    gravar_json(acordaos, os.path.join(entrada, 'EspelhoPrimeiraTurma', '20200201.json'))
+    monitor = _monitor(entrada, saida)
+    try:
+        assert len(monitor.acordaos) == TOTAL_ACORDAOS
+        monitor.ciclo()
+        monitor.ciclo()
+        assert monitor.arquivos_processados == 1
+        assert monitor.acordaos_processados == POR_ARQUIVO
+        assert len(monitor.acordaos) == TOTAL_ACORDAOS + POR_ARQUIVO
+    finally:
+        monitor.fechar()
+
+def test_acordao_sem_classe_nao_trava_o_monitor(tmp_path):
+    entrada = str(tmp_path / 'entrada')
+    os.makedirs(os.path.join(entrada, 'EspelhoSegundaTurma'))
+    gravar_json([{'id': '1', 'numeroProcesso': '123'}], os.path.join(entrada, 'EspelhoSegundaTurma', '20200101.json'))
+    monitor = _monitor(entrada, str(tmp_path / 'saida'))
+    try:
+        for _ in range(3):
+            monitor.ciclo()
+        assert monitor.arquivos_processados == 1
+        assert monitor.estado()['saudavel']
+    finally:
+        monitor.fechar()
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.clusters_similares import clusters_do_diretorio
+from parsers.cocitacao import cocitacao_do_diretorio
+from parsers.colunas import exportar_colunas
+from parsers.cubo_relatores import cubo_do_diretorio
+from parsers.montadores import montar_indices
+from parsers.precedentes import precedentes_do_diretorio
+from parsers.sigla_matcher import SiglaMatcher
+
+pytest.importorskip('numpy')
+
+def _arquivos(diretorio):
+    """Conteúdo de todos os arquivos sob o diretório, por caminho relativo."""
+    arquivos = {}
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            with open(caminho, 'rb') as f:
+                arquivos[os.path.relpath(caminho, diretorio)] = f.read()
+    return arquivos
+
+def test_uma_leitura_grava_os_mesmos_indices(saida_referencia, tmp_path):
+    juntos, separados = tmp_path / 'juntos', tmp_path / 'separados'
+    resultados = montar_indices(saida_referencia, str(juntos / 'indices'), colunas=str(juntos / 'colunas'))
+    assert set(resultados) == {'precedentes', 'cocitacao', 'clusters_similares', 'cubo_relatores', 'colunas'}
+    
+    indices = separados / 'indices'
+    precedentes_do_diretorio(saida_referencia, str(indices / 'precedentes'))
+    cocitacao_do_diretorio(saida_referencia, str(indices / 'cocitacao'))
+    clusters_do_diretorio(saida_referencia, str(indices / 'clusters_similares'))
+    cubo_do_diretorio(saida_referencia, str(indices / 'cubo_relatores'))
+    exportar_colunas(saida_referencia, str(separados / 'colunas'))
+    
+    arquivos = _arquivos(str(juntos))
+    assert arquivos == _arquivos(str(separados))
+    for nome in ('precedentes', 'cocitacao', 'clusters_similares', 'cubo_relatores'):
+        assert any(caminho.startswith(os.path.join('indices', nome)) for caminho in arquivos)
+
+def test_indice_salvo_resolve_os_similares(saida_referencia, tmp_path):
+    indice_path = str(tmp_path / 'indice_acordaos.json')
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    index.build_from_directory(saida_referencia)
+    index.save_to_file(indice_path)
+    
+    montar_indices(saida_referencia, str(tmp_path / 'com_indice'), indice_path=indice_path)
+    montar_indices(saida_referencia, str(tmp_path / 'sem_indice'))
+    assert _arquivos(str(tmp_path / 'com_indice' / 'clusters_similares')) == \
+        _arquivos(str(tmp_path / 'sem_indice' / 'clusters_similares'))
@@ -0,0 +1,76 @@
+import glob
+import os
+from collections import Counter
+
+from parsers.json_utils import dumps, loads
+from parsers.particionamento import (DESCONHECIDO, EscritorParticionado, chave_particao, listar_partes,
+                                     particionar_diretorio, valor_orgao)
+from process_stj_data import process_directory
+
+from .auxiliares import TOTAL_ACORDAOS, ler_json, ler_saidas
+
+def _linhas(base_path: str, partes=None) -> Counter:
+    """Acórdãos gravados nas partes (todas, se não informadas), como JSON."""
+    linhas = Counter()
+    for parte in partes if partes is not None else glob.glob(os.path.join(base_path, 'ano=*', 'orgao=*', '*.jsonl')):
+        with open(parte, 'r', encoding='utf-8') as f:
+            linhas.update(linha.rstrip('\n') for linha in f)
+    return linhas
+
+def _acordaos(saida: str):
+    return [acordao for caminho in ler_saidas(saida) for acordao in ler_json(os.path.join(saida, caminho))]
+
+def test_chave_particao():
+    assert valor_orgao(' Terceira  Turma ') == 'TERCEIRA_TURMA'
+    assert valor_orgao('') == DESCONHECIDO
+    assert chave_particao({'dataDecisao': '20200131', 'nomeOrgaoJulgador': 'CORTE ESPECIAL'}) == ('2020', 'CORTE_ESPECIAL')
+    assert chave_particao({'dataDecisao': '2020'}) == (DESCONHECIDO, DESCONHECIDO)
+
+def test_saida_particionada_do_parse(entrada, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida, particionar=True)
+    assert ler_saidas(saida) == saidas_referencia
+    
+    particionado = os.path.join(saida, 'particionado')
+    acordaos = _acordaos(saida)
+    assert _linhas(particionado) == Counter(dumps(acordao) for acordao in acordaos)
+    
+    manifesto = ler_json(os.path.join(particionado, EscritorParticionado.NOME_MANIFESTO))
+    assert manifesto['linhas'] == TOTAL_ACORDAOS
+    for particao in manifesto['particoes']:
+        partes = [os.path.join(particionado, *particao['caminho'].split('/'), parte['arquivo'])
+                  for parte in particao['partes']]
+        datas = []
+        for linha in _linhas(particionado, partes).elements():
+            acordao = loads(linha)
+            assert chave_particao(acordao) == (particao['ano'], particao['orgao'])
+            datas.append(f"{acordao['dataDecisao'][:4]}-{acordao['dataDecisao'][4:6]}-{acordao['dataDecisao'][6:8]}")
+        assert len(datas) == particao['linhas']
+        assert (particao['dataMin'], particao['dataMax']) == (min(datas), max(datas))
+    assert not os.path.exists(particionado + '.tmp')
+
+def test_partes_e_filtros(saida_referencia, tmp_path):
+    destino = str(tmp_path / 'particionado')
+    manifesto = particionar_diretorio(saida_referencia, destino, linhas_por_parte=2)
+    assert _linhas(destino) == Counter(dumps(acordao) for acordao in _acordaos(saida_referencia))
+    for particao in manifesto['particoes']:
+        assert all(parte['linhas'] <= 2 for parte in particao['partes'])
+        assert sum(parte['linhas'] for parte in particao['partes']) == particao['linhas']
+    assert any(len(particao['partes']) > 1 for particao in manifesto['particoes'])
+    
+    particao = manifesto['particoes'][0]
+    partes = listar_partes(destino, anos=[particao['ano']], orgaos=[particao['nomeOrgaoJulgador']])
+    assert len(partes) == len(particao['partes'])
+    assert listar_partes(destino, data_inicio='2999-01-01') == []
+    assert len(listar_partes(destino)) == sum(len(p['partes']) for p in manifesto['particoes'])
+
+def test_descartar_mantem_a_saida_anterior(saida_referencia, tmp_path):
+    destino = str(tmp_path / 'particionado')
+    particionar_diretorio(saida_referencia, destino)
+    anteriores = _linhas(destino)
+    
+    escritor = EscritorParticionado(destino, max_abertos=1)
+    escritor.adicionar([{'id': '1', 'dataDecisao': '20210101', 'nomeOrgaoJulgador': 'X'}])
+    escritor.descartar()
+    assert _linhas(destino) == anteriores
+    assert not os.path.exists(destino + '.tmp')
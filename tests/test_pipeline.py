@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from parsers.versoes import modulos_locais
+from pipeline import Etapa, Pipeline, versao_codigo
+
+# Funções das etapas no nível do módulo, para rodarem no pool de processos
+
+def _maiusculas(config):
+    with open(config['origem'], encoding='utf-8') as f, open(config['meio'], 'w', encoding='utf-8') as g:
+        g.write(f.read().upper() + config.get('sufixo', ''))
+
+def _contar(config):
+    with open(config['meio'], encoding='utf-8') as f, open(config['fim'], 'w', encoding='utf-8') as g:
+        g.write(str(len(f.read())))
+    with open(config['log'], 'a', encoding='utf-8') as log:
+        log.write('contar\n')
+
+def _falhar(config):
+    raise RuntimeError("falha proposital")
+
+def _config(tmp_path):
+    config = {nome: str(tmp_path / nome) for nome in ('origem', 'meio', 'fim', 'log')}
+    config['saida'] = str(tmp_path / 'saida')
+    with open(config['origem'], 'w', encoding='utf-8') as f:
+        f.write('abc')
+    return config
+
+def _etapas(config, primeira=_maiusculas):
+    return [
+        Etapa('contar', _contar, [config['meio']], [config['fim']], modulos=['parsers.json_utils']),
+        Etapa('maiusculas', primeira, [config['origem']], [config['meio']], modulos=['parsers.json_utils'],
+              parametros=['sufixo']),
+    ]
+
+def test_dependencias_e_ciclos(tmp_path):
+    config = _config(tmp_path)
+    pipeline = Pipeline(_etapas(config), config)
+    assert pipeline.dependencias == {'contar': {'maiusculas'}, 'maiusculas': set()}
+    assert pipeline.com_dependencias(['contar']) == {'contar', 'maiusculas'}
+    with pytest.raises(ValueError):
+        pipeline.com_dependencias(['inexistente'])
+        
+    ciclo = [Etapa('a', _contar, [config['fim']], [config['meio']]), Etapa('b', _contar, [config['meio']], [config['fim']])]
+    with pytest.raises(ValueError, match='Ciclo'):
+        Pipeline(ciclo, config)
+
+def test_carimbos_pulam_etapas_atualizadas(tmp_path):
+    config = _config(tmp_path)
+    assert Pipeline(_etapas(config), config).executar() == {'maiusculas': 'executada', 'contar': 'executada'}
+    with open(config['meio'], encoding='utf-8') as f:
+        assert f.read() == 'ABC'
+    assert Pipeline(_etapas(config), config).status() == {'contar': 'atualizada', 'maiusculas': 'atualizada'}
+    assert Pipeline(_etapas(config), config).executar() == {'maiusculas': 'pulada', 'contar': 'pulada'}
+    
+    # Mesma saída intermediária: só a etapa cuja entrada mudou roda de novo
+    config['sufixo'] = ''
+    assert Pipeline(_etapas(config), config).executar() == {'maiusculas': 'executada', 'contar': 'pulada'}
+    config['sufixo'] = '!'
+    assert Pipeline(_etapas(config), config).executar() == {'maiusculas': 'executada', 'contar': 'executada'}
+    with open(config['origem'], 'w', encoding='utf-8') as f:
+        f.write('abcd')
+    assert Pipeline(_etapas(config), config).status() == {'contar': 'atualizada', 'maiusculas': 'pendente'}
+    assert Pipeline(_etapas(config), config).executar(['maiusculas']) == {'maiusculas': 'executada'}
+    assert Pipeline(_etapas(config), config).executar() == {'maiusculas': 'pulada', 'contar': 'executada'}
+    
+    os.remove(config['fim'])
+    assert Pipeline(_etapas(config), config, forcar=['maiusculas']).executar() == \
+        {'maiusculas': 'executada', 'contar': 'executada'}
+    with open(config['log'], encoding='utf-8') as log:
+        assert log.read().count('contar') == 4
+
+def test_falha_cancela_dependentes(tmp_path):
+    config = _config(tmp_path)
+    assert Pipeline(_etapas(config, primeira=_falhar), config).executar() == {'maiusculas': 'falhou', 'contar': 'cancelada'}
+    assert not os.path.exists(config['fim'])
+
+def test_versao_segue_os_imports_do_projeto():
+    locais = modulos_locais(['pipeline'])
+    assert {'pipeline', 'parsers.json_utils', 'parsers.versoes'} <= set(locais)
+    # Também os importados dentro de funções (as etapas importam seus módulos ao rodar)
+    assert 'process_stj_data' in locais
+    assert modulos_locais(['parsers.versoes']) == ['parsers.versoes']
+    # Etapas que chamam pacotes incluem todos os módulos do pacote
+    assert versao_codigo(['parsers']) != versao_codigo(['parsers.json_utils'])
+    assert versao_codigo(['parsers.json_utils']) == versao_codigo(['parsers.json_utils'])
+    with pytest.raises(ValueError):
+        versao_codigo(['inexistente'])
@@ -0,0 +1,60 @@
+import copy
+from collections import Counter, defaultdict
+
+import pytest
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers.acordao_index import AcordaoIndex
+from parsers.precedentes import IndicePrecedentes, chave_precedente, precedentes_citados
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao
+
+@pytest.fixture(scope='module')
+def acordaos():
+    pytest.importorskip('numpy')
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    brutos = list(gerar_acordaos(400, seed=3))
+    for acordao in brutos:
+        index.add_acordao(acordao)
+    processados = [process_acordao(copy.deepcopy(acordao), index) for acordao in brutos]
+    # Um acórdão repetido (mesmo id em dois arquivos) conta uma vez
+    return processados + processados[:5]
+
+def test_chave_precedente():
+    assert chave_precedente('STJ', 'TEMA', '1.076') == 'STJ:TEMA:1076'
+    assert chave_precedente('stj ', 'SÚMULA', '000007') == chave_precedente('STJ', 'SÚMULA', 7) == 'STJ:SÚMULA:7'
+    assert chave_precedente(None, 'SÚMULA', '7') == 'DESCONHECIDO:SÚMULA:7'
+    assert chave_precedente('STJ', 'REsp', '7') is None
+    assert chave_precedente('STJ', 'TEMA', 'sem número') is None
+
+def test_postings_iguais_a_varredura(acordaos):
+    indice = IndicePrecedentes.de_acordaos(acordaos)
+    
+    # Varredura: ids (na ordem da primeira aparição) e anos dos acórdãos que citam cada precedente
+    citantes = defaultdict(dict)
+    for acordao in acordaos:
+        for chave in precedentes_citados(acordao):
+            citantes[chave][acordao['id']] = acordao['dataDecisao'][:4]
+    assert citantes
+    assert sorted(indice.precedentes) == sorted(citantes)
+    
+    for chave, ids in citantes.items():
+        tribunal, especie, numero = chave.split(':')
+        assert indice.acordaos(tribunal, especie, numero) == sorted(ids, key=indice.ids.index)
+        assert indice.total(tribunal, especie, numero) == len(ids)
+        assert indice.contagens_por_ano(tribunal, especie, numero) == dict(Counter(ids.values()))
+        
+    totais = sorted(((-len(ids), indice.codigos[chave]) for chave, ids in citantes.items()))[:5]
+    assert indice.mais_citados(5) == [(indice.precedentes[p], -total) for total, p in totais]
+    assert all(chave.split(':')[1] == 'SÚMULA' for chave, _ in indice.mais_citados(3, especie='SÚMULA'))
+    assert indice.acordaos('STJ', 'TEMA', 999999) == []
+
+def test_salvar_e_carregar(acordaos, tmp_path):
+    indice = IndicePrecedentes.de_acordaos(acordaos)
+    indice.salvar(str(tmp_path / 'precedentes'))
+    carregado = IndicePrecedentes.carregar(str(tmp_path / 'precedentes'))
+    for chave in indice.precedentes:
+        tribunal, especie, numero = chave.split(':')
+        assert carregado.acordaos(tribunal, especie, numero) == indice.acordaos(tribunal, especie, numero)
+        assert carregado.contagens_por_ano(tribunal, especie, numero) == \
+            indice.contagens_por_ano(tribunal, especie, numero)
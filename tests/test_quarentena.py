@@ -0,0 +1,65 @@
+import os
+
+import process_stj_data
+from parsers.input_sources import listar_fontes
+from parsers.json_utils import loads
+from parsers.output_schema import PARSERS_ESTRUTURADOS
+from parsers.quarentena import Quarentena
+from process_stj_data import process_directory, retry_quarantine
+
+from .auxiliares import ler_json, ler_saidas
+
+def _falhar_em(ids_com_falha, entrada):
+    """PARSERS_ESTRUTURADOS com o parser da data de publicação falhando para os acórdãos informados."""
+    datas = {acordao['dataPublicacao'] for fonte in listar_fontes(entrada) for acordao in loads(fonte.ler_bytes())
+             if acordao['id'] in ids_com_falha}
+             
+    def parser_com_falha(parser):
+        def parse(valor, index):
+            if valor in datas:
+                raise ValueError("falha simulada")
+            return parser(valor, index)
+        return parse
+        
+    return [(bruto, estruturado, parser_com_falha(parser) if bruto == 'dataPublicacao' else parser)
+            for bruto, estruturado, parser in PARSERS_ESTRUTURADOS]
+
+def _ids_da_saida(saida, caminho):
+    return [acordao['id'] for acordao in ler_json(os.path.join(saida, caminho))]
+
+def test_retry_restaura_a_ordem_original(entrada_sintetica, saida_referencia, saidas_referencia, tmp_path,
+                                         monkeypatch):
+    arquivo = sorted(saidas_referencia)[0]
+    ids = _ids_da_saida(saida_referencia, arquivo)
+    # O primeiro, dois seguidos no meio e o último do arquivo
+    ids_com_falha = {ids[0], ids[10], ids[11], ids[-1]}
+    
+    saida = str(tmp_path / 'saida')
+    monkeypatch.setattr(process_stj_data, 'PARSERS_ESTRUTURADOS', _falhar_em(ids_com_falha, entrada_sintetica))
+    process_directory(entrada_sintetica, saida)
+    
+    registros = Quarentena(saida).ler()
+    assert {registro['id'] for registro in registros} == ids_com_falha
+    assert all(registro['parser'] == 'publicacaoEstruturada' for registro in registros)
+    assert _ids_da_saida(saida, arquivo) == [i for i in ids if i not in ids_com_falha]
+    
+    monkeypatch.undo()
+    retry_quarantine(entrada_sintetica, saida)
+    assert Quarentena(saida).ler() == []
+    assert ler_saidas(saida) == saidas_referencia
+
+def test_retry_mantem_na_quarentena_o_que_continua_falhando(entrada_sintetica, saida_referencia, saidas_referencia,
+                                                           tmp_path, monkeypatch):
+    arquivo = sorted(saidas_referencia)[-1]
+    ids = _ids_da_saida(saida_referencia, arquivo)
+    
+    saida = str(tmp_path / 'saida')
+    monkeypatch.setattr(process_stj_data, 'PARSERS_ESTRUTURADOS', _falhar_em({ids[3], ids[4]}, entrada_sintetica))
+    process_directory(entrada_sintetica, saida)
+    # Só o primeiro dos dois é corrigido
+    monkeypatch.setattr(process_stj_data, 'PARSERS_ESTRUTURADOS', _falhar_em({ids[4]}, entrada_sintetica))
+    retry_quarantine(entrada_sintetica, saida)
+    
+    assert [registro['id'] for registro in Quarentena(saida).ler()] == [ids[4]]
+    assert _ids_da_saida(saida, arquivo) == ids[:4] + ids[5:]
+    assert ler_json(os.path.join(saida, arquivo))[3] == ler_json(os.path.join(saida_referencia, arquivo))[3]
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+import process_stj_data
+from parsers.output_schema import (CAMPO_VERSOES, CAMPOS_ESTRUTURADOS, PARSERS_ESTRUTURADOS, SCHEMA_ENXUTO,
+                                   OutputSchema, versao_parser)
+from process_stj_data import process_directory, recompute_fields
+
+from .auxiliares import TOTAL_ACORDAOS, ler_json, ler_saidas
+
+CAMPO = 'referenciasLegislativasEstruturadas'
+
+def _sem_versoes(saida: str):
+    acordaos = {}
+    for caminho in ler_saidas(saida):
+        for acordao in ler_json(os.path.join(saida, caminho)):
+            acordao.pop(CAMPO_VERSOES, None)
+            acordaos[acordao['id']] = acordao
+    return acordaos
+
+def _referencia(saida_referencia):
+    return {acordao['id']: acordao for caminho in ler_saidas(saida_referencia)
+            for acordao in ler_json(os.path.join(saida_referencia, caminho))}
+
+@pytest.fixture
+def saida_versionada(entrada, tmp_path) -> str:
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida, schema=OutputSchema(versoes=True))
+    return saida
+
+def test_versoes_anotadas_so_quando_pedidas(saida_versionada, saida_referencia):
+    for caminho in ler_saidas(saida_versionada):
+        for acordao in ler_json(os.path.join(saida_versionada, caminho)):
+            assert acordao[CAMPO_VERSOES] == {campo: versao_parser(campo) for campo in CAMPOS_ESTRUTURADOS
+                                              if campo in acordao}
+    assert _sem_versoes(saida_versionada) == _referencia(saida_referencia)
+    assert all(CAMPO_VERSOES not in acordao for acordao in _referencia(saida_referencia).values())
+
+def test_recompute_refaz_so_os_desatualizados(saida_versionada, saida_referencia, monkeypatch):
+    anteriores = ler_saidas(saida_versionada)
+    contagens = recompute_fields(saida_versionada)
+    assert all(contagem['refeitos'] == 0 for contagem in contagens.values())
+    assert ler_saidas(saida_versionada) == anteriores
+    
+    # Nova versão de um parser: só o seu campo é refeito
+    versao_atual = process_stj_data.versao_parser
+    monkeypatch.setattr(process_stj_data, 'versao_parser',
+                        lambda campo: 'nova' if campo == CAMPO else versao_atual(campo))
+    contagens = recompute_fields(saida_versionada)
+    assert contagens[CAMPO]['refeitos'] > 0 and contagens[CAMPO]['atualizados'] == 0
+    assert all(contagem['refeitos'] == 0 for campo, contagem in contagens.items() if campo != CAMPO)
+    versoes = [acordao[CAMPO_VERSOES] for caminho in ler_saidas(saida_versionada)
+               for acordao in ler_json(os.path.join(saida_versionada, caminho)) if CAMPO in acordao]
+    assert versoes and all(versao[CAMPO] == 'nova' for versao in versoes)
+    assert _sem_versoes(saida_versionada) == _referencia(saida_referencia)
+    assert recompute_fields(saida_versionada, campos=[CAMPO])[CAMPO]['refeitos'] == 0
+
+def test_saida_sem_versoes_e_refeita_uma_vez(entrada, saida_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada, saida)
+    contagens = recompute_fields(saida)
+    assert sum(contagem['refeitos'] for contagem in contagens.values()) > TOTAL_ACORDAOS
+    assert _sem_versoes(saida) == _referencia(saida_referencia)
+    assert all(contagem['refeitos'] == 0 for contagem in recompute_fields(saida).values())
+
+def test_sem_bruto_e_falhas_mantem_o_valor(entrada, tmp_path, monkeypatch):
+    saida = str(tmp_path / 'enxuta')
+    process_directory(entrada, saida, schema=SCHEMA_ENXUTO)
+    anteriores = ler_saidas(saida)
+    contagens = recompute_fields(saida, campos=[CAMPO])
+    assert contagens[CAMPO]['sem_bruto'] > 0 and contagens[CAMPO]['refeitos'] == 0
+    assert ler_saidas(saida) == anteriores
+    
+    saida = str(tmp_path / 'completa')
+    process_directory(entrada, saida, schema=OutputSchema(versoes=True))
+    anteriores = ler_saidas(saida)
+    
+    def falhar(valor, index):
+        raise ValueError("parser quebrado")
+        
+    monkeypatch.setattr(process_stj_data, 'PARSERS_ESTRUTURADOS', [
+        (bruto, estruturado, falhar if estruturado == CAMPO else parser)
+        for bruto, estruturado, parser in PARSERS_ESTRUTURADOS])
+    contagens = recompute_fields(saida, campos=[CAMPO], forcar=True)
+    assert contagens[CAMPO]['erros'] > 0 and contagens[CAMPO]['refeitos'] == 0
+    assert ler_saidas(saida) == anteriores
+    
+    with pytest.raises(ValueError):
+        recompute_fields(saida, campos=['inexistente'])
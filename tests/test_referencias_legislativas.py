@@ -0,0 +1,70 @@
+import copy
+import pickle
+
+import pytest
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers import referencias_legislativas
+from parsers.json_utils import dumps
+from parsers.referencias_legislativas import (MAX_CACHE_REFERENCIAS, RegistroImutavel, configurar_cache,
+                                              estatisticas_cache, parse_referencias_legislativas, relatorio_cache)
+
+REFERENCIA = ('LEG:FED LEI:013105 ANO:2015\n*****  CPC-15    CÓDIGO DE PROCESSO CIVIL DE 2015\n'
+              '        ART:00489 PAR:00001 INC:00004')
+
+@pytest.fixture
+def cache_pequeno():
+    configurar_cache(2)
+    yield
+    configurar_cache(MAX_CACHE_REFERENCIAS)
+
+def test_cache_igual_ao_parse_sem_cache():
+    referencias = [ref for acordao in gerar_acordaos(200, seed=7) for ref in acordao['referenciasLegislativas']]
+    com_cache = [dumps(parse_referencias_legislativas([ref])) for ref in referencias]
+    configurar_cache(0)
+    try:
+        assert [dumps(parse_referencias_legislativas([ref])) for ref in referencias] == com_cache
+    finally:
+        configurar_cache(MAX_CACHE_REFERENCIAS)
+
+def test_alterar_um_resultado_nao_altera_o_cache():
+    primeiro, = parse_referencias_legislativas([REFERENCIA])
+    esperado = copy.deepcopy(primeiro)
+    primeiro['ART']['detalhes']['PAR'] = 'alterado'
+    primeiro['ART']['numero'] = '1'
+    primeiro.setdefault('novo', 1)
+    primeiro.pop('legSigla')
+    segundo, = parse_referencias_legislativas([REFERENCIA])
+    assert segundo == esperado
+    assert dumps(segundo) == dumps(esperado)
+
+def test_registro_imutavel():
+    registro = RegistroImutavel.congelar({'ART': {'numero': '1', 'itens': [1, {'a': 2}]}})
+    with pytest.raises(TypeError):
+        registro['ART'] = {}
+    with pytest.raises(TypeError):
+        registro['ART'].update(numero='2')
+    assert registro['ART']['itens'] == (1, {'a': 2})
+    copia = registro.copia()
+    copia['ART']['numero'] = '2'
+    assert registro['ART']['numero'] == '1'
+    assert copy.deepcopy(registro) == registro and type(copy.deepcopy(registro)) is dict
+    assert pickle.loads(pickle.dumps(registro)) == registro
+
+def test_contadores_do_cache(cache_pequeno):
+    inicio = estatisticas_cache()
+    outras = [REFERENCIA.replace('00489', f"{artigo:05d}") for artigo in range(3)]
+    for ref in [REFERENCIA, REFERENCIA] + outras + [outras[-1]]:
+        parse_referencias_legislativas([ref])
+    atual = estatisticas_cache()
+    assert atual['hits'] - inicio['hits'] == 2
+    assert atual['misses'] - inicio['misses'] == 4
+    # Com 2 entradas, as duas primeiras das quatro faltas encheram o cache; as outras descartaram uma cada
+    assert atual['evictions'] - inicio['evictions'] == 2
+    assert (atual['tamanho'], atual['maximo']) == (2, 2)
+    
+    # Acumulados no processo mesmo depois de redimensionar o cache
+    configurar_cache(10)
+    assert estatisticas_cache()['hits'] == atual['hits']
+    assert relatorio_cache(inicio).startswith("Cache de referências legislativas: 2 hits, 4 misses, 2 evicções")
+    assert referencias_legislativas._parse_referencia_cache.cache_info().currsize == 0
@@ -0,0 +1,30 @@
+import copy
+
+from benchmarks.synthetic import gerar_acordaos
+from parsers.acordao_index import AcordaoIndex
+from parsers.json_utils import dumps
+from parsers.registros import compactar_acordao
+from parsers.sigla_matcher import SiglaMatcher
+from process_stj_data import process_acordao, process_directory
+
+from .auxiliares import ler_saidas
+
+def test_registros_compactos_gravam_os_mesmos_bytes(entrada_sintetica, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada_sintetica, saida, registros_compactos=True)
+    assert ler_saidas(saida) == saidas_referencia
+
+def test_registros_compactos_com_pipeline(entrada_sintetica, saidas_referencia, tmp_path):
+    saida = str(tmp_path / 'saida')
+    process_directory(entrada_sintetica, saida, io_workers=4, registros_compactos=True)
+    assert ler_saidas(saida) == saidas_referencia
+
+def test_compactar_acordao_serializa_igual():
+    index = AcordaoIndex(SiglaMatcher.from_recursos())
+    acordaos = list(gerar_acordaos(50))
+    for acordao in acordaos:
+        index.add_acordao(acordao)
+    for acordao in acordaos:
+        processado = process_acordao(copy.deepcopy(acordao), index)
+        esperado = dumps(processado, indent=2)
+        assert dumps(compactar_acordao(processado), indent=2) == esperado
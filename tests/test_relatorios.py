@@ -0,0 +1,63 @@
+import contextlib
+import io
+from collections import Counter
+
+from parsers.input_sources import listar_fontes
+from parsers.json_utils import loads
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.relator_index import RelatorIndex
+from parsers.sketches import ContadorTopK
+
+def _relatorios(acordaos, somente_contagem: bool) -> str:
+    relatores = RelatorIndex(somente_contagem)
+    referencias = LegalReferencesIndex(somente_contagem)
+    for acordao in acordaos:
+        relatores.add_acordao(acordao)
+        for ref in acordao.get('referenciasLegislativasEstruturadas', []):
+            referencias.add_reference(ref, acordao['id'])
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        relatores._generate_report()
+        referencias._generate_report()
+    # A linha final do modo somente contagem descreve o próprio modo
+    return '\n'.join(linha for linha in saida.getvalue().splitlines() if not linha.startswith('(modo'))
+
+def test_contagem_igual_aos_conjuntos_com_ids_repetidos(saida_referencia):
+    acordaos = [acordao for fonte in listar_fontes(saida_referencia) for acordao in loads(fonte.ler_bytes())]
+    # Cada arquivo lido duas vezes, fora de sequência (como o mesmo acórdão em dois downloads)
+    repetidos = acordaos + acordaos[:len(acordaos) // 2]
+    relatorio = _relatorios(repetidos, somente_contagem=True)
+    assert relatorio == _relatorios(repetidos, somente_contagem=False)
+    assert relatorio != _relatorios(acordaos[len(acordaos) // 2:], somente_contagem=False)
+
+def test_id_repetido_fora_de_sequencia_conta_uma_vez():
+    ref = {'LEG': 'FED LEI', 'ANO': '1990', 'ART1': {'numero': '5'}}
+    indices = [LegalReferencesIndex(), LegalReferencesIndex(somente_contagem=True)]
+    for indice in indices:
+        for acordao_id in ('a', 'b', 'a'):
+            indice.add_reference(ref, acordao_id)
+    completo, contagem = indices
+    assert len(completo.by_law['FED LEI-1990']) == 2
+    assert contagem.contadores['by_law'].top_k(1) == [('FED LEI-1990', 2, 0)]
+    assert contagem.contadores['by_article'].top_k(1) == [('FED LEI-1990:ART5', 2, 0)]
+    assert contagem.total_references == completo.total_references == 3
+
+def test_top_k_exato_ate_a_capacidade_e_limitado_acima():
+    itens = [f"chave{i % 50}" for i in range(1000)] + [f"rara{i}" for i in range(200)] + ['chave0'] * 100
+    reais = Counter(itens)
+    
+    contador = ContadorTopK(capacidade=500)
+    contador.adicionar_varios(itens)
+    assert contador.exato
+    assert contador.total_distintos() == len(reais)
+    top = contador.top_k(3)
+    assert [contagem for _, contagem, _ in top] == sorted(reais.values(), reverse=True)[:3]
+    assert all(erro == 0 and contagem == reais[chave] for chave, contagem, erro in top)
+    
+    contador = ContadorTopK(capacidade=60)
+    contador.adicionar_varios(itens)
+    assert not contador.exato
+    for chave, contagem, erro in contador.top_k(10):
+        assert contagem - erro <= reais[chave] <= contagem
+    assert contador.top_k(1)[0][0] == 'chave0'
+    assert abs(contador.total_distintos() - len(reais)) <= 0.05 * len(reais)
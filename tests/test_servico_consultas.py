@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from parsers.legal_references_index import LegalReferencesIndex
+from parsers.relator_index import RelatorIndex
+from servico_consultas import ARQUIVO_REFERENCIAS, ARQUIVO_RELATORES, ServicoConsultas
+
+from .auxiliares import TOTAL_ACORDAOS, ler_json
+
+@pytest.fixture
+def servico(entrada_sintetica, saida_referencia, tmp_path) -> ServicoConsultas:
+    """Serviço sobre índices salvos da saída de referência (o de acórdãos é construído da entrada)."""
+    indices = str(tmp_path / 'indices')
+    os.makedirs(indices)
+    referencias = LegalReferencesIndex()
+    referencias.process_directory(saida_referencia)
+    referencias.save_to_file(os.path.join(indices, ARQUIVO_REFERENCIAS))
+    relatores = RelatorIndex()
+    relatores.process_directory(saida_referencia)
+    relatores.save_to_file(os.path.join(indices, ARQUIVO_RELATORES))
+    return ServicoConsultas.carregar(indices, entrada_sintetica, max_cache=2)
+
+def _consultar(servico: ServicoConsultas, rota: str, **params):
+    status, corpo = servico.consultar(rota, params)
+    return status, json.loads(corpo)
+
+def test_acordao_e_relator(servico, entrada_sintetica):
+    acordao = ler_json(os.path.join(entrada_sintetica, 'EspelhoPrimeiraTurma', '20200101.json'))[0]
+    status, resposta = _consultar(servico, '/acordao', tipo=acordao['siglaClasse'], numero=acordao['numeroProcesso'])
+    assert status == 200 and resposta['id'] == acordao['id']
+    assert _consultar(servico, '/acordao', tipo='REsp', numero='0')[0] == 404
+    assert _consultar(servico, '/acordao', tipo='REsp')[0] == 400
+    
+    status, resposta = _consultar(servico, '/relator', nome=acordao['ministroRelator'].lower())
+    assert status == 200 and resposta['relator'] == acordao['ministroRelator'].strip().upper()
+    assert resposta['totalAcordaos'] == sum(resposta['porOrgao'].values())
+    assert _consultar(servico, '/relator', nome='NINGUÉM')[0] == 404
+    assert _consultar(servico, '/inexistente')[0] == 404
+    assert servico.saude()['acordaos'] == TOTAL_ACORDAOS
+
+def test_legislacao_ordenada_sob_demanda(servico):
+    referencias = servico.referencias
+    assert servico._ids_ordenados == {}
+    chave = max(referencias.by_law, key=lambda lei: len(referencias.by_law[lei]))
+    status, resposta = _consultar(servico, '/legislacao', chave=chave, limite='3', offset='1')
+    assert status == 200
+    assert resposta['total'] == len(referencias.by_law[chave])
+    assert resposta['ids'] == sorted(referencias.by_law[chave])[1:4]
+    assert list(servico._ids_ordenados) == [chave]
+    assert _consultar(servico, '/legislacao', chave=chave, limite='x')[0] == 400
+    assert _consultar(servico, '/legislacao', chave='FED LEI-0')[0] == 404
+    
+    # Acrescentado ao índice (como pelo monitor), aparece depois de limpar_cache
+    referencias.by_law[chave].add('0')
+    servico.limpar_cache()
+    resposta = _consultar(servico, '/legislacao', chave=chave)[1]
+    assert resposta['total'] == len(referencias.by_law[chave]) and resposta['ids'][0] == '0'
+
+def test_cache_e_metricas(servico):
+    for _ in range(3):
+        _consultar(servico, '/acordao', tipo='REsp', numero='0')
+    _consultar(servico, '/acordao', tipo='REsp', numero='1')
+    _consultar(servico, '/acordao', tipo='REsp', numero='2')
+    metricas = servico.metricas()
+    assert metricas['cache'] == {'tamanho': 2, 'maximo': 2, 'hits': 2, 'misses': 3, 'taxaAcerto': 0.4}
+    assert metricas['endpoints']['/acordao']['requisicoes'] == 5
+    assert metricas['endpoints']['/acordao']['erros'] == 5
+
+def test_http_keep_alive(servico):
+    async def requisitar():
+        servidor = await servico.iniciar('127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+            respostas = []
+            for alvo in ('/saude', '/relator?nome=ningu%C3%A9m'):
+                writer.write(f"GET {alvo} HTTP/1.1\r\nHost: x\r\n\r\n".encode('latin-1'))
+                cabecalho = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+                tamanho = int(cabecalho.split('Content-Length: ')[1].split('\r\n')[0])
+                respostas.append((cabecalho.split(' ')[1], json.loads(await reader.readexactly(tamanho))))
+            writer.close()
+            return respostas
+            
+    (status_saude, saude), (status_relator, relator) = asyncio.run(requisitar())
+    assert status_saude == '200' and saude['acordaos'] == TOTAL_ACORDAOS
+    assert status_relator == '404' and 'NINGUÉM' in relator['erro'].upper()
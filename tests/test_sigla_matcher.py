@@ -0,0 +1,41 @@
+import pytest
+
+from parsers.acordao_index import AcordaoIndex
+from parsers.sigla_matcher import SiglaMatcher
+
+@pytest.fixture(scope='module')
+def matcher() -> SiglaMatcher:
+    return SiglaMatcher.from_recursos()
+
+@pytest.mark.parametrize('tipo, esperado', [
+    ('RESP', 'REsp'),
+    ('resp', 'REsp'),
+    ('REsp', 'REsp'),
+    ('AGRG NO RESP', 'AgRg no REsp'),
+    ('A.g.R.g. no R.E.s.p', 'AgRg no REsp'),
+    ('AgRg  no   REsp', 'AgRg no REsp'),
+    ('EDCL NO AGRG NO RESP', 'EDcl no AgRg no REsp'),
+    ('HC', 'HC'),
+])
+def test_canonicaliza_variacoes(matcher, tipo, esperado):
+    assert matcher.canonicalize(tipo) == esperado
+
+def test_mantem_tokens_desconhecidos(matcher):
+    assert matcher.canonicalize('XYZ no RESP') == 'XYZ no REsp'
+    assert matcher.canonicalize('') == ''
+
+def test_registra_siglas_dos_dados_sem_alterar_o_original(matcher):
+    copia = matcher.copia()
+    copia.registra('AgInt')
+    copia.registra('AREsp')
+    assert copia.canonicalize('AGINT NO ARESP') == 'AgInt no AREsp'
+    assert copia.canonicalize('a.g.i.n.t. no a.r.e.s.p') == 'AgInt no AREsp'
+    assert matcher.canonicalize('AGINT NO ARESP') == 'AGINT no ARESP'
+
+def test_indice_encontra_variacoes_da_sigla(matcher):
+    index = AcordaoIndex(matcher.copia())
+    index.add_acordao({'id': '1', 'siglaClasse': 'AgRg no REsp', 'numeroProcesso': '123'})
+    index.add_acordao({'id': '2', 'siglaClasse': 'AgInt no AREsp', 'numeroProcesso': '456'})
+    assert index.get_id('A.g.R.g. no R.E.s.p', '123') == '1'
+    assert index.get_id('AGINT NO ARESP', ' 456 ') == '2'
+    assert index.get_id('REsp', '123') is None